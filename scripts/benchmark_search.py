@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark hors ligne de la recherche complete (phases 1 a 8, BDD comprise).
+
+Usage:
+------
+    # 1. Enregistrer une vraie recherche (reseau + tokens de DATABASE_URL)
+    python scripts/benchmark_search.py record \\
+        --keywords "bijoux,montre femme" --cms Shopify --out bench/bijoux.jsonl.gz
+
+    # 2. Rejouer sans reseau (SQLite temporaire par defaut)
+    python scripts/benchmark_search.py replay --archive bench/bijoux.jsonl.gz \\
+        --runs 3 --latency-ms 50 --jitter-ms 20 --output bench/report.json
+
+    # 3. Comparer a une reference (code de sortie 1 si regression)
+    python scripts/benchmark_search.py replay --archive bench/bijoux.jsonl.gz \\
+        --baseline bench/baseline.json
+
+Options de replay:
+------------------
+    --database-url      Base cible (ex: postgresql://localhost/bench); vide = SQLite temporaire
+    --latency-ms        Latence fixe servie par le serveur local
+    --jitter-ms         Gigue uniforme ajoutee a la latence
+    --latency-scale     Rejoue la latence enregistree x facteur (remplace latency/jitter)
+    --runs              Nombre de runs (chacun dans un process neuf)
+    --tolerance         Degradation toleree par rapport a --baseline (0.15 = 15%)
+
+Mesures:
+--------
+- wall_seconds et duree de chaque phase
+- requetes/s, annonces sauvees/s
+- latence p50/p95 des appels Meta et web (cote client)
+- pic RSS du process
+- misses: requetes absentes de l'archive (le code a change d'appels)
+
+Note:
+-----
+Une base Postgres passee via --database-url doit etre vide: le cache API
+et les pages deja connues fausseraient les mesures.
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Ajouter le dossier parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+from src.infrastructure.config import (
+    BENCHMARK_LATENCY_MS,
+    BENCHMARK_JITTER_MS,
+    BENCHMARK_REGRESSION_TOLERANCE,
+)
+from src.infrastructure.benchmark import compare_reports, record_search, run_replay_isolated
+
+
+def _split(value: str) -> list:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def cmd_record(args):
+    from src.infrastructure.persistence.database import DatabaseManager
+
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    db = DatabaseManager(args.database_url)
+    record_search(
+        db, args.out, _split(args.keywords), _split(args.cms),
+        ads_min=args.ads_min, countries=args.countries, languages=args.languages,
+    )
+
+
+def cmd_replay(args):
+    report = run_replay_isolated(
+        runs=args.runs,
+        archive_path=args.archive,
+        database_url=args.database_url,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        latency_scale=args.latency_scale,
+    )
+
+    print("\n" + "=" * 60)
+    print("📊 BENCHMARK (médianes)")
+    print("=" * 60)
+    for key, value in report["median"].items():
+        print(f"   {key}: {value}")
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Rapport: {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_reports(report, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Régressions:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("\n✅ Pas de régression")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark hors ligne de la recherche (enregistrement / rejeu HTTP)"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="Enregistre une vraie recherche dans une archive")
+    record.add_argument("--keywords", required=True, help="Mots-clés séparés par des virgules")
+    record.add_argument("--cms", default="Shopify", help="CMS retenus, séparés par des virgules")
+    record.add_argument("--ads-min", type=int, default=3)
+    record.add_argument("--countries", default="FR")
+    record.add_argument("--languages", default="fr")
+    record.add_argument("--database-url", default=None, help="Base des tokens (défaut: DATABASE_URL)")
+    record.add_argument("--out", required=True, help="Archive à écrire (.jsonl.gz)")
+    record.set_defaults(func=cmd_record)
+
+    replay = sub.add_parser("replay", help="Rejoue une archive sans réseau et mesure")
+    replay.add_argument("--archive", required=True)
+    replay.add_argument("--database-url", default=None)
+    replay.add_argument("--latency-ms", type=float, default=BENCHMARK_LATENCY_MS)
+    replay.add_argument("--jitter-ms", type=float, default=BENCHMARK_JITTER_MS)
+    replay.add_argument("--latency-scale", type=float, default=None)
+    replay.add_argument("--runs", type=int, default=3)
+    replay.add_argument("--output", default=None, help="Rapport JSON à écrire")
+    replay.add_argument("--baseline", default=None, help="Rapport de référence")
+    replay.add_argument("--tolerance", type=float, default=BENCHMARK_REGRESSION_TOLERANCE)
+    replay.set_defaults(func=cmd_replay)
+
+    args = parser.parse_args()
+    try:
+        args.func(args)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Stockage compact des annonces pendant l'execution d'une recherche.
+
+Une annonce Meta en dict Python coute de l'ordre du kilo-octet (dict,
+chaines, listes de creatives). Pour une recherche de 50k annonces, les
+listes par page pesent plusieurs centaines de Mo par recherche.
+
+AdStore range les annonces en colonnes:
+- page (index dans la table des page_id internes)
+- mot-cle (index dans la table des mots-cles internes, -1 si absent)
+- reach (int64) et date de creation (epoch, int64) pour la detection winning
+- decalage dans une arene d'octets partagee ou les valeurs restantes de
+  l'annonce sont serialisees en JSON compact (creatives, snapshot, id...);
+  la liste des cles est internee une fois (schema) au lieu d'etre repetee
+
+Vu de l'executeur, le store reste un mapping page_id -> sequence d'annonces:
+les dicts ne sont reconstruits qu'a la lecture (un a la fois en iteration).
+"""
+import json
+import math
+import threading
+from array import array
+from collections.abc import MutableMapping, Sequence
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Sentinelle int64: valeur absente (reach/date de creation)
+_MISSING = -(2 ** 63)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def naive_epoch(value) -> Optional[int]:
+    """
+    Secondes depuis 1970 d'une date ISO Meta, fuseau ignore (comme is_winning_ad
+    qui compare des dates naives). None si absente ou invalide.
+    """
+    if not value:
+        return None
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        value = value.replace(tzinfo=None)
+        return math.floor((value - _EPOCH).total_seconds())
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def _normalize_reach(value) -> int:
+    """Meme normalisation que is_winning_ad (None/str invalide -> 0)"""
+    value = value or 0
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class _PageAds(Sequence):
+    """
+    Vue paresseuse des annonces d'une page (dict reconstruit a la lecture).
+    Les lignes sont relues a chaque acces: la vue reste valide apres compact().
+    """
+
+    __slots__ = ("_store", "_page_id")
+
+    def __init__(self, store: "AdStore", page_id):
+        self._store = store
+        self._page_id = page_id
+
+    def __len__(self) -> int:
+        return len(self._store._rows.get(self._page_id, ()))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store.ad(row) for row in self._store.rows(self._page_id)[index]]
+        return self._store.ad_at(self._page_id, index)
+
+    def __iter__(self) -> Iterator[dict]:
+        index = 0
+        while True:
+            try:
+                ad = self._store.ad_at(self._page_id, index)
+            except IndexError:
+                return
+            yield ad
+            index += 1
+
+    def __repr__(self) -> str:
+        return f"<PageAds {self._page_id}: {len(self)} annonces>"
+
+
+class AdStore(MutableMapping):
+    """
+    Annonces d'une recherche, par page, en colonnes + arene d'octets.
+    Thread-safe (la phase 1 ajoute pendant que le pipeline lit).
+    """
+
+    def __init__(self):
+        self._page_keys: List = []
+        self._page_index: Dict = {}
+        self._keywords: List[str] = []
+        self._keyword_index: Dict[str, int] = {}
+        self._schemas: List[tuple] = []
+        self._schema_index: Dict[tuple, int] = {}
+
+        self._page = array("i")
+        self._keyword = array("i")
+        self._schema = array("i")
+        self._reach = array("q")
+        self._created = array("q")
+        self._start = array("q")
+        self._end = array("q")
+        self._arena = bytearray()
+
+        self._rows: Dict = {}   # page_id -> array des lignes de la page
+        self._lock = threading.RLock()
+
+    # ─── Ecriture ────────────────────────────────────────────────────────────
+
+    def _intern_page(self, page_id) -> int:
+        index = self._page_index.get(page_id)
+        if index is None:
+            index = len(self._page_keys)
+            self._page_keys.append(page_id)
+            self._page_index[page_id] = index
+        return index
+
+    def _intern_keyword(self, keyword: str) -> int:
+        index = self._keyword_index.get(keyword)
+        if index is None:
+            index = len(self._keywords)
+            self._keywords.append(keyword)
+            self._keyword_index[keyword] = index
+        return index
+
+    def _intern_schema(self, keys: tuple) -> int:
+        index = self._schema_index.get(keys)
+        if index is None:
+            index = len(self._schemas)
+            self._schemas.append(keys)
+            self._schema_index[keys] = index
+        return index
+
+    def _append_row(self, page_id, ad: dict) -> int:
+        """Ajoute une ligne (appele avec le lock)"""
+        rest = dict(ad)
+        if rest.get("page_id") == page_id:
+            del rest["page_id"]
+
+        keyword = rest.get("_keyword")
+        keyword_idx = -1
+        if isinstance(keyword, str) and keyword:
+            keyword_idx = self._intern_keyword(rest.pop("_keyword"))
+
+        raw_reach = rest.get("eu_total_reach", _MISSING)
+        if raw_reach is _MISSING:
+            reach = _MISSING
+        elif type(raw_reach) is int:
+            reach = rest.pop("eu_total_reach")
+        else:
+            # Valeur brute conservee dans l'arene, colonne normalisee
+            reach = _normalize_reach(raw_reach)
+
+        created = naive_epoch(rest.get("ad_creation_time"))
+
+        payload = json.dumps(
+            list(rest.values()), separators=(",", ":"), ensure_ascii=False, default=str
+        ).encode("utf-8")
+        row = len(self._page)
+        self._page.append(self._intern_page(page_id))
+        self._keyword.append(keyword_idx)
+        self._schema.append(self._intern_schema(tuple(rest)))
+        self._reach.append(reach)
+        self._created.append(_MISSING if created is None else created)
+        self._start.append(len(self._arena))
+        self._arena += payload
+        self._end.append(len(self._arena))
+        return row
+
+    def add(self, page_id, ad: dict) -> int:
+        """Ajoute une annonce a la page. Retourne son numero de ligne."""
+        with self._lock:
+            row = self._append_row(page_id, ad)
+            rows = self._rows.get(page_id)
+            if rows is None:
+                rows = self._rows[page_id] = array("i")
+            rows.append(row)
+            return row
+
+    def __setitem__(self, page_id, ads: Iterable[dict]):
+        """Remplace les annonces d'une page (les anciennes lignes sont liberees au compact())"""
+        ads = list(ads)  # Peut etre une vue de ce store
+        with self._lock:
+            self._rows[page_id] = array("i", (self._append_row(page_id, ad) for ad in ads))
+
+    def __delitem__(self, page_id):
+        with self._lock:
+            del self._rows[page_id]
+
+    def retain(self, page_ids: Iterable):
+        """Ne garde que les pages donnees et libere la memoire des autres"""
+        keep = set(page_ids)
+        with self._lock:
+            for page_id in [pid for pid in self._rows if pid not in keep]:
+                del self._rows[page_id]
+            self.compact()
+
+    def compact(self):
+        """Reconstruit colonnes et arene avec les seules lignes encore referencees"""
+        with self._lock:
+            page, keyword, schema = array("i"), array("i"), array("i")
+            reach, created = array("q"), array("q")
+            start, end = array("q"), array("q")
+            arena = bytearray()
+            rows_by_page = {}
+
+            for page_id, rows in self._rows.items():
+                new_rows = array("i")
+                for row in rows:
+                    new_rows.append(len(page))
+                    page.append(self._page[row])
+                    keyword.append(self._keyword[row])
+                    schema.append(self._schema[row])
+                    reach.append(self._reach[row])
+                    created.append(self._created[row])
+                    start.append(len(arena))
+                    arena += self._arena[self._start[row]:self._end[row]]
+                    end.append(len(arena))
+                rows_by_page[page_id] = new_rows
+
+            self._page, self._keyword, self._schema = page, keyword, schema
+            self._reach, self._created = reach, created
+            self._start, self._end = start, end
+            self._arena = arena
+            self._rows = rows_by_page
+
+    # ─── Lecture ─────────────────────────────────────────────────────────────
+
+    def __getitem__(self, page_id) -> _PageAds:
+        if page_id not in self._rows:
+            raise KeyError(page_id)
+        return _PageAds(self, page_id)
+
+    def __iter__(self) -> Iterator:
+        with self._lock:
+            return iter(list(self._rows))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, page_id) -> bool:
+        return page_id in self._rows
+
+    def rows(self, page_id) -> array:
+        """Numeros de ligne des annonces d'une page (vide si inconnue)"""
+        with self._lock:
+            return array("i", self._rows.get(page_id, ()))
+
+    def ad(self, row: int) -> dict:
+        """Reconstruit le dict complet d'une annonce"""
+        with self._lock:
+            values = json.loads(bytes(self._arena[self._start[row]:self._end[row]]))
+            ad = dict(zip(self._schemas[self._schema[row]], values))
+            ad.setdefault("page_id", self._page_keys[self._page[row]])
+            if self._keyword[row] >= 0:
+                ad["_keyword"] = self._keywords[self._keyword[row]]
+            if "eu_total_reach" not in ad and self._reach[row] != _MISSING:
+                ad["eu_total_reach"] = self._reach[row]
+            return ad
+
+    def ad_at(self, page_id, index: int) -> dict:
+        """Annonce n de la page (IndexError au-dela, page inconnue comprise)"""
+        with self._lock:
+            rows = self._rows.get(page_id, ())
+            return self.ad(rows[index])
+
+    def reach(self, row: int) -> int:
+        """Reach normalise (0 si absent)"""
+        value = self._reach[row]
+        return 0 if value == _MISSING else value
+
+    def created_epoch(self, row: int) -> Optional[int]:
+        """Date de creation (epoch naif) ou None si absente/invalide"""
+        value = self._created[row]
+        return None if value == _MISSING else value
+
+    def first_keyword(self, page_id) -> Optional[str]:
+        """Premier mot-cle ayant trouve une annonce de la page"""
+        with self._lock:
+            for row in self._rows.get(page_id, ()):
+                if self._keyword[row] >= 0:
+                    return self._keywords[self._keyword[row]]
+        return None
+
+    @property
+    def ad_count(self) -> int:
+        """Nombre d'annonces referencees (toutes pages)"""
+        return sum(len(rows) for rows in self._rows.values())
+
+    def nbytes(self) -> int:
+        """Memoire occupee par les colonnes et l'arene (octets)"""
+        with self._lock:
+            columns = (self._page, self._keyword, self._schema, self._reach, self._created, self._start, self._end)
+            row_lists = sum(len(rows) * rows.itemsize for rows in self._rows.values())
+            return sum(len(col) * col.itemsize for col in columns) + len(self._arena) + row_lists
@@ -7,12 +7,26 @@ Migre depuis app/search_executor.py vers l'architecture hexagonale.
 import os
 import time
 import json
+import queue
+import threading
+from contextvars import copy_context
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Callable
 from uuid import UUID
 from collections import defaultdict, Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from src.application.use_cases.ad_store import AdStore, naive_epoch
+from src.infrastructure.monitoring.tracing import Tracer, trace_span
+from src.infrastructure.cache.document_cache import (
+    DocumentCache, set_current_document_cache, clear_current_document_cache
+)
+from src.infrastructure.cache.fingerprint_store import DomainFingerprintStore
+from src.infrastructure.http.revalidation import configure_revalidation_cache
+from src.infrastructure.http.host_health import (
+    RetryBudget, set_current_retry_budget, clear_current_retry_budget
+)
+
 # Imports depuis l'architecture hexagonale
 try:
     from src.infrastructure.config import (
@@ -20,7 +34,19 @@ try:
         META_DELAY_BETWEEN_BATCHES,
         WINNING_AD_CRITERIA,
         MIN_ADS_SUIVI,
-        MIN_ADS_LISTE
+        MIN_ADS_LISTE,
+        FIELDS_ADS_COMPLETE,
+        FIELDS_ADS_COUNT,
+        META_LEAN_COUNT_ENABLED,
+        SEARCH_CHECKPOINT_ENABLED,
+        SEARCH_CHECKPOINT_INTERVAL,
+        SEARCH_PIPELINE_ENABLED,
+        SEARCH_PIPELINE_QUEUE_SIZE,
+        SEARCH_PIPELINE_CMS_WORKERS,
+        SEARCH_PIPELINE_WEB_WORKERS,
+        CRAWLER_WORKERS,
+        TRACE_ENABLED,
+        DOCUMENT_CACHE_ENABLED
     )
 except ImportError:
     from src.infrastructure.config import (
@@ -28,24 +54,484 @@ except ImportError:
         META_DELAY_BETWEEN_BATCHES,
         WINNING_AD_CRITERIA,
         MIN_ADS_SUIVI,
-        MIN_ADS_LISTE
+        MIN_ADS_LISTE,
+        FIELDS_ADS_COMPLETE,
+        FIELDS_ADS_COUNT,
+        META_LEAN_COUNT_ENABLED,
+        SEARCH_CHECKPOINT_ENABLED,
+        SEARCH_CHECKPOINT_INTERVAL,
+        SEARCH_PIPELINE_ENABLED,
+        SEARCH_PIPELINE_QUEUE_SIZE,
+        SEARCH_PIPELINE_CMS_WORKERS,
+        SEARCH_PIPELINE_WEB_WORKERS,
+        CRAWLER_WORKERS,
+        TRACE_ENABLED,
+        DOCUMENT_CACHE_ENABLED
     )
 
 
+def extract_website_from_ads(ads_list) -> str:
+    """Extrait l'URL du site depuis les annonces"""
+    for ad in ads_list:
+        link_url = ad.get("ad_creative_link_url")
+        if link_url:
+            return link_url
+        captions = ad.get("ad_creative_link_captions", [])
+        if captions and isinstance(captions, list):
+            for cap in captions:
+                if cap and "." in cap:
+                    return f"https://{cap}"
+    return ""
+
+
+class PageAdsGrouper:
+    """
+    Regroupement incremental des annonces par page.
+
+    Alimente au fil de la recherche (streaming page par page) ou a partir
+    d'une liste complete: deduplique les annonces, ignore la blacklist et
+    construit les structures de la phase 2 sans conserver de liste globale.
+    Les annonces sont rangees dans un AdStore compact (page_ads).
+    """
+
+    def __init__(self, blacklist_ids: set):
+        self.blacklist_ids = blacklist_ids
+        self.pages: Dict[str, dict] = {}
+        self.page_ads = AdStore()
+        self.name_counter = defaultdict(Counter)
+        self.seen_ad_ids = set()
+        self.total_ads = 0
+        self.blacklisted_ads_count = 0
+        self.blacklisted_pages_found = set()
+        self._touched = set()    # Pages ayant recu des annonces depuis take_qualified()
+        self._qualified = set()  # Pages deja signalees par take_qualified()
+
+    def add_ads(self, ads: List[dict], keyword: str = ""):
+        """Ajoute une page de resultats (ou une liste d'annonces)"""
+        for ad in ads:
+            self.total_ads += 1
+            ad_id = ad.get("id")
+            if ad_id:
+                if ad_id in self.seen_ad_ids:
+                    continue
+                self.seen_ad_ids.add(ad_id)
+            if keyword and not ad.get("_keyword"):
+                ad["_keyword"] = keyword
+            self._add_ad(ad)
+
+    def _add_ad(self, ad: dict):
+        pid = ad.get("page_id")
+        if not pid:
+            return
+
+        if str(pid) in self.blacklist_ids:
+            self.blacklisted_ads_count += 1
+            self.blacklisted_pages_found.add(str(pid))
+            return
+
+        pname = (ad.get("page_name") or "").strip()
+
+        if pid not in self.pages:
+            self.pages[pid] = {
+                "page_id": pid, "page_name": pname, "website": "",
+                "_ad_ids": set(), "_keywords": set(), "ads_found_search": 0,
+                "ads_active_total": -1, "currency": "",
+                "cms": "Unknown", "is_shopify": False
+            }
+
+        if ad.get("_keyword"):
+            self.pages[pid]["_keywords"].add(ad["_keyword"])
+        # Site de la premiere annonce qui en donne un (conserve par le checkpoint)
+        if not self.pages[pid]["website"]:
+            self.pages[pid]["website"] = extract_website_from_ads([ad])
+
+        ad_id = ad.get("id")
+        if ad_id:
+            self.pages[pid]["_ad_ids"].add(ad_id)
+            self.page_ads.add(pid, ad)
+            self._touched.add(pid)
+        if pname:
+            self.name_counter[pid][pname] += 1
+
+    def to_state(self) -> dict:
+        """
+        Etat serialisable compact (checkpoint).
+
+        Seuls les identifiants d'annonces par page sont conserves, pas les
+        annonces: apres une reprise, celles des pages retenues sont
+        redemandees a Meta en phase 5.
+        """
+        return {
+            "pages": {
+                pid: {**data, "_ad_ids": list(data["_ad_ids"]), "_keywords": list(data["_keywords"])}
+                for pid, data in self.pages.items()
+            },
+            "name_counter": {pid: dict(counter) for pid, counter in self.name_counter.items()},
+            "total_ads": self.total_ads,
+            "blacklisted_ads_count": self.blacklisted_ads_count,
+            "blacklisted_pages_found": list(self.blacklisted_pages_found),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, blacklist_ids: set) -> "PageAdsGrouper":
+        """Reconstruit un grouper depuis un checkpoint"""
+        grouper = cls(blacklist_ids)
+        grouper.pages = {
+            pid: {**data, "_ad_ids": set(data["_ad_ids"]), "_keywords": set(data["_keywords"])}
+            for pid, data in state.get("pages", {}).items()
+        }
+        for pid, names in state.get("name_counter", {}).items():
+            grouper.name_counter[pid].update(names)
+        grouper.seen_ad_ids = {ad_id for data in grouper.pages.values() for ad_id in data["_ad_ids"]}
+        grouper.total_ads = state.get("total_ads", 0)
+        grouper.blacklisted_ads_count = state.get("blacklisted_ads_count", 0)
+        grouper.blacklisted_pages_found = set(state.get("blacklisted_pages_found", []))
+        grouper._touched = set(grouper.pages)
+        return grouper
+
+    def take_qualified(self, min_ads: int) -> List[str]:
+        """
+        Pages ayant atteint min_ads annonces depuis le dernier appel
+        (chaque page n'est renvoyee qu'une fois).
+        """
+        qualified = [
+            pid for pid in self._touched
+            if pid not in self._qualified and len(self.pages[pid]["_ad_ids"]) >= min_ads
+        ]
+        self._qualified.update(qualified)
+        self._touched.clear()
+        return qualified
+
+    def finalize(self) -> Dict[str, dict]:
+        """Fixe le nom majoritaire et le nombre d'ads de chaque page"""
+        for pid, counter in self.name_counter.items():
+            if counter and pid in self.pages:
+                self.pages[pid]["page_name"] = counter.most_common(1)[0][0]
+
+        for data in self.pages.values():
+            data["ads_found_search"] = len(data["_ad_ids"])
+
+        return self.pages
+
+
+class PagePipeline:
+    """
+    Traitement des pages au fil de l'eau entre les phases (mode pipeline).
+
+    Une page qualifiee en phase 1 (>= ads_min annonces) traverse les etapes
+    sans attendre la fin des autres pages:
+
+        site (par lots) -> CMS -> analyse web (si le CMS passe le filtre)
+
+    Les etapes communiquent par des files bornees: une etape lente freine
+    les precedentes au lieu d'accumuler des pages en memoire. Les phases 4 et
+    6 reutilisent ensuite les resultats deja calcules (wait_cms / wait_web).
+    """
+
+    _END = object()
+
+    def __init__(
+        self,
+        resolve_sites: Callable[[List[str]], Dict[str, str]],
+        detect_cms: Callable[[str, str], dict],
+        accept_for_web: Callable[[str, dict], bool],
+        analyze_web: Callable[[str, str], dict],
+        queue_size: int = SEARCH_PIPELINE_QUEUE_SIZE,
+        cms_workers: int = SEARCH_PIPELINE_CMS_WORKERS,
+        web_workers: int = SEARCH_PIPELINE_WEB_WORKERS
+    ):
+        """
+        Args:
+            resolve_sites: fn(pids) -> {pid: url du site} ("" si inconnu)
+            detect_cms: fn(pid, url) -> {"cms": ..., "is_shopify": ...}
+            accept_for_web: fn(pid, resultat CMS) -> True si la page doit etre analysee
+            analyze_web: fn(pid, url) -> resultat de l'analyse web
+            queue_size: Taille de chaque file entre deux etapes
+            cms_workers: Threads de detection CMS
+            web_workers: Threads d'analyse web
+        """
+        self._resolve_sites = resolve_sites
+        self._detect_cms = detect_cms
+        self._accept_for_web = accept_for_web
+        self._analyze_web = analyze_web
+        self._cms_workers = max(1, cms_workers)
+        self._web_workers = max(1, web_workers)
+
+        self._site_queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._cms_queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._web_queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._cms_done = threading.Event()
+        self._web_done = threading.Event()
+        self._cms_alive = self._cms_workers
+        self._web_alive = self._web_workers
+
+        self.sites: Dict[str, str] = {}
+        self.cms_results: Dict[str, dict] = {}
+        self.web_results: Dict[str, dict] = {}
+
+        # Étapes exécutées dans le contexte de la recherche (cache de documents, budget de relances)
+        stages = [(self._site_stage, "pipeline_site")]
+        stages += [(self._cms_stage, f"pipeline_cms_{i}") for i in range(self._cms_workers)]
+        stages += [(self._web_stage, f"pipeline_web_{i}") for i in range(self._web_workers)]
+        self._threads = [
+            threading.Thread(target=copy_context().run, args=(stage,), daemon=True, name=name)
+            for stage, name in stages
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _put(self, target: "queue.Queue", item) -> bool:
+        """Put bloquant (back-pressure) mais interruptible par cancel()"""
+        while not self._cancelled.is_set():
+            try:
+                target.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def submit(self, pids: List[str]):
+        """Ajoute des pages qualifiees (bloque si l'etape site est saturee)"""
+        for pid in pids:
+            if not self._put(self._site_queue, pid):
+                return
+
+    def close(self):
+        """Plus aucune page a soumettre: les etapes se terminent une fois videes"""
+        self._put(self._site_queue, self._END)
+
+    def cancel(self):
+        """Abandonne les pages en attente (recherche sans resultat ou en erreur)"""
+        self._cancelled.set()
+        self._cms_done.set()
+        self._web_done.set()
+
+    def _site_stage(self):
+        finished = False
+        while not finished and not self._cancelled.is_set():
+            try:
+                pids = [self._site_queue.get(timeout=0.2)]
+            except queue.Empty:
+                continue
+            # Regrouper ce qui est deja en file: une requete BDD par lot
+            while len(pids) < 50:
+                try:
+                    pids.append(self._site_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self._END in pids:
+                finished = True
+                pids = [pid for pid in pids if pid is not self._END]
+            if not pids:
+                continue
+
+            try:
+                sites = self._resolve_sites(pids)
+            except Exception as e:
+                print(f"⚠️ Pipeline: echec resolution des sites: {e}")
+                sites = {}
+            for pid in pids:
+                url = sites.get(pid, "")
+                if url:
+                    self.sites[pid] = url
+                    self._put(self._cms_queue, (pid, url))
+
+        for _ in range(self._cms_workers):
+            self._put(self._cms_queue, self._END)
+
+    def _cms_stage(self):
+        while not self._cancelled.is_set():
+            try:
+                item = self._cms_queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if item is self._END:
+                break
+            pid, url = item
+            try:
+                result = self._detect_cms(pid, url)
+            except Exception:
+                result = {"cms": "Unknown", "is_shopify": False}
+            with self._lock:
+                self.cms_results[pid] = result
+            try:
+                accepted = self._accept_for_web(pid, result)
+            except Exception:
+                accepted = False
+            if accepted:
+                self._put(self._web_queue, (pid, url))
+
+        with self._lock:
+            self._cms_alive -= 1
+            last = self._cms_alive == 0
+        if last:
+            self._cms_done.set()
+            for _ in range(self._web_workers):
+                self._put(self._web_queue, self._END)
+
+    def _web_stage(self):
+        while not self._cancelled.is_set():
+            try:
+                item = self._web_queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if item is self._END:
+                break
+            pid, url = item
+            try:
+                result = self._analyze_web(pid, url)
+            except Exception as e:
+                result = {"product_count": 0, "error": str(e)}
+            with self._lock:
+                self.web_results[pid] = result
+
+        with self._lock:
+            self._web_alive -= 1
+            last = self._web_alive == 0
+        if last:
+            self._web_done.set()
+
+    def wait_cms(self) -> Dict[str, dict]:
+        """Attend la fin des etapes site et CMS; retourne {pid: resultat CMS}"""
+        self._cms_done.wait()
+        with self._lock:
+            return dict(self.cms_results)
+
+    def wait_web(self) -> Dict[str, dict]:
+        """Attend la fin de l'analyse web; retourne {pid: resultat}"""
+        self._web_done.wait()
+        with self._lock:
+            return dict(self.web_results)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Pages traitees par etape"""
+        with self._lock:
+            return {
+                "sites": len(self.sites),
+                "cms": len(self.cms_results),
+                "web": len(self.web_results),
+            }
+
+
+class SearchCheckpoint:
+    """
+    Point de reprise d'une recherche, persiste dans SearchQueue.checkpoint_data.
+
+    Chaque phase couteuse y enregistre ses resultats (pages groupees et curseurs
+    Meta, CMS, comptages, analyses web). Une recherche relancee apres un
+    redeploiement ou un crash ne refait pas les appels deja effectues.
+    """
+
+    def __init__(self, db, search_id: int, data: Optional[dict] = None,
+                 enabled: bool = SEARCH_CHECKPOINT_ENABLED,
+                 interval: float = SEARCH_CHECKPOINT_INTERVAL):
+        self.db = db
+        self.search_id = search_id
+        self.data = data or {}
+        self.enabled = enabled
+        self.interval = interval
+        self.tracer: Optional[Tracer] = None
+        self._last_save = time.time()
+
+    @classmethod
+    def load(cls, db, search_id: int) -> "SearchCheckpoint":
+        """Charge le checkpoint existant (vide si absent ou desactive)"""
+        data = None
+        if SEARCH_CHECKPOINT_ENABLED:
+            try:
+                from src.infrastructure.persistence.database import get_search_checkpoint
+                data = get_search_checkpoint(db, search_id)
+            except Exception as e:
+                print(f"[Search #{search_id}] ⚠️ Checkpoint illisible: {e}")
+        return cls(db, search_id, data)
+
+    @property
+    def phase(self) -> int:
+        """Derniere phase terminee (0 si aucune)"""
+        return self.data.get("phase", 0)
+
+    @property
+    def resumed(self) -> bool:
+        """True si la recherche reprend depuis un checkpoint"""
+        return bool(self.data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def is_due(self) -> bool:
+        """True si l'intervalle minimum depuis le dernier enregistrement est ecoule"""
+        return time.time() - self._last_save >= self.interval
+
+    def discard(self, *keys: str):
+        """Retire de l'etat les donnees devenues inutiles (au prochain enregistrement)"""
+        for key in keys:
+            self.data.pop(key, None)
+
+    def update(self, **state):
+        """Met a jour l'etat et l'enregistre en base"""
+        self.data.update(state)
+        self._last_save = time.time()
+        if not self.enabled:
+            return
+        try:
+            from src.infrastructure.persistence.database import save_search_checkpoint
+            with trace_span(self.tracer, "checkpoint", "db"):
+                save_search_checkpoint(self.db, self.search_id, self.data)
+        except Exception as e:
+            print(f"[Search #{self.search_id}] ⚠️ Erreur sauvegarde checkpoint: {e}")
+
+
+def merge_counted_ads(counted_ads: List[dict], known_ads: List[dict]) -> tuple:
+    """
+    Complete les annonces comptees en mode leger avec les creatives deja
+    recues en phase 1 (meme ad id).
+
+    Args:
+        counted_ads: Annonces du comptage (FIELDS_ADS_COUNT)
+        known_ads: Annonces completes deja connues pour la page
+
+    Returns:
+        Tuple (annonces fusionnees, True si toutes les creatives etaient connues)
+    """
+    known_by_id = {ad.get("id"): ad for ad in known_ads if ad.get("id")}
+    merged = []
+    complete = True
+
+    for ad in counted_ads:
+        known = known_by_id.get(ad.get("id"))
+        if known is None:
+            complete = False
+            merged.append(ad)
+            continue
+        full_ad = dict(known)
+        full_ad.update(ad)  # Reach/devise du comptage plus recents
+        merged.append(full_ad)
+
+    return merged, complete
+
+
 class BackgroundProgressTracker:
     """
     Tracker de progression pour les recherches en arrière-plan.
-    Met à jour la base de données au lieu de l'UI Streamlit.
+    Publie sur le canal de progression (push SSE) au lieu de l'UI Streamlit;
+    les étapes sont écrites en base au plus une fois par intervalle,
+    les débuts/fins de phase immédiatement.
     """
 
-    def __init__(self, db, search_id: int):
+    def __init__(self, db, search_id: int, tracer: Optional[Tracer] = None):
         """
         Args:
             db: DatabaseManager instance
             search_id: ID de la recherche dans SearchQueue
+            tracer: Tracer de la recherche (un span par phase)
         """
         self.db = db
         self.search_id = search_id
+        self.tracer = tracer
+        self._phase_span = None
         self.current_phase = 0
         self.total_phases = 9
         self.phases_data = []
@@ -57,6 +543,10 @@ class BackgroundProgressTracker:
         self.current_phase = phase_num
         self.total_phases = total_phases
         self.phase_start_time = time.time()
+        if self.tracer:
+            if self._phase_span is not None:
+                self.tracer.end(self._phase_span)
+            self._phase_span = self.tracer.begin(phase_name, "phase", phase=phase_num)
 
         # Calculer le pourcentage global
         progress_percent = int((phase_num - 1) / total_phases * 100)
@@ -65,7 +555,8 @@ class BackgroundProgressTracker:
             phase=phase_num,
             phase_name=phase_name,
             percent=progress_percent,
-            message=f"Phase {phase_num}/{total_phases}: {phase_name}"
+            message=f"Phase {phase_num}/{total_phases}: {phase_name}",
+            force=True
         )
 
         print(f"[Search #{self.search_id}] Phase {phase_num}: {phase_name}")
@@ -99,13 +590,17 @@ class BackgroundProgressTracker:
             "stats": stats or {}
         }
         self.phases_data.append(phase_data)
+        if self.tracer and self._phase_span is not None:
+            self.tracer.end(self._phase_span, result=result_summary)
+            self._phase_span = None
 
         # Mettre à jour la DB avec les phases complètes
         self._update_db(
             phase=self.current_phase,
             percent=int(self.current_phase / self.total_phases * 100),
             message=f"Phase {self.current_phase} terminée: {result_summary}",
-            phases_data=self.phases_data
+            phases_data=self.phases_data,
+            force=True
         )
 
         print(f"[Search #{self.search_id}] Phase {self.current_phase} terminée: {result_summary} ({self._format_duration(duration)})")
@@ -115,18 +610,19 @@ class BackgroundProgressTracker:
         self.metrics[key] = value
 
     def _update_db(self, phase: int, percent: int, message: str,
-                   phase_name: str = None, phases_data: list = None):
-        """Met à jour la base de données"""
-        from src.infrastructure.persistence.database import update_search_queue_progress
+                   phase_name: str = None, phases_data: list = None, force: bool = False):
+        """Publie la progression (écriture base coalescée, immédiate si force)"""
+        from src.infrastructure.monitoring.progress_channel import publish_progress
 
-        update_search_queue_progress(
+        publish_progress(
             self.db,
             self.search_id,
+            force=force,
             phase=phase,
             phase_name=phase_name or self._get_phase_name(phase),
             percent=percent,
             message=message,
-            phases_data=phases_data
+            phases_data=list(phases_data) if phases_data is not None else None
         )
 
     def _get_phase_name(self, phase_num: int) -> str:
@@ -186,6 +682,85 @@ def execute_background_search(
     Returns:
         Dict avec les résultats et search_log_id
     """
+    pipelines: List[PagePipeline] = []
+    tracer = Tracer("search", search_id=search_id, keywords=len(keywords)) if TRACE_ENABLED else None
+    # Pages d'accueil téléchargées une fois pour la recherche (CMS, analyse web, Gemini)
+    documents = DocumentCache() if DOCUMENT_CACHE_ENABLED else None
+    if documents is not None:
+        set_current_document_cache(documents)
+    # Relances du moteur de crawl bornées pour la recherche (hôtes muets, pannes)
+    retries = RetryBudget()
+    set_current_retry_budget(retries)
+    status = "failed"
+    try:
+        result = _run_background_search(
+            db, search_id, keywords, cms_filter, ads_min,
+            countries, languages, user_id, pipelines, tracer
+        )
+        status = result.get("status", "completed")
+        return result
+    finally:
+        # Arrêter les étapes du pipeline (fin anticipée, erreur)
+        for pipeline in pipelines:
+            pipeline.cancel()
+        if documents is not None:
+            _close_document_cache(search_id, documents)
+        _close_retry_budget(search_id, retries)
+        if tracer:
+            _save_trace(db, tracer, status)
+
+
+def _close_document_cache(search_id: int, documents: DocumentCache):
+    """Désactive le cache de documents de la recherche et supprime ses fichiers"""
+    clear_current_document_cache(documents)
+    stats = documents.get_stats()
+    documents.close()
+    if stats["hits"] or stats["stored"]:
+        print(f"[Search #{search_id}] Cache documents: {stats['stored']} stockés, "
+              f"{stats['hits']} réutilisés, {stats['spilled']} sur disque")
+
+
+def _close_retry_budget(search_id: int, retries: RetryBudget):
+    """Désactive le budget de relances de la recherche"""
+    clear_current_retry_budget(retries)
+    stats = retries.get_stats()
+    if stats["denied"]:
+        print(f"[Search #{search_id}] Budget relances: {stats['retries']} relances, "
+              f"{stats['denied']} refusées ({stats['requests']} requêtes)")
+
+
+def _save_trace(db, tracer: Tracer, status: str):
+    """Termine le trace et l'attache au SearchLog (résumé + trace Chrome)"""
+    tracer.finish(status=status)
+    search_id = tracer.root.attrs.get("search_id")
+    log_id = tracer.root.attrs.get("search_log_id")
+    if not log_id:
+        return
+    try:
+        from src.infrastructure.persistence.database import save_search_trace
+        summary = tracer.summary()
+        save_search_trace(db, log_id, summary, tracer.to_chrome_trace())
+        print(f"[Search #{search_id}] Trace: {summary['spans']} spans, {summary['dropped_spans']} ignorés")
+    except Exception as e:
+        print(f"[Search #{search_id}] ⚠️ Erreur sauvegarde trace: {e}")
+
+
+def _run_background_search(
+    db,
+    search_id: int,
+    keywords: List[str],
+    cms_filter: List[str],
+    ads_min: int,
+    countries: str,
+    languages: str,
+    user_id: Optional[UUID],
+    pipelines: List["PagePipeline"],
+    tracer: Optional[Tracer] = None
+) -> Dict[str, Any]:
+    """
+    Corps de execute_background_search (pipelines: étapes à arrêter en sortie,
+    tracer: spans de la recherche, None si désactivé)
+    """
     # Imports depuis l'architecture hexagonale (avec fallback legacy)
     try:
         from src.infrastructure.external_services.meta_api import (
@@ -204,7 +779,7 @@ def execute_background_search(
         get_active_meta_tokens_with_proxies, get_blacklist_ids, get_cached_pages_info,
         create_search_log, update_search_log, save_pages_recherche,
         save_suivi_page, save_ads_recherche, save_winning_ads,
-        ensure_tables_exist, is_winning_ad,
+        ensure_tables_exist, match_winning_criteria,
         record_pages_search_history_batch, record_winning_ads_search_history_batch
     )
 
@@ -213,7 +788,7 @@ def execute_background_search(
                    "Wix", "Squarespace", "Custom", "Autre/Inconnu"]
 
     # Créer le tracker de progression
-    tracker = BackgroundProgressTracker(db, search_id)
+    tracker = BackgroundProgressTracker(db, search_id, tracer=tracer)
 
     # Convertir countries et languages en listes si ce sont des strings
     # (SearchQueue stocke des strings comme "FR" ou "FR,BE")
@@ -230,6 +805,13 @@ def execute_background_search(
     # S'assurer que les tables existent
     ensure_tables_exist(db)
 
+    # Validateurs HTTP persistants (pages d'accueil et sitemaps revalidés entre scans)
+    configure_revalidation_cache(db)
+
+    # Empreintes de domaines partagées entre utilisateurs (consultées avant tout crawl)
+    fingerprints = DomainFingerprintStore(db)
+    analysis_country = countries_list[0] if countries_list else "FR"
+
     # Charger les tokens avec leurs proxies
     tokens_data = get_active_meta_tokens_with_proxies(db)
     if not tokens_data:
@@ -245,109 +827,179 @@ def execute_background_search(
     rotator = init_token_rotator(tokens_with_proxies=tokens_data, db=db)
     client = MetaAdsClient(rotator.get_current_token())
 
-    # Créer le log de recherche
-    log_id = create_search_log(
-        db,
-        keywords=keywords,
-        countries=countries,
-        languages=languages,
-        min_ads=ads_min,
-        selected_cms=cms_filter,
-        user_id=user_id
-    )
+    # Point de reprise (recherche relancee apres interruption)
+    checkpoint = SearchCheckpoint.load(db, search_id)
+    checkpoint.tracer = tracer
+    if checkpoint.resumed:
+        print(f"[Search #{search_id}] ♻️ Reprise depuis le checkpoint (phase {checkpoint.phase} terminée)")
+
+    # Créer le log de recherche (ou reprendre celui de l'exécution interrompue)
+    log_id = checkpoint.get("search_log_id")
+    if not log_id:
+        log_id = create_search_log(
+            db,
+            keywords=keywords,
+            countries=countries,
+            languages=languages,
+            min_ads=ads_min,
+            selected_cms=cms_filter,
+            user_id=user_id
+        )
+        checkpoint.update(search_log_id=log_id)
 
-    # Créer l'API tracker
-    api_tracker = APITracker(search_log_id=log_id, db=db)
+    # Créer l'API tracker (chaque appel devient aussi un span du trace)
+    if tracer:
+        tracer.root.attrs["search_log_id"] = log_id
+    api_tracker = APITracker(search_log_id=log_id, db=db, tracer=tracer)
     set_current_tracker(api_tracker)
 
     # Récupérer la blacklist
     blacklist_ids = get_blacklist_ids(db, user_id=user_id)
     print(f"[Search #{search_id}] {len(blacklist_ids)} pages en blacklist")
 
+    def cms_matches(cms_name):
+        if cms_name in cms_filter:
+            return True
+        if "Autre/Inconnu" in cms_filter and cms_name not in cms_options[:-1]:
+            return True
+        return False
+
     # ═══ PHASE 1: Recherche par mots-clés (parallèle si proxies) ═══
     tracker.start_phase(1, "Recherche par mots-clés", total_phases=8)
 
-    # Utiliser la recherche parallèle intelligente
-    try:
-        from src.infrastructure.external_services.meta_api import search_keywords_parallel
-    except ImportError:
+    from src.infrastructure.config import META_ASYNC_ENABLED
+    if checkpoint.get("grouper"):
+        grouper = PageAdsGrouper.from_state(checkpoint.get("grouper"), blacklist_ids)
+    else:
+        grouper = PageAdsGrouper(blacklist_ids)
+
+    # Mots-cles deja termines et curseurs Meta des mots-cles en cours
+    keywords_done = list(checkpoint.get("keywords_done", []))
+    cursors = dict(checkpoint.get("cursors", {}))
+    if checkpoint.phase >= 2:
+        remaining_keywords = []
+    else:
+        remaining_keywords = [kw for kw in keywords if kw not in keywords_done]
+
+    # Mode pipeline: etapes CMS / analyse web alimentees pendant la phase 1
+    pipeline = None
+    pipeline_cached_pages = {}
+
+    def pipeline_sites(pids):
+        pipeline_cached_pages.update(get_cached_pages_info(db, pids, cache_days=1, user_id=user_id))
+        sites = {
+            pid: pipeline_cached_pages.get(str(pid), {}).get("lien_site")
+            or grouper.pages[pid]["website"]
+            for pid in pids
+        }
+        fingerprints.preload(sites.values())
+        return sites
+
+    def pipeline_cms(pid, website):
+        cached = pipeline_cached_pages.get(str(pid), {})
+        if cached.get("cms") and cached["cms"] not in ("Unknown", "Inconnu", ""):
+            return {"cms": cached["cms"], "is_shopify": cached["cms"] == "Shopify", "_cached": True}
+        shared_cms = fingerprints.get_cms(website)
+        if shared_cms:
+            return {"cms": shared_cms, "is_shopify": shared_cms == "Shopify", "_cached": True}
+        with trace_span(tracer, "cms", "page", key=f"page:{pid}", page_id=pid, url=website):
+            cms_result = detect_cms_from_url(website)
+        fingerprints.record_cms(website, cms_result.get("cms"))
+        return cms_result
+
+    def pipeline_accept(pid, cms_result):
+        if not cms_matches(cms_result.get("cms", "Unknown")):
+            return False
+        cached = pipeline_cached_pages.get(str(pid), {})
+        # Meme critere de cache valide que la phase 6
+        return not (not cached.get("needs_rescan") and cached.get("nombre_produits") is not None
+                    and cached.get("thematique"))
+
+    def pipeline_analyze(pid, website):
+        shared = fingerprints.get_web_result(website, analysis_country)
+        if shared:
+            return shared
+        with trace_span(tracer, "web_analysis", "page", key=f"page:{pid}", page_id=pid, url=website):
+            result = analyze_website_complete(website, analysis_country)
+        fingerprints.record_analysis(website, result, analysis_country)
+        return result
+
+    if remaining_keywords and META_ASYNC_ENABLED:
+        # Streaming: chaque page de resultats Meta est dedupliquee et
+        # regroupee des sa reception (pas de liste globale d'annonces)
+        from src.infrastructure.external_services.async_meta_api import iter_search_keywords
+
+        if SEARCH_PIPELINE_ENABLED:
+            # Les pages qualifiees partent en detection CMS / analyse web
+            # pendant que la recherche par mots-cles continue
+            pipeline = PagePipeline(pipeline_sites, pipeline_cms, pipeline_accept, pipeline_analyze)
+            pipelines.append(pipeline)
+
+        stream = iter_search_keywords(remaining_keywords, countries_list, languages_list,
+                                      db=db, start_cursors=cursors)
+        for result_page in stream:
+            if result_page.done:
+                keywords_done.append(result_page.keyword)
+                cursors.pop(result_page.keyword, None)
+                tracker.update_step("Recherche", len(keywords_done), len(keywords),
+                                    f"Mot-clé: {result_page.keyword} ({len(grouper.pages)} pages)")
+            else:
+                grouper.add_ads(result_page.ads, result_page.keyword)
+                if result_page.next_cursor:
+                    cursors[result_page.keyword] = result_page.next_cursor
+                if pipeline:
+                    pipeline.submit(grouper.take_qualified(ads_min))
+
+            if checkpoint.is_due():
+                checkpoint.update(grouper=grouper.to_state(), keywords_done=keywords_done, cursors=cursors)
+    elif remaining_keywords:
         from src.infrastructure.external_services.meta_api import search_keywords_parallel
 
-    def phase1_progress(kw, current, total):
-        """Callback pour la progression de la recherche"""
-        tracker.update_step("Recherche", current, total, f"Mot-clé: {kw}")
-
-    # Lancer la recherche (parallèle ou séquentielle selon les proxies)
-    all_ads, ads_by_keyword = search_keywords_parallel(
-        keywords=keywords,
-        countries=countries_list,
-        languages=languages_list,
-        db=db,
-        progress_callback=phase1_progress
-    )
+        def phase1_progress(kw, current, total):
+            """Callback pour la progression de la recherche"""
+            tracker.update_step("Recherche", current, total, f"Mot-clé: {kw}")
+
+        # Lancer la recherche (parallèle ou séquentielle selon la config)
+        all_ads, _ = search_keywords_parallel(
+            keywords=remaining_keywords,
+            countries=countries_list,
+            languages=languages_list,
+            db=db,
+            progress_callback=phase1_progress
+        )
+        grouper.add_ads(all_ads)
+        del all_ads
+
+    if pipeline:
+        pipeline.close()
 
-    # Compter les ads uniques (déjà dédupliquées par search_keywords_parallel)
-    seen_ad_ids = {ad.get("id") for ad in all_ads if ad.get("id")}
+    total_ads_found = len(grouper.seen_ad_ids)
 
     phase1_stats = {
         "Mots-clés recherchés": len(keywords),
-        "Annonces trouvées": len(all_ads),
-        "Annonces uniques": len(seen_ad_ids),
-        "Mode": "parallèle" if rotator.has_proxy_tokens() else "séquentiel",
+        "Annonces trouvées": grouper.total_ads,
+        "Annonces uniques": total_ads_found,
+        "Mode": "async" if META_ASYNC_ENABLED else ("parallèle" if rotator.has_proxy_tokens() else "séquentiel"),
     }
-    tracker.complete_phase(f"{len(all_ads)} annonces trouvées", stats=phase1_stats)
-    tracker.update_metric("total_ads_found", len(all_ads))
+    tracker.complete_phase(f"{total_ads_found} annonces trouvées", stats=phase1_stats)
+    tracker.update_metric("total_ads_found", total_ads_found)
 
     # ═══ PHASE 2: Regroupement par page ═══
+    # (le regroupement est fait au fil de la recherche, il ne reste qu'a finaliser)
     tracker.start_phase(2, "Regroupement par page", total_phases=8)
-    pages = {}
-    page_ads = defaultdict(list)
-    name_counter = defaultdict(Counter)
-    blacklisted_ads_count = 0
-    blacklisted_pages_found = set()
-
-    for i, ad in enumerate(all_ads):
-        if i % 100 == 0:
-            tracker.update_step("Regroupement", i + 1, len(all_ads))
-
-        pid = ad.get("page_id")
-        if not pid:
-            continue
-
-        if str(pid) in blacklist_ids:
-            blacklisted_ads_count += 1
-            blacklisted_pages_found.add(str(pid))
-            continue
-
-        pname = (ad.get("page_name") or "").strip()
-
-        if pid not in pages:
-            pages[pid] = {
-                "page_id": pid, "page_name": pname, "website": "",
-                "_ad_ids": set(), "_keywords": set(), "ads_found_search": 0,
-                "ads_active_total": -1, "currency": "",
-                "cms": "Unknown", "is_shopify": False
-            }
-
-        if ad.get("_keyword"):
-            pages[pid]["_keywords"].add(ad["_keyword"])
-
-        ad_id = ad.get("id")
-        if ad_id:
-            pages[pid]["_ad_ids"].add(ad_id)
-            page_ads[pid].append(ad)
-        if pname:
-            name_counter[pid][pname] += 1
-
-    for pid, counter in name_counter.items():
-        if counter and pid in pages:
-            pages[pid]["page_name"] = counter.most_common(1)[0][0]
-
-    for pid, data in pages.items():
-        data["ads_found_search"] = len(data["_ad_ids"])
+    pages = grouper.finalize()
+    page_ads = grouper.page_ads
+    blacklisted_ads_count = grouper.blacklisted_ads_count
+    blacklisted_pages_found = grouper.blacklisted_pages_found
 
     pages_filtered = {pid: data for pid, data in pages.items() if data["ads_found_search"] >= ads_min}
 
+    if checkpoint.phase < 2:
+        # Curseurs et mots-cles termines ne servent plus apres la phase 1
+        checkpoint.discard("keywords_done", "cursors")
+        checkpoint.update(phase=2, grouper=grouper.to_state())
+    page_ads.retain(pages_filtered)
+
     phase2_stats = {
         "Pages trouvées": len(pages),
         f"Pages ≥{ads_min} ads": len(pages_filtered),
@@ -361,7 +1013,7 @@ def execute_background_search(
 
     if not pages_filtered:
         update_search_log(db, log_id, status="no_results",
-                         total_ads_found=len(all_ads),
+                         total_ads_found=total_ads_found,
                          total_pages_found=len(pages))
         return {"search_log_id": log_id, "status": "no_results", "pages": 0}
 
@@ -369,20 +1021,7 @@ def execute_background_search(
     tracker.start_phase(3, "Extraction sites web", total_phases=8)
 
     # Pages existantes en BDD (dernier scan < 1 jour)
-    cached_pages = get_cached_pages_info(db, list(pages_filtered.keys()), cache_days=1)
-
-    def extract_website_from_ads(ads_list):
-        """Extrait l'URL du site depuis les annonces"""
-        for ad in ads_list:
-            link_url = ad.get("ad_creative_link_url")
-            if link_url:
-                return link_url
-            captions = ad.get("ad_creative_link_captions", [])
-            if captions and isinstance(captions, list):
-                for cap in captions:
-                    if cap and "." in cap:
-                        return f"https://{cap}"
-        return ""
+    cached_pages = get_cached_pages_info(db, list(pages_filtered.keys()), cache_days=1, user_id=user_id)
 
     pages_without_url = []
     for i, (pid, data) in enumerate(pages_filtered.items()):
@@ -393,7 +1032,7 @@ def execute_background_search(
             data["website"] = cached["lien_site"]
             data["_from_cache"] = True
         else:
-            data["website"] = extract_website_from_ads(page_ads.get(pid, []))
+            # Extrait des annonces au fil de la phase 1 (PageAdsGrouper)
             data["_from_cache"] = False
 
         # Tracker les pages sans URL
@@ -435,19 +1074,38 @@ def execute_background_search(
     tracker.start_phase(4, "Détection CMS", total_phases=8)
     pages_with_sites = {pid: data for pid, data in pages_filtered.items() if data["website"]}
 
+    # CMS déjà détectés avant une interruption (checkpoint)
+    cms_results = dict(checkpoint.get("cms_results", {}))
+
+    # CMS détectés au fil de la phase 1 (mode pipeline)
+    if pipeline:
+        for pid, cms_result in pipeline.wait_cms().items():
+            if pid in pages_with_sites and not cms_result.get("_cached") and pid not in cms_results:
+                cms_results[pid] = {"cms": cms_result["cms"], "is_shopify": cms_result.get("is_shopify", False)}
+        print(f"[Search #{search_id}] Pipeline: {pipeline.get_stats()}")
+
     # Le CMS ne change presque jamais, on utilise le cache sans limite d'âge
+    # (page de l'utilisateur, sinon empreinte partagée du domaine)
+    fingerprints.preload(data["website"] for data in pages_with_sites.values())
     pages_need_cms = []
     for pid, data in pages_with_sites.items():
         cached = cached_pages.get(str(pid), {})
-        if cached.get("cms") and cached["cms"] not in ("Unknown", "Inconnu", ""):
-            data["cms"] = cached["cms"]
-            data["is_shopify"] = cached["cms"] == "Shopify"
+        cached_cms = cached.get("cms") if cached.get("cms") not in (None, "Unknown", "Inconnu", "") else None
+        if pid not in cms_results and not cached_cms:
+            cached_cms = fingerprints.get_cms(data["website"])
+        if pid in cms_results:
+            data["cms"] = cms_results[pid]["cms"]
+            data["is_shopify"] = cms_results[pid].get("is_shopify", False)
+            data["_cms_cached"] = False
+        elif cached_cms:
+            data["cms"] = cached_cms
+            data["is_shopify"] = cached_cms == "Shopify"
             data["_cms_cached"] = True
         else:
             pages_need_cms.append((pid, data))
             data["_cms_cached"] = False
 
-    cms_cached_count = len(pages_with_sites) - len(pages_need_cms)
+    cms_cached_count = len(pages_with_sites) - len(pages_need_cms) - len(cms_results)
 
     # Collecter les IDs avec CMS en cache
     cms_cached_page_ids = [pid for pid, data in pages_with_sites.items() if data.get("_cms_cached")]
@@ -455,7 +1113,7 @@ def execute_background_search(
     # Log détaillé Phase 4
     print(f"[Search #{search_id}] Phase 4 - Détection CMS:")
     print(f"   🔍 Sites à analyser: {len(pages_need_cms)}")
-    print(f"   💾 CMS en cache (de BDD): {cms_cached_count}")
+    print(f"   💾 CMS en cache (de BDD / empreintes): {cms_cached_count}")
     if cms_cached_page_ids:
         for pid in cms_cached_page_ids:
             cms_val = pages_with_sites[pid].get("cms", "?")
@@ -464,22 +1122,31 @@ def execute_background_search(
     def detect_cms_worker(pid_data):
         pid, data = pid_data
         try:
-            cms_result = detect_cms_from_url(data["website"])
+            with trace_span(tracer, "cms", "page", key=f"page:{pid}", page_id=pid, url=data["website"]):
+                cms_result = detect_cms_from_url(data["website"])
+            fingerprints.record_cms(data["website"], cms_result.get("cms"))
             return pid, cms_result
         except Exception:
             return pid, {"cms": "Unknown", "is_shopify": False}
 
     if pages_need_cms:
         completed = 0
-        with ThreadPoolExecutor(max_workers=8) as executor:
-            futures = {executor.submit(detect_cms_worker, item): item[0] for item in pages_need_cms}
+        with ThreadPoolExecutor(max_workers=CRAWLER_WORKERS) as executor:
+            futures = {executor.submit(copy_context().run, detect_cms_worker, item): item[0]
+                       for item in pages_need_cms}
             for future in as_completed(futures):
                 pid, cms_result = future.result()
                 pages_with_sites[pid]["cms"] = cms_result["cms"]
                 pages_with_sites[pid]["is_shopify"] = cms_result.get("is_shopify", False)
+                cms_results[pid] = {"cms": cms_result["cms"], "is_shopify": cms_result.get("is_shopify", False)}
                 completed += 1
                 if completed % 5 == 0:
                     tracker.update_step("Analyse CMS", completed, len(pages_need_cms))
+                if checkpoint.is_due():
+                    checkpoint.update(cms_results=cms_results)
+
+    if checkpoint.phase < 4:
+        checkpoint.update(phase=4, cms_results=cms_results)
 
     # Compter tous les CMS (y compris ceux en cache)
     all_cms_counts = {}
@@ -501,13 +1168,6 @@ def execute_background_search(
             print(f"      ... et {len(cms_page_ids[cms_name]) - 5} autres")
 
     # Filtrer par CMS
-    def cms_matches(cms_name):
-        if cms_name in cms_filter:
-            return True
-        if "Autre/Inconnu" in cms_filter and cms_name not in cms_options[:-1]:
-            return True
-        return False
-
     pages_with_cms = {pid: data for pid, data in pages_with_sites.items() if cms_matches(data.get("cms", "Unknown"))}
 
     # Log filtre CMS
@@ -532,7 +1192,7 @@ def execute_background_search(
     phase4_stats = {
         "Pages analysées": len(pages_with_sites),
         "CMS en cache": cms_cached_count,
-        "CMS détectés": len(pages_need_cms),
+        "CMS détectés": len(cms_results),
         "Pages CMS sélectionnés": len(pages_with_cms),
     }
     tracker.complete_phase(f"{len(pages_with_cms)} pages avec CMS sélectionnés", stats=phase4_stats)
@@ -542,29 +1202,89 @@ def execute_background_search(
 
     page_ids_list = list(pages_with_cms.keys())
     batch_size = 10
-    total_batches = (len(page_ids_list) + batch_size - 1) // batch_size
-
-    for batch_idx in range(0, len(page_ids_list), batch_size):
-        batch_pids = page_ids_list[batch_idx:batch_idx + batch_size]
-        batch_num = (batch_idx // batch_size) + 1
-        tracker.update_step("Batch API", batch_num, total_batches)
 
-        batch_results = client.fetch_ads_for_pages_batch(batch_pids, countries_list, languages_list)
+    def fetch_pages_in_batches(pids: List[str], fields: str, step_name: str) -> Dict:
+        """Batches de 10 pages: repartis sur tous les tokens en mode async, sinon sequentiels"""
+        if META_ASYNC_ENABLED:
+            from src.infrastructure.external_services.async_meta_api import fetch_pages_concurrent
+            return fetch_pages_concurrent(
+                pids, countries_list, languages_list, db=db, fields=fields,
+                progress_callback=lambda done, total: tracker.update_step(step_name, done, total)
+            )
+
+        results = {}
+        total_batches = (len(pids) + batch_size - 1) // batch_size
+        for batch_idx in range(0, len(pids), batch_size):
+            batch_pids = pids[batch_idx:batch_idx + batch_size]
+            tracker.update_step(step_name, (batch_idx // batch_size) + 1, total_batches)
+            results.update(client.fetch_ads_for_pages_batch(
+                batch_pids, countries_list, languages_list, fields=fields
+            ))
+
+            # Délai fixe uniquement si le rate limiter adaptatif n'est pas actif
+            if not rotator.get_rate_limiter():
+                time.sleep(META_DELAY_BETWEEN_BATCHES)
+        return results
+
+    # Mode comptage leger: id/page_id/reach/date/devise uniquement,
+    # les creatives ne sont recuperees que pour les pages retenues
+    count_fields = FIELDS_ADS_COUNT if META_LEAN_COUNT_ENABLED else FIELDS_ADS_COMPLETE
+    counted_ads = {}
+
+    if checkpoint.get("ad_counts") is not None:
+        # Comptage déjà effectué avant l'interruption: {page_id: [nombre, devise]}
+        ad_counts = checkpoint.get("ad_counts")
+    else:
+        batch_results = fetch_pages_in_batches(page_ids_list, count_fields, "Batch API")
+        ad_counts = {}
+        for pid in page_ids_list:
+            ads_counted, count = batch_results.get(str(pid), ([], 0))
+            if count > 0:
+                counted_ads[pid] = ads_counted
+                ad_counts[str(pid)] = [count, extract_currency_from_ads(ads_counted)]
+        del batch_results
+        checkpoint.update(phase=5, ad_counts=ad_counts)
+    for pid in page_ids_list:
+        data = pages_with_cms[pid]
+        count, currency = ad_counts.get(str(pid), (0, ""))
+
+        if count > 0:
+            data["ads_active_total"] = count
+            data["currency"] = currency
+        else:
+            data["ads_active_total"] = data["ads_found_search"]
 
-        for pid in batch_pids:
-            data = pages_with_cms[pid]
-            ads_complete, count = batch_results.get(str(pid), ([], 0))
+    pages_final = {pid: data for pid, data in pages_with_cms.items() if data["ads_active_total"] >= ads_min}
 
+    # Creatives completes pour les pages retenues uniquement (sauvegarde + winning ads).
+    # Les annonces deja recues en phase 1 sont reutilisees; seules les pages
+    # comportant des annonces inconnues sont re-interrogees.
+    pages_to_hydrate = []
+    for pid in pages_final:
+        if pid not in counted_ads:
+            # Reprise: les annonces ne sont pas conservees par le checkpoint
+            if not page_ads.get(pid):
+                pages_to_hydrate.append(pid)
+            continue
+        if not META_LEAN_COUNT_ENABLED:
+            page_ads[pid] = counted_ads[pid]
+            continue
+        merged, complete = merge_counted_ads(counted_ads[pid], page_ads.get(pid, []))
+        page_ads[pid] = merged
+        if not complete:
+            pages_to_hydrate.append(pid)
+
+    if pages_to_hydrate:
+        full_results = fetch_pages_in_batches(pages_to_hydrate, FIELDS_ADS_COMPLETE, "Creatives")
+        for pid in pages_to_hydrate:
+            ads_full, count = full_results.get(str(pid), ([], 0))
             if count > 0:
-                page_ads[pid] = ads_complete
-                data["ads_active_total"] = count
-                data["currency"] = extract_currency_from_ads(ads_complete)
-            else:
-                data["ads_active_total"] = data["ads_found_search"]
+                page_ads[pid] = ads_full
 
-        time.sleep(META_DELAY_BETWEEN_BATCHES)
-
-    pages_final = {pid: data for pid, data in pages_with_cms.items() if data["ads_active_total"] >= ads_min}
+    del counted_ads
+    # Libere les annonces des pages exclues et les lignes remplacees ci-dessus
+    page_ads.retain(pages_final)
+    print(f"[Search #{search_id}] Annonces en memoire: {page_ads.ad_count} ({page_ads.nbytes() // 1024} Ko)")
 
     # Log filtre min_ads
     pages_excluded_ads = {pid: data for pid, data in pages_with_cms.items() if data["ads_active_total"] < ads_min}
@@ -601,6 +1321,8 @@ def execute_background_search(
     phase5_stats = {
         "Pages comptées": len(pages_with_cms),
         "Pages finales": len(pages_final),
+        "Pages re-interrogées (creatives)": len(pages_to_hydrate),
+        "Mode": "async multi-tokens" if META_ASYNC_ENABLED else "séquentiel",
     }
     for etat in ["XXL", "XL", "L", "M", "S", "XS"]:
         if etat in etat_counts:
@@ -610,7 +1332,7 @@ def execute_background_search(
 
     if not pages_final:
         update_search_log(db, log_id, status="no_results",
-                         total_ads_found=len(all_ads),
+                         total_ads_found=total_ads_found,
                          total_pages_found=len(pages),
                          pages_after_filter=len(pages_filtered))
         return {"search_log_id": log_id, "status": "no_results", "pages": 0}
@@ -627,15 +1349,35 @@ def execute_background_search(
     pages_cached = 0
     pages_no_thematique = 0
     pages_expired = 0
+    pages_shared = 0
+
+    # Analyses déjà faites avant une interruption (checkpoint)
+    web_results.update(checkpoint.get("web_results", {}))
+
+    # Analyses lancées dès la détection CMS (mode pipeline)
+    if pipeline:
+        for pid, result in pipeline.wait_web().items():
+            if pid in pages_final and pid not in web_results:
+                web_results[pid] = result
 
     for pid, data in pages_final.items():
         cached = cached_pages.get(str(pid), {})
 
+        if pid in web_results:
+            if not data.get("currency") and web_results[pid].get("currency_from_site"):
+                data["currency"] = web_results[pid]["currency_from_site"]
+            continue
+
         # Vérifier les 3 conditions du cache
         is_recent = not cached.get("needs_rescan")
         has_analysis = cached.get("nombre_produits") is not None
         has_thematique = bool(cached.get("thematique"))
 
+        # Sinon, analyse récente du même domaine (toutes recherches confondues)
+        shared = None
+        if not (is_recent and has_analysis and has_thematique) and data.get("website"):
+            shared = fingerprints.get_web_result(data["website"], analysis_country)
+
         if is_recent and has_analysis and has_thematique:
             web_results[pid] = {
                 "product_count": cached.get("nombre_produits", 0),
@@ -648,6 +1390,12 @@ def execute_background_search(
             if cached.get("devise") and not data.get("currency"):
                 data["currency"] = cached["devise"]
             pages_cached += 1
+        elif shared:
+            web_results[pid] = shared
+            if shared.get("currency_from_site") and not data.get("currency"):
+                data["currency"] = shared["currency_from_site"]
+            pages_cached += 1
+            pages_shared += 1
         elif data.get("website"):
             if not is_recent:
                 pages_expired += 1
@@ -667,7 +1415,7 @@ def execute_background_search(
 
     # Log détaillé avec IDs
     print(f"[Search #{search_id}] Phase 6 - Cache:")
-    print(f"   ✅ {pages_cached} pages en cache valide:")
+    print(f"   ✅ {pages_cached} pages en cache valide (dont {pages_shared} par empreinte de domaine):")
     for pid in cached_page_ids[:10]:
         print(f"      → {pid}")
     if len(cached_page_ids) > 10:
@@ -682,7 +1430,9 @@ def execute_background_search(
     def analyze_web_worker(pid_data):
         pid, data = pid_data
         try:
-            result = analyze_website_complete(data["website"], countries_list[0] if countries_list else "FR")
+            with trace_span(tracer, "web_analysis", "page", key=f"page:{pid}", page_id=pid, url=data["website"]):
+                result = analyze_website_complete(data["website"], analysis_country)
+            fingerprints.record_analysis(data["website"], result, analysis_country)
             return pid, result
         except Exception as e:
             return pid, {"product_count": 0, "error": str(e)}
@@ -692,8 +1442,9 @@ def execute_background_search(
         total_to_analyze = len(pages_need_analysis)
         tracker.update_step("Analyse web", 0, total_to_analyze, f"Démarrage analyse de {total_to_analyze} sites...")
 
-        with ThreadPoolExecutor(max_workers=8) as executor:
-            futures = {executor.submit(analyze_web_worker, item): item[0] for item in pages_need_analysis}
+        with ThreadPoolExecutor(max_workers=CRAWLER_WORKERS) as executor:
+            futures = {executor.submit(copy_context().run, analyze_web_worker, item): item[0]
+                       for item in pages_need_analysis}
             for future in as_completed(futures):
                 pid, result = future.result()
                 web_results[pid] = result
@@ -703,6 +1454,8 @@ def execute_background_search(
                 completed += 1
                 # Mise à jour à chaque page pour un meilleur feedback
                 tracker.update_step("Analyse web", completed, total_to_analyze, f"Site {completed}/{total_to_analyze}")
+                if checkpoint.is_due():
+                    checkpoint.update(web_results=web_results)
 
     # ═══ Classification Gemini (pages nouvellement analysées) ═══
     classified_count = 0
@@ -750,7 +1503,8 @@ def execute_background_search(
     else:
         print(f"   ⚠️ Clé Gemini: NON CONFIGURÉE")
 
-    if gemini_key and pages_to_classify_data:
+    # Classification déjà faite si la phase 6 avait été terminée
+    if gemini_key and pages_to_classify_data and checkpoint.phase < 6:
         total_to_classify = len(pages_to_classify_data)
         tracker.update_step("Classification Gemini", 0, total_to_classify, f"Classification de {total_to_classify} pages...")
         try:
@@ -767,6 +1521,7 @@ def execute_background_search(
                     web_results[pid]["gemini_category"] = classification.get("category", "")
                     web_results[pid]["gemini_subcategory"] = classification.get("subcategory", "")
                     web_results[pid]["gemini_confidence"] = classification.get("confidence", 0.0)
+                fingerprints.record_classification(pages_final.get(pid, {}).get("website", ""), classification)
                 classified_idx += 1
 
             classified_count = len(classification_results)
@@ -780,10 +1535,14 @@ def execute_background_search(
     phase6_stats = {
         "Sites totaux": len(web_results),
         "En cache (< 1 jour)": pages_cached,
+        "Empreintes partagées": pages_shared,
         "Analysés": len(pages_need_analysis),
         "Classifiées (Gemini)": classified_count,
     }
     tracker.complete_phase(f"{len(web_results)} sites, {classified_count} classifiées", stats=phase6_stats)
+    print(f"[Search #{search_id}] Empreintes domaines: {fingerprints.get_stats()}")
+    if checkpoint.phase < 6:
+        checkpoint.update(phase=6, web_results=web_results)
 
     # ═══ PHASE 7: Détection des Winning Ads ═══
     tracker.start_phase(7, "Détection Winning Ads", total_phases=8)
@@ -792,22 +1551,31 @@ def execute_background_search(
     winning_ads_by_page = {}
     total_ads_checked = 0
 
+    scan_epoch = naive_epoch(scan_date)
+
     for i, (pid, data) in enumerate(pages_final.items()):
         tracker.update_step("Analyse winning", i + 1, len(pages_final))
 
+        # Lecture en colonnes (reach / date de creation): seules les
+        # winning ads sont reconstruites en dict
         page_winning_count = 0
-        for ad in page_ads.get(pid, []):
-            is_winning, age_days, reach, matched_criteria = is_winning_ad(ad, scan_date, WINNING_AD_CRITERIA)
-            if is_winning:
+        for row in page_ads.rows(pid):
+            total_ads_checked += 1
+            created = page_ads.created_epoch(row)
+            if created is None:
+                continue
+            age_days = max(0, (scan_epoch - created) // 86400)
+            reach = page_ads.reach(row)
+            matched_criteria = match_winning_criteria(age_days, reach, WINNING_AD_CRITERIA)
+            if matched_criteria:
                 winning_ads_data.append({
-                    "ad": ad,
+                    "ad": page_ads.ad(row),
                     "page_id": pid,
                     "age_days": age_days,
                     "reach": reach,
                     "matched_criteria": matched_criteria
                 })
                 page_winning_count += 1
-            total_ads_checked += 1
 
         if page_winning_count > 0:
             winning_ads_by_page[pid] = page_winning_count
@@ -861,7 +1629,8 @@ def execute_background_search(
                 existing_ad_ids = {a.ad_id for a in existing_ads}
 
         tracker.update_step("Sauvegarde pages", 1, 5)
-        pages_result = save_pages_recherche(db, pages_final, web_results, countries_list, languages_list, None, log_id, user_id=user_id)
+        with trace_span(tracer, "save_pages", "db", rows=len(pages_final)):
+            pages_result = save_pages_recherche(db, pages_final, web_results, countries_list, languages_list, None, log_id, user_id=user_id)
         # Gérer le retour tuple (total, new, existing)
         if isinstance(pages_result, tuple):
             pages_saved, pages_new, pages_existing = pages_result
@@ -871,13 +1640,16 @@ def execute_background_search(
             pages_existing = 0
 
         tracker.update_step("Sauvegarde suivi", 2, 5)
-        suivi_saved = save_suivi_page(db, pages_final, web_results, MIN_ADS_SUIVI, user_id=user_id)
+        with trace_span(tracer, "save_suivi", "db", rows=len(pages_final)):
+            suivi_saved = save_suivi_page(db, pages_final, web_results, MIN_ADS_SUIVI, user_id=user_id)
 
         tracker.update_step("Sauvegarde annonces", 3, 5)
-        ads_saved = save_ads_recherche(db, pages_final, dict(page_ads), countries_list, MIN_ADS_LISTE, user_id=user_id)
+        with trace_span(tracer, "save_ads", "db", rows=page_ads.ad_count):
+            ads_saved = save_ads_recherche(db, pages_final, page_ads, countries_list, MIN_ADS_LISTE, user_id=user_id)
 
         tracker.update_step("Sauvegarde winning ads", 4, 5)
-        winning_saved, winning_new, winning_updated = save_winning_ads(db, winning_ads_data, log_id, user_id=user_id)
+        with trace_span(tracer, "save_winning_ads", "db", rows=len(winning_ads_data)):
+            winning_saved, winning_new, winning_updated = save_winning_ads(db, winning_ads_data, log_id, user_id=user_id)
 
         # ═══ Enregistrer l'historique de recherche ═══
         tracker.update_step("Historique recherche", 5, 5)
@@ -887,11 +1659,7 @@ def execute_background_search(
         for pid, data in pages_final.items():
             pid_str = str(pid)
             # Trouver le keyword qui a trouvé cette page
-            keyword = None
-            for ad in data.get("_ads", []):
-                if ad.get("_keyword"):
-                    keyword = ad.get("_keyword")
-                    break
+            keyword = page_ads.first_keyword(pid)
 
             pages_history_data.append({
                 "page_id": pid_str,
@@ -915,8 +1683,9 @@ def execute_background_search(
                 })
 
         # Enregistrer l'historique avec les metadonnees completes
-        pages_history_count = record_pages_search_history_batch(db, pages_history_data, log_id, user_id=user_id)
-        winning_history_count = record_winning_ads_search_history_batch(db, winning_history_data, log_id, user_id=user_id)
+        with trace_span(tracer, "save_history", "db", rows=len(pages_history_data) + len(winning_history_data)):
+            pages_history_count = record_pages_search_history_batch(db, pages_history_data, log_id, user_id=user_id)
+            winning_history_count = record_winning_ads_search_history_batch(db, winning_history_data, log_id, user_id=user_id)
 
         new_pages_count = sum(1 for d in pages_history_data if d.get("was_new"))
         new_winning_count = sum(1 for d in winning_history_data if d.get("was_new"))
@@ -957,7 +1726,7 @@ def execute_background_search(
     update_search_log(
         db, log_id,
         status="completed",
-        total_ads_found=len(all_ads),
+        total_ads_found=total_ads_found,
         total_pages_found=len(pages),
         pages_after_filter=len(pages_filtered),
         winning_ads_count=len(winning_ads_data),
@@ -0,0 +1,37 @@
+"""
+Module de benchmark hors ligne des recherches.
+
+Enregistre le trafic HTTP d'une vraie recherche dans une archive, puis la
+rejoue sans reseau via un serveur local pour mesurer duree, debit,
+latences et memoire du pipeline complet (voir scripts/benchmark_search.py).
+"""
+
+from src.infrastructure.benchmark.archive import (
+    ReplayArchive,
+    request_key,
+)
+from src.infrastructure.benchmark.http_replay import (
+    ReplayServer,
+    record_http,
+    replay_http,
+)
+from src.infrastructure.benchmark.runner import (
+    compare_reports,
+    percentile,
+    record_search,
+    run_replay,
+    run_replay_isolated,
+)
+
+__all__ = [
+    "ReplayArchive",
+    "request_key",
+    "ReplayServer",
+    "record_http",
+    "replay_http",
+    "compare_reports",
+    "percentile",
+    "record_search",
+    "run_replay",
+    "run_replay_isolated",
+]
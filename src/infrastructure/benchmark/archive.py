@@ -0,0 +1,143 @@
+"""
+Archive de reponses HTTP pour le rejeu hors ligne des recherches.
+
+Une archive contient, dans l'ordre ou elles ont ete recues, les reponses
+vues pendant une vraie recherche (Meta Ads Archive, pages et sitemaps des
+sites). Elle est stockee en JSON Lines compresse (gzip):
+- 1re ligne: {"meta": {...}} (parametres de la recherche enregistree)
+- puis une ligne par reponse: cle, statut, en-tetes utiles, corps (base64),
+  ou l'erreur reseau rencontree (timeout, connexion refusee...)
+
+Cle d'une requete: methode + URL normalisee (parametres tries, secrets
+access_token / api_key retires, URL cible extraite d'une URL ScraperAPI).
+Un meme appel enregistre plusieurs fois (retry, rate limit) est rejoue dans
+le meme ordre; au-dela, la derniere reponse est resservie.
+"""
+import base64
+import gzip
+import json
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from src.infrastructure.config import SCRAPER_API_URL
+
+# Parametres jamais enregistres (identifiants)
+_SECRET_PARAMS = frozenset({"access_token", "appsecret_proof", "api_key"})
+
+# En-tetes conserves (contenu, revalidation, quotas Meta)
+_KEPT_HEADERS = frozenset({
+    "content-type", "etag", "last-modified", "cache-control",
+    "x-app-usage", "x-business-use-case-usage", "x-ad-account-usage",
+})
+
+_SCRAPER_API_HOST = urlsplit(SCRAPER_API_URL).hostname
+
+
+def request_key(method: str, url: str) -> str:
+    """Cle d'archive d'une requete (stable d'un token ou d'un proxy a l'autre)"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if parts.hostname == _SCRAPER_API_HOST:
+        target = dict(query).get("url")
+        if target:
+            return request_key(method, target)
+
+    query = sorted((k, v) for k, v in query if k not in _SECRET_PARAMS)
+    key = f"{method.upper()} {parts.scheme}://{(parts.hostname or '').lower()}{parts.path or '/'}"
+    return f"{key}?{urlencode(query)}" if query else key
+
+
+def strip_secrets(url: str) -> str:
+    """URL sans parametres secrets (stockee pour information)"""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _SECRET_PARAMS]
+    return parts._replace(query=urlencode(query)).geturl()
+
+
+class ReplayArchive:
+    """Reponses HTTP enregistrees, rejouables par cle. Thread-safe."""
+
+    def __init__(self, meta: Optional[Dict] = None):
+        self.meta: Dict = dict(meta or {})
+        self._entries: Dict[str, List[Dict]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, method: str, url: str, status: int, headers: Dict, body: bytes,
+            elapsed_ms: float = 0, final_url: str = None, error: str = None):
+        """Enregistre une reponse (error: erreur reseau, rejouee en connexion fermee)"""
+        entry = {
+            "key": request_key(method, url),
+            "url": strip_secrets(url),
+            "final_url": strip_secrets(final_url) if final_url else None,
+            "status": status,
+            "headers": {k.lower(): v for k, v in (headers or {}).items() if k.lower() in _KEPT_HEADERS},
+            "body": base64.b64encode(body or b"").decode("ascii"),
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._entries.setdefault(entry["key"], []).append(entry)
+            self._count += 1
+
+    def lookup(self, method: str, url: str) -> Optional[Dict]:
+        """Prochaine reponse enregistree pour cette requete (None si jamais vue)"""
+        key = request_key(method, url)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            index = self._cursors.get(key, 0)
+            self._cursors[key] = index + 1
+            return entries[min(index, len(entries) - 1)]
+
+    def reset(self):
+        """Rejoue depuis la premiere reponse de chaque cle"""
+        with self._lock:
+            self._cursors.clear()
+
+    @staticmethod
+    def body(entry: Dict) -> bytes:
+        return base64.b64decode(entry["body"])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            entries = [e for group in self._entries.values() for e in group]
+        return {
+            "responses": len(entries),
+            "requests": len(self._entries),
+            "meta_api": sum(1 for e in entries if "graph.facebook.com" in e["key"]),
+            "body_bytes": sum(len(e["body"]) * 3 // 4 for e in entries),
+        }
+
+    def save(self, path: str):
+        """Ecrit l'archive (JSON Lines gzip)"""
+        with self._lock:
+            groups = [list(group) for group in self._entries.values()]
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"meta": self.meta}, default=str) + "\n")
+            for group in groups:
+                for entry in group:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayArchive":
+        """Relit une archive ecrite par save()"""
+        archive = cls()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "meta" in record:
+                    archive.meta = record["meta"]
+                    continue
+                archive._entries.setdefault(record["key"], []).append(record)
+                archive._count += 1
+        return archive
@@ -0,0 +1,272 @@
+"""
+Enregistrement et rejeu du trafic HTTP d'une recherche.
+
+- record_http(archive): les requetes requests et aiohttp du process partent
+  normalement; chaque reponse (ou erreur reseau) est ajoutee a l'archive.
+- ReplayServer: serveur HTTP local (127.0.0.1) qui sert les reponses de
+  l'archive avec une latence configurable (fixe + gigue, ou latence
+  enregistree multipliee par un facteur).
+- replay_http(server): les requetes du process sont reecrites vers le
+  serveur local (http://127.0.0.1:port/<scheme>/<hote>/<chemin>?<query>);
+  les proxies des tokens sont ignores. Aucun acces reseau.
+
+Les deux modes remplacent requests.Session.request et
+aiohttp.ClientSession._request le temps du bloc (outil de benchmark, pas
+de code de production).
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+import yarl
+
+from src.infrastructure.benchmark.archive import ReplayArchive
+
+# En-tete portant l'URL finale enregistree (apres redirections)
+_REPLAY_URL_HEADER = "X-Replay-Url"
+
+
+def _request_kind(url: str) -> str:
+    """Categorie d'une requete pour les statistiques de latence"""
+    return "meta_api" if "graph.facebook.com" in url else "web"
+
+
+def _full_url(method: str, url: str, params) -> str:
+    """URL avec ses parametres (comme l'enverrait requests)"""
+    if not params:
+        return url
+    return requests.Request(method, url, params=params).prepare().url
+
+
+class ReplayServer:
+    """Serveur HTTP local rejouant une archive"""
+
+    def __init__(self, archive: ReplayArchive, latency_ms: float = 0, jitter_ms: float = 0,
+                 latency_scale: Optional[float] = None, seed: int = 0):
+        """
+        Args:
+            archive: Reponses a servir
+            latency_ms: Latence fixe ajoutee a chaque reponse
+            jitter_ms: Gigue uniforme [0, jitter_ms] ajoutee a la latence fixe
+            latency_scale: Si fourni, latence = latence enregistree * facteur
+            seed: Graine de la gigue (runs reproductibles)
+        """
+        self.archive = archive
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latency_scale = latency_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.served = 0
+        self.misses: List[str] = []
+        self.latencies: Dict[str, List[float]] = {}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ─── Cycle de vie ────────────────────────────────────────────────────────
+
+    def start(self) -> "ReplayServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._serve(self)
+
+            do_POST = do_HEAD = do_GET
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="ReplayServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ─── Rejeu ───────────────────────────────────────────────────────────────
+
+    def rewrite(self, url: str) -> str:
+        """URL d'origine -> URL du serveur local"""
+        parts = urlsplit(url)
+        local = f"{self.url}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+        return f"{local}?{parts.query}" if parts.query else local
+
+    def _original_url(self, path: str) -> str:
+        _, scheme, rest = path.split("/", 2)
+        return f"{scheme}://{rest}"
+
+    def _delay(self, entry: Dict) -> float:
+        if self.latency_scale is not None:
+            return entry.get("elapsed_ms", 0) * self.latency_scale / 1000
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+        return (self.latency_ms + jitter) / 1000
+
+    def _serve(self, handler: BaseHTTPRequestHandler):
+        if handler.command == "POST":
+            length = int(handler.headers.get("Content-Length") or 0)
+            handler.rfile.read(length)
+        try:
+            url = self._original_url(handler.path)
+        except ValueError:
+            url = handler.path
+        entry = self.archive.lookup(handler.command, url)
+
+        if entry is None:
+            with self._lock:
+                self.misses.append(f"{handler.command} {url}")
+            body = b"replay: no recorded response"
+            handler.send_response(404)
+            handler.send_header("Content-Type", "text/plain")
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+            return
+
+        time.sleep(self._delay(entry))
+        with self._lock:
+            self.served += 1
+
+        if entry.get("error"):
+            # Erreur reseau enregistree: connexion fermee sans reponse
+            handler.close_connection = True
+            return
+
+        body = ReplayArchive.body(entry)
+        handler.send_response(entry["status"])
+        for name, value in entry["headers"].items():
+            handler.send_header(name, value)
+        handler.send_header(_REPLAY_URL_HEADER, entry.get("final_url") or entry["url"])
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(body)
+
+    def record_latency(self, url: str, elapsed_ms: float):
+        """Latence mesuree cote client (appelee par replay_http)"""
+        with self._lock:
+            self.latencies.setdefault(_request_kind(url), []).append(elapsed_ms)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Interception requests / aiohttp
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@contextmanager
+def _patched(requests_request, aiohttp_request) -> Iterator[None]:
+    original_sync = requests.Session.request
+    original_async = aiohttp.ClientSession._request
+    requests.Session.request = requests_request(original_sync)
+    aiohttp.ClientSession._request = aiohttp_request(original_async)
+    try:
+        yield
+    finally:
+        requests.Session.request = original_sync
+        aiohttp.ClientSession._request = original_async
+
+
+def _aiohttp_url(str_or_url, params) -> str:
+    url = yarl.URL(str(str_or_url))
+    return str(url.extend_query(params)) if params else str(url)
+
+
+@contextmanager
+def record_http(archive: ReplayArchive) -> Iterator[ReplayArchive]:
+    """Enregistre dans l'archive toutes les reponses HTTP du bloc"""
+
+    def requests_request(original):
+        def request(session, method, url, params=None, **kwargs):
+            full_url = _full_url(method, url, params)
+            start = time.perf_counter()
+            try:
+                response = original(session, method, full_url, **kwargs)
+            except requests.RequestException as e:
+                archive.add(method, full_url, 0, {}, b"", (time.perf_counter() - start) * 1000,
+                            error=type(e).__name__)
+                raise
+            archive.add(method, full_url, response.status_code, response.headers, response.content,
+                        (time.perf_counter() - start) * 1000, final_url=response.url)
+            return response
+        return request
+
+    def aiohttp_request(original):
+        async def _request(session, method, str_or_url, **kwargs):
+            url = _aiohttp_url(str_or_url, kwargs.pop("params", None))
+            start = time.perf_counter()
+            try:
+                response = await original(session, method, yarl.URL(url, encoded=True), **kwargs)
+                body = await response.read()
+            except (aiohttp.ClientError, TimeoutError) as e:
+                archive.add(method, url, 0, {}, b"", (time.perf_counter() - start) * 1000,
+                            error=type(e).__name__)
+                raise
+            archive.add(method, url, response.status, dict(response.headers), body,
+                        (time.perf_counter() - start) * 1000, final_url=str(response.url))
+            return response
+        return _request
+
+    with _patched(requests_request, aiohttp_request):
+        yield archive
+
+
+@contextmanager
+def replay_http(server: ReplayServer) -> Iterator[ReplayServer]:
+    """Redirige toutes les requetes HTTP du bloc vers le serveur de rejeu"""
+
+    def requests_request(original):
+        def request(session, method, url, params=None, **kwargs):
+            full_url = _full_url(method, url, params)
+            kwargs.pop("proxies", None)
+            start = time.perf_counter()
+            try:
+                response = original(session, method, server.rewrite(full_url), **kwargs)
+            finally:
+                server.record_latency(full_url, (time.perf_counter() - start) * 1000)
+            response.url = response.headers.get(_REPLAY_URL_HEADER, full_url)
+            return response
+        return request
+
+    def aiohttp_request(original):
+        async def _request(session, method, str_or_url, **kwargs):
+            url = _aiohttp_url(str_or_url, kwargs.pop("params", None))
+            kwargs.pop("proxy", None)
+            kwargs.pop("proxy_auth", None)
+            start = time.perf_counter()
+            try:
+                response = await original(session, method, yarl.URL(server.rewrite(url), encoded=True), **kwargs)
+                await response.read()
+            finally:
+                server.record_latency(url, (time.perf_counter() - start) * 1000)
+            # URL finale d'origine (moteur de crawl: redirections des sites)
+            response._url = yarl.URL(response.headers.get(_REPLAY_URL_HEADER, url), encoded=True)
+            getattr(response, "_cache", {}).pop("url", None)
+            return response
+        return _request
+
+    with _patched(requests_request, aiohttp_request):
+        yield server
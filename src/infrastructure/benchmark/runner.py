@@ -0,0 +1,256 @@
+"""
+Benchmark hors ligne de la recherche complete (execute_background_search).
+
+1. record_search(): execute une vraie recherche en enregistrant toutes les
+   reponses HTTP (Meta, sites, sitemaps) dans une archive.
+2. run_replay(): rejoue l'archive via un serveur local, sans reseau, sur une
+   base locale (SQLite temporaire par defaut, ou Postgres via database_url),
+   toutes phases comprises (sauvegardes BDD incluses), et mesure:
+   - duree totale et par phase, debit (requetes/s, annonces/s)
+   - latence des requetes cote client (p50 / p95 / p99 par categorie)
+   - pic de memoire residente (RSS) du process
+3. run_replay_isolated(): N runs, chacun dans un process neuf (caches L1,
+   pools et pic RSS non partages entre runs), resultats agreges (medianes).
+4. compare_reports(): regressions par rapport a un rapport de reference.
+
+Voir scripts/benchmark_search.py pour la ligne de commande.
+"""
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from src.infrastructure.config import (
+    BENCHMARK_LATENCY_MS,
+    BENCHMARK_JITTER_MS,
+    BENCHMARK_REGRESSION_TOLERANCE,
+)
+from src.infrastructure.benchmark.archive import ReplayArchive
+from src.infrastructure.benchmark.http_replay import ReplayServer, record_http, replay_http
+
+# Metriques comparees a la reference (plus grand = moins bien)
+COMPARED_METRICS = ("wall_seconds", "meta_api_p95_ms", "web_p95_ms", "peak_rss_mb")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile (interpolation lineaire), 0 si aucune valeur"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss_mb() -> float:
+    """Pic de memoire residente du process (Mo)"""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+@contextmanager
+def _environment(**values) -> Iterator[None]:
+    """Variables d'environnement temporaires (None = supprimee)"""
+    previous = {key: os.environ.get(key) for key in values}
+    for key, value in values.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _search_params(archive: ReplayArchive) -> Dict:
+    meta = archive.meta
+    return {
+        "keywords": meta["keywords"],
+        "cms_filter": meta.get("cms_filter", []),
+        "ads_min": meta.get("ads_min", 3),
+        "countries": meta.get("countries", "FR"),
+        "languages": meta.get("languages", "fr"),
+    }
+
+
+def record_search(
+    db,
+    archive_path: str,
+    keywords: List[str],
+    cms_filter: List[str],
+    ads_min: int = 3,
+    countries: str = "FR",
+    languages: str = "fr",
+) -> Dict:
+    """
+    Execute une vraie recherche (reseau, tokens de la base) et enregistre
+    toutes ses reponses HTTP dans archive_path.
+
+    Returns:
+        Statistiques de l'archive ecrite
+    """
+    from src.application.use_cases.search_executor import execute_background_search
+    from src.infrastructure.persistence.database import (
+        create_search_queue, ensure_tables_exist, get_active_meta_tokens_with_proxies,
+    )
+
+    ensure_tables_exist(db)
+    tokens = get_active_meta_tokens_with_proxies(db)
+    archive = ReplayArchive(meta={
+        "keywords": keywords,
+        "cms_filter": cms_filter,
+        "ads_min": ads_min,
+        "countries": countries,
+        "languages": languages,
+        # Meme nombre de tokens/proxies au rejeu: meme parallelisme
+        "tokens": [{"name": t["name"], "proxy": bool(t.get("proxy"))} for t in tokens],
+        "recorded_at": time.time(),
+    })
+    search_id = create_search_queue(
+        db, keywords=json.dumps(keywords), countries=countries, languages=languages,
+        ads_min=ads_min, cms_filter=json.dumps(cms_filter),
+    )
+
+    start = time.perf_counter()
+    with record_http(archive):
+        result = execute_background_search(
+            db, search_id, keywords, cms_filter, ads_min, countries, languages
+        )
+    archive.meta["recorded_seconds"] = round(time.perf_counter() - start, 2)
+    archive.meta["recorded_result"] = {k: v for k, v in result.items() if k != "phases_data"}
+    archive.save(archive_path)
+
+    stats = archive.get_stats()
+    print(f"[Benchmark] Archive {archive_path}: {stats['responses']} réponses "
+          f"({stats['meta_api']} Meta), {stats['body_bytes'] / 1e6:.1f} Mo")
+    return stats
+
+
+def run_replay(
+    archive_path: str,
+    database_url: Optional[str] = None,
+    latency_ms: float = BENCHMARK_LATENCY_MS,
+    jitter_ms: float = BENCHMARK_JITTER_MS,
+    latency_scale: Optional[float] = None,
+    seed: int = 0,
+) -> Dict:
+    """
+    Rejoue une archive sur une base locale et mesure la recherche complete.
+
+    Args:
+        archive_path: Archive ecrite par record_search()
+        database_url: Base cible (defaut: SQLite temporaire, supprimee apres le run)
+        latency_ms / jitter_ms: Latence servie (fixe + gigue uniforme)
+        latency_scale: Si fourni, rejoue la latence enregistree multipliee par ce facteur
+        seed: Graine de la gigue
+
+    Returns:
+        Rapport du run (durees, debit, latences, memoire, requetes non enregistrees)
+    """
+    from src.application.use_cases.search_executor import execute_background_search
+    from src.infrastructure.persistence.database import (
+        DatabaseManager, add_meta_token, create_search_queue, ensure_tables_exist, flush_write_behind,
+    )
+    from src.infrastructure.monitoring.progress_channel import get_progress_channel
+
+    archive = ReplayArchive.load(archive_path)
+    params = _search_params(archive)
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        db = DatabaseManager(database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        ensure_tables_exist(db)
+        for i, token in enumerate(archive.meta.get("tokens") or [{"name": "Replay", "proxy": False}]):
+            # Faux tokens/proxies: memes slots paralleles, jamais contactes (rejeu local)
+            proxy = f"http://replay-proxy-{i}:8080" if token.get("proxy") else None
+            add_meta_token(db, f"replay-token-{i}", name=token.get("name") or f"Replay #{i + 1}", proxy_url=proxy)
+        search_id = create_search_queue(
+            db, keywords=json.dumps(params["keywords"]), countries=params["countries"],
+            languages=params["languages"], ads_min=params["ads_min"],
+            cms_filter=json.dumps(params["cms_filter"]),
+        )
+
+        server = ReplayServer(archive, latency_ms, jitter_ms, latency_scale, seed)
+        # Classification Gemini desactivee (non enregistree); URLs ScraperAPI rejouees par URL cible
+        with server, replay_http(server), _environment(GEMINI_API_KEY=None, META_ACCESS_TOKEN=None):
+            start = time.perf_counter()
+            result = execute_background_search(db, search_id, **params)
+            wall = time.perf_counter() - start
+        # Ecritures differees (progression, logs API) avant de fermer la base
+        get_progress_channel().flush()
+        flush_write_behind()
+        db.engine.dispose()
+
+    meta_latencies = server.latencies.get("meta_api", [])
+    web_latencies = server.latencies.get("web", [])
+    total_requests = len(meta_latencies) + len(web_latencies)
+    return {
+        "status": result.get("status"),
+        "wall_seconds": round(wall, 3),
+        "phases": {p["name"]: round(p["duration"], 3) for p in result.get("phases_data", [])},
+        "requests": total_requests,
+        "requests_per_second": round(total_requests / wall, 1) if wall else 0,
+        "ads_saved": result.get("ads", 0),
+        "ads_per_second": round(result.get("ads", 0) / wall, 1) if wall else 0,
+        "pages_saved": result.get("pages", 0),
+        "meta_api_p50_ms": round(percentile(meta_latencies, 50), 1),
+        "meta_api_p95_ms": round(percentile(meta_latencies, 95), 1),
+        "web_p50_ms": round(percentile(web_latencies, 50), 1),
+        "web_p95_ms": round(percentile(web_latencies, 95), 1),
+        "web_p99_ms": round(percentile(web_latencies, 99), 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "misses": len(server.misses),
+        "missed_requests": server.misses[:20],
+    }
+
+
+def run_replay_isolated(runs: int = 3, **kwargs) -> Dict:
+    """
+    Execute run_replay() `runs` fois, chacun dans un process neuf.
+
+    Returns:
+        {"runs": [rapports], "median": {metrique: mediane}}
+    """
+    context = multiprocessing.get_context("spawn")
+    reports = []
+    for i in range(runs):
+        with context.Pool(1) as pool:
+            report = pool.apply(run_replay, kwds=dict(kwargs, seed=kwargs.get("seed", 0) + i))
+        print(f"[Benchmark] Run {i + 1}/{runs}: {report['wall_seconds']}s, "
+              f"p95 web {report['web_p95_ms']}ms, RSS {report['peak_rss_mb']} Mo")
+        reports.append(report)
+
+    numeric = [key for key, value in reports[0].items() if isinstance(value, (int, float))]
+    median = {key: round(statistics.median(r[key] for r in reports), 3) for key in numeric}
+    return {"runs": reports, "median": median}
+
+
+def compare_reports(current: Dict, baseline: Dict,
+                    tolerance: float = BENCHMARK_REGRESSION_TOLERANCE) -> List[str]:
+    """
+    Regressions de current par rapport a baseline (rapports agreges ou simples).
+
+    Returns:
+        Liste lisible des metriques degradees de plus de `tolerance` (vide = OK)
+    """
+    current = current.get("median", current)
+    baseline = baseline.get("median", baseline)
+    regressions = []
+    for metric in COMPARED_METRICS:
+        before, after = baseline.get(metric), current.get(metric)
+        if not before or after is None:
+            continue
+        if after > before * (1 + tolerance):
+            regressions.append(f"{metric}: {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+    if current.get("misses"):
+        regressions.append(f"misses: {current['misses']} requêtes absentes de l'archive")
+    return regressions
@@ -2,7 +2,10 @@
 Module de cache en memoire avec TTL.
 
 Fournit un cache leger pour les donnees frequemment accedees
-avec support du Time-To-Live (TTL).
+avec support du Time-To-Live (TTL), la coalescence des
+appels identiques concurrents (single-flight), le cache des
+documents HTTP d'une recherche (fetch-once) et les empreintes de
+domaines partagees entre utilisateurs.
 """
 
 from src.infrastructure.cache.ttl_cache import (
@@ -16,6 +19,23 @@ from src.infrastructure.cache.ttl_cache import (
     invalidate_all_caches,
     get_all_cache_stats,
 )
+from src.infrastructure.cache.lru_cache import BoundedLRUCache
+from src.infrastructure.cache.single_flight import (
+    SingleFlight,
+    get_search_single_flight,
+)
+from src.infrastructure.cache.document_cache import (
+    DocumentCache,
+    CachedDocument,
+    normalize_url,
+    get_current_document_cache,
+    set_current_document_cache,
+    clear_current_document_cache,
+)
+from src.infrastructure.cache.fingerprint_store import (
+    DomainFingerprintStore,
+    fingerprint_domain,
+)
 
 __all__ = [
     "TTLCache",
@@ -27,4 +47,15 @@ __all__ = [
     "invalidate_data_cache",
     "invalidate_all_caches",
     "get_all_cache_stats",
+    "BoundedLRUCache",
+    "SingleFlight",
+    "get_search_single_flight",
+    "DocumentCache",
+    "CachedDocument",
+    "normalize_url",
+    "get_current_document_cache",
+    "set_current_document_cache",
+    "clear_current_document_cache",
+    "DomainFingerprintStore",
+    "fingerprint_domain",
 ]
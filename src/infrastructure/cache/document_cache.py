@@ -0,0 +1,296 @@
+"""
+Cache des documents HTTP d'une recherche (fetch-once).
+
+Pendant une recherche, la page d'accueil d'un site est demandee par la
+detection CMS (phase 4), l'analyse web (phase 6) puis le scraper Gemini.
+Le cache garde la premiere reponse (statut, headers, corps tronque) et la
+sert aux detecteurs suivants au lieu de retelecharger le site.
+
+- Cle: URL normalisee (schema et hote en minuscules, port par defaut et
+  fragment retires)
+- Budget memoire: au-dela, les documents les moins recemment utilises sont
+  deplaces sur disque (compresses, repertoire temporaire supprime a la
+  fermeture)
+- Un cache par recherche: active par l'executor pour la duree du run, dans
+  le contexte du thread qui l'execute (recherches simultanees isolees)
+
+Usage:
+    cache = DocumentCache()
+    set_current_document_cache(cache)
+    try:
+        ...  # get_crawler().fetch(url, use_cache=True)
+    finally:
+        clear_current_document_cache(cache)
+        cache.close()
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import zlib
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from src.infrastructure.config import (
+    DOCUMENT_CACHE_MEMORY_BYTES,
+    DOCUMENT_CACHE_DISK_BYTES,
+    DOCUMENT_CACHE_MAX_DOCUMENT_BYTES,
+)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalise une URL pour en faire une cle de cache.
+
+    https:// est ajoute si absent; le schema et l'hote passent en minuscules,
+    le port par defaut et le fragment sont retires, un chemin vide devient "/".
+    """
+    url = (url or "").strip()
+    if not url.lower().startswith(("http://", "https://")):
+        url = "https://" + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, _DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+@dataclass
+class CachedDocument:
+    """Reponse HTTP conservee dans le cache"""
+    url: str  # URL finale (apres redirections)
+    status_code: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    content: bytes = b""
+    cookies: Dict[str, str] = field(default_factory=dict)
+    encoding: Optional[str] = None
+    truncated: bool = False  # Corps coupe (a la lecture ou a max_document_bytes)
+    via_proxy: bool = False
+
+    @property
+    def size(self) -> int:
+        """Taille approximative en memoire (octets)"""
+        meta = sum(len(k) + len(v) for k, v in self.headers.items())
+        meta += sum(len(k) + len(v) for k, v in self.cookies.items())
+        return len(self.content) + meta + len(self.url)
+
+    def covers(self, max_bytes: int) -> bool:
+        """True si le corps conserve suffit a une lecture de max_bytes (0: complete)"""
+        if not self.truncated:
+            return True
+        return bool(max_bytes) and len(self.content) >= max_bytes
+
+
+class DocumentCache:
+    """
+    Cache thread-safe des documents d'une recherche, borne en memoire.
+
+    Les documents evinces de la memoire sont ecrits sur disque tant que le
+    budget disque le permet, puis oublies (les plus anciens d'abord).
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = DOCUMENT_CACHE_MEMORY_BYTES,
+        max_disk_bytes: int = DOCUMENT_CACHE_DISK_BYTES,
+        max_document_bytes: int = DOCUMENT_CACHE_MAX_DOCUMENT_BYTES,
+        spill_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            max_memory_bytes: Taille cumulee max des documents en memoire
+            max_disk_bytes: Taille cumulee max des fichiers deverses (0: pas de disque)
+            max_document_bytes: Corps conserve au plus par document
+            spill_dir: Repertoire parent des fichiers deverses (defaut: tmp systeme)
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_document_bytes = max_document_bytes
+        self._spill_parent = spill_dir
+        self._spill_path: Optional[str] = None
+        self._spill_seq = 0
+
+        self._memory: "OrderedDict[str, CachedDocument]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, tuple]" = OrderedDict()  # cle -> (fichier, taille)
+        self._disk_bytes = 0
+        self._lock = Lock()
+        self._closed = False
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "spilled": 0, "disk_hits": 0, "dropped": 0}
+
+    # ─── Lecture / ecriture ──────────────────────────────────────────────────
+
+    def get(self, url: str, max_bytes: int = 0) -> Optional[CachedDocument]:
+        """
+        Recupere le document d'une URL.
+
+        Args:
+            url: URL (normalisee ici)
+            max_bytes: Corps attendu par l'appelant (0: complet); un document
+                tronque plus court n'est pas servi
+
+        Returns:
+            CachedDocument ou None
+        """
+        key = normalize_url(url)
+        with self._lock:
+            document = self._memory.get(key)
+            if document is not None:
+                self._memory.move_to_end(key)
+            elif key in self._disk:
+                document = self._read_spilled(key)
+                if document is not None:
+                    self._stats["disk_hits"] += 1
+
+            if document is None or not document.covers(max_bytes):
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            return document
+
+    def put(self, url: str, document: CachedDocument):
+        """Stocke le document d'une URL (corps tronque a max_document_bytes)"""
+        if len(document.content) > self.max_document_bytes:
+            document.content = document.content[:self.max_document_bytes]
+            document.truncated = True
+
+        key = normalize_url(url)
+        with self._lock:
+            if self._closed:
+                return
+            self._forget(key)
+            size = document.size
+            if size > self.max_memory_bytes:
+                self._stats["dropped"] += 1
+                return
+            self._memory[key] = document
+            self._memory_bytes += size
+            self._stats["stored"] += 1
+
+            while self._memory_bytes > self.max_memory_bytes:
+                oldest, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted.size
+                self._spill(oldest, evicted)
+
+    # ─── Disque ──────────────────────────────────────────────────────────────
+
+    def _spill(self, key: str, document: CachedDocument):
+        """Ecrit un document evince sur disque (appele avec le lock)"""
+        if not self.max_disk_bytes:
+            self._stats["dropped"] += 1
+            return
+        try:
+            if self._spill_path is None:
+                self._spill_path = tempfile.mkdtemp(prefix="doc_cache_", dir=self._spill_parent)
+            data = zlib.compress(pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL), 1)
+            if len(data) > self.max_disk_bytes:
+                self._stats["dropped"] += 1
+                return
+            self._spill_seq += 1
+            path = os.path.join(self._spill_path, f"{self._spill_seq}.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+        except OSError:
+            self._stats["dropped"] += 1
+            return
+
+        self._disk[key] = (path, len(data))
+        self._disk_bytes += len(data)
+        self._stats["spilled"] += 1
+        while self._disk_bytes > self.max_disk_bytes:
+            self._remove_spilled(next(iter(self._disk)))
+            self._stats["dropped"] += 1
+
+    def _read_spilled(self, key: str) -> Optional[CachedDocument]:
+        """Relit un document deverse (appele avec le lock)"""
+        path, _ = self._disk[key]
+        try:
+            with open(path, "rb") as f:
+                return pickle.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            self._remove_spilled(key)
+            return None
+
+    def _remove_spilled(self, key: str):
+        path, size = self._disk.pop(key)
+        self._disk_bytes -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _forget(self, key: str):
+        """Retire une cle de la memoire et du disque (appele avec le lock)"""
+        document = self._memory.pop(key, None)
+        if document is not None:
+            self._memory_bytes -= document.size
+        if key in self._disk:
+            self._remove_spilled(key)
+
+    # ─── Etat ────────────────────────────────────────────────────────────────
+
+    def get_stats(self) -> Dict:
+        """Statistiques (hits, documents en memoire / sur disque, octets)"""
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "memory_documents": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_documents": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "hit_rate": round(self._stats["hits"] / total * 100, 2) if total else 0,
+            }
+
+    def close(self):
+        """Vide le cache et supprime les fichiers deverses"""
+        with self._lock:
+            self._closed = True
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk.clear()
+            self._disk_bytes = 0
+            path, self._spill_path = self._spill_path, None
+        if path:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CACHE COURANT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Cache de la recherche executee par le thread (ou la tache asyncio) courant:
+# chaque recherche garde le sien. Les threads de travail d'une recherche le
+# recoivent avec contextvars.copy_context().
+_current_cache: ContextVar[Optional[DocumentCache]] = ContextVar("document_cache", default=None)
+
+
+def get_current_document_cache() -> Optional[DocumentCache]:
+    """Retourne le cache de documents du contexte courant (None hors recherche)"""
+    return _current_cache.get()
+
+
+def set_current_document_cache(cache: DocumentCache):
+    """Active un cache de documents dans le contexte courant (jusqu'a clear_current_document_cache)"""
+    _current_cache.set(cache)
+
+
+def clear_current_document_cache(cache: Optional[DocumentCache] = None):
+    """
+    Desactive le cache de documents du contexte courant.
+
+    Avec un argument, seulement s'il est le cache actif; les recherches
+    executees par d'autres threads gardent le leur.
+    """
+    if cache is None or _current_cache.get() is cache:
+        _current_cache.set(None)
@@ -0,0 +1,246 @@
+"""
+Empreintes de domaines partagees entre utilisateurs.
+
+Le cache par page (liste_page_recherche) est isole par user_id: deux
+clients qui tombent sur la meme boutique declenchaient deux analyses
+completes. L'empreinte d'un domaine (CMS, theme, paiements, devise, nombre
+de produits, classification) est observee sur le site public: elle est
+partagee entre utilisateurs et consultee par l'executor avant tout crawl.
+
+- Cle: domaine (hote en minuscules, sans "www.")
+- Fraicheur par groupe: CMS, analyse web, classification (voir settings)
+- Isolation: seules les observations des detecteurs et de Gemini sont
+  ecrites; les champs propres a un utilisateur restent dans sa page
+- Lecture groupee par phase (preload), ecriture differee (write-behind)
+
+Usage:
+    store = DomainFingerprintStore(db)
+    store.preload(websites)
+    cms = store.get_cms(website)
+    if cms is None:
+        cms = detect_cms_from_url(website)["cms"]
+        store.record_cms(website, cms)
+"""
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from src.infrastructure.cache.document_cache import normalize_url
+from src.infrastructure.config import (
+    DOMAIN_FINGERPRINT_ENABLED,
+    DOMAIN_FINGERPRINT_CMS_TTL_DAYS,
+    DOMAIN_FINGERPRINT_ANALYSIS_TTL_DAYS,
+    DOMAIN_FINGERPRINT_CLASSIFICATION_TTL_DAYS,
+)
+
+# Resultats de detection qui ne decrivent pas le site (pas partages)
+_UNKNOWN_CMS = {"", "Unknown", "Inconnu", "ERROR"}
+
+# Colonnes d'analyse web -> cles du resultat de analyze_website_complete
+_ANALYSIS_FIELDS = {
+    "theme": "theme",
+    "payments": "payments",
+    "currency": "currency_from_site",
+    "thematique": "thematique",
+    "type_produits": "type_produits",
+    "product_count": "product_count",
+    "site_title": "site_title",
+    "site_description": "site_description",
+    "site_h1": "site_h1",
+    "site_keywords": "site_keywords",
+}
+
+
+def fingerprint_domain(url: str) -> str:
+    """Domaine d'une URL pour l'empreinte ("" si pas d'hote)"""
+    if not url:
+        return ""
+    host = urlsplit(normalize_url(url)).netloc
+    return host[4:] if host.startswith("www.") else host
+
+
+class DomainFingerprintStore:
+    """
+    Empreintes des domaines rencontres par une recherche.
+
+    Thread-safe. Les empreintes lues sont gardees pour la duree de la
+    recherche; chaque observation est ecrite en differe dans
+    domain_fingerprints.
+    """
+
+    def __init__(
+        self,
+        db,
+        cms_ttl_days: float = DOMAIN_FINGERPRINT_CMS_TTL_DAYS,
+        analysis_ttl_days: float = DOMAIN_FINGERPRINT_ANALYSIS_TTL_DAYS,
+        classification_ttl_days: float = DOMAIN_FINGERPRINT_CLASSIFICATION_TTL_DAYS,
+        enabled: bool = DOMAIN_FINGERPRINT_ENABLED
+    ):
+        """
+        Args:
+            db: DatabaseManager (table domain_fingerprints)
+            cms_ttl_days: Age max d'un CMS detecte
+            analysis_ttl_days: Age max d'une analyse web (theme, paiements, devise, produits)
+            classification_ttl_days: Age max d'une classification Gemini
+            enabled: False: aucune lecture ni ecriture (toujours un crawl)
+        """
+        self.db = db
+        self.enabled = enabled
+        self.max_age = {
+            "cms_checked_at": cms_ttl_days * 86400,
+            "analyzed_at": analysis_ttl_days * 86400,
+            "classified_at": classification_ttl_days * 86400,
+        }
+        self._fingerprints: Dict[str, Dict] = {}
+        self._loaded = set()
+        self._lock = threading.Lock()
+        self._stats = {"cms_hits": 0, "analysis_hits": 0, "classification_hits": 0,
+                       "recorded": 0, "db_errors": 0}
+
+    # ─── Lecture ─────────────────────────────────────────────────────────────
+
+    def preload(self, urls: Iterable[str]):
+        """Charge en une requete les empreintes des domaines pas encore lus"""
+        if not self.enabled:
+            return
+        with self._lock:
+            domains = {fingerprint_domain(url) for url in urls} - self._loaded - {""}
+        if not domains:
+            return
+
+        from src.infrastructure.persistence.repositories.page_repository import get_domain_fingerprints
+
+        try:
+            rows = get_domain_fingerprints(self.db, list(domains))
+        except Exception as e:
+            self._count("db_errors")
+            print(f"⚠️ Erreur lecture empreintes domaines: {str(e)[:100]}")
+            return
+
+        with self._lock:
+            for domain, row in rows.items():
+                # Une observation faite pendant la lecture reste prioritaire
+                self._fingerprints[domain] = {**row, **self._fingerprints.get(domain, {})}
+            self._loaded |= domains
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Empreinte du domaine d'une URL (None si inconnue)"""
+        domain = fingerprint_domain(url)
+        if not self.enabled or not domain:
+            return None
+        self.preload([url])
+        with self._lock:
+            fingerprint = self._fingerprints.get(domain)
+            return dict(fingerprint) if fingerprint else None
+
+    def _fresh(self, fingerprint: Dict, stamp: str) -> bool:
+        checked_at = fingerprint.get(stamp)
+        if not checked_at:
+            return False
+        return (datetime.utcnow() - checked_at).total_seconds() <= self.max_age[stamp]
+
+    def get_cms(self, url: str) -> Optional[str]:
+        """CMS du domaine s'il a ete detecte recemment"""
+        fingerprint = self.get(url)
+        if not fingerprint or not self._fresh(fingerprint, "cms_checked_at"):
+            return None
+        if fingerprint.get("cms") in _UNKNOWN_CMS or fingerprint.get("cms") is None:
+            return None
+        self._count("cms_hits")
+        return fingerprint["cms"]
+
+    def get_web_result(self, url: str, country: str) -> Optional[Dict]:
+        """
+        Resultat d'analyse web du domaine (format de analyze_website_complete).
+
+        Le nombre de produits depend du pays (sitemap par pays): une analyse
+        faite pour un autre pays n'est pas reutilisee. Avec une classification
+        Gemini recente, le resultat la contient et _skip_classification est
+        positionne.
+        """
+        fingerprint = self.get(url)
+        if not fingerprint or not self._fresh(fingerprint, "analyzed_at"):
+            return None
+        if (fingerprint.get("product_count_country") or "") != (country or ""):
+            return None
+
+        result = {key: fingerprint.get(column) or "" for column, key in _ANALYSIS_FIELDS.items()}
+        result["product_count"] = fingerprint.get("product_count") or 0
+        result["cms"] = fingerprint.get("cms") or ""
+        result["_from_cache"] = True
+        self._count("analysis_hits")
+
+        if fingerprint.get("category") and self._fresh(fingerprint, "classified_at"):
+            result.update({
+                "gemini_category": fingerprint["category"],
+                "gemini_subcategory": fingerprint.get("subcategory") or "",
+                "gemini_confidence": fingerprint.get("classification_confidence") or 0.0,
+                "_skip_classification": True,
+            })
+            self._count("classification_hits")
+        return result
+
+    # ─── Observations ────────────────────────────────────────────────────────
+
+    def record_cms(self, url: str, cms: str):
+        """Enregistre le CMS detecte sur un site"""
+        if cms not in _UNKNOWN_CMS and cms is not None:
+            self._record(url, "cms_checked_at", {"cms": cms})
+
+    def record_analysis(self, url: str, result: Dict, country: str):
+        """Enregistre une analyse web reussie (resultat de analyze_website_complete)"""
+        if not result or result.get("error") or result.get("cms") in ("ERROR", None):
+            return
+        fields = {column: result.get(key) for column, key in _ANALYSIS_FIELDS.items()}
+        fields["product_count"] = _to_int(result.get("product_count"))
+        fields["product_count_country"] = country or ""
+        self._record(url, "analyzed_at", fields)
+        self.record_cms(url, result.get("cms"))
+
+    def record_classification(self, url: str, classification: Dict):
+        """Enregistre une classification Gemini (category, subcategory, confidence)"""
+        if not classification or not classification.get("category"):
+            return
+        self._record(url, "classified_at", {
+            "category": classification["category"],
+            "subcategory": classification.get("subcategory") or "",
+            "classification_confidence": classification.get("confidence") or 0.0,
+        })
+
+    def _record(self, url: str, stamp: str, fields: Dict):
+        domain = fingerprint_domain(url)
+        if not self.enabled or not domain:
+            return
+        with self._lock:
+            fingerprint = self._fingerprints.setdefault(domain, {"domain": domain})
+            fingerprint.update(fields)
+            fingerprint[stamp] = datetime.utcnow()
+            self._stats["recorded"] += 1
+
+        from src.infrastructure.persistence.write_behind import queue_domain_fingerprint
+
+        try:
+            queue_domain_fingerprint(self.db, domain=domain, **fields)
+        except Exception as e:
+            self._count("db_errors")
+            print(f"⚠️ Erreur ecriture empreinte domaine: {str(e)[:100]}")
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    # ─── Etat ────────────────────────────────────────────────────────────────
+
+    def get_stats(self) -> Dict:
+        """Statistiques (empreintes reutilisees par groupe, observations enregistrees)"""
+        with self._lock:
+            return {**self._stats, "domains": len(self._fingerprints)}
+
+
+def _to_int(value) -> Optional[int]:
+    """Nombre de produits en entier (None si non numerique)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,123 @@
+"""
+Cache LRU en memoire borne en nombre d'entrees et en octets.
+
+Utilise comme cache L1 devant les caches persistants (APICache): les
+valeurs volumineuses sont stockees compressees et leur taille est
+comptabilisee pour ne jamais depasser le budget memoire.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class _LRUEntry:
+    """Entree LRU avec taille et expiration"""
+    value: Any
+    size: int
+    expires_at: float  # Timestamp d'expiration (0 = jamais)
+
+
+class BoundedLRUCache:
+    """
+    Cache LRU thread-safe borne en entrees et en octets.
+
+    Les entrees les moins recemment utilisees sont evincees des que l'une
+    des deux limites est depassee. Une entree plus grosse que le budget
+    complet n'est pas stockee.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Nombre maximum d'entrees
+            max_bytes: Taille cumulee maximum des valeurs (en octets)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _LRUEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Recupere une valeur (None si absente ou expiree)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            if entry.expires_at and time.time() > entry.expires_at:
+                self._remove(key)
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, size: int, expires_at: float = 0):
+        """
+        Stocke une valeur.
+
+        Args:
+            key: Cle
+            value: Valeur
+            size: Taille de la valeur en octets (pour le budget memoire)
+            expires_at: Timestamp d'expiration (0 = jamais)
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = _LRUEntry(value=value, size=size, expires_at=expires_at)
+            self._bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """Supprime une entree"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str):
+        """Supprime une entree (appele avec le lock)"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get_stats(self) -> Dict:
+        """Retourne les statistiques du cache"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / total * 100, 2) if total else 0,
+            }
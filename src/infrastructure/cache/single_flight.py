@@ -0,0 +1,104 @@
+"""
+Coalescence des requetes identiques concurrentes (single-flight).
+
+Quand plusieurs threads demandent le meme resultat au meme moment, un seul
+(le leader) execute l'appel; les autres (followers) attendent et partagent
+son resultat - ou son exception.
+"""
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class _Call:
+    """Appel en cours pour une cle"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Groupe d'appels coalesces par cle.
+
+    Usage:
+        flight = SingleFlight()
+        result, shared = flight.do(cache_key, lambda: client.search_ads(...))
+
+    Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Execute fn une seule fois pour tous les appelants concurrents de la cle.
+
+        Args:
+            key: Cle de coalescence
+            fn: Fonction a executer par le leader
+
+        Returns:
+            Tuple (resultat, shared) - shared=True si le resultat vient d'un autre appelant
+
+        Raises:
+            L'exception levee par fn (propagee au leader et aux followers)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self, key: str) -> bool:
+        """True si un appel est en cours pour la cle"""
+        with self._lock:
+            return key in self._calls
+
+    def get_stats(self) -> Dict:
+        """Statistiques (appels executes / coalesces)"""
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+# Instance globale pour les recherches Meta
+_search_flight = SingleFlight()
+
+
+def get_search_single_flight() -> SingleFlight:
+    """Retourne le groupe single-flight des recherches Meta"""
+    return _search_flight
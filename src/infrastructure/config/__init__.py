@@ -34,11 +34,84 @@ from src.infrastructure.config.settings import (  # noqa: F401
     META_DELAY_ON_ERROR,
     META_PARALLEL_ENABLED,
     META_MIN_DELAY_BETWEEN_PARALLEL,
+    META_ASYNC_ENABLED,
+    META_ASYNC_MAX_CONCURRENT_PER_TOKEN,
+    META_STREAM_MAX_BUFFERED_PAGES,
+    META_COALESCE_LEASE_SECONDS,
+    META_COALESCE_WAIT_SECONDS,
+    META_COALESCE_POLL_INTERVAL,
+    API_CACHE_L1_MAX_ENTRIES,
+    API_CACHE_L1_MAX_BYTES,
+    API_CACHE_HIT_FLUSH_INTERVAL,
+    API_CACHE_HIT_FLUSH_THRESHOLD,
+    SEARCH_CHECKPOINT_ENABLED,
+    SEARCH_CHECKPOINT_INTERVAL,
+    SEARCH_PIPELINE_ENABLED,
+    SEARCH_PIPELINE_QUEUE_SIZE,
+    SEARCH_PIPELINE_CMS_WORKERS,
+    SEARCH_PIPELINE_WEB_WORKERS,
+    WRITE_BEHIND_ENABLED,
+    WRITE_BEHIND_MAX_PENDING,
+    WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_FLUSH_INTERVAL,
+    PROGRESS_CHANNEL_ENABLED,
+    PROGRESS_FLUSH_INTERVAL_MS,
+    PROGRESS_RETENTION_SECONDS,
+    PROGRESS_SSE_HEARTBEAT,
+    PROGRESS_SSE_DB_POLL_INTERVAL,
+    TRACE_ENABLED,
+    TRACE_MAX_SPANS,
+    TRACE_SUMMARY_TOP,
+    TRACE_FOLDED_LIMIT,
+    BENCHMARK_LATENCY_MS,
+    BENCHMARK_JITTER_MS,
+    BENCHMARK_REGRESSION_TOLERANCE,
+    META_ADAPTIVE_RATE_LIMIT,
+    META_RATE_INITIAL,
+    META_RATE_MIN,
+    META_RATE_MAX,
+    META_RATE_BURST,
+    META_RATE_INCREASE_STEP,
+    META_RATE_DECREASE_FACTOR,
+    META_USAGE_TARGET_PERCENT,
+    META_TOKEN_SCHEDULER_ENABLED,
+    META_SCHEDULER_WINDOW,
+    META_SCHEDULER_MIN_SAMPLES,
+    META_SCHEDULER_DEFAULT_LATENCY,
+    META_SCHEDULER_DEMOTE_FACTOR,
+    META_SCHEDULER_DEMOTE_SECONDS,
     WEB_DELAY_BETWEEN_REQUESTS,
     WEB_DELAY_CMS_CHECK,
     WEB_MAX_CONCURRENT,
+    CRAWLER_MAX_CONCURRENCY,
+    CRAWLER_MAX_CONNECTIONS,
+    CRAWLER_PER_HOST_CONCURRENCY,
+    CRAWLER_PER_HOST_DELAY,
+    CRAWLER_MAX_BODY_BYTES,
+    CRAWLER_WORKERS,
+    HOST_CIRCUIT_FAILURES,
+    HOST_CIRCUIT_RECOVERY,
+    HOST_DEAD_TTL,
+    HOST_HEALTH_MAX_HOSTS,
+    RETRY_BUDGET_MIN,
+    RETRY_BUDGET_RATIO,
+    DOCUMENT_CACHE_ENABLED,
+    DOCUMENT_CACHE_MEMORY_BYTES,
+    DOCUMENT_CACHE_DISK_BYTES,
+    DOCUMENT_CACHE_MAX_DOCUMENT_BYTES,
+    HTTP_REVALIDATION_ENABLED,
+    HTTP_REVALIDATION_MAX_AGE_DAYS,
+    HTTP_REVALIDATION_L1_MAX_ENTRIES,
+    HTTP_REVALIDATION_L1_MAX_BYTES,
+    HTTP_REVALIDATION_MISS_TTL,
+    DOMAIN_FINGERPRINT_ENABLED,
+    DOMAIN_FINGERPRINT_CMS_TTL_DAYS,
+    DOMAIN_FINGERPRINT_ANALYSIS_TTL_DAYS,
+    DOMAIN_FINGERPRINT_CLASSIFICATION_TTL_DAYS,
     THROTTLE_MULTIPLIER_ON_RATE_LIMIT,
     FIELDS_ADS_COMPLETE,
+    FIELDS_ADS_COUNT,
+    META_LEAN_COUNT_ENABLED,
     # Analyse Web
     REQUEST_TIMEOUT,
     SCRAPER_API_KEY,
@@ -73,6 +146,10 @@ from src.infrastructure.config.settings import (  # noqa: F401
     COMPILED_CURRENCY_OG,
     MAX_SITEMAPS_TO_PARSE,
     MAX_PRODUCTS_FROM_SITEMAP,
+    SITEMAP_SHARD_CONCURRENCY,
+    SITEMAP_MAX_BYTES,
+    PRODUCTS_JSON_CONCURRENCY,
+    PRODUCTS_JSON_MAX_PAGES,
     # Pays et langues
     DEFAULT_COUNTRIES,
     DEFAULT_LANGUAGES,
@@ -109,11 +186,84 @@ __all__ = [
     "META_DELAY_ON_ERROR",
     "META_PARALLEL_ENABLED",
     "META_MIN_DELAY_BETWEEN_PARALLEL",
+    "META_ASYNC_ENABLED",
+    "META_ASYNC_MAX_CONCURRENT_PER_TOKEN",
+    "META_STREAM_MAX_BUFFERED_PAGES",
+    "META_COALESCE_LEASE_SECONDS",
+    "META_COALESCE_WAIT_SECONDS",
+    "META_COALESCE_POLL_INTERVAL",
+    "API_CACHE_L1_MAX_ENTRIES",
+    "API_CACHE_L1_MAX_BYTES",
+    "API_CACHE_HIT_FLUSH_INTERVAL",
+    "API_CACHE_HIT_FLUSH_THRESHOLD",
+    "SEARCH_CHECKPOINT_ENABLED",
+    "SEARCH_CHECKPOINT_INTERVAL",
+    "SEARCH_PIPELINE_ENABLED",
+    "SEARCH_PIPELINE_QUEUE_SIZE",
+    "SEARCH_PIPELINE_CMS_WORKERS",
+    "SEARCH_PIPELINE_WEB_WORKERS",
+    "WRITE_BEHIND_ENABLED",
+    "WRITE_BEHIND_MAX_PENDING",
+    "WRITE_BEHIND_BATCH_SIZE",
+    "WRITE_BEHIND_FLUSH_INTERVAL",
+    "PROGRESS_CHANNEL_ENABLED",
+    "PROGRESS_FLUSH_INTERVAL_MS",
+    "PROGRESS_RETENTION_SECONDS",
+    "PROGRESS_SSE_HEARTBEAT",
+    "PROGRESS_SSE_DB_POLL_INTERVAL",
+    "TRACE_ENABLED",
+    "TRACE_MAX_SPANS",
+    "TRACE_SUMMARY_TOP",
+    "TRACE_FOLDED_LIMIT",
+    "BENCHMARK_LATENCY_MS",
+    "BENCHMARK_JITTER_MS",
+    "BENCHMARK_REGRESSION_TOLERANCE",
+    "META_ADAPTIVE_RATE_LIMIT",
+    "META_RATE_INITIAL",
+    "META_RATE_MIN",
+    "META_RATE_MAX",
+    "META_RATE_BURST",
+    "META_RATE_INCREASE_STEP",
+    "META_RATE_DECREASE_FACTOR",
+    "META_USAGE_TARGET_PERCENT",
+    "META_TOKEN_SCHEDULER_ENABLED",
+    "META_SCHEDULER_WINDOW",
+    "META_SCHEDULER_MIN_SAMPLES",
+    "META_SCHEDULER_DEFAULT_LATENCY",
+    "META_SCHEDULER_DEMOTE_FACTOR",
+    "META_SCHEDULER_DEMOTE_SECONDS",
     "WEB_DELAY_BETWEEN_REQUESTS",
     "WEB_DELAY_CMS_CHECK",
     "WEB_MAX_CONCURRENT",
+    "CRAWLER_MAX_CONCURRENCY",
+    "CRAWLER_MAX_CONNECTIONS",
+    "CRAWLER_PER_HOST_CONCURRENCY",
+    "CRAWLER_PER_HOST_DELAY",
+    "CRAWLER_MAX_BODY_BYTES",
+    "CRAWLER_WORKERS",
+    "HOST_CIRCUIT_FAILURES",
+    "HOST_CIRCUIT_RECOVERY",
+    "HOST_DEAD_TTL",
+    "HOST_HEALTH_MAX_HOSTS",
+    "RETRY_BUDGET_MIN",
+    "RETRY_BUDGET_RATIO",
+    "DOCUMENT_CACHE_ENABLED",
+    "DOCUMENT_CACHE_MEMORY_BYTES",
+    "DOCUMENT_CACHE_DISK_BYTES",
+    "DOCUMENT_CACHE_MAX_DOCUMENT_BYTES",
+    "HTTP_REVALIDATION_ENABLED",
+    "HTTP_REVALIDATION_MAX_AGE_DAYS",
+    "HTTP_REVALIDATION_L1_MAX_ENTRIES",
+    "HTTP_REVALIDATION_L1_MAX_BYTES",
+    "HTTP_REVALIDATION_MISS_TTL",
+    "DOMAIN_FINGERPRINT_ENABLED",
+    "DOMAIN_FINGERPRINT_CMS_TTL_DAYS",
+    "DOMAIN_FINGERPRINT_ANALYSIS_TTL_DAYS",
+    "DOMAIN_FINGERPRINT_CLASSIFICATION_TTL_DAYS",
     "THROTTLE_MULTIPLIER_ON_RATE_LIMIT",
     "FIELDS_ADS_COMPLETE",
+    "FIELDS_ADS_COUNT",
+    "META_LEAN_COUNT_ENABLED",
     # Analyse Web
     "REQUEST_TIMEOUT",
     "SCRAPER_API_KEY",
@@ -148,6 +298,10 @@ __all__ = [
     "COMPILED_CURRENCY_OG",
     "MAX_SITEMAPS_TO_PARSE",
     "MAX_PRODUCTS_FROM_SITEMAP",
+    "SITEMAP_SHARD_CONCURRENCY",
+    "SITEMAP_MAX_BYTES",
+    "PRODUCTS_JSON_CONCURRENCY",
+    "PRODUCTS_JSON_MAX_PAGES",
     # Pays et langues
     "DEFAULT_COUNTRIES",
     "DEFAULT_LANGUAGES",
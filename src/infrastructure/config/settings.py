@@ -95,6 +95,50 @@ WINNING_AD_CRITERIA = [
     (29, 400_000),  # 1 mois: ad evergreen a tres fort reach
 ]
 
+# Cache API (api_cache): payload compresse + cache L1 en memoire
+API_CACHE_L1_MAX_ENTRIES = 64                 # Entrees max du cache L1 (par process)
+API_CACHE_L1_MAX_BYTES = 128 * 1024 * 1024    # Budget memoire du L1 (payloads compresses)
+API_CACHE_HIT_FLUSH_INTERVAL = 30             # Secondes entre deux ecritures groupees des hit_count
+API_CACHE_HIT_FLUSH_THRESHOLD = 100           # Ecriture anticipee au-dela de N hits en attente
+
+# Reprise des recherches en arriere-plan (checkpoint par phase dans SearchQueue)
+SEARCH_CHECKPOINT_ENABLED = os.getenv("SEARCH_CHECKPOINT_ENABLED", "true").lower() == "true"
+SEARCH_CHECKPOINT_INTERVAL = 30  # Secondes min entre deux checkpoints en cours de phase
+
+# Mode pipeline des recherches: les pages qualifiees passent en detection CMS
+# puis en analyse web pendant la recherche par mots-cles (files bornees)
+SEARCH_PIPELINE_ENABLED = os.getenv("SEARCH_PIPELINE_ENABLED", "true").lower() == "true"
+SEARCH_PIPELINE_QUEUE_SIZE = 64        # Pages en attente max entre deux etapes
+SEARCH_PIPELINE_CMS_WORKERS = 16       # Threads de detection CMS (le moteur de crawl borne le reseau)
+SEARCH_PIPELINE_WEB_WORKERS = 16       # Threads d'analyse web
+
+# Ecriture differee (write-behind) des logs tokens / appels API
+# Les appels Meta deposent leurs logs dans une file bornee videe par lots
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() == "true"
+WRITE_BEHIND_MAX_PENDING = 10000       # Enregistrements en attente max (au-dela: abandon compte)
+WRITE_BEHIND_BATCH_SIZE = 500          # Enregistrements max par insertion groupee
+WRITE_BEHIND_FLUSH_INTERVAL = 2.0      # Delai max avant ecriture (secondes)
+
+# Canal de progression des recherches en arriere-plan (memoire + SSE)
+# Les etapes sont fusionnees en memoire; la ligne SearchQueue est ecrite au plus
+# une fois par intervalle (debut/fin de phase: ecriture immediate)
+PROGRESS_CHANNEL_ENABLED = os.getenv("PROGRESS_CHANNEL_ENABLED", "true").lower() == "true"
+PROGRESS_FLUSH_INTERVAL_MS = 1000      # Ecriture BDD max par recherche (ms)
+PROGRESS_RETENTION_SECONDS = 300       # Etat final conserve en memoire apres la fin (clients SSE)
+PROGRESS_SSE_HEARTBEAT = 15            # Commentaire keep-alive SSE sans changement (secondes)
+PROGRESS_SSE_DB_POLL_INTERVAL = 2.0    # Lecture BDD si la recherche tourne dans un autre process
+
+# Tracing des recherches (spans imbriques search -> phase -> mot-cle/page -> HTTP/BDD)
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+TRACE_MAX_SPANS = 20000                # Spans detailles conserves par recherche (au-dela: comptes)
+TRACE_SUMMARY_TOP = 20                 # Spans les plus lents dans le resume
+TRACE_FOLDED_LIMIT = 200               # Piles "folded" (flamegraph) conservees dans le resume
+
+# Benchmark hors ligne (rejeu d'archives HTTP, scripts/benchmark_search.py)
+BENCHMARK_LATENCY_MS = 50              # Latence servie par le serveur de rejeu (ms)
+BENCHMARK_JITTER_MS = 20               # Gigue uniforme ajoutee a la latence (ms)
+BENCHMARK_REGRESSION_TOLERANCE = 0.15  # Degradation toleree par rapport a la reference (15%)
+
 # Parallelisation
 WORKERS_WEB_ANALYSIS = 5  # Reduit pour eviter les bans (etait 10)
 TIMEOUT_WEB = 25
@@ -113,11 +157,84 @@ META_DELAY_ON_ERROR = 2.0              # Delai supplementaire apres une erreur
 META_PARALLEL_ENABLED = True           # Activer la recherche parallele si proxies disponibles
 META_MIN_DELAY_BETWEEN_PARALLEL = 0.5  # Delai minimum entre lancements paralleles
 
+# Client asynchrone (aiohttp, sessions poolees par token/proxy)
+META_ASYNC_ENABLED = os.getenv("META_ASYNC_ENABLED", "true").lower() == "true"
+META_ASYNC_MAX_CONCURRENT_PER_TOKEN = 4  # Recherches simultanees par token (= connexions du pool)
+META_STREAM_MAX_BUFFERED_PAGES = 8       # Pages de resultats en attente max (borne la memoire en streaming)
+
+# Coalescence des recherches identiques concurrentes (cached_search_ads)
+# En process: single-flight; entre process: bail en BDD (api_cache_leases)
+META_COALESCE_LEASE_SECONDS = 300      # Duree max du bail du leader
+META_COALESCE_WAIT_SECONDS = 180       # Attente max d'un follower avant d'appeler lui-meme l'API
+META_COALESCE_POLL_INTERVAL = 1.0      # Intervalle de verification du cache par un follower
+
+# Rate limiting adaptatif par token (AIMD pilote par x-business-use-case-usage / x-app-usage)
+# Si active, remplace les delais fixes ci-dessus par un token bucket par token
+META_ADAPTIVE_RATE_LIMIT = os.getenv("META_ADAPTIVE_RATE_LIMIT", "true").lower() == "true"
+META_RATE_INITIAL = 2.0                # Requetes/seconde au demarrage
+META_RATE_MIN = 0.1                    # Plancher (1 requete / 10s)
+META_RATE_MAX = 10.0                   # Plafond
+META_RATE_BURST = 3                    # Requetes autorisees en rafale
+META_RATE_INCREASE_STEP = 0.25         # Increase additif sous la cible
+META_RATE_DECREASE_FACTOR = 0.5        # Decrease multiplicatif au-dessus de la cible
+META_USAGE_TARGET_PERCENT = 75         # Usage cible du quota Meta (%)
+
+# Ordonnancement des tokens (latence, erreurs et quota restant par token/proxy)
+# Chaque mot-cle part sur le token au plus faible temps de completion attendu
+META_TOKEN_SCHEDULER_ENABLED = os.getenv("META_TOKEN_SCHEDULER_ENABLED", "true").lower() == "true"
+META_SCHEDULER_WINDOW = 50             # Appels conserves par token (fenetre glissante)
+META_SCHEDULER_MIN_SAMPLES = 5         # Appels minimum avant de retrograder un token
+META_SCHEDULER_DEFAULT_LATENCY = 2.0   # Latence supposee d'un token sans historique (s)
+META_SCHEDULER_DEMOTE_FACTOR = 3.0     # Proxy retrograde au-dela de 3x la latence mediane
+META_SCHEDULER_DEMOTE_SECONDS = 300    # Retrogradation levee apres 5 min sans appel (nouvel essai)
+
 # Web/Shopify scraping
 WEB_DELAY_BETWEEN_REQUESTS = 0.5       # Secondes entre chaque requete web
 WEB_DELAY_CMS_CHECK = 0.3              # Delai entre les checks CMS
 WEB_MAX_CONCURRENT = 3                 # Max requetes simultanees (reduit de 5)
 
+# Moteur de crawl partage (boucle asyncio + pool de connexions global)
+# Tous les scrapers (CMS, analyse web, sitemaps, Gemini, MarketSpy) passent par lui
+CRAWLER_MAX_CONCURRENCY = 64           # Requetes simultanees max (tous sites confondus)
+CRAWLER_MAX_CONNECTIONS = 128          # Connexions max du pool (keep-alive)
+CRAWLER_PER_HOST_CONCURRENCY = 2       # Requetes simultanees max vers un meme site
+CRAWLER_PER_HOST_DELAY = 0.25          # Secondes min entre deux requetes vers un meme site
+CRAWLER_MAX_BODY_BYTES = 5 * 1024 * 1024  # Corps de reponse lu au plus (au-dela: tronque)
+CRAWLER_WORKERS = 32                   # Threads d'analyse en attente sur le moteur (phases 4 et 6)
+
+# Sante des hotes: les sites morts ou muets ne bloquent plus les threads d'analyse
+# Circuit par hote ouvert apres N echecs reseau consecutifs (timeout, connexion, DNS),
+# hote ensuite ignore (cache negatif) pendant HOST_DEAD_TTL secondes
+HOST_CIRCUIT_FAILURES = 3              # Echecs reseau consecutifs avant ouverture du circuit
+HOST_CIRCUIT_RECOVERY = 300            # Secondes avant une requete de test (circuit semi-ouvert)
+HOST_DEAD_TTL = 3600                   # Secondes pendant lesquelles un hote mort est ignore
+HOST_HEALTH_MAX_HOSTS = 50000          # Hotes suivis au plus (circuits et cache negatif)
+# Budget de relances par recherche: minimum + ratio des requetes de la recherche
+RETRY_BUDGET_MIN = 50                  # Relances toujours permises
+RETRY_BUDGET_RATIO = 0.1               # Relances supplementaires par requete
+
+# Cache des documents d'une recherche (fetch-once: CMS phase 4, analyse phase 6, Gemini)
+# Au-dela du budget memoire, les documents sont deverses sur disque (tmp, supprime en fin de recherche)
+DOCUMENT_CACHE_ENABLED = os.getenv("DOCUMENT_CACHE_ENABLED", "true").lower() == "true"
+DOCUMENT_CACHE_MEMORY_BYTES = 64 * 1024 * 1024      # Documents gardes en memoire par recherche
+DOCUMENT_CACHE_DISK_BYTES = 512 * 1024 * 1024       # Fichiers deverses max (compresses), 0: pas de disque
+DOCUMENT_CACHE_MAX_DOCUMENT_BYTES = 2 * 1024 * 1024  # Corps conserve au plus par document
+
+# Revalidation HTTP des pages d'accueil et sitemaps (If-None-Match / If-Modified-Since)
+# Validateurs + resultat d'analyse en BDD (http_validators): reponse 304 = resultat reutilise
+HTTP_REVALIDATION_ENABLED = os.getenv("HTTP_REVALIDATION_ENABLED", "true").lower() == "true"
+HTTP_REVALIDATION_MAX_AGE_DAYS = 30    # Au-dela, telechargement complet (validateurs non fiables)
+HTTP_REVALIDATION_L1_MAX_ENTRIES = 20000  # Validateurs gardes en memoire (process)
+HTTP_REVALIDATION_L1_MAX_BYTES = 32 * 1024 * 1024
+HTTP_REVALIDATION_MISS_TTL = 3600      # URL sans validateurs: pas de relecture BDD pendant 1h
+
+# Empreintes de domaines partagees entre utilisateurs (table domain_fingerprints)
+# CMS, theme, paiements, devise, produits, classification d'un site: consultees avant tout crawl
+DOMAIN_FINGERPRINT_ENABLED = os.getenv("DOMAIN_FINGERPRINT_ENABLED", "true").lower() == "true"
+DOMAIN_FINGERPRINT_CMS_TTL_DAYS = 30             # Le CMS d'un site ne change presque jamais
+DOMAIN_FINGERPRINT_ANALYSIS_TTL_DAYS = 1         # Theme, paiements, devise, produits (meme fraicheur que dernier_scan)
+DOMAIN_FINGERPRINT_CLASSIFICATION_TTL_DAYS = 30  # Classification Gemini
+
 # Adaptative throttling (augmente les delais si rate limits detectes)
 THROTTLE_MULTIPLIER_ON_RATE_LIMIT = 2.0  # Multiplie les delais si rate limit
 
@@ -131,6 +248,13 @@ FIELDS_ADS_COMPLETE = ",".join([
     "currency"
 ])
 
+# Fields minimaux pour le comptage (phase 5): comptage + detection winning ads + devise.
+# Les creatives completes ne sont recuperees ensuite que pour les pages retenues.
+FIELDS_ADS_COUNT = ",".join([
+    "id", "page_id", "ad_creation_time", "eu_total_reach", "currency"
+])
+META_LEAN_COUNT_ENABLED = os.getenv("META_LEAN_COUNT_ENABLED", "true").lower() == "true"
+
 # ---------------------------------------------------------------------------
 # Analyse Web
 REQUEST_TIMEOUT = 25
@@ -168,12 +292,16 @@ def get_random_headers() -> dict:
     return {"User-Agent": random.choice(USER_AGENTS)}
 
 
-def get_proxied_url(url: str) -> tuple[str, dict]:
+def get_proxied_url(url: str, extra_params: dict = None) -> tuple[str, dict]:
     """
     Retourne l'URL et les headers a utiliser pour la requete.
     Si ScraperAPI est configure, utilise le proxy.
     Sinon, requete directe avec User-Agent aleatoire.
 
+    Args:
+        url: URL cible
+        extra_params: Parametres ScraperAPI supplementaires (ex: country_code)
+
     Returns:
         tuple: (url_to_use, headers_to_use)
     """
@@ -187,6 +315,7 @@ def get_proxied_url(url: str) -> tuple[str, dict]:
             "url": url,
             "render": "false",  # Pas besoin de JS rendering
         }
+        params.update(extra_params or {})
         proxy_url = f"{SCRAPER_API_URL}?{urlencode(params)}"
         return proxy_url, {}  # ScraperAPI gere les headers
     else:
@@ -317,6 +446,12 @@ COMPILED_CURRENCY_OG = re.compile(r'property=["\']og:price:currency["\']\s+conte
 # Limite sitemap (optimisation memoire)
 MAX_SITEMAPS_TO_PARSE = 10
 MAX_PRODUCTS_FROM_SITEMAP = 5000
+SITEMAP_SHARD_CONCURRENCY = 4          # Sitemaps produits d'un site telecharges en parallele
+SITEMAP_MAX_BYTES = 64 * 1024 * 1024   # XML lu au plus par sitemap (compte en flux, .xml.gz decompresse)
+
+# Comptage Shopify par /products.json (pages de 250 produits)
+PRODUCTS_JSON_CONCURRENCY = 4          # Pages sondees en parallele (recherche de la derniere page)
+PRODUCTS_JSON_MAX_PAGES = 100          # Pages comptees au plus (au-dela: count plafonne)
 
 # ---------------------------------------------------------------------------
 # Pays et langues par defaut
@@ -39,6 +39,16 @@ from src.infrastructure.external_services.meta_api import (
     cached_fetch_ads_for_page,
 )
 
+# Meta API asynchrone (sessions poolees par token/proxy)
+from src.infrastructure.external_services.async_meta_api import (
+    AsyncMetaAdsClient,
+    SearchResultPage,
+    search_keywords_async,
+    search_keywords_concurrent,
+    iter_search_keywords,
+    fetch_pages_concurrent,
+)
+
 __all__ = [
     "MetaAdsSearchAdapter",
     # Gemini Classifier
@@ -67,4 +77,11 @@ __all__ = [
     "extract_currency_from_ads",
     "cached_search_ads",
     "cached_fetch_ads_for_page",
+    # Meta API asynchrone
+    "AsyncMetaAdsClient",
+    "SearchResultPage",
+    "search_keywords_async",
+    "search_keywords_concurrent",
+    "iter_search_keywords",
+    "fetch_pages_concurrent",
 ]
@@ -0,0 +1,874 @@
+"""
+Client asynchrone pour l'API Meta Ads Archive.
+
+Complement de meta_api.py pour les recherches massives:
+- Une session aiohttp (pool de connexions keep-alive) par couple token/proxy
+- Pagination non bloquante (asyncio.sleep au lieu de time.sleep)
+- Des centaines de recherches par mot-cle concurrentes dans un seul process
+- Cadencement par le rate limiter adaptatif du token (partage avec TokenRotator)
+- API streaming: chaque page de resultats est renvoyee des sa reception
+- Comptage des ads par page (batches de 10 pages) reparti sur tous les tokens
+"""
+import json
+import time
+import queue
+import asyncio
+import threading
+import aiohttp
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Optional, Callable, Iterator, AsyncIterator
+
+from src.infrastructure.config import (
+    ADS_ARCHIVE, TIMEOUT, LIMIT_SEARCH, LIMIT_COUNT, LIMIT_MIN,
+    FIELDS_ADS_COMPLETE,
+    META_DELAY_BETWEEN_PAGES,
+    META_ASYNC_MAX_CONCURRENT_PER_TOKEN,
+    META_STREAM_MAX_BUFFERED_PAGES,
+)
+from src.infrastructure.monitoring.api_tracker import get_current_tracker
+from src.infrastructure.external_services.meta_rate_limiter import AdaptiveRateLimiter
+
+
+# Cle de pool: (token, proxy)
+SessionKey = Tuple[str, Optional[str]]
+
+
+@dataclass
+class SearchResultPage:
+    """Page de resultats d'une recherche par mot-cle (streaming)"""
+    keyword: str
+    ads: List[dict] = field(default_factory=list)
+    done: bool = False  # True: marqueur de fin du mot-cle (ads vide)
+    next_cursor: Optional[str] = None  # Curseur Meta de la page suivante (reprise)
+
+
+class AsyncMetaAdsClient:
+    """
+    Client asynchrone pour l'API Meta Ads Archive.
+
+    Chaque couple token/proxy dispose de sa propre ClientSession avec un
+    TCPConnector dedie: les connexions TLS sont reutilisees d'une page a
+    l'autre et d'un mot-cle a l'autre au lieu d'etre renegociees a chaque
+    requete.
+
+    Usage:
+        async with AsyncMetaAdsClient(tokens_data) as client:
+            all_ads, ads_by_keyword = await client.search_keywords(
+                keywords, ["FR"], ["fr"]
+            )
+    """
+
+    def __init__(
+        self,
+        tokens_with_proxies: List[Dict],
+        db=None,
+        max_concurrent_per_token: int = META_ASYNC_MAX_CONCURRENT_PER_TOKEN,
+        timeout: int = TIMEOUT,
+        rotator=None
+    ):
+        """
+        Args:
+            tokens_with_proxies: Liste de dicts [{"id": 1, "token": "...", "proxy": "http://...", "name": "..."}]
+            db: DatabaseManager pour le logging des tokens (optionnel)
+            max_concurrent_per_token: Recherches simultanees max par token
+            timeout: Timeout total par requete en secondes
+            rotator: TokenRotator dont les rate limiters cadencent les requetes (optionnel)
+        """
+        self._token_data = [
+            {
+                "id": t.get("id"),
+                "token": t["token"].strip(),
+                "proxy": t.get("proxy") or None,
+                "name": t.get("name", f"Token #{i+1}")
+            }
+            for i, t in enumerate(tokens_with_proxies or [])
+            if t.get("token") and t["token"].strip()
+        ]
+        self._db = db
+        self._rotator = rotator
+        self._max_concurrent_per_token = max(1, max_concurrent_per_token)
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._sessions: Dict[SessionKey, aiohttp.ClientSession] = {}
+        self._semaphores: Dict[SessionKey, asyncio.Semaphore] = {}
+
+    @property
+    def token_count(self) -> int:
+        """Nombre de tokens disponibles"""
+        return len(self._token_data)
+
+    async def __aenter__(self) -> "AsyncMetaAdsClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _session_key(self, token_data: Dict) -> SessionKey:
+        return token_data["token"], token_data.get("proxy")
+
+    def _get_session(self, token_data: Dict) -> aiohttp.ClientSession:
+        """Retourne (ou cree) la session poolee du couple token/proxy"""
+        key = self._session_key(token_data)
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._max_concurrent_per_token,
+                ssl=False,  # Meme comportement que verify=False cote requests (Railway)
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+            self._sessions[key] = session
+        return session
+
+    def _get_semaphore(self, token_data: Dict) -> asyncio.Semaphore:
+        """
+        Limite le nombre de recherches simultanees par token.
+        Sans proxy, toutes les requetes partagent l'IP du serveur: un seul
+        mot-cle a la fois (meme politique que la recherche sequentielle).
+        """
+        key = self._session_key(token_data)
+        if key not in self._semaphores:
+            limit = self._max_concurrent_per_token if token_data.get("proxy") else 1
+            self._semaphores[key] = asyncio.Semaphore(limit)
+        return self._semaphores[key]
+
+    def _get_rate_limiter(self, token_data: Dict) -> Optional[AdaptiveRateLimiter]:
+        """Rate limiter adaptatif du token (None si desactive ou sans rotator)"""
+        if self._rotator is None:
+            return None
+        return self._rotator.get_rate_limiter(token_data["token"])
+
+    def _record_latency(self, token_data: Dict, response_time_ms: float, success: bool):
+        """Remonte la latence d'un appel a l'ordonnanceur du rotator"""
+        if self._rotator is not None:
+            self._rotator.record_latency(token_data["token"], response_time_ms, success)
+
+    def _pick_token(self, position: int, exclude: Optional[Dict] = None) -> Dict:
+        """
+        Token d'une nouvelle recherche: le mieux classe par l'ordonnanceur du
+        rotator (temps de completion attendu). A score egal, ou sans rotator,
+        round-robin a partir de la position.
+        """
+        offset = position % len(self._token_data)
+        candidates = self._token_data[offset:] + self._token_data[:offset]
+        if exclude is not None and len(candidates) > 1:
+            candidates = [t for t in candidates if t["token"] != exclude["token"]]
+        if self._rotator is None:
+            return candidates[0]
+        return self._rotator.rank_token_data(candidates)[0]
+
+    async def close(self):
+        """Ferme toutes les sessions poolees"""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+    async def _get_api(
+        self,
+        token_data: Dict,
+        url: str,
+        params: dict,
+        keyword: str = "",
+        max_retries: int = 5
+    ) -> dict:
+        """Appel API avec retry, gestion du rate limiting et proxy du token"""
+        params = dict(params)
+        if params:
+            params["access_token"] = token_data["token"]
+
+        session = self._get_session(token_data)
+        proxy = token_data.get("proxy")
+        limiter = self._get_rate_limiter(token_data)
+        tracker = get_current_tracker()
+        token_name = token_data.get("name", "")
+
+        for attempt in range(max_retries):
+            if limiter:
+                await limiter.wait_async()
+            start_time = time.time()
+            try:
+                async with session.get(url, params=params or None, proxy=proxy) as r:
+                    body = await r.text()
+                    status = r.status
+                    if limiter:
+                        limiter.update_from_headers(r.headers)
+                response_time = (time.time() - start_time) * 1000
+
+                try:
+                    data = json.loads(body) if body else {}
+                except (ValueError, json.JSONDecodeError):
+                    data = {}
+
+                self._record_latency(token_data, response_time, status == 200 and "error" not in data)
+
+                if "error" in data:
+                    error_code = data["error"].get("code")
+                    error_msg = data["error"].get("message", "")
+
+                    if error_code == 613 or "rate limit" in error_msg.lower():
+                        if tracker:
+                            tracker.track_meta_api_call(
+                                endpoint=url[:200],
+                                keyword=keyword,
+                                status_code=status,
+                                success=False,
+                                error_type="rate_limit",
+                                error_message=error_msg[:200],
+                                response_time_ms=response_time,
+                                token=token_name, proxy=proxy
+                            )
+                        sleep_time = min(2 ** attempt, 60)
+                        print(f"⏳ Rate limit token {token_data.get('name')}, attente {sleep_time}s...")
+                        if limiter:
+                            limiter.on_rate_limited(sleep_time)
+                        else:
+                            await asyncio.sleep(sleep_time)
+                        continue
+
+                    if tracker:
+                        tracker.track_meta_api_call(
+                            endpoint=url[:200],
+                            keyword=keyword,
+                            status_code=status,
+                            success=False,
+                            error_type="api_error",
+                            error_message=error_msg[:200],
+                            response_time_ms=response_time,
+                            token=token_name, proxy=proxy
+                        )
+                    raise RuntimeError(f"API Error {error_code}: {error_msg}")
+
+                if status == 200:
+                    if tracker:
+                        tracker.track_meta_api_call(
+                            endpoint=url[:200],
+                            keyword=keyword,
+                            status_code=200,
+                            success=True,
+                            response_time_ms=response_time,
+                            response_size=len(body),
+                            items_returned=len(data.get("data", [])),
+                            token=token_name, proxy=proxy
+                        )
+                    return data
+
+                if status in (429, 500, 502, 503):
+                    if tracker:
+                        tracker.track_meta_api_call(
+                            endpoint=url[:200],
+                            keyword=keyword,
+                            status_code=status,
+                            success=False,
+                            error_type="http_error",
+                            response_time_ms=response_time,
+                            token=token_name, proxy=proxy
+                        )
+                    sleep_time = min(2 ** attempt, 30)
+                    if limiter and status == 429:
+                        limiter.on_rate_limited(sleep_time)
+                    else:
+                        await asyncio.sleep(sleep_time)
+                    continue
+
+                raise RuntimeError(f"HTTP {status}: {body[:200]}")
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                response_time = (time.time() - start_time) * 1000
+                self._record_latency(token_data, response_time, False)
+                if tracker:
+                    tracker.track_meta_api_call(
+                        endpoint=url[:200],
+                        keyword=keyword,
+                        success=False,
+                        error_type="network_error",
+                        error_message=str(e)[:200],
+                        response_time_ms=response_time,
+                        token=token_name, proxy=proxy
+                    )
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                raise RuntimeError(f"Erreur réseau: {e}")
+
+        raise RuntimeError("Échec après plusieurs tentatives (rate limit)")
+
+    async def search_ads(
+        self,
+        keyword: str,
+        countries: List[str],
+        languages: List[str],
+        token_data: Optional[Dict] = None
+    ) -> List[dict]:
+        """
+        Recherche des annonces par mot-cle (toutes les pages de resultats).
+
+        Args:
+            keyword: Mot-cle a rechercher
+            countries: Liste des codes pays
+            languages: Liste des codes langues
+            token_data: Token/proxy a utiliser (defaut: premier token)
+
+        Returns:
+            Liste des annonces trouvees
+
+        Raises:
+            RuntimeError: Si la premiere page echoue (permet un retry sur un autre token)
+        """
+        all_ads = []
+        async for batch in self.iter_search_ads(keyword, countries, languages, token_data):
+            all_ads.extend(batch)
+        return all_ads
+
+    async def iter_search_ads(
+        self,
+        keyword: str,
+        countries: List[str],
+        languages: List[str],
+        token_data: Optional[Dict] = None
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Recherche des annonces par mot-cle, page de resultats par page.
+
+        Yields:
+            Liste des annonces de chaque page, des sa reception
+
+        Raises:
+            RuntimeError: Si la premiere page echoue (permet un retry sur un autre token)
+        """
+        async for batch, _ in self._iter_search_pages(keyword, countries, languages, token_data):
+            yield batch
+
+    async def _iter_search_pages(
+        self,
+        keyword: str,
+        countries: List[str],
+        languages: List[str],
+        token_data: Optional[Dict] = None,
+        after: Optional[str] = None
+    ) -> AsyncIterator[Tuple[List[dict], Optional[str]]]:
+        """
+        Pagination d'une recherche par mot-cle.
+
+        Args:
+            after: Curseur Meta de reprise (paging.cursors.after d'une page precedente)
+
+        Yields:
+            Tuple (annonces de la page, curseur de la page suivante ou None si derniere page)
+        """
+        if token_data is None:
+            if not self._token_data:
+                return
+            token_data = self._token_data[0]
+
+        start_time = time.time()
+        error_msg = None
+        success = True
+        ads_count = 0
+
+        url = ADS_ARCHIVE
+        params = {
+            "search_terms": keyword,
+            "search_type": "KEYWORD_UNORDERED",
+            "ad_type": "ALL",
+            "ad_active_status": "ACTIVE",
+            "ad_reached_countries": json.dumps(countries),
+            "fields": FIELDS_ADS_COMPLETE,
+            "limit": LIMIT_SEARCH
+        }
+        if languages:
+            params["languages"] = json.dumps(languages)
+        if after:
+            params["after"] = after
+
+        limit_curr = LIMIT_SEARCH
+
+        try:
+            async with self._get_semaphore(token_data):
+                while True:
+                    try:
+                        data = await self._get_api(token_data, url, params, keyword=keyword)
+                    except RuntimeError as e:
+                        err_msg = str(e)
+                        error_msg = err_msg
+                        success = False
+
+                        # Reduire la limite si demande par l'API
+                        if ("reduce" in err_msg or "code\":1" in err_msg) and limit_curr > LIMIT_MIN and params:
+                            limit_curr = max(LIMIT_MIN, limit_curr // 2)
+                            params["limit"] = limit_curr
+                            await asyncio.sleep(0.3)
+                            continue
+
+                        print(f"❌ Erreur API Meta pour '{keyword}' ({token_data.get('name')}): {err_msg}")
+                        break
+
+                    # Relance reussie (limite reduite): l'erreur precedente ne compte plus
+                    success, error_msg = True, None
+                    batch = data.get("data", [])
+                    ads_count += len(batch)
+                    paging = data.get("paging", {})
+                    next_url = paging.get("next")
+                    next_cursor = paging.get("cursors", {}).get("after") if next_url else None
+                    yield batch, next_cursor
+
+                    if not next_url:
+                        break
+
+                    # Delai fixe uniquement sans rate limiter adaptatif
+                    if not self._get_rate_limiter(token_data):
+                        await asyncio.sleep(META_DELAY_BETWEEN_PAGES)
+                    url = next_url
+                    params = {}  # Next URL contient deja les params (dont access_token)
+        finally:
+            await self._log_usage(token_data, keyword, countries, success, ads_count, error_msg, start_time)
+
+        if not success and not ads_count:
+            raise RuntimeError(error_msg or f"Echec recherche '{keyword}'")
+
+    async def _log_usage(
+        self,
+        token_data: Dict,
+        keyword: str,
+        countries: List[str],
+        success: bool,
+        ads_count: int,
+        error_msg: Optional[str],
+        start_time: float
+    ):
+        """Log de l'utilisation du token (ecriture differee, sans I/O dans l'event loop)"""
+        if not token_data.get("id") or not self._db:
+            return
+        try:
+            from src.infrastructure.persistence.database import queue_token_usage_log
+            countries_str = ",".join(countries) if isinstance(countries, list) else countries
+            queue_token_usage_log(
+                self._db,
+                token_id=token_data["id"],
+                token_name=token_data.get("name", ""),
+                action_type="search_async",
+                keyword=keyword,
+                countries=countries_str,
+                success=success,
+                ads_count=ads_count,
+                error_message=error_msg,
+                response_time_ms=int((time.time() - start_time) * 1000)
+            )
+        except Exception as log_err:
+            print(f"⚠️ Erreur logging token: {log_err}")
+
+    async def fetch_ads_for_pages_batch(
+        self,
+        page_ids: List[str],
+        countries: List[str],
+        languages: List[str],
+        fields: str = FIELDS_ADS_COMPLETE,
+        token_data: Optional[Dict] = None
+    ) -> Dict[str, Tuple[List[dict], int]]:
+        """
+        Recupere les annonces de plusieurs pages (max 10) en une seule requete.
+        Equivalent async de MetaAdsClient.fetch_ads_for_pages_batch.
+
+        Returns:
+            Dict {page_id: (liste des annonces, count)}
+
+        Raises:
+            RuntimeError: Si la premiere page echoue (permet un retry sur un autre token)
+        """
+        if token_data is None:
+            token_data = self._token_data[0]
+
+        page_ids = [str(pid) for pid in page_ids[:10]]
+        params = {
+            "search_page_ids": json.dumps(page_ids),
+            "ad_active_status": "ACTIVE",
+            "ad_type": "ALL",
+            "ad_reached_countries": json.dumps(countries),
+            "fields": fields,
+            "limit": LIMIT_COUNT
+        }
+        if languages:
+            params["languages"] = json.dumps(languages)
+
+        url = ADS_ARCHIVE
+        ads_by_page: Dict[str, List[dict]] = {pid: [] for pid in page_ids}
+        first_page = True
+
+        async with self._get_semaphore(token_data):
+            while True:
+                try:
+                    data = await self._get_api(token_data, url, params)
+                except RuntimeError:
+                    if first_page:
+                        raise
+                    break  # Resultats partiels (meme comportement que la version sync)
+                first_page = False
+
+                for ad in data.get("data", []):
+                    pid = str(ad.get("page_id", ""))
+                    if pid in ads_by_page:
+                        ads_by_page[pid].append(ad)
+
+                next_url = data.get("paging", {}).get("next")
+                if not next_url:
+                    break
+
+                if not self._get_rate_limiter(token_data):
+                    await asyncio.sleep(META_DELAY_BETWEEN_PAGES)
+                url = next_url
+                params = {}
+
+        return {pid: (ads, len(ads)) for pid, ads in ads_by_page.items()}
+
+    async def fetch_pages_batches(
+        self,
+        page_ids: List[str],
+        countries: List[str],
+        languages: List[str],
+        fields: str = FIELDS_ADS_COMPLETE,
+        batch_size: int = 10,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Tuple[List[dict], int]]:
+        """
+        Repartit les batches de pages sur tous les tokens.
+
+        Chaque token dispose d'autant de workers que son semaphore le permet
+        (1 sans proxy); les workers piochent dans une file commune, de sorte
+        qu'un token rapide traite plus de batches qu'un token ralenti par son
+        rate limiter. Un batch en echec est retente une fois sur le token suivant.
+
+        Returns:
+            Dict {page_id: (liste des annonces, count)} - count 0 si le batch a echoue
+        """
+        results: Dict[str, Tuple[List[dict], int]] = {}
+        if not self._token_data or not page_ids:
+            return results
+
+        batches = [page_ids[i:i + batch_size] for i in range(0, len(page_ids), batch_size)]
+        pending = list(enumerate(batches))
+        pending.reverse()  # pop() depuis la fin = ordre d'origine
+        token_count = len(self._token_data)
+        done = 0
+
+        async def worker(token_index: int):
+            nonlocal done
+            while pending:
+                batch_index, batch = pending.pop()
+                batch_results = None
+                for attempt in range(min(2, token_count)):
+                    token_data = self._token_data[(token_index + attempt) % token_count]
+                    try:
+                        batch_results = await self.fetch_ads_for_pages_batch(
+                            batch, countries, languages, fields=fields, token_data=token_data
+                        )
+                        break
+                    except RuntimeError as e:
+                        print(f"⚠️ Batch {batch_index + 1} échoué ({token_data.get('name')}): {e}")
+
+                for pid in batch:
+                    results[str(pid)] = (batch_results or {}).get(str(pid), ([], 0))
+
+                done += 1
+                if progress_callback:
+                    progress_callback(done, len(batches))
+
+        workers = []
+        for index, token_data in enumerate(self._token_data):
+            slots = self._max_concurrent_per_token if token_data.get("proxy") else 1
+            workers.extend(worker(index) for _ in range(slots))
+
+        await asyncio.gather(*workers)
+        return results
+
+    async def iter_keywords(
+        self,
+        keywords: List[str],
+        countries: List[str],
+        languages: List[str],
+        max_buffered_pages: int = META_STREAM_MAX_BUFFERED_PAGES,
+        start_cursors: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[SearchResultPage]:
+        """
+        Recherche tous les mots-cles de maniere concurrente et renvoie chaque
+        page de resultats des son arrivee, tous mots-cles confondus.
+
+        Chaque mot-cle part, au moment ou il demarre, sur le token au plus faible
+        temps de completion attendu (latence, erreurs, quota restant et file du
+        token - voir TokenScheduler); sans rotator, en round-robin. Un mot-cle
+        dont la premiere page echoue est retente une fois sur un autre token.
+        La file entre la pagination et l'appelant est bornee: si l'appelant
+        traite moins vite que Meta ne repond, la pagination est mise en pause.
+
+        Args:
+            start_cursors: {keyword: curseur} pour reprendre une pagination interrompue
+
+        Yields:
+            SearchResultPage par page recue, puis une page done=True par mot-cle termine
+        """
+        if not self._token_data or not keywords:
+            return
+
+        token_count = len(self._token_data)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_buffered_pages))
+        pending = list(enumerate(keywords))
+        pending.reverse()  # pop() depuis la fin = ordre d'origine
+        tracker = get_current_tracker()
+        tracer = getattr(tracker, "tracer", None)
+
+        async def run_keyword(index: int, keyword: str):
+            attempts = min(2, token_count)
+            failed_token = None
+            # Span du mot-cle: les appels Meta du mot-cle s'y rattachent par cle
+            span_key = f"keyword:{keyword}"
+            token_name = ""
+            if tracer:
+                tracer.begin("keyword", "keyword", key=span_key, keyword=keyword)
+            try:
+                for attempt in range(attempts):
+                    token_data = self._pick_token(index + attempt, exclude=failed_token)
+                    token_name = token_data.get("name", "")
+                    if self._rotator is not None:
+                        self._rotator.begin_search(token_data["token"])
+                    yielded = False
+                    try:
+                        pages = self._iter_search_pages(
+                            keyword, countries, languages, token_data,
+                            after=(start_cursors or {}).get(keyword)
+                        )
+                        async for batch, next_cursor in pages:
+                            yielded = True
+                            await queue.put(SearchResultPage(keyword=keyword, ads=batch, next_cursor=next_cursor))
+                        break
+                    except RuntimeError as e:
+                        if yielded:
+                            break
+                        failed_token = token_data
+                        if attempt + 1 < attempts:
+                            print(f"  → Retry '{keyword}' avec un autre token ({e})")
+                    finally:
+                        if self._rotator is not None:
+                            self._rotator.end_search(token_data["token"])
+            finally:
+                if tracer:
+                    tracer.end_key(span_key, token=token_name)
+                await queue.put(SearchResultPage(keyword=keyword, ads=[], done=True))
+
+        async def worker():
+            # Les mots-cles sont pioches au fil de l'eau: le token est choisi
+            # avec les statistiques a jour, pas toutes au demarrage
+            while pending:
+                index, keyword = pending.pop()
+                try:
+                    await run_keyword(index, keyword)
+                except Exception as e:  # Le worker continue avec les mots-cles suivants
+                    print(f"❌ Erreur recherche '{keyword}': {e}")
+
+        slots = sum(
+            self._max_concurrent_per_token if t.get("proxy") else 1
+            for t in self._token_data
+        )
+        tasks = [asyncio.create_task(worker()) for _ in range(min(slots, len(keywords)))]
+        remaining = len(keywords)
+        try:
+            while remaining:
+                page = await queue.get()
+                if page.done:
+                    remaining -= 1
+                yield page
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def search_keywords(
+        self,
+        keywords: List[str],
+        countries: List[str],
+        languages: List[str],
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> Tuple[List[dict], Dict[str, int]]:
+        """
+        Recherche tous les mots-cles de maniere concurrente.
+
+        Args:
+            keywords: Liste des mots-cles a rechercher
+            countries: Liste des codes pays
+            languages: Liste des codes langues
+            progress_callback: Callback(keyword, current, total) pour la progression
+
+        Returns:
+            Tuple (liste de toutes les ads dedupliquees, dict {keyword: nb_ads})
+        """
+        if not self._token_data:
+            print("⚠️ Aucun token disponible pour la recherche")
+            return [], {}
+
+        all_ads = []
+        ads_by_keyword = {}
+        seen_ad_ids = set()
+        completed = 0
+
+        async for page in self.iter_keywords(keywords, countries, languages):
+            ads_by_keyword[page.keyword] = ads_by_keyword.get(page.keyword, 0) + len(page.ads)
+            for ad in page.ads:
+                ad_id = ad.get("id")
+                if ad_id and ad_id not in seen_ad_ids:
+                    ad["_keyword"] = page.keyword
+                    all_ads.append(ad)
+                    seen_ad_ids.add(ad_id)
+
+            if page.done:
+                completed += 1
+                if progress_callback:
+                    progress_callback(page.keyword, completed, len(keywords))
+
+        print(f"✅ Recherche async terminée: {len(all_ads)} ads uniques ({len(self._token_data)} token(s))")
+        return all_ads, ads_by_keyword
+
+
+async def search_keywords_async(
+    keywords: List[str],
+    countries: List[str],
+    languages: List[str],
+    tokens_with_proxies: List[Dict],
+    db=None,
+    progress_callback: Optional[Callable[[str, int, int], None]] = None,
+    rotator=None
+) -> Tuple[List[dict], Dict[str, int]]:
+    """
+    Recherche concurrente de plusieurs mots-cles (version async).
+
+    Returns:
+        Tuple (liste de toutes les ads, dict {keyword: nb_ads})
+    """
+    async with AsyncMetaAdsClient(tokens_with_proxies, db=db, rotator=rotator) as client:
+        return await client.search_keywords(keywords, countries, languages, progress_callback)
+
+
+def search_keywords_concurrent(
+    keywords: List[str],
+    countries: List[str],
+    languages: List[str],
+    db=None,
+    progress_callback: Optional[Callable[[str, int, int], None]] = None
+) -> Tuple[List[dict], Dict[str, int]]:
+    """
+    Version synchrone de search_keywords_async, basee sur le TokenRotator global.
+    Meme signature et meme retour que search_keywords_parallel.
+    """
+    from src.infrastructure.external_services.meta_api import get_token_rotator
+
+    rotator = get_token_rotator()
+    if not rotator or rotator.token_count == 0:
+        print("⚠️ Aucun token disponible pour la recherche")
+        return [], {}
+
+    return asyncio.run(search_keywords_async(
+        keywords, countries, languages,
+        rotator.get_all_token_data(),
+        db=db,
+        progress_callback=progress_callback,
+        rotator=rotator
+    ))
+
+
+def iter_search_keywords(
+    keywords: List[str],
+    countries: List[str],
+    languages: List[str],
+    db=None,
+    max_buffered_pages: int = META_STREAM_MAX_BUFFERED_PAGES,
+    start_cursors: Optional[Dict[str, str]] = None
+) -> Iterator[SearchResultPage]:
+    """
+    Version synchrone (generateur) de AsyncMetaAdsClient.iter_keywords,
+    basee sur le TokenRotator global.
+
+    La boucle asyncio tourne dans un thread dedie; les pages transitent par
+    une file bornee. Si l'appelant interrompt l'iteration, la recherche est
+    annulee proprement.
+
+    Yields:
+        SearchResultPage par page recue, puis une page done=True par mot-cle termine
+    """
+    from src.infrastructure.external_services.meta_api import get_token_rotator
+
+    rotator = get_token_rotator()
+    if not rotator or rotator.token_count == 0:
+        print("⚠️ Aucun token disponible pour la recherche")
+        return
+
+    pages: "queue.Queue" = queue.Queue(maxsize=max(1, max_buffered_pages))
+    stop = threading.Event()
+    end_marker = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def pump():
+        async with AsyncMetaAdsClient(rotator.get_all_token_data(), db=db, rotator=rotator) as client:
+            stream = client.iter_keywords(keywords, countries, languages, max_buffered_pages, start_cursors)
+            async for page in stream:
+                if not await asyncio.to_thread(put, page):
+                    break
+
+    def run():
+        try:
+            asyncio.run(pump())
+        except BaseException as e:  # Transmis au consommateur
+            put(e)
+        finally:
+            put(end_marker)
+
+    thread = threading.Thread(target=run, daemon=True, name="meta_search_stream")
+    thread.start()
+    try:
+        while True:
+            item = pages.get()
+            if item is end_marker:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join(timeout=30)
+
+
+def fetch_pages_concurrent(
+    page_ids: List[str],
+    countries: List[str],
+    languages: List[str],
+    db=None,
+    fields: str = FIELDS_ADS_COMPLETE,
+    progress_callback: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Tuple[List[dict], int]]:
+    """
+    Recupere les annonces d'une liste de pages par batches de 10, repartis
+    sur les tokens disponibles du TokenRotator global (tokens en cooldown exclus).
+
+    Returns:
+        Dict {page_id: (liste des annonces, count)}
+    """
+    from src.infrastructure.external_services.meta_api import get_token_rotator
+
+    rotator = get_token_rotator()
+    if not rotator or rotator.token_count == 0:
+        print("⚠️ Aucun token disponible pour le comptage")
+        return {}
+
+    async def run():
+        async with AsyncMetaAdsClient(rotator.get_available_token_data(), db=db, rotator=rotator) as client:
+            return await client.fetch_pages_batches(
+                page_ids, countries, languages,
+                fields=fields, progress_callback=progress_callback
+            )
+
+    return asyncio.run(run())
@@ -12,37 +12,29 @@ import json
 import time
 import asyncio
 import aiohttp
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 from urllib.parse import urlparse
 import logging
-import random
+
+from src.infrastructure.config import is_proxy_enabled
+from src.infrastructure.http.crawler import CrawlResponse, get_crawler
+from src.infrastructure.scrapers.html_features import extract_html_features
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Supprimer les warnings SSL pour requests
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
 # Constantes
 MAX_CONTENT_LENGTH = 2000  # Max caracteres par site
 BATCH_SIZE = 20  # Nombre de sites par requete Gemini
 REQUEST_TIMEOUT = 15  # Timeout pour le scraping (reduit pour eviter les blocages)
+SCRAPER_API_TIMEOUT = 30  # Timeout quand la requete passe par ScraperAPI
+MAX_HTML_LENGTH = 500000  # HTML analyse au plus par site (500KB)
 GEMINI_TIMEOUT = 60  # Timeout pour Gemini
 RATE_LIMIT_DELAY = 4.5  # Delai entre appels Gemini (15 RPM max = 4s minimum, 4.5s pour securite)
 
-# User-Agents realistes pour le scraping
-USER_AGENTS = [
-    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
-    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
-]
-
 
 @dataclass
 class SiteContent:
@@ -103,209 +95,107 @@ def extract_site_content_sync(html: str, page_id: str, url: str, page_name: str
     """
     Extrait le contenu minimal d'une page HTML (version synchrone).
 
-    Extrait uniquement :
+    Extrait uniquement (un seul passage, voir extract_html_features) :
     - <title>
     - <meta name="description">
     - <meta name="keywords">
     - Premier <h1>
     - 10 premiers liens internes ressemblant a des produits
     """
-    from bs4 import BeautifulSoup
-
     try:
-        soup = BeautifulSoup(html, 'lxml')
-    except Exception:
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-        except Exception as e:
-            return SiteContent(page_id=page_id, url=url, page_name=page_name, error=f"Parse error: {str(e)[:50]}")
-
-    # Extraire le titre
-    title = ""
-    title_tag = soup.find('title')
-    if title_tag and title_tag.string:
-        title = title_tag.string.strip()
-
-    # Extraire la meta description
-    description = ""
-    meta_desc = soup.find('meta', attrs={'name': 'description'})
-    if meta_desc and meta_desc.get('content'):
-        description = meta_desc['content'].strip()
-
-    # Extraire les meta keywords
-    keywords = ""
-    meta_kw = soup.find('meta', attrs={'name': 'keywords'})
-    if meta_kw and meta_kw.get('content'):
-        keywords = meta_kw['content'].strip()
-
-    # Extraire le premier H1
-    h1 = ""
-    h1_tag = soup.find('h1')
-    if h1_tag:
-        h1 = h1_tag.get_text(strip=True)
-
-    # Extraire les liens produits (heuristique)
-    product_links = extract_product_links(soup, url)
+        features = extract_html_features(html, url, payment_terms=[])
+    except Exception as e:
+        return SiteContent(page_id=page_id, url=url, page_name=page_name, error=f"Parse error: {str(e)[:50]}")
 
     return SiteContent(
         page_id=page_id,
         url=url,
         page_name=page_name,
-        title=title,
-        description=description,
-        keywords=keywords,
-        h1=h1,
-        product_links=product_links
+        title=features.title,
+        description=features.description,
+        keywords=features.keywords,
+        h1=features.h1,
+        product_links=features.product_links
     )
 
 
-def extract_product_links(soup, base_url: str, max_links: int = 10) -> List[str]:
+def extract_product_links(html: str, base_url: str, max_links: int = 10) -> List[str]:
     """
     Extrait les textes de liens ressemblant a des produits.
 
-    Heuristiques utilisees :
+    Heuristiques utilisees (is_product_link) :
     - Liens contenant /product/, /produit/, /p/, /shop/, /collection/
     - Liens avec des prix (EUR, $, EUR)
     - Textes de liens avec des patterns produit
     """
-    product_patterns = [
-        r'/product[s]?/',
-        r'/produit[s]?/',
-        r'/p/',
-        r'/shop/',
-        r'/collection[s]?/',
-        r'/item[s]?/',
-        r'/article[s]?/',
-        r'/catalog/',
-    ]
-
-    domain = urlparse(base_url).netloc
-    product_texts = []
+    return extract_html_features(html, base_url, payment_terms=[], max_links=max_links).product_links
 
-    for a_tag in soup.find_all('a', href=True):
-        href = a_tag['href']
-        text = a_tag.get_text(strip=True)
 
-        if not text or len(text) < 3 or len(text) > 100:
-            continue
-
-        # Verifier si c'est un lien interne
-        is_internal = (
-            href.startswith('/') or
-            href.startswith('#') or
-            domain in href
+def _site_content_from_response(
+    response: CrawlResponse,
+    page_id: str,
+    original_url: str,
+    page_name: str = ""
+) -> SiteContent:
+    """Convertit une reponse du moteur de crawl en SiteContent."""
+    if response.error:
+        logger.warning(f"{response.error}: {original_url[:50]}... - {response.error_message[:30]}")
+        error = {
+            "timeout": "Timeout",
+            "ssl": "SSL Error",
+            "connection": "Connection Error",
+        }.get(response.error, response.error_message[:50])
+        return SiteContent(page_id=page_id, url=original_url, page_name=page_name, error=error)
+
+    if response.status_code != 200:
+        logger.warning(f"HTTP {response.status_code} for {original_url}")
+        return SiteContent(
+            page_id=page_id,
+            url=original_url,
+            page_name=page_name,
+            error=f"HTTP {response.status_code}"
         )
 
-        if not is_internal:
-            continue
+    result = extract_site_content_sync(response.text[:MAX_HTML_LENGTH], page_id, original_url, page_name)
 
-        # Verifier les patterns produit dans l'URL
-        is_product_url = any(re.search(p, href, re.I) for p in product_patterns)
-
-        # Verifier si le texte ressemble a un produit
-        has_price = bool(re.search(r'[\d,\.]+\s*[€$£]|[€$£]\s*[\d,\.]+|EUR|USD', text))
+    if result.has_content():
+        logger.debug(f"OK: {original_url[:50]}... (title={bool(result.title)}, desc={bool(result.description)})")
+    else:
+        logger.warning(f"Vide: {original_url[:50]}...")
 
-        if is_product_url or has_price:
-            # Nettoyer le texte
-            clean_text = re.sub(r'\s+', ' ', text).strip()
-            if clean_text and clean_text not in product_texts:
-                product_texts.append(clean_text)
+    return result
 
-                if len(product_texts) >= max_links:
-                    break
 
-    return product_texts
+def _fetch_options(timeout: int, use_scraperapi: bool) -> Dict:
+    """
+    Options du moteur de crawl pour le scraping Gemini: ScraperAPI (geolocalise
+    en France) si configure, repli en requete directe s'il ne repond pas.
+    Les pages deja recuperees par la recherche (phases 4 et 6) sont reutilisees.
+    """
+    use_proxy = use_scraperapi and is_proxy_enabled()
+    return {
+        "timeout": SCRAPER_API_TIMEOUT if use_proxy else timeout,
+        "use_proxy": use_proxy,
+        "proxy_params": {"country_code": "fr"},
+        "retries": 1,
+        "direct_fallback": True,
+        "max_bytes": MAX_HTML_LENGTH,
+        "use_cache": True,
+    }
 
 
 async def fetch_site_content(
-    session: aiohttp.ClientSession,
     page_id: str,
     url: str,
     page_name: str = "",
     timeout: int = REQUEST_TIMEOUT,
-    retries: int = 2
+    use_scraperapi: bool = True
 ) -> SiteContent:
     """
-    Recupere et parse le contenu d'un site de maniere asynchrone avec retry.
+    Recupere et parse le contenu d'un site de maniere asynchrone (moteur de crawl).
     """
-    original_url = url
-
-    # S'assurer que l'URL a un schema
-    if not url.startswith(('http://', 'https://')):
-        url = f'https://{url}'
-
-    last_error = None
-
-    for attempt in range(retries + 1):
-        # Headers realistes avec User-Agent aleatoire (different a chaque tentative)
-        headers = {
-            'User-Agent': random.choice(USER_AGENTS),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0',
-        }
-
-        try:
-            async with session.get(
-                url,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=timeout),
-                ssl=False,
-                allow_redirects=True,
-                max_redirects=5
-            ) as response:
-                if response.status != 200:
-                    last_error = f"HTTP {response.status}"
-                    if response.status in [403, 429, 503]:
-                        # Retry sur ces erreurs
-                        if attempt < retries:
-                            await asyncio.sleep(1)
-                            continue
-                    return SiteContent(
-                        page_id=page_id,
-                        url=original_url,
-                        page_name=page_name,
-                        error=last_error
-                    )
-
-                # Limiter la taille du contenu
-                content = await response.text(errors='ignore')
-                if len(content) > 500000:  # 500KB max
-                    content = content[:500000]
-
-                result = extract_site_content_sync(content, page_id, original_url, page_name)
-
-                # Log si on a trouve du contenu
-                if result.has_content():
-                    logger.debug(f"Scraped {original_url}: title={bool(result.title)}, desc={bool(result.description)}")
-                else:
-                    logger.warning(f"No content found for {original_url}")
-
-                return result
-
-        except asyncio.TimeoutError:
-            last_error = "Timeout"
-            if attempt < retries:
-                await asyncio.sleep(0.5)
-                continue
-        except aiohttp.ClientError as e:
-            last_error = f"Network: {str(e)[:40]}"
-            if attempt < retries:
-                await asyncio.sleep(0.5)
-                continue
-        except Exception as e:
-            last_error = f"Error: {str(e)[:40]}"
-            break
-
-    logger.warning(f"Failed to scrape {original_url}: {last_error}")
-    return SiteContent(page_id=page_id, url=original_url, page_name=page_name, error=last_error)
+    response = await get_crawler().afetch(url, **_fetch_options(timeout, use_scraperapi))
+    return _site_content_from_response(response, page_id, url, page_name)
 
 
 async def scrape_sites_batch(
@@ -314,39 +204,36 @@ async def scrape_sites_batch(
 ) -> List[SiteContent]:
     """
     Scrape plusieurs sites en parallele (async version).
+
+    La concurrence reseau est bornee par le moteur de crawl; max_concurrent
+    limite les sites traites simultanement par cet appel.
     """
-    connector = aiohttp.TCPConnector(limit=max_concurrent, ssl=False)
-
-    async with aiohttp.ClientSession(connector=connector) as session:
-        tasks = [
-            fetch_site_content(
-                session,
-                site['page_id'],
-                site['url'],
-                site.get('page_name', '')
-            )
-            for site in sites
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Convertir les exceptions en SiteContent avec erreur
-        processed = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed.append(SiteContent(
-                    page_id=sites[i]['page_id'],
-                    url=sites[i]['url'],
-                    page_name=sites[i].get('page_name', ''),
-                    error=str(result)[:100]
-                ))
-            else:
-                processed.append(result)
+    semaphore = asyncio.Semaphore(max(1, max_concurrent))
+
+    async def fetch_one(site: Dict) -> SiteContent:
+        async with semaphore:
+            return await fetch_site_content(site['page_id'], site['url'], site.get('page_name', ''))
+
+    results = await asyncio.gather(*(fetch_one(site) for site in sites), return_exceptions=True)
+
+    # Convertir les exceptions en SiteContent avec erreur
+    processed = []
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            processed.append(SiteContent(
+                page_id=sites[i]['page_id'],
+                url=sites[i]['url'],
+                page_name=sites[i].get('page_name', ''),
+                error=str(result)[:100]
+            ))
+        else:
+            processed.append(result)
 
-        return processed
+    return processed
 
 
 # ===========================================================================
-# SCRAPER SYNCHRONE AVEC REQUESTS (plus fiable sur Railway)
+# SCRAPER SYNCHRONE (threads appelants, reseau dans le moteur de crawl)
 # ===========================================================================
 
 def fetch_site_content_sync_requests(
@@ -357,105 +244,12 @@ def fetch_site_content_sync_requests(
     use_scraperapi: bool = True
 ) -> SiteContent:
     """
-    Recupere le contenu d'un site avec requests (synchrone, plus fiable).
+    Recupere le contenu d'un site (synchrone) via le moteur de crawl.
     Utilise ScraperAPI si configure pour eviter les blocages.
     Fallback automatique vers requete directe si ScraperAPI echoue.
     """
-    from src.infrastructure.config import SCRAPER_API_KEY, SCRAPER_API_URL
-
-    original_url = url
-
-    # S'assurer que l'URL a un schema
-    if not url.startswith(('http://', 'https://')):
-        url = f'https://{url}'
-
-    def _make_request(use_proxy: bool) -> requests.Response:
-        """Helper pour faire la requete avec ou sans proxy."""
-        if use_proxy and SCRAPER_API_KEY:
-            from urllib.parse import urlencode
-            scraper_params = {
-                "api_key": SCRAPER_API_KEY,
-                "url": url,
-                "render": "false",
-                "country_code": "fr"
-            }
-            request_url = f"{SCRAPER_API_URL}?{urlencode(scraper_params)}"
-            headers = {}
-            req_timeout = 30
-            logger.debug(f"ScraperAPI: {original_url[:50]}...")
-        else:
-            request_url = url
-            headers = {
-                'User-Agent': random.choice(USER_AGENTS),
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                'Accept-Language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Cache-Control': 'max-age=0',
-            }
-            req_timeout = timeout
-            if not use_proxy:
-                logger.debug(f"Direct (fallback): {original_url[:50]}...")
-
-        return requests.get(
-            request_url,
-            headers=headers,
-            timeout=req_timeout,
-            verify=False,
-            allow_redirects=True
-        )
-
-    def _process_response(response: requests.Response) -> SiteContent:
-        """Helper pour traiter la reponse."""
-        if response.status_code != 200:
-            logger.warning(f"HTTP {response.status_code} for {url}")
-            return SiteContent(
-                page_id=page_id,
-                url=original_url,
-                page_name=page_name,
-                error=f"HTTP {response.status_code}"
-            )
-
-        content = response.text
-        if len(content) > 500000:
-            content = content[:500000]
-
-        result = extract_site_content_sync(content, page_id, original_url, page_name)
-
-        if result.has_content():
-            logger.info(f"OK: {original_url[:50]}... (title={bool(result.title)}, desc={bool(result.description)})")
-        else:
-            logger.warning(f"Vide: {original_url[:50]}...")
-
-        return result
-
-    # Phase 1: Essayer avec ScraperAPI si configure et active
-    proxy_error = None
-    if use_scraperapi and SCRAPER_API_KEY:
-        try:
-            response = _make_request(use_proxy=True)
-            return _process_response(response)
-        except requests.exceptions.RequestException as e:
-            proxy_error = e
-            logger.warning(f"ScraperAPI failed for {url[:50]}..., trying direct request")
-
-    # Phase 2: Fallback vers requete directe (ou requete directe si pas de proxy)
-    try:
-        response = _make_request(use_proxy=False)
-        return _process_response(response)
-    except requests.exceptions.Timeout:
-        logger.warning(f"Timeout: {url[:50]}...")
-        return SiteContent(page_id=page_id, url=original_url, page_name=page_name, error="Timeout")
-    except requests.exceptions.SSLError as e:
-        logger.warning(f"SSL Error: {url[:50]}... - {str(e)[:30]}")
-        return SiteContent(page_id=page_id, url=original_url, page_name=page_name, error="SSL Error")
-    except requests.exceptions.ConnectionError as e:
-        logger.warning(f"Connection Error: {url[:50]}... - {str(e)[:30]}")
-        return SiteContent(page_id=page_id, url=original_url, page_name=page_name, error="Connection Error")
-    except Exception as e:
-        logger.warning(f"Error: {url[:50]}... - {str(e)[:30]}")
-        return SiteContent(page_id=page_id, url=original_url, page_name=page_name, error=str(e)[:50])
+    response = get_crawler().fetch(url, **_fetch_options(timeout, use_scraperapi))
+    return _site_content_from_response(response, page_id, url, page_name)
 
 
 def scrape_sites_sync(
@@ -463,37 +257,35 @@ def scrape_sites_sync(
     max_workers: int = 5
 ) -> List[SiteContent]:
     """
-    Scrape plusieurs sites en parallele avec ThreadPoolExecutor (synchrone).
+    Scrape plusieurs sites en parallele (synchrone).
 
-    Cette methode est plus fiable sur Railway que l'async avec aiohttp.
+    Les requetes partent ensemble dans le moteur de crawl (limites globales
+    et par site); max_workers borne les threads de parsing HTML.
     """
-    results = []
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_site = {
-            executor.submit(
-                fetch_site_content_sync_requests,
-                site['page_id'],
-                site['url'],
-                site.get('page_name', '')
-            ): site
-            for site in sites
-        }
+    if not sites:
+        return []
 
-        for future in as_completed(future_to_site):
-            site = future_to_site[future]
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                results.append(SiteContent(
-                    page_id=site['page_id'],
-                    url=site['url'],
-                    page_name=site.get('page_name', ''),
-                    error=str(e)[:100]
-                ))
+    responses = get_crawler().fetch_many(
+        [site['url'] for site in sites],
+        **_fetch_options(REQUEST_TIMEOUT, True)
+    )
+
+    def parse(index: int) -> SiteContent:
+        site = sites[index]
+        try:
+            return _site_content_from_response(
+                responses[index], site['page_id'], site['url'], site.get('page_name', '')
+            )
+        except Exception as e:
+            return SiteContent(
+                page_id=site['page_id'],
+                url=site['url'],
+                page_name=site.get('page_name', ''),
+                error=str(e)[:100]
+            )
 
-    return results
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(parse, range(len(sites))))
 
 
 # ===========================================================================
@@ -780,12 +572,12 @@ async def classify_pages_async(
     if progress_callback:
         progress_callback(0, len(pages), "Extraction du contenu des sites...")
 
-    # Utiliser le scraper synchrone (requests) qui est plus fiable sur Railway
+    # Les deux scrapers passent par le moteur de crawl partage
     if use_sync_scraper:
-        logger.info("Utilisation du scraper synchrone (requests)")
+        logger.info("Utilisation du scraper synchrone")
         scraped_contents = scrape_sites_sync(pages, max_workers=5)
     else:
-        logger.info("Utilisation du scraper async (aiohttp)")
+        logger.info("Utilisation du scraper async")
         scraped_contents = await scrape_sites_batch(pages, max_concurrent=10)
 
     # Statistiques de scraping
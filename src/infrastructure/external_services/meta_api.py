@@ -3,12 +3,15 @@ Module pour l'interaction avec l'API Meta Ads Archive.
 
 Migre depuis app/meta_api.py vers l'architecture hexagonale.
 """
+import os
 import json
 import time
 import re
+import socket
+import threading
 import requests
 from collections import Counter
-from typing import List, Dict, Tuple, Optional, Callable
+from typing import List, Dict, Tuple, Optional, Callable, Iterator
 from threading import Lock
 
 # Supprimer les warnings SSL pour Railway
@@ -20,24 +23,34 @@ try:
     from src.infrastructure.config import (
         ADS_ARCHIVE, TIMEOUT, LIMIT_SEARCH, LIMIT_COUNT, LIMIT_MIN,
         FIELDS_ADS_COMPLETE,
-        META_DELAY_BETWEEN_PAGES
+        META_DELAY_BETWEEN_PAGES, META_ADAPTIVE_RATE_LIMIT,
+        META_TOKEN_SCHEDULER_ENABLED
     )
     from src.infrastructure.monitoring.api_tracker import get_current_tracker
+    from src.infrastructure.external_services.meta_rate_limiter import AdaptiveRateLimiter
+    from src.infrastructure.external_services.meta_token_scheduler import TokenScheduler
 except ImportError:
     # Fallback pour compatibilite legacy
     try:
         from src.infrastructure.config import (
             ADS_ARCHIVE, TIMEOUT, LIMIT_SEARCH, LIMIT_COUNT, LIMIT_MIN,
             FIELDS_ADS_COMPLETE,
-            META_DELAY_BETWEEN_PAGES
+            META_DELAY_BETWEEN_PAGES, META_ADAPTIVE_RATE_LIMIT,
+            META_TOKEN_SCHEDULER_ENABLED
         )
         from src.infrastructure.monitoring.api_tracker import get_current_tracker
+        from src.infrastructure.external_services.meta_rate_limiter import AdaptiveRateLimiter
+        from src.infrastructure.external_services.meta_token_scheduler import TokenScheduler
     except ImportError:
         from config import (
             ADS_ARCHIVE, TIMEOUT, LIMIT_SEARCH, LIMIT_COUNT, LIMIT_MIN,
             FIELDS_ADS_COMPLETE
         )
         META_DELAY_BETWEEN_PAGES = 0.3
+        META_ADAPTIVE_RATE_LIMIT = False
+        META_TOKEN_SCHEDULER_ENABLED = False
+        AdaptiveRateLimiter = None
+        TokenScheduler = None
         try:
             from api_tracker import get_current_tracker
         except ImportError:
@@ -55,6 +68,9 @@ class TokenRotator:
     - Chaque token a son proxy associé
     - Un token fait toute la pagination d'une recherche
     - Rotation entre les recherches (keywords)
+    - Un rate limiter adaptatif (AIMD) par token, piloté par les headers d'usage Meta
+    - Choix du token suivant selon son temps de complétion attendu
+      (latence, taux d'erreur et quota restant sur une fenêtre glissante)
     Thread-safe.
     """
 
@@ -94,6 +110,16 @@ class TokenRotator:
         self._rate_limited = {}  # {token: timestamp_until_available}
         self._call_counts = {t["token"]: 0 for t in self._token_data}
 
+        # Rate limiter adaptatif par token (remplace les délais fixes)
+        self._rate_limiters = {}
+        if META_ADAPTIVE_RATE_LIMIT and AdaptiveRateLimiter:
+            self._rate_limiters = {t["token"]: AdaptiveRateLimiter() for t in self._token_data}
+
+        # Ordonnanceur latence/erreurs/quota (None = rotation round-robin)
+        self._scheduler = None
+        if META_TOKEN_SCHEDULER_ENABLED and TokenScheduler:
+            self._scheduler = TokenScheduler()
+
     @property
     def token_count(self) -> int:
         """Nombre de tokens disponibles"""
@@ -166,9 +192,29 @@ class TokenRotator:
                     self._mask_token(t): round(ts - now, 1)
                     for t, ts in self._rate_limited.items()
                     if ts > now
-                }
+                },
+                "rate_limiters": {
+                    self._mask_token(t): limiter.get_stats()
+                    for t, limiter in self._rate_limiters.items()
+                },
+                "scheduler": {
+                    self._mask_token(t["token"]): self._scheduler.get_stats(t["token"])
+                    for t in self._token_data
+                } if self._scheduler else {}
             }
 
+    def get_rate_limiter(self, token: str = None) -> Optional["AdaptiveRateLimiter"]:
+        """
+        Retourne le rate limiter adaptatif d'un token (token courant par défaut).
+        None si le rate limiting adaptatif est désactivé ou le token inconnu.
+        """
+        with self._lock:
+            if token is None:
+                if not self._token_data:
+                    return None
+                token = self._token_data[self._current_index]["token"]
+            return self._rate_limiters.get(token)
+
     def _mask_token(self, token: str) -> str:
         """Masque un token pour l'affichage"""
         if not token or len(token) <= 10:
@@ -187,22 +233,41 @@ class TokenRotator:
             if len(self._token_data) <= 1:
                 return False
 
-            now = time.time()
             old_idx = self._current_index
-
-            # Chercher le prochain token non rate-limited
-            for i in range(1, len(self._token_data) + 1):
-                next_idx = (self._current_index + i) % len(self._token_data)
-                next_token = self._token_data[next_idx]["token"]
-                if next_token not in self._rate_limited or self._rate_limited[next_token] <= now:
-                    self._current_index = next_idx
-                    new_name = self._token_data[next_idx].get("name", f"#{next_idx + 1}")
-                    print(f"🔄 Token rotation ({reason}): #{old_idx + 1} → #{next_idx + 1} ({new_name})")
-                    return True
+            next_idx = self._find_next_index()
+            if next_idx is not None:
+                self._current_index = next_idx
+                new_name = self._token_data[next_idx].get("name", f"#{next_idx + 1}")
+                print(f"🔄 Token rotation ({reason}): #{old_idx + 1} → #{next_idx + 1} ({new_name})")
+                return True
 
             print("⚠️ Tous les tokens sont rate-limited, conserve le token actuel")
             return False
 
+    def _find_next_index(self) -> Optional[int]:
+        """
+        Index du prochain token hors cooldown, autre que le token courant
+        (appelé avec le lock). Avec l'ordonnanceur: celui au plus faible temps
+        de complétion attendu; sinon le suivant en round-robin.
+        """
+        now = time.time()
+        count = len(self._token_data)
+        candidates = [
+            (self._current_index + i) % count for i in range(1, count)
+        ] if count > 1 else []
+        candidates = [
+            idx for idx in candidates
+            if self._rate_limited.get(self._token_data[idx]["token"], 0) <= now
+        ]
+        if not candidates:
+            return None
+        if self._scheduler is None:
+            return candidates[0]
+
+        by_token = {self._token_data[idx]["token"]: idx for idx in candidates}
+        ranked = self._scheduler.rank(list(by_token), self._rate_limiters, self._rate_limited)
+        return by_token[ranked[0]]
+
     def rotate(self, reason: str = "manual") -> bool:
         """Alias pour rotate_to_next (compatibilité)"""
         return self.rotate_to_next(reason)
@@ -247,6 +312,20 @@ class TokenRotator:
         with self._lock:
             return [t.copy() for t in self._token_data]
 
+    def get_available_token_data(self) -> List[Dict]:
+        """
+        Retourne les tokens hors cooldown de rate limit.
+        Si tous sont en cooldown, retourne tous les tokens (leur rate limiter
+        se charge alors de l'attente).
+        """
+        with self._lock:
+            now = time.time()
+            available = [
+                t.copy() for t in self._token_data
+                if self._rate_limited.get(t["token"], 0) <= now
+            ]
+            return available or [t.copy() for t in self._token_data]
+
     def mark_rate_limited(self, cooldown_seconds: int = 60, error_message: str = None) -> bool:
         """
         Marque le token courant comme rate-limited et tourne.
@@ -264,22 +343,21 @@ class TokenRotator:
 
             current = self._token_data[self._current_index]["token"]
             self._rate_limited[current] = time.time() + cooldown_seconds
+            if current in self._rate_limiters:
+                self._rate_limiters[current].on_rate_limited(cooldown_seconds)
 
             # Enregistrer en BDD
             self._record_to_db(current, success=False, is_rate_limit=True,
                               error_message=error_message, rate_limit_seconds=cooldown_seconds)
 
             # Chercher un token non rate-limited
-            now = time.time()
-            for i in range(1, len(self._token_data) + 1):
-                idx = (self._current_index + i) % len(self._token_data)
-                token = self._token_data[idx]["token"]
-                if token not in self._rate_limited or self._rate_limited[token] <= now:
-                    old_idx = self._current_index
-                    self._current_index = idx
-                    new_name = self._token_data[idx].get("name", f"#{idx + 1}")
-                    print(f"🔄 Token #{old_idx + 1} rate-limited, switch vers #{idx + 1} ({new_name})")
-                    return True
+            idx = self._find_next_index()
+            if idx is not None:
+                old_idx = self._current_index
+                self._current_index = idx
+                new_name = self._token_data[idx].get("name", f"#{idx + 1}")
+                print(f"🔄 Token #{old_idx + 1} rate-limited, switch vers #{idx + 1} ({new_name})")
+                return True
 
             # Tous les tokens sont rate-limited
             print("⚠️ Tous les tokens sont rate-limited!")
@@ -305,14 +383,51 @@ class TokenRotator:
             if success:
                 self._record_to_db(token, success=True)
 
+    def record_latency(self, token: str, response_time_ms: float, success: bool = True):
+        """
+        Alimente l'ordonnanceur avec la latence d'un appel HTTP du token.
+        Appelé pour chaque requête (succès comme erreurs), y compris par le client async.
+        """
+        if self._scheduler is not None:
+            self._scheduler.record(token, response_time_ms / 1000, success)
+
+    def rank_token_data(self, candidates: List[Dict] = None) -> List[Dict]:
+        """
+        Classe des tokens du plus au moins prometteur (temps de complétion attendu).
+        Sans ordonnanceur, l'ordre d'entrée est conservé.
+
+        Args:
+            candidates: Tokens à classer (défaut: tous les tokens)
+        """
+        with self._lock:
+            if candidates is None:
+                candidates = [t.copy() for t in self._token_data]
+            if self._scheduler is None or len(candidates) <= 1:
+                return list(candidates)
+            ranked = self._scheduler.rank(
+                [t["token"] for t in candidates], self._rate_limiters, self._rate_limited
+            )
+        by_token = {t["token"]: t for t in candidates}
+        return [by_token[token] for token in ranked]
+
+    def begin_search(self, token: str):
+        """Une recherche démarre sur le token (file prise en compte par l'ordonnanceur)"""
+        if self._scheduler is not None:
+            self._scheduler.begin(token)
+
+    def end_search(self, token: str):
+        """Une recherche se termine sur le token"""
+        if self._scheduler is not None:
+            self._scheduler.end(token)
+
     def _record_to_db(self, token: str, success: bool = True, is_rate_limit: bool = False,
                       error_message: str = None, rate_limit_seconds: int = 60):
-        """Enregistre l'utilisation d'un token en base de données"""
+        """Enregistre l'utilisation d'un token en base de données (écriture différée)"""
         if not self._db:
             return
         try:
-            from src.infrastructure.persistence.database import record_token_usage
-            record_token_usage(
+            from src.infrastructure.persistence.database import queue_token_usage
+            queue_token_usage(
                 self._db,
                 token=token,
                 success=success,
@@ -364,6 +479,21 @@ def clear_token_rotator():
     _token_db = None
 
 
+def _get_current_rate_limiter() -> Optional["AdaptiveRateLimiter"]:
+    """Retourne le rate limiter du token courant du rotator global (si actif)"""
+    rotator = get_token_rotator()
+    return rotator.get_rate_limiter() if rotator else None
+
+
+def _pause_between_pages(limiter: Optional["AdaptiveRateLimiter"]):
+    """
+    Délai fixe entre deux pages de pagination.
+    Inutile si un rate limiter adaptatif cadence déjà les requêtes du token.
+    """
+    if limiter is None:
+        time.sleep(META_DELAY_BETWEEN_PAGES)
+
+
 class MetaAdsClient:
     """Client pour interagir avec l'API Meta Ads Archive"""
 
@@ -401,6 +531,12 @@ class MetaAdsClient:
 
             if proxy_url:
                 proxies = {"http": proxy_url, "https": proxy_url}
+            token_name = rotator.get_current_token_name() if rotator else ""
+
+            # Cadencement adaptatif du token (remplace les délais fixes)
+            limiter = rotator.get_rate_limiter(current_token) if rotator else None
+            if limiter:
+                limiter.wait()
 
             start_time = time.time()
             try:
@@ -408,12 +544,23 @@ class MetaAdsClient:
                 r = requests.get(url, params=params, timeout=TIMEOUT, proxies=proxies, verify=False)
                 response_time = (time.time() - start_time) * 1000
 
+                # Ajuster le débit selon l'usage du quota remonté par Meta
+                if limiter:
+                    limiter.update_from_headers(r.headers)
+
                 # Parse response
                 try:
                     data = r.json()
                 except (ValueError, json.JSONDecodeError):
                     data = {}
 
+                # Latence et issue de l'appel pour l'ordonnanceur de tokens
+                if rotator:
+                    rotator.record_latency(
+                        current_token, response_time,
+                        success=r.status_code == 200 and "error" not in data
+                    )
+
                 response_size = len(r.text) if r.text else 0
 
                 # Check for rate limit error in JSON response (code 613)
@@ -431,7 +578,8 @@ class MetaAdsClient:
                                 success=False,
                                 error_type="rate_limit",
                                 error_message=error_msg[:200],
-                                response_time_ms=response_time
+                                response_time_ms=response_time,
+                                token=token_name, proxy=proxy_url
                             )
 
                         # Essayer de switcher de token si possible
@@ -444,7 +592,10 @@ class MetaAdsClient:
                         # Rate limit - exponential backoff
                         sleep_time = min(2 ** attempt, 60)  # Max 60s
                         print(f"⏳ Rate limit atteint, attente {sleep_time}s...")
-                        time.sleep(sleep_time)
+                        if limiter:
+                            limiter.on_rate_limited(sleep_time)
+                        else:
+                            time.sleep(sleep_time)
                         continue
 
                     # Track other API error
@@ -456,7 +607,8 @@ class MetaAdsClient:
                             success=False,
                             error_type="api_error",
                             error_message=error_msg[:200],
-                            response_time_ms=response_time
+                            response_time_ms=response_time,
+                            token=token_name, proxy=proxy_url
                         )
 
                     # Other API error
@@ -473,7 +625,8 @@ class MetaAdsClient:
                             success=True,
                             response_time_ms=response_time,
                             response_size=response_size,
-                            items_returned=items_count
+                            items_returned=items_count,
+                            token=token_name, proxy=proxy_url
                         )
                     # Enregistrer le succès dans le rotator
                     if rotator:
@@ -488,16 +641,22 @@ class MetaAdsClient:
                             status_code=r.status_code,
                             success=False,
                             error_type="http_error",
-                            response_time_ms=response_time
+                            response_time_ms=response_time,
+                            token=token_name, proxy=proxy_url
                         )
                     sleep_time = min(2 ** attempt, 30)
-                    time.sleep(sleep_time)
+                    if limiter and r.status_code == 429:
+                        limiter.on_rate_limited(sleep_time)
+                    else:
+                        time.sleep(sleep_time)
                     continue
 
                 raise RuntimeError(f"HTTP {r.status_code}: {r.text[:200]}")
 
             except requests.RequestException as e:
                 response_time = (time.time() - start_time) * 1000
+                if rotator:
+                    rotator.record_latency(current_token, response_time, success=False)
                 if tracker:
                     tracker.track_meta_api_call(
                         endpoint=url[:200],
@@ -505,7 +664,8 @@ class MetaAdsClient:
                         success=False,
                         error_type="network_error",
                         error_message=str(e)[:200],
-                        response_time_ms=response_time
+                        response_time_ms=response_time,
+                        token=token_name, proxy=proxy_url
                     )
                 if attempt < max_retries - 1:
                     time.sleep(2 ** attempt)
@@ -533,6 +693,34 @@ class MetaAdsClient:
         Returns:
             Liste des annonces trouvées
         """
+        all_ads = []
+        for batch in self.iter_search_ads(keyword, countries, languages):
+            all_ads.extend(batch)
+            if progress_callback:
+                progress_callback(len(all_ads), -1)
+        return all_ads
+
+    def iter_search_ads(
+        self,
+        keyword: str,
+        countries: List[str],
+        languages: List[str]
+    ) -> Iterator[List[dict]]:
+        """
+        Recherche des annonces par mot-clé, page de résultats par page.
+
+        Chaque page est renvoyée dès sa réception: l'appelant peut traiter
+        les annonces pendant que la pagination continue, sans conserver
+        l'ensemble des résultats en mémoire.
+
+        Args:
+            keyword: Mot-clé à rechercher
+            countries: Liste des codes pays
+            languages: Liste des codes langues
+
+        Yields:
+            Liste des annonces de chaque page de résultats
+        """
         # Set current keyword for API tracking
         self._current_keyword = keyword
 
@@ -543,6 +731,7 @@ class MetaAdsClient:
         start_time = time.time()
         error_msg = None
         success = True
+        ads_count = 0
 
         url = ADS_ARCHIVE
         params = {
@@ -558,71 +747,69 @@ class MetaAdsClient:
         if languages:
             params["languages"] = json.dumps(languages)
 
-        all_ads = []
         limit_curr = LIMIT_SEARCH
 
-        while True:
-            try:
-                data = self._get_api(url, params)
-            except RuntimeError as e:
-                err_msg = str(e)
-                error_msg = err_msg
-                success = False
-                # Log l'erreur pour diagnostic
-                print(f"❌ Erreur API Meta pour '{keyword}': {err_msg}")
-
-                # Réduire la limite si demandé par l'API
-                if ("reduce" in err_msg or "code\":1" in err_msg) and limit_curr > LIMIT_MIN:
-                    limit_curr = max(LIMIT_MIN, limit_curr // 2)
-                    params["limit"] = limit_curr
-                    time.sleep(0.3)
-                    continue
-
-                # Erreur OAuth/Token expiré
-                if "OAuth" in err_msg or "token" in err_msg.lower() or "expired" in err_msg.lower():
-                    print(f"🔑 Token invalide ou expiré! Vérifiez vos tokens Meta API dans Settings.")
-
-                break
+        try:
+            while True:
+                try:
+                    data = self._get_api(url, params)
+                except RuntimeError as e:
+                    err_msg = str(e)
+                    error_msg = err_msg
+                    success = False
+                    # Log l'erreur pour diagnostic
+                    print(f"❌ Erreur API Meta pour '{keyword}': {err_msg}")
 
-            batch = data.get("data", [])
-            all_ads.extend(batch)
+                    # Réduire la limite si demandé par l'API
+                    if ("reduce" in err_msg or "code\":1" in err_msg) and limit_curr > LIMIT_MIN:
+                        limit_curr = max(LIMIT_MIN, limit_curr // 2)
+                        params["limit"] = limit_curr
+                        time.sleep(0.3)
+                        continue
 
-            if progress_callback:
-                progress_callback(len(all_ads), -1)
+                    # Erreur OAuth/Token expiré
+                    if "OAuth" in err_msg or "token" in err_msg.lower() or "expired" in err_msg.lower():
+                        print(f"🔑 Token invalide ou expiré! Vérifiez vos tokens Meta API dans Settings.")
 
-            next_url = data.get("paging", {}).get("next")
-            if not next_url:
-                break
+                    break
 
-            # Délai entre les pages pour éviter rate limit
-            time.sleep(META_DELAY_BETWEEN_PAGES)
+                # Relance réussie (limite réduite): l'erreur précédente ne compte plus
+                success, error_msg = True, None
+                batch = data.get("data", [])
+                ads_count += len(batch)
+                yield batch
 
-            url = next_url
-            params = {}
+                next_url = data.get("paging", {}).get("next")
+                if not next_url:
+                    break
 
-        # Log de l'utilisation du token
-        response_time_ms = int((time.time() - start_time) * 1000)
-        if token_id and _token_db:
-            try:
-                from src.infrastructure.persistence.database import log_token_usage
-                # S'assurer que countries est une liste avant le join
-                countries_str = ",".join(countries) if isinstance(countries, list) and countries else (countries if isinstance(countries, str) else None)
-                log_token_usage(
-                    _token_db,
-                    token_id=token_id,
-                    token_name=token_name,
-                    action_type="search",
-                    keyword=keyword,
-                    countries=countries_str,
-                    success=success,
-                    ads_count=len(all_ads),
-                    error_message=error_msg,
-                    response_time_ms=response_time_ms
-                )
-            except Exception as log_err:
-                print(f"⚠️ Erreur logging token: {log_err}")
+                # Délai entre les pages pour éviter rate limit
+                _pause_between_pages(_get_current_rate_limiter())
 
-        return all_ads
+                url = next_url
+                params = {}
+        finally:
+            # Log de l'utilisation du token (aussi si l'appelant s'arrête en cours de route)
+            response_time_ms = int((time.time() - start_time) * 1000)
+            if token_id and _token_db:
+                try:
+                    from src.infrastructure.persistence.database import queue_token_usage_log
+                    # S'assurer que countries est une liste avant le join
+                    countries_str = ",".join(countries) if isinstance(countries, list) and countries else (countries if isinstance(countries, str) else None)
+                    queue_token_usage_log(
+                        _token_db,
+                        token_id=token_id,
+                        token_name=token_name,
+                        action_type="search",
+                        keyword=keyword,
+                        countries=countries_str,
+                        success=success,
+                        ads_count=ads_count,
+                        error_message=error_msg,
+                        response_time_ms=response_time_ms
+                    )
+                except Exception as log_err:
+                    print(f"⚠️ Erreur logging token: {log_err}")
 
     def fetch_all_ads_for_page(
         self,
@@ -674,9 +861,9 @@ class MetaAdsClient:
                 response_time_ms = int((time.time() - start_time) * 1000)
                 if token_id and _token_db:
                     try:
-                        from src.infrastructure.persistence.database import log_token_usage
+                        from src.infrastructure.persistence.database import queue_token_usage_log
                         countries_str = ",".join(countries) if isinstance(countries, list) and countries else (countries if isinstance(countries, str) else None)
-                        log_token_usage(
+                        queue_token_usage_log(
                             _token_db,
                             token_id=token_id,
                             token_name=token_name,
@@ -700,7 +887,7 @@ class MetaAdsClient:
                 break
 
             # Délai entre les pages pour éviter rate limit
-            time.sleep(META_DELAY_BETWEEN_PAGES)
+            _pause_between_pages(_get_current_rate_limiter())
 
             url = next_url
             params = {}
@@ -709,9 +896,9 @@ class MetaAdsClient:
         response_time_ms = int((time.time() - start_time) * 1000)
         if token_id and _token_db:
             try:
-                from src.infrastructure.persistence.database import log_token_usage
+                from src.infrastructure.persistence.database import queue_token_usage_log
                 countries_str = ",".join(countries) if isinstance(countries, list) and countries else (countries if isinstance(countries, str) else None)
-                log_token_usage(
+                queue_token_usage_log(
                     _token_db,
                     token_id=token_id,
                     token_name=token_name,
@@ -732,7 +919,8 @@ class MetaAdsClient:
         page_ids: List[str],
         countries: List[str],
         languages: List[str],
-        max_per_request: int = 10
+        max_per_request: int = 10,
+        fields: str = FIELDS_ADS_COMPLETE
     ) -> Dict[str, Tuple[List[dict], int]]:
         """
         Récupère les annonces pour plusieurs pages en une seule requête
@@ -743,6 +931,7 @@ class MetaAdsClient:
             countries: Liste des codes pays
             languages: Liste des codes langues
             max_per_request: Nombre max de pages par requête (défaut: 10)
+            fields: Champs demandés (FIELDS_ADS_COUNT pour un simple comptage)
 
         Returns:
             Dict {page_id: (liste des annonces, count)}
@@ -757,7 +946,7 @@ class MetaAdsClient:
             "ad_active_status": "ACTIVE",
             "ad_type": "ALL",
             "ad_reached_countries": json.dumps(countries),
-            "fields": FIELDS_ADS_COMPLETE,
+            "fields": fields,
             "limit": LIMIT_COUNT
         }
         # N'inclure languages que si une liste non vide est fournie
@@ -785,7 +974,7 @@ class MetaAdsClient:
                 break
 
             # Délai entre les pages pour éviter rate limit
-            time.sleep(META_DELAY_BETWEEN_PAGES)
+            _pause_between_pages(_get_current_rate_limiter())
 
             url = next_url
             params = {}
@@ -877,9 +1066,28 @@ def search_keywords_parallel(
         results_lock = Lock()
         failed_keywords = []  # Keywords qui ont échoué pour retry avec autre token
 
+        assign_lock = Lock()
+        token_positions = {t["token"]: idx for idx, t in enumerate(tokens_with_proxies)}
+
+        def pick_token(keyword_index: int, exclude_idx: int = None) -> Tuple[Dict, int]:
+            """
+            Choisit le token au moment où le mot-clé démarre: celui au plus faible
+            temps de complétion attendu (latence, erreurs, quota, recherches en cours).
+            À score égal (ou sans ordonnanceur), round-robin à partir du mot-clé.
+            """
+            offset = keyword_index % len(tokens_with_proxies)
+            candidates = tokens_with_proxies[offset:] + tokens_with_proxies[:offset]
+            if exclude_idx is not None:
+                candidates = [t for t in candidates if token_positions[t["token"]] != exclude_idx]
+            with assign_lock:
+                token_data = rotator.rank_token_data(candidates)[0]
+                rotator.begin_search(token_data["token"])
+            return token_data, token_positions[token_data["token"]]
+
         def search_keyword_worker(args):
             """Worker pour rechercher un mot-clé avec un token+proxy dédié"""
-            keyword, token_data, token_idx = args
+            keyword, keyword_index = args
+            token_data, token_idx = pick_token(keyword_index)
 
             try:
                 # Faire la requête API directement avec le token+proxy dédié
@@ -894,21 +1102,19 @@ def search_keywords_parallel(
             except Exception as e:
                 print(f"❌ Erreur worker #{token_idx+1} pour '{keyword}': {e}")
                 return keyword, [], str(e), token_idx
+            finally:
+                rotator.end_search(token_data["token"])
 
-        # Distribuer les keywords aux workers
-        keyword_tasks = []
-        for i, kw in enumerate(keywords):
-            # Assigner un token avec proxy à chaque keyword (round-robin)
-            token_idx = i % len(tokens_with_proxies)
-            token_data = tokens_with_proxies[token_idx]
-            keyword_tasks.append((kw, token_data, token_idx))
+        # Le token de chaque keyword est choisi au démarrage de sa recherche
+        keyword_tasks = [(kw, i) for i, kw in enumerate(keywords)]
 
         completed = 0
         with ThreadPoolExecutor(max_workers=num_workers) as executor:
             # Soumettre toutes les tâches avec un petit délai entre chaque
             futures = {}
             for i, task in enumerate(keyword_tasks):
-                if i > 0:
+                # Le rate limiter adaptatif cadence déjà chaque token
+                if i > 0 and not META_ADAPTIVE_RATE_LIMIT:
                     time.sleep(META_MIN_DELAY_BETWEEN_PARALLEL)
                 future = executor.submit(search_keyword_worker, task)
                 futures[future] = task[0]  # keyword
@@ -945,9 +1151,9 @@ def search_keywords_parallel(
             print(f"🔄 Retry de {len(failed_keywords)} keyword(s) avec un autre token...")
 
             for kw, failed_token_idx in failed_keywords:
-                # Utiliser un token différent
-                new_token_idx = (failed_token_idx + 1) % len(tokens_with_proxies)
-                new_token_data = tokens_with_proxies[new_token_idx]
+                # Utiliser un token différent (le mieux classé hors token en échec)
+                new_token_data, new_token_idx = pick_token(failed_token_idx + 1, exclude_idx=failed_token_idx)
+                rotator.end_search(new_token_data["token"])
 
                 print(f"  → Retry '{kw}' avec {new_token_data.get('name', f'Token #{new_token_idx+1}')}")
                 time.sleep(META_DELAY_BETWEEN_KEYWORDS)  # Attendre avant le retry
@@ -984,12 +1190,15 @@ def search_keywords_parallel(
         # ═══ STRATÉGIE SÉQUENTIELLE ═══
         # Un seul token, délai plus long entre les requêtes
         delay = META_DELAY_SEQUENTIAL_NO_PROXY if not tokens_with_proxies else META_DELAY_BETWEEN_KEYWORDS
-        print(f"🔄 Recherche séquentielle: {rotator.token_count} token(s), délai {delay}s entre keywords")
+        if META_ADAPTIVE_RATE_LIMIT:
+            print(f"🔄 Recherche séquentielle: {rotator.token_count} token(s), cadence adaptative")
+        else:
+            print(f"🔄 Recherche séquentielle: {rotator.token_count} token(s), délai {delay}s entre keywords")
 
         client = MetaAdsClient(rotator.get_current_token())
 
         for i, kw in enumerate(keywords):
-            if i > 0:
+            if i > 0 and not META_ADAPTIVE_RATE_LIMIT:
                 time.sleep(delay)
 
             success = False
@@ -1085,19 +1294,34 @@ def _search_ads_with_dedicated_token(
     if proxy:
         proxies = {"http": proxy, "https": proxy}
 
+    # Rate limiter adaptatif du token (partagé via le rotator global)
+    rotator = get_token_rotator()
+    limiter = rotator.get_rate_limiter(token) if rotator else None
+
     all_ads = []
     limit_curr = LIMIT_SEARCH
 
     while True:
         for attempt in range(max_retries):
             try:
+                if limiter:
+                    limiter.wait()
+                call_start = time.time()
                 r = requests.get(url, params=params, timeout=TIMEOUT, proxies=proxies, verify=False)
+                if limiter:
+                    limiter.update_from_headers(r.headers)
 
                 try:
                     data = r.json()
                 except (ValueError, json.JSONDecodeError):
                     data = {}
 
+                if rotator:
+                    rotator.record_latency(
+                        token, (time.time() - call_start) * 1000,
+                        success=r.status_code == 200 and "error" not in data
+                    )
+
                 # Check for errors
                 if "error" in data:
                     error_code = data["error"].get("code")
@@ -1107,7 +1331,10 @@ def _search_ads_with_dedicated_token(
                         # Rate limit - attendre et réessayer
                         sleep_time = min(2 ** attempt, 30)
                         print(f"⏳ Rate limit token {token_name}, attente {sleep_time}s...")
-                        time.sleep(sleep_time)
+                        if limiter:
+                            limiter.on_rate_limited(sleep_time)
+                        else:
+                            time.sleep(sleep_time)
                         continue
 
                     # Réduire la limite si demandé
@@ -1130,12 +1357,14 @@ def _search_ads_with_dedicated_token(
                     break
 
                 # Délai entre les pages
-                time.sleep(META_DELAY_BETWEEN_PAGES)
+                _pause_between_pages(limiter)
                 url = next_url
                 params = {}  # Next URL contient déjà les params
                 break
 
             except requests.RequestException as e:
+                if rotator:
+                    rotator.record_latency(token, (time.time() - call_start) * 1000, success=False)
                 if attempt < max_retries - 1:
                     time.sleep(2 ** attempt)
                     continue
@@ -1154,9 +1383,9 @@ def _search_ads_with_dedicated_token(
     response_time_ms = int((time.time() - start_time) * 1000)
     if token_id and db:
         try:
-            from src.infrastructure.persistence.database import log_token_usage
+            from src.infrastructure.persistence.database import queue_token_usage_log
             countries_str = ",".join(countries) if isinstance(countries, list) else countries
-            log_token_usage(
+            queue_token_usage_log(
                 db,
                 token_id=token_id,
                 token_name=token_name,
@@ -1338,6 +1567,10 @@ def cached_search_ads(
     """
     Recherche des annonces avec cache optionnel.
 
+    Les recherches identiques concurrentes (meme cle de cache) sont coalescees:
+    dans le process via single-flight, entre process via un bail en BDD.
+    Un seul appelant interroge Meta, les autres partagent son resultat.
+
     Args:
         client: MetaAdsClient instance
         keyword: Mot-cle a rechercher
@@ -1349,52 +1582,125 @@ def cached_search_ads(
         progress_callback: Fonction callback pour la progression
 
     Returns:
-        Tuple (liste des ads, from_cache: bool)
+        Tuple (liste des ads, from_cache: bool) - from_cache=True aussi pour
+        un resultat partage par une recherche concurrente
     """
     # Si pas de db ou cache desactive, appel direct
     if not db or not use_cache:
         ads = client.search_ads(keyword, countries, languages, progress_callback)
         return (ads, False)
 
-    try:
-        from src.infrastructure.persistence.database import generate_cache_key, get_cached_response, set_cached_response
+    from src.infrastructure.persistence.database import generate_cache_key, get_cached_response
+    from src.infrastructure.cache.single_flight import get_search_single_flight
 
-        # Generer la cle de cache
-        cache_key = generate_cache_key(
-            "search_ads",
-            keyword=keyword.lower().strip(),
-            countries=sorted(countries),
-            languages=sorted(languages)
-        )
+    # Generer la cle de cache
+    cache_key = generate_cache_key(
+        "search_ads",
+        keyword=keyword.lower().strip(),
+        countries=sorted(countries),
+        languages=sorted(languages)
+    )
 
-        # Verifier le cache
+    # Verifier le cache
+    try:
         cached_data = get_cached_response(db, cache_key)
-        if cached_data is not None:
-            if progress_callback:
-                progress_callback(len(cached_data), len(cached_data))
-            return (cached_data, True)
-
-        # Cache miss - faire l'appel API
+    except Exception as e:
+        # Cache illisible: appel direct (sans coalescence, la BDD est indisponible)
+        print(f"⚠️ Erreur cache: {e}")
         ads = client.search_ads(keyword, countries, languages, progress_callback)
+        return (ads, False)
+    if cached_data is not None:
+        if progress_callback:
+            progress_callback(len(cached_data), len(cached_data))
+        return (cached_data, True)
+
+    # Cache miss - un seul appel API par cle, en process et entre process.
+    # Une erreur du leader est partagee telle quelle: pas de relance par follower.
+    def fetch():
+        return _fetch_search_ads_coalesced(
+            client, cache_key, keyword, countries, languages, db,
+            cache_ttl_hours, progress_callback
+        )
 
-        # Sauvegarder dans le cache si on a des resultats
-        if ads:
-            set_cached_response(
-                db,
-                cache_key,
-                "search_ads",
-                ads,
-                ttl_hours=cache_ttl_hours
-            )
+    (ads, from_cache), shared = get_search_single_flight().do(cache_key, fetch)
+    if shared and progress_callback:
+        progress_callback(len(ads), len(ads))
+    return (ads, from_cache or shared)
 
-        return (ads, False)
 
+def _fetch_search_ads_coalesced(
+    client: MetaAdsClient,
+    cache_key: str,
+    keyword: str,
+    countries: List[str],
+    languages: List[str],
+    db,
+    cache_ttl_hours: int,
+    progress_callback: Optional[Callable[[int, int], None]]
+) -> Tuple[List[dict], bool]:
+    """
+    Appel API protege par un bail en BDD sur la cle de cache.
+
+    Si un autre process detient deja le bail, attend qu'il remplisse le cache
+    (ou qu'il libere le bail sans resultat) avant d'appeler soi-meme l'API.
+
+    Returns:
+        Tuple (liste des ads, from_cache: bool)
+    """
+    from src.infrastructure.persistence.database import (
+        get_cached_response, set_cached_response,
+        acquire_cache_lease, release_cache_lease, is_cache_lease_active
+    )
+    try:
+        from src.infrastructure.config import (
+            META_COALESCE_LEASE_SECONDS, META_COALESCE_WAIT_SECONDS, META_COALESCE_POLL_INTERVAL
+        )
+    except ImportError:
+        META_COALESCE_LEASE_SECONDS, META_COALESCE_WAIT_SECONDS, META_COALESCE_POLL_INTERVAL = 300, 180, 1.0
+
+    owner = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+    try:
+        leader = acquire_cache_lease(db, cache_key, owner, ttl_seconds=META_COALESCE_LEASE_SECONDS)
+        if not leader:
+            # Follower: un autre process interroge deja Meta pour cette cle
+            deadline = time.time() + META_COALESCE_WAIT_SECONDS
+            while time.time() < deadline:
+                time.sleep(META_COALESCE_POLL_INTERVAL)
+                cached_data = get_cached_response(db, cache_key)
+                if cached_data is not None:
+                    return (cached_data, True)
+                if not is_cache_lease_active(db, cache_key):
+                    break
+            # Leader termine sans resultat (vide ou erreur), mort ou trop lent
+            leader = acquire_cache_lease(db, cache_key, owner, ttl_seconds=META_COALESCE_LEASE_SECONDS)
     except Exception as e:
-        # En cas d'erreur de cache, fallback sur l'appel direct
-        print(f"⚠️ Erreur cache: {e}")
+        # BDD indisponible: appel direct, sans coalescence entre process
+        print(f"⚠️ Erreur bail cache: {e}")
+        leader = False
+
+    if not leader:
         ads = client.search_ads(keyword, countries, languages, progress_callback)
         return (ads, False)
 
+    try:
+        ads = client.search_ads(keyword, countries, languages, progress_callback)
+
+        # Seuls les resultats non vides sont mis en cache: une erreur API donne
+        # aussi []. Le bail libere sans resultat, les followers appellent eux-memes.
+        if ads:
+            try:
+                set_cached_response(db, cache_key, "search_ads", ads, ttl_hours=cache_ttl_hours)
+            except Exception as e:
+                print(f"⚠️ Erreur ecriture cache: {e}")
+        return (ads, False)
+    finally:
+        try:
+            release_cache_lease(db, cache_key, owner)
+        except Exception as e:
+            # Le bail expirera de lui-meme; le resultat de l'appel API est conserve
+            print(f"⚠️ Erreur liberation bail cache: {e}")
+
 
 def cached_fetch_ads_for_page(
     client: MetaAdsClient,
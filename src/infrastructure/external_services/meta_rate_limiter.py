@@ -0,0 +1,224 @@
+"""
+Rate limiter adaptatif pour l'API Meta Ads Archive.
+
+Un token bucket par token Meta, dont le debit est ajuste en continu (AIMD)
+a partir des headers d'usage renvoyes par Meta:
+- x-business-use-case-usage: {"<business_id>": [{"call_count": %, "total_cputime": %,
+  "total_time": %, "estimated_time_to_regain_access": minutes, ...}]}
+- x-app-usage: {"call_count": %, "total_cputime": %, "total_time": %}
+
+Tant que l'usage reste sous la cible, le debit augmente de maniere additive;
+des que la cible est depassee (ou qu'un rate limit est recu), il est divise
+(decroissance multiplicative). Le token tourne ainsi au plus pres de son quota.
+"""
+import json
+import time
+import asyncio
+from threading import Lock
+from typing import Dict, Optional, Tuple, Any
+
+from src.infrastructure.config import (
+    META_RATE_INITIAL,
+    META_RATE_MIN,
+    META_RATE_MAX,
+    META_RATE_BURST,
+    META_RATE_INCREASE_STEP,
+    META_RATE_DECREASE_FACTOR,
+    META_USAGE_TARGET_PERCENT,
+)
+
+USAGE_HEADER_BUSINESS = "x-business-use-case-usage"
+USAGE_HEADER_APP = "x-app-usage"
+USAGE_METRICS = ("call_count", "total_cputime", "total_time")
+
+
+def _get_header(headers: Any, name: str) -> Optional[str]:
+    """Lecture insensible a la casse (requests, aiohttp ou simple dict)"""
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is None and isinstance(headers, dict):
+        lowered = {str(k).lower(): v for k, v in headers.items()}
+        value = lowered.get(name)
+    return value
+
+
+def parse_meta_usage_headers(headers: Any) -> Tuple[Optional[float], float]:
+    """
+    Extrait l'usage du quota depuis les headers Meta.
+
+    Args:
+        headers: Headers de la reponse HTTP
+
+    Returns:
+        Tuple (usage en % le plus eleve ou None si absent,
+               secondes avant retour d'acces - 0 si non bloque)
+    """
+    usage = None
+    regain_seconds = 0.0
+
+    raw_business = _get_header(headers, USAGE_HEADER_BUSINESS)
+    if raw_business:
+        try:
+            for entries in json.loads(raw_business).values():
+                for entry in entries if isinstance(entries, list) else [entries]:
+                    for metric in USAGE_METRICS:
+                        if metric in entry:
+                            usage = max(usage or 0.0, float(entry[metric]))
+                    regain_minutes = float(entry.get("estimated_time_to_regain_access") or 0)
+                    regain_seconds = max(regain_seconds, regain_minutes * 60)
+        except (ValueError, TypeError, AttributeError):
+            pass
+
+    raw_app = _get_header(headers, USAGE_HEADER_APP)
+    if raw_app:
+        try:
+            app_usage = json.loads(raw_app)
+            for metric in USAGE_METRICS:
+                if metric in app_usage:
+                    usage = max(usage or 0.0, float(app_usage[metric]))
+        except (ValueError, TypeError, AttributeError):
+            pass
+
+    return usage, regain_seconds
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket avec debit ajuste en AIMD selon l'usage Meta.
+    Thread-safe; utilisable en synchrone (wait) ou en asyncio (wait_async).
+    """
+
+    def __init__(
+        self,
+        rate: float = META_RATE_INITIAL,
+        min_rate: float = META_RATE_MIN,
+        max_rate: float = META_RATE_MAX,
+        burst: float = META_RATE_BURST,
+        increase_step: float = META_RATE_INCREASE_STEP,
+        decrease_factor: float = META_RATE_DECREASE_FACTOR,
+        target_usage: float = META_USAGE_TARGET_PERCENT
+    ):
+        """
+        Args:
+            rate: Debit initial (requetes/seconde)
+            min_rate: Debit plancher
+            max_rate: Debit plafond
+            burst: Capacite du bucket (requetes autorisees en rafale)
+            increase_step: Increment additif du debit sous la cible
+            decrease_factor: Facteur multiplicatif (< 1) au-dessus de la cible
+            target_usage: Usage cible du quota Meta (en %)
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1.0, burst)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.target_usage = target_usage
+
+        self._rate = min(max(rate, min_rate), max_rate)
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_usage: Optional[float] = None
+        self._lock = Lock()
+
+    @property
+    def rate(self) -> float:
+        """Debit courant (requetes/seconde)"""
+        return self._rate
+
+    @property
+    def last_usage(self) -> Optional[float]:
+        """Dernier usage du quota remonte par Meta (en %)"""
+        return self._last_usage
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self._rate)
+            self._last_refill = now
+
+    def reserve(self) -> float:
+        """
+        Reserve un jeton pour la prochaine requete.
+
+        Returns:
+            Temps d'attente en secondes avant de pouvoir envoyer la requete
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self._rate
+            return max(wait, self._blocked_until - now)
+
+    def peek_wait(self) -> float:
+        """
+        Attente qu'aurait la prochaine requete, sans reserver de jeton.
+
+        Returns:
+            Temps d'attente estime en secondes
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(0.0, now - self._last_refill)
+            tokens = min(self.burst, self._tokens + elapsed * self._rate) - 1
+            wait = 0.0 if tokens >= 0 else -tokens / self._rate
+            return max(wait, self._blocked_until - now)
+
+    def wait(self):
+        """Bloque jusqu'a ce qu'une requete soit autorisee"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self):
+        """Equivalent asyncio de wait()"""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update_from_headers(self, headers: Any) -> Optional[float]:
+        """
+        Ajuste le debit d'apres les headers d'usage d'une reponse.
+
+        Returns:
+            Usage du quota en % (None si les headers sont absents)
+        """
+        usage, regain_seconds = parse_meta_usage_headers(headers)
+
+        with self._lock:
+            if regain_seconds > 0:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + regain_seconds)
+                self._decrease()
+            elif usage is None or usage < self.target_usage:
+                self._rate = min(self.max_rate, self._rate + self.increase_step)
+            else:
+                self._decrease()
+
+            if usage is not None:
+                self._last_usage = usage
+
+        return usage
+
+    def on_rate_limited(self, cooldown_seconds: float = 0):
+        """Rate limit recu (code 613 / HTTP 429): diminue le debit et suspend le token"""
+        with self._lock:
+            self._decrease()
+            if cooldown_seconds > 0:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + cooldown_seconds)
+
+    def _decrease(self):
+        self._rate = max(self.min_rate, self._rate * self.decrease_factor)
+        # Vider le bucket pour stopper immediatement les rafales
+        self._tokens = min(self._tokens, 0.0)
+
+    def get_stats(self) -> Dict:
+        """Retourne l'etat du limiter (pour affichage/monitoring)"""
+        with self._lock:
+            return {
+                "rate": round(self._rate, 2),
+                "usage": self._last_usage,
+                "blocked_for": round(max(0.0, self._blocked_until - time.monotonic()), 1),
+            }
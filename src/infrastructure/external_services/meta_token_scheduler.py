@@ -0,0 +1,229 @@
+"""
+Ordonnanceur des tokens Meta selon leur temps de completion attendu.
+
+Pour chaque token (et donc son proxy), une fenetre glissante des derniers
+appels (latence, succes) est conservee. Le temps de completion attendu
+d'une nouvelle recherche combine:
+- la latence moyenne du token, multipliee par sa file (recherches en cours + 1)
+- le taux d'erreur (une requete echouee doit etre rejouee)
+- le quota restant remonte par Meta (usage % du rate limiter adaptatif)
+- l'attente imposee par le rate limiter et le cooldown de rate limit
+
+Un token dont la latence depasse nettement la mediane des autres (proxy lent)
+est retrograde: il ne recoit de nouveaux mots-cles que si aucun token sain
+n'est disponible. La retrogradation expire si le token n'a pas ete utilise
+depuis un moment, pour lui redonner sa chance.
+"""
+import time
+from collections import deque
+from statistics import median
+from threading import Lock
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from src.infrastructure.config import (
+    META_SCHEDULER_WINDOW,
+    META_SCHEDULER_MIN_SAMPLES,
+    META_SCHEDULER_DEFAULT_LATENCY,
+    META_SCHEDULER_DEMOTE_FACTOR,
+    META_SCHEDULER_DEMOTE_SECONDS,
+)
+
+# Taux d'erreur plafonne pour garder un score fini
+_MAX_ERROR_RATE = 0.9
+# Usage plafonne (un token a 100% reste classable, derriere les autres)
+_MAX_USAGE_PERCENT = 95.0
+
+
+class _TokenWindow:
+    """Fenetre glissante des appels d'un token"""
+
+    def __init__(self, size: int):
+        self.calls: Deque[Tuple[float, bool]] = deque(maxlen=max(1, size))
+        self.in_flight = 0
+        self.last_call = 0.0
+
+    @property
+    def samples(self) -> int:
+        return len(self.calls)
+
+    def mean_latency(self) -> Optional[float]:
+        if not self.calls:
+            return None
+        return sum(latency for latency, _ in self.calls) / len(self.calls)
+
+    def error_rate(self) -> float:
+        if not self.calls:
+            return 0.0
+        errors = sum(1 for _, ok in self.calls if not ok)
+        return errors / len(self.calls)
+
+
+class TokenScheduler:
+    """
+    Statistiques glissantes par token et classement par temps de completion attendu.
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        window_size: int = META_SCHEDULER_WINDOW,
+        min_samples: int = META_SCHEDULER_MIN_SAMPLES,
+        default_latency: float = META_SCHEDULER_DEFAULT_LATENCY,
+        demote_factor: float = META_SCHEDULER_DEMOTE_FACTOR,
+        demote_seconds: float = META_SCHEDULER_DEMOTE_SECONDS
+    ):
+        """
+        Args:
+            window_size: Nombre d'appels conserves par token
+            min_samples: Appels minimum avant de juger un token (retrogradation)
+            default_latency: Latence supposee d'un token sans historique (secondes)
+            demote_factor: Un token est retrograde au-dela de demote_factor x la latence mediane
+            demote_seconds: Duree de la retrogradation sans nouvel appel du token
+        """
+        self.window_size = window_size
+        self.min_samples = max(1, min_samples)
+        self.default_latency = default_latency
+        self.demote_factor = demote_factor
+        self.demote_seconds = demote_seconds
+        self._windows: Dict[str, _TokenWindow] = {}
+        self._lock = Lock()
+
+    def _window(self, token: str) -> _TokenWindow:
+        window = self._windows.get(token)
+        if window is None:
+            window = _TokenWindow(self.window_size)
+            self._windows[token] = window
+        return window
+
+    def record(self, token: str, latency_seconds: float, success: bool = True):
+        """Enregistre un appel termine (latence en secondes)"""
+        with self._lock:
+            window = self._window(token)
+            window.calls.append((max(0.0, latency_seconds), success))
+            window.last_call = time.time()
+
+    def begin(self, token: str):
+        """Une recherche demarre sur le token"""
+        with self._lock:
+            self._window(token).in_flight += 1
+
+    def end(self, token: str):
+        """Une recherche se termine sur le token"""
+        with self._lock:
+            window = self._window(token)
+            window.in_flight = max(0, window.in_flight - 1)
+
+    def _median_latency(self, exclude: str) -> Optional[float]:
+        """Latence mediane des autres tokens suffisamment mesures (appele avec le lock)"""
+        latencies = [
+            w.mean_latency() for token, w in self._windows.items()
+            if token != exclude and w.samples >= self.min_samples
+        ]
+        if not latencies:
+            return None
+        return median(latencies)
+
+    def _is_demoted(self, token: str) -> bool:
+        """Retrogradation du token (appele avec le lock)"""
+        window = self._windows.get(token)
+        if window is None or window.samples < self.min_samples:
+            return False
+        median_latency = self._median_latency(exclude=token)
+        if median_latency is None:
+            return False
+        if self.demote_seconds and time.time() - window.last_call > self.demote_seconds:
+            return False
+        return window.mean_latency() > self.demote_factor * median_latency
+
+    def is_demoted(self, token: str) -> bool:
+        """True si le token est nettement plus lent que les autres"""
+        with self._lock:
+            return self._is_demoted(token)
+
+    def _expected_completion(
+        self,
+        token: str,
+        limiter=None,
+        cooldown_until: float = 0,
+        now: Optional[float] = None
+    ) -> float:
+        """Temps de completion attendu (appele avec le lock)"""
+        window = self._windows.get(token)
+        latency = window.mean_latency() if window else None
+        if latency is None:
+            latency = self.default_latency
+        in_flight = window.in_flight if window else 0
+        error_rate = min(_MAX_ERROR_RATE, window.error_rate() if window else 0.0)
+
+        service = latency * (in_flight + 1) / (1 - error_rate)
+
+        wait = 0.0
+        if limiter is not None:
+            usage = min(_MAX_USAGE_PERCENT, limiter.last_usage or 0.0)
+            service /= (1 - usage / 100)
+            wait = limiter.peek_wait()
+        if cooldown_until:
+            wait = max(wait, cooldown_until - (now if now is not None else time.time()))
+
+        return service + max(0.0, wait)
+
+    def expected_completion(
+        self,
+        token: str,
+        limiter=None,
+        cooldown_until: float = 0,
+        now: Optional[float] = None
+    ) -> float:
+        """
+        Temps de completion attendu (secondes) d'une nouvelle recherche sur le token.
+
+        Args:
+            token: Token Meta
+            limiter: AdaptiveRateLimiter du token (quota restant et attente du bucket)
+            cooldown_until: Timestamp de fin de cooldown de rate limit (0 = aucun)
+            now: Timestamp courant (tests)
+        """
+        with self._lock:
+            return self._expected_completion(token, limiter, cooldown_until, now)
+
+    def rank(
+        self,
+        tokens: Iterable[str],
+        limiters: Optional[Dict[str, object]] = None,
+        cooldowns: Optional[Dict[str, float]] = None
+    ) -> List[str]:
+        """
+        Classe des tokens du plus au moins prometteur.
+        Les tokens retrogrades passent apres les autres; a score egal,
+        l'ordre d'entree est conserve (rotation round-robin).
+        """
+        limiters = limiters or {}
+        cooldowns = cooldowns or {}
+        now = time.time()
+        with self._lock:
+            scored = [
+                (
+                    self._is_demoted(token),
+                    self._expected_completion(token, limiters.get(token), cooldowns.get(token, 0), now),
+                    position,
+                    token,
+                )
+                for position, token in enumerate(tokens)
+            ]
+        scored.sort()
+        return [token for _, _, _, token in scored]
+
+    def get_stats(self, token: str) -> Dict:
+        """Statistiques d'un token (pour affichage/monitoring)"""
+        with self._lock:
+            window = self._windows.get(token)
+            if window is None:
+                return {"samples": 0, "latency": None, "error_rate": 0.0, "in_flight": 0, "demoted": False}
+            latency = window.mean_latency()
+            return {
+                "samples": window.samples,
+                "latency": round(latency, 3) if latency is not None else None,
+                "error_rate": round(window.error_rate(), 3),
+                "in_flight": window.in_flight,
+                "demoted": self._is_demoted(token),
+            }
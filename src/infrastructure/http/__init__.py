@@ -5,6 +5,9 @@ Fournit un client HTTP avec:
 - Connection pooling
 - Circuit breaker
 - Exponential backoff
+- Moteur de crawl asynchrone partage (scrapers de sites web)
+- Revalidation HTTP (ETag / Last-Modified) des pages d'accueil et sitemaps
+- Sante des hotes (circuits, hotes morts) et budget de relances par recherche
 """
 
 from src.infrastructure.http.resilient_client import (
@@ -17,6 +20,26 @@ from src.infrastructure.http.resilient_client import (
     get_http_client,
     close_http_client,
 )
+from src.infrastructure.http.host_health import (
+    HostHealth,
+    RetryBudget,
+    get_current_retry_budget,
+    set_current_retry_budget,
+    clear_current_retry_budget,
+)
+from src.infrastructure.http.crawler import (
+    CrawlerEngine,
+    CrawlResponse,
+    get_crawler,
+    close_crawler,
+)
+from src.infrastructure.http.revalidation import (
+    RevalidationCache,
+    Revalidated,
+    get_revalidation_cache,
+    configure_revalidation_cache,
+    fetch_revalidated,
+)
 
 __all__ = [
     "CircuitBreaker",
@@ -27,4 +50,18 @@ __all__ = [
     "get_circuit_breaker",
     "get_http_client",
     "close_http_client",
+    "HostHealth",
+    "RetryBudget",
+    "get_current_retry_budget",
+    "set_current_retry_budget",
+    "clear_current_retry_budget",
+    "CrawlerEngine",
+    "CrawlResponse",
+    "get_crawler",
+    "close_crawler",
+    "RevalidationCache",
+    "Revalidated",
+    "get_revalidation_cache",
+    "configure_revalidation_cache",
+    "fetch_revalidated",
 ]
@@ -0,0 +1,658 @@
+"""
+Moteur de crawl asynchrone partage par tous les scrapers de sites web.
+
+- Une boucle asyncio dans un thread dedie et une seule ClientSession:
+  pool de connexions keep-alive commun a tout le process
+- Budget global de requetes simultanees (CRAWLER_MAX_CONCURRENCY)
+- Politesse par site: requetes simultanees max et delai minimum entre deux
+  requetes vers le meme hote (l'hote cible, meme si la requete passe par
+  ScraperAPI)
+- API synchrone (fetch, fetch_many) pour les threads d'analyse existants et
+  API asynchrone (afetch) utilisable depuis n'importe quelle boucle
+- Les erreurs reseau ne levent pas d'exception: CrawlResponse.error
+- use_cache=True: reponse servie par le cache de documents de la recherche du
+  thread appelant (fetch-once), requetes identiques simultanees coalescees
+- sink: corps d'une reponse 2xx passe en flux a un consommateur (jamais
+  materialise), lecture arretee a sa demande
+- Hotes morts ou muets ignores sans requete (circuit par hote, cache
+  negatif) et relances limitees par le budget de la recherche du thread
+  appelant
+
+Usage:
+    crawler = get_crawler()
+    response = crawler.fetch("https://shop.com", timeout=10)
+    if response.ok:
+        html = response.text
+"""
+import os
+import json
+import socket
+import time
+import atexit
+import random
+import asyncio
+import threading
+import aiohttp
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from requests.structures import CaseInsensitiveDict
+
+from src.infrastructure.config import (
+    USER_AGENTS, REQUEST_TIMEOUT, get_proxied_url, is_proxy_enabled,
+    CRAWLER_MAX_CONCURRENCY, CRAWLER_MAX_CONNECTIONS,
+    CRAWLER_PER_HOST_CONCURRENCY, CRAWLER_PER_HOST_DELAY,
+    CRAWLER_MAX_BODY_BYTES,
+)
+from src.infrastructure.monitoring.api_tracker import get_current_tracker
+from src.infrastructure.cache.document_cache import (
+    CachedDocument, DocumentCache, get_current_document_cache, normalize_url,
+)
+from src.infrastructure.http.host_health import HostHealth, RetryBudget, get_current_retry_budget
+
+
+# Statuts relances quand retries > 0 (en plus des erreurs reseau)
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Etats d'hotes conserves au-dela desquels les hotes inactifs sont oublies
+_MAX_TRACKED_HOSTS = 10000
+
+
+@dataclass
+class CrawlResponse:
+    """
+    Reponse du moteur de crawl (interface proche de requests.Response).
+
+    status_code vaut 0 quand aucune reponse n'a ete recue; error donne
+    alors la cause ("timeout", "ssl", "dns", "connection", "redirects",
+    "error"), ou "dead_host" / "circuit_open" si l'hote a ete ignore.
+    """
+    requested_url: str
+    url: str = ""  # URL finale (apres redirections)
+    status_code: int = 0
+    headers: CaseInsensitiveDict = field(default_factory=CaseInsensitiveDict)
+    content: bytes = b""
+    cookies: Dict[str, str] = field(default_factory=dict)
+    encoding: Optional[str] = None
+    elapsed_ms: float = 0
+    truncated: bool = False  # Corps coupe a max_bytes
+    via_proxy: bool = False  # Requete passee par ScraperAPI
+    from_cache: bool = False  # Servie par le cache de documents (pas de requete)
+    error: Optional[str] = None
+    error_message: str = ""
+    _text: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 0 < self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.content.decode(self.encoding or "utf-8", errors="replace") if self.content else ""
+        return self._text
+
+    def json(self):
+        return json.loads(self.text)
+
+    def covers(self, max_bytes: int) -> bool:
+        """True si le corps lu suffit a une lecture de max_bytes (0: complete)"""
+        return not self.truncated or (bool(max_bytes) and len(self.content) >= max_bytes)
+
+    def head(self, max_bytes: int) -> "CrawlResponse":
+        """Copie dont le corps est coupe a max_bytes (0: inchange)"""
+        if not max_bytes or len(self.content) <= max_bytes:
+            return replace(self, _text=None)
+        return replace(self, content=self.content[:max_bytes], truncated=True, _text=None)
+
+    def to_document(self) -> CachedDocument:
+        return CachedDocument(
+            url=self.url, status_code=self.status_code, headers=dict(self.headers),
+            content=self.content, cookies=dict(self.cookies), encoding=self.encoding,
+            truncated=self.truncated, via_proxy=self.via_proxy
+        )
+
+    @classmethod
+    def from_document(cls, requested_url: str, document: CachedDocument) -> "CrawlResponse":
+        return cls(
+            requested_url=requested_url, url=document.url, status_code=document.status_code,
+            headers=CaseInsensitiveDict(document.headers), content=document.content,
+            cookies=dict(document.cookies), encoding=document.encoding,
+            truncated=document.truncated, via_proxy=document.via_proxy, from_cache=True
+        )
+
+
+@dataclass
+class _HostState:
+    """Politesse d'un hote: slots de requetes et prochain depart autorise"""
+    semaphore: asyncio.Semaphore
+    next_at: float = 0.0
+    active: int = 0
+
+
+def _feed_sink(sink, headers, chunk: bytes) -> bool:
+    """Passe un corps deja lu a un consommateur en flux (True: lecture arretee)"""
+    sink.start(headers)
+    return bool(chunk) and bool(sink.feed(chunk))
+
+
+def _error_kind(error: BaseException) -> str:
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(error, aiohttp.ClientSSLError):
+        return "ssl"
+    if isinstance(error, aiohttp.TooManyRedirects):
+        return "redirects"
+    if isinstance(error, aiohttp.ClientConnectorError) and isinstance(error.os_error, socket.gaierror) \
+       and error.os_error.errno != socket.EAI_AGAIN:
+        return "dns"  # Nom de domaine inexistant (echec temporaire du resolveur: "connection")
+    if isinstance(error, aiohttp.ClientConnectionError):
+        return "connection"
+    return "error"
+
+
+def _search_cache(use_cache: bool) -> Optional[DocumentCache]:
+    """Cache de documents de la recherche du thread appelant (si demande)"""
+    return get_current_document_cache() if use_cache else None
+
+
+def default_headers() -> Dict[str, str]:
+    """Headers navigateur avec User-Agent aleatoire (requetes directes)"""
+    return {
+        "User-Agent": random.choice(USER_AGENTS),
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7",
+    }
+
+
+class CrawlerEngine:
+    """
+    Moteur de crawl: une boucle asyncio, une session, des limites globales.
+
+    Les limites s'appliquent a tous les appelants du process: les pools de
+    threads des phases 4 et 6, le pipeline et le scraper Gemini attendent
+    leurs reponses ici au lieu d'ouvrir chacun leurs connexions.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = CRAWLER_MAX_CONCURRENCY,
+        max_connections: int = CRAWLER_MAX_CONNECTIONS,
+        per_host_concurrency: int = CRAWLER_PER_HOST_CONCURRENCY,
+        per_host_delay: float = CRAWLER_PER_HOST_DELAY,
+        max_body_bytes: int = CRAWLER_MAX_BODY_BYTES,
+        health: Optional[HostHealth] = None
+    ):
+        """
+        Args:
+            max_concurrency: Requetes simultanees max, tous hotes confondus
+            max_connections: Connexions max du pool
+            per_host_concurrency: Requetes simultanees max vers un meme hote
+            per_host_delay: Secondes min entre deux departs vers un meme hote
+            max_body_bytes: Octets lus au plus par reponse (defaut de fetch)
+            health: Sante des hotes (defaut: propre au moteur)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_connections = max(1, max_connections)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.per_host_delay = max(0.0, per_host_delay)
+        self.max_body_bytes = max_body_bytes
+        self.health = health or HostHealth()
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+        # Crees dans la boucle du moteur
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._global: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, _HostState] = {}
+        # Requetes en cours par (cache, URL normalisee): les suivantes attendent
+        self._pending: Dict[Tuple[int, str], asyncio.Future] = {}
+
+        self._stats = {"requests": 0, "errors": 0, "bytes": 0, "in_flight": 0,
+                       "cache_hits": 0, "coalesced": 0, "blocked": 0, "retries_denied": 0}
+
+    # ─── Boucle ──────────────────────────────────────────────────────────────
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Demarre la boucle du moteur (et la redemarre apres un fork)"""
+        with self._lock:
+            alive = self._thread is not None and self._thread.is_alive()
+            if self._loop is None or not alive or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, daemon=True, name="crawler_engine")
+                thread.start()
+                self._loop, self._thread, self._pid = loop, thread, os.getpid()
+                self._session, self._global, self._hosts = None, None, {}
+                self._pending = {}
+            return self._loop
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=0,  # Politesse geree par hote cible (ScraperAPI = un seul hote)
+                ssl=False,
+                keepalive_timeout=30,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+            self._global = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    # ─── Politesse ───────────────────────────────────────────────────────────
+
+    async def _acquire_host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            if len(self._hosts) >= _MAX_TRACKED_HOSTS:
+                now = asyncio.get_running_loop().time()
+                for idle in [h for h, s in self._hosts.items() if not s.active and s.next_at <= now]:
+                    del self._hosts[idle]
+            state = self._hosts[host] = _HostState(asyncio.Semaphore(self.per_host_concurrency))
+
+        state.active += 1
+        await state.semaphore.acquire()
+        now = asyncio.get_running_loop().time()
+        wait = state.next_at - now
+        state.next_at = max(now, state.next_at) + self.per_host_delay
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return state
+
+    def _release_host(self, state: _HostState):
+        state.semaphore.release()
+        state.active -= 1
+
+    # ─── Requetes ────────────────────────────────────────────────────────────
+
+    async def _request(
+        self,
+        url: str,
+        request_url: str,
+        headers: Dict[str, str],
+        timeout: float,
+        max_bytes: int,
+        via_proxy: bool,
+        sink=None
+    ) -> CrawlResponse:
+        """Une requete GET (slot global deja pris)"""
+        result = CrawlResponse(requested_url=url, url=url, via_proxy=via_proxy)
+        start = time.time()
+        size = 0
+        try:
+            async with self._get_session().get(
+                request_url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                allow_redirects=True,
+                max_redirects=10
+            ) as response:
+                # Corps d'une reponse 2xx au consommateur (rien n'est conserve)
+                streamed = sink is not None and 200 <= response.status < 300
+                if streamed:
+                    sink.start(response.headers)
+                chunks = []
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    if max_bytes and size + len(chunk) >= max_bytes:
+                        chunk = chunk[:max_bytes - size]
+                        result.truncated = True
+                    size += len(chunk)
+                    if not streamed:
+                        chunks.append(chunk)
+                    elif sink.feed(chunk):
+                        result.truncated = True
+                    if result.truncated:
+                        break
+                result.content = b"".join(chunks)
+                result.status_code = response.status
+                result.headers = CaseInsensitiveDict(response.headers)
+                result.cookies = {name: morsel.value for name, morsel in response.cookies.items()}
+                result.encoding = response.charset
+                # Via ScraperAPI, l'URL finale du site n'est pas connue
+                result.url = url if via_proxy else str(response.url)
+        except Exception as e:
+            result.error = _error_kind(e)
+            result.error_message = str(e)[:200] or type(e).__name__
+        result.elapsed_ms = (time.time() - start) * 1000
+
+        self._stats["requests"] += 1
+        self._stats["bytes"] += size
+        if result.error:
+            self._stats["errors"] += 1
+        return result
+
+    async def _fetch(
+        self,
+        url: str,
+        timeout: float = REQUEST_TIMEOUT,
+        headers: Optional[Dict[str, str]] = None,
+        use_proxy: bool = True,
+        proxy_params: Optional[Dict[str, str]] = None,
+        retries: int = 0,
+        direct_fallback: bool = False,
+        max_bytes: Optional[int] = None,
+        cache: Optional[DocumentCache] = None,
+        extra_headers: Optional[Dict[str, str]] = None,
+        sink=None,
+        budget: Optional[RetryBudget] = None
+    ) -> CrawlResponse:
+        """
+        Requete GET polie, avec relances et repli sans proxy (boucle du moteur).
+
+        cache, budget: cache de documents et budget de relances de la
+        recherche, lus par l'appelant dans son propre thread (la boucle du
+        moteur est partagee par les recherches).
+        """
+        if not url.startswith(("http://", "https://")):
+            url = "https://" + url
+        max_bytes = self.max_body_bytes if max_bytes is None else max_bytes
+        options = dict(timeout=timeout, headers=headers, use_proxy=use_proxy,
+                       proxy_params=proxy_params, retries=retries, direct_fallback=direct_fallback,
+                       extra_headers=extra_headers, budget=budget)
+
+        if sink is not None:
+            return await self._fetch_streamed(cache, url, max_bytes, sink, options)
+        if cache is None:
+            return await self._fetch_network(url, max_bytes=max_bytes, **options)
+        return await self._fetch_cached(cache, url, max_bytes, options)
+
+    async def _fetch_cached(
+        self,
+        cache: DocumentCache,
+        url: str,
+        max_bytes: int,
+        options: Dict
+    ) -> CrawlResponse:
+        """
+        Requete servie par le cache de documents (fetch-once).
+
+        Le premier appelant lit au moins max_document_bytes pour que le
+        document serve aussi les detecteurs qui lisent plus loin; une requete
+        identique en cours est attendue au lieu d'etre relancee.
+        """
+        document = cache.get(url, max_bytes)
+        if document is not None:
+            self._stats["cache_hits"] += 1
+            return CrawlResponse.from_document(url, document).head(max_bytes)
+
+        key = (id(cache), normalize_url(url))
+        pending = self._pending.get(key)
+        if pending is not None:
+            response = await asyncio.shield(pending)
+            if response is not None and response.covers(max_bytes):
+                self._stats["coalesced"] += 1
+                return replace(response.head(max_bytes), requested_url=url, from_cache=True)
+
+        read_bytes = max_bytes
+        if max_bytes and max_bytes < cache.max_document_bytes:
+            read_bytes = cache.max_document_bytes
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        response = None
+        try:
+            response = await self._fetch_network(url, max_bytes=read_bytes, **options)
+            # Reponses definitives uniquement (pas d'erreur reseau, de 429/5xx temporaire ni de 304 sans corps)
+            if response.error is None and response.status_code not in RETRY_STATUSES | {304}:
+                cache.put(url, response.to_document())
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+            future.set_result(response)  # None si la requete a ete annulee
+        return response.head(max_bytes)
+
+    async def _fetch_streamed(
+        self,
+        cache: Optional[DocumentCache],
+        url: str,
+        max_bytes: int,
+        sink,
+        options: Dict
+    ) -> CrawlResponse:
+        """
+        Requete dont le corps est passe en flux au consommateur.
+
+        Un document deja dans le cache de la recherche lui est rejoue; un
+        corps lu en flux n'est pas conserve, donc pas mis en cache.
+        """
+        document = cache.get(url, max_bytes) if cache is not None else None
+        if document is None:
+            return await self._fetch_network(url, max_bytes=max_bytes, sink=sink, **options)
+
+        self._stats["cache_hits"] += 1
+        response = CrawlResponse.from_document(url, document).head(max_bytes)
+        if 200 <= response.status_code < 300:
+            if _feed_sink(sink, response.headers, response.content):
+                response.truncated = True
+            response.content = b""
+        return response
+
+    async def _fetch_network(
+        self,
+        url: str,
+        timeout: float,
+        headers: Optional[Dict[str, str]],
+        use_proxy: bool,
+        proxy_params: Optional[Dict[str, str]],
+        retries: int,
+        direct_fallback: bool,
+        max_bytes: int,
+        extra_headers: Optional[Dict[str, str]] = None,
+        sink=None,
+        budget: Optional[RetryBudget] = None
+    ) -> CrawlResponse:
+        """Requete reseau (sans cache)"""
+        host = (urlparse(url).hostname or "").lower()
+        via_proxy = use_proxy and is_proxy_enabled()
+        blocked = self.health.blocked(host)
+        if blocked:
+            return self._blocked(url, host, blocked)
+        if budget is not None:
+            budget.record_request()
+
+        plans = [via_proxy]
+        if via_proxy and direct_fallback:
+            plans.append(False)
+
+        self._get_session()
+        result = None
+        for proxied in plans:
+            if proxied and extra_headers:
+                # ScraperAPI ne transmet nos headers qu'avec keep_headers
+                request_url, _ = get_proxied_url(url, {**(proxy_params or {}), "keep_headers": "true"})
+                request_headers = {**default_headers(), **extra_headers}
+            elif proxied:
+                request_url, request_headers = get_proxied_url(url, proxy_params)
+            else:
+                request_url, request_headers = url, {**(headers or default_headers()), **(extra_headers or {})}
+
+            for attempt in range(retries + 1):
+                if result is not None:
+                    # Relance ou repli: hote devenu injoignable, budget de la recherche epuise
+                    if self.health.blocked(host):
+                        return result
+                    if budget is not None and not budget.try_spend():
+                        self._stats["retries_denied"] += 1
+                        return result
+                state = await self._acquire_host(host)
+                # Hote declare mort pendant l'attente d'un slot (autres requetes)
+                blocked = self.health.blocked(host)
+                if blocked:
+                    self._release_host(state)
+                    return result if result is not None else self._blocked(url, host, blocked)
+                try:
+                    async with self._global:
+                        self._stats["in_flight"] += 1
+                        try:
+                            result = await self._request(url, request_url, request_headers,
+                                                         timeout, max_bytes, proxied, sink)
+                        finally:
+                            self._stats["in_flight"] -= 1
+                finally:
+                    self._release_host(state)
+                self.health.record(host, result.error, proxied)
+
+                retryable = result.error is not None or result.status_code in RETRY_STATUSES
+                if not retryable or attempt == retries or self.health.blocked(host):
+                    break
+                await asyncio.sleep(0.5 * (attempt + 1))
+
+            # Repli sans proxy uniquement si ScraperAPI n'a pas repondu
+            if result.error is None:
+                break
+        return result
+
+    def _blocked(self, url: str, host: str, reason: str) -> CrawlResponse:
+        """Reponse d'une requete refusee sans appel reseau (hote mort ou circuit ouvert)"""
+        self._stats["blocked"] += 1
+        return CrawlResponse(requested_url=url, url=url, error=reason,
+                             error_message=f"{host}: {reason.replace('_', ' ')}")
+
+    async def afetch(self, url: str, use_cache: bool = False, **kwargs) -> CrawlResponse:
+        """Version asynchrone de fetch (appelable depuis n'importe quelle boucle)"""
+        loop = self._ensure_loop()
+        coro = self._fetch(url, cache=_search_cache(use_cache),
+                           budget=get_current_retry_budget(), **kwargs)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def fetch(
+        self,
+        url: str,
+        timeout: float = REQUEST_TIMEOUT,
+        headers: Optional[Dict[str, str]] = None,
+        use_proxy: bool = True,
+        proxy_params: Optional[Dict[str, str]] = None,
+        retries: int = 0,
+        direct_fallback: bool = False,
+        max_bytes: Optional[int] = None,
+        use_cache: bool = False,
+        extra_headers: Optional[Dict[str, str]] = None,
+        sink=None,
+        track: bool = False,
+        site_url: str = "",
+        page_id: str = ""
+    ) -> CrawlResponse:
+        """
+        Requete GET bloquante (thread appelant), executee dans la boucle du moteur.
+
+        Args:
+            url: URL du site (https:// ajoute si absent)
+            timeout: Timeout total de chaque tentative (secondes)
+            headers: Headers des requetes directes (defaut: navigateur, UA aleatoire)
+            use_proxy: Passer par ScraperAPI s'il est configure
+            proxy_params: Parametres ScraperAPI supplementaires (ex: country_code)
+            retries: Relances sur erreur reseau ou statut 429/502/503/504
+            direct_fallback: Requete directe si ScraperAPI ne repond pas
+            max_bytes: Octets lus au plus (defaut: CRAWLER_MAX_BODY_BYTES, 0: illimite)
+            use_cache: Passer par le cache de documents de la recherche en cours
+            extra_headers: Headers ajoutes a la requete, directe ou via ScraperAPI
+                (ex: If-None-Match)
+            sink: Consommateur du corps en flux: sink.start(headers) a chaque
+                reponse 2xx recue (relances comprises), puis sink.feed(chunk)
+                par morceau, True pour arreter la lecture. Le corps n'est pas
+                conserve (content vide) ni mis en cache
+            track: Enregistrer l'appel dans l'APITracker courant
+            site_url: Site rattache a l'appel (tracking)
+            page_id: Page rattachee a l'appel (tracking)
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._fetch(
+            url, timeout=timeout, headers=headers, use_proxy=use_proxy,
+            proxy_params=proxy_params, retries=retries,
+            direct_fallback=direct_fallback, max_bytes=max_bytes, cache=_search_cache(use_cache),
+            extra_headers=extra_headers, sink=sink, budget=get_current_retry_budget()
+        ), loop)
+        response = future.result()
+        if track:
+            self._track(response, site_url, page_id)
+        return response
+
+    def fetch_many(self, urls: List[str], use_cache: bool = False, **kwargs) -> List[CrawlResponse]:
+        """Plusieurs requetes en parallele (limites du moteur), dans l'ordre des URLs"""
+        if not urls:
+            return []
+        loop = self._ensure_loop()
+        kwargs.update(cache=_search_cache(use_cache), budget=get_current_retry_budget())
+
+        async def run():
+            return await asyncio.gather(*(self._fetch(url, **kwargs) for url in urls))
+
+        return asyncio.run_coroutine_threadsafe(run(), loop).result()
+
+    def _track(self, response: CrawlResponse, site_url: str = "", page_id: str = ""):
+        """Enregistre l'appel dans le tracker (depuis le thread appelant: spans imbriques)"""
+        tracker = get_current_tracker()
+        if not tracker or response.from_cache:
+            return
+        url = response.requested_url[:200]
+        call = {"url": url, "site_url": site_url or url, "response_time_ms": response.elapsed_ms}
+        if response.error:
+            call.update(success=False, error_type="timeout" if response.error == "timeout" else "error",
+                        error_message=response.error_message)
+        else:
+            call.update(status_code=response.status_code, success=response.status_code == 200,
+                        response_size=len(response.content))
+        if response.via_proxy:
+            tracker.track_scraper_api_call(**call)
+        else:
+            tracker.track_web_request(page_id=page_id, **call)
+
+    # ─── Etat ────────────────────────────────────────────────────────────────
+
+    def get_stats(self) -> Dict[str, int]:
+        """Compteurs du moteur (requetes, erreurs, octets lus, en cours, cache, hotes ignores, hotes suivis)"""
+        return {**self._stats, "hosts": len(self._hosts)}
+
+    def close(self):
+        """Ferme la session et arrete la boucle"""
+        with self._lock:
+            loop, thread, session = self._loop, self._thread, self._session
+            self._loop, self._thread, self._session = None, None, None
+        if loop is None or not loop.is_running() or self._pid != os.getpid():
+            return
+        if session is not None and not session.closed:
+            try:
+                asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout=5)
+            except Exception:
+                pass
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INSTANCE GLOBALE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_crawler: Optional[CrawlerEngine] = None
+_crawler_lock = threading.Lock()
+
+
+def get_crawler() -> CrawlerEngine:
+    """Retourne le moteur de crawl du process (cree au premier appel)"""
+    global _crawler
+    if _crawler is None:
+        with _crawler_lock:
+            if _crawler is None:
+                _crawler = CrawlerEngine()
+                atexit.register(close_crawler)
+    return _crawler
+
+
+def close_crawler():
+    """Ferme le moteur de crawl global"""
+    global _crawler
+    with _crawler_lock:
+        crawler, _crawler = _crawler, None
+    if crawler is not None:
+        crawler.close()
@@ -0,0 +1,212 @@
+"""
+Sante des hotes et budget de relances du moteur de crawl.
+
+Quelques domaines injoignables (DNS mort, paquets ignores) gardaient des
+threads d'analyse bloques de 25 a 40 s chacun: chaque requete attendait
+son timeout, puis etait relancee. Le moteur consulte ici, avant chaque
+tentative, l'etat de l'hote cible.
+
+- Circuit par hote (CircuitBreaker): ouvert apres HOST_CIRCUIT_FAILURES
+  echecs reseau consecutifs (timeout, connexion, DNS), requete de test
+  apres HOST_CIRCUIT_RECOVERY secondes
+- Cache negatif des hotes morts: nom de domaine inexistant, ou echec de la
+  requete de test d'un circuit semi-ouvert; hote ignore HOST_DEAD_TTL
+  secondes
+- Toute reponse HTTP (meme 4xx/5xx) prouve que l'hote repond
+- Budget de relances par recherche (RetryBudget): les relances d'une
+  recherche sont limitees a un minimum plus une fraction de ses requetes;
+  une panne generale ne multiplie plus le nombre de requetes. Budget actif
+  dans le contexte du thread qui execute la recherche
+
+Usage:
+    budget = RetryBudget()
+    set_current_retry_budget(budget)
+    try:
+        ...  # get_crawler().fetch(url, retries=2)
+    finally:
+        clear_current_retry_budget(budget)
+"""
+import time
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, Optional
+
+from src.infrastructure.config import (
+    HOST_CIRCUIT_FAILURES, HOST_CIRCUIT_RECOVERY, HOST_DEAD_TTL, HOST_HEALTH_MAX_HOSTS,
+    RETRY_BUDGET_MIN, RETRY_BUDGET_RATIO,
+)
+from src.infrastructure.cache.lru_cache import BoundedLRUCache
+from src.infrastructure.http.resilient_client import CircuitBreaker
+
+# Erreurs du moteur imputables a l'hote (voir CrawlResponse.error)
+HOST_FAILURES = {"timeout", "connection", "dns"}
+
+# Raisons d'une requete refusee sans appel reseau (CrawlResponse.error)
+DEAD_HOST = "dead_host"
+CIRCUIT_OPEN = "circuit_open"
+
+
+class HostHealth:
+    """
+    Circuits par hote et cache negatif des hotes morts (thread-safe).
+
+    Les hotes sans echec ne sont pas suivis: la memoire reste bornee par
+    max_hosts quel que soit le nombre de sites crawles.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = HOST_CIRCUIT_FAILURES,
+        recovery_timeout: int = HOST_CIRCUIT_RECOVERY,
+        dead_ttl: int = HOST_DEAD_TTL,
+        max_hosts: int = HOST_HEALTH_MAX_HOSTS
+    ):
+        """
+        Args:
+            failure_threshold: Echecs reseau consecutifs avant ouverture du circuit
+            recovery_timeout: Secondes avant une requete de test
+            dead_ttl: Secondes pendant lesquelles un hote mort est ignore
+            max_hosts: Hotes suivis au plus (circuits et cache negatif)
+        """
+        self.dead_ttl = dead_ttl
+        self._circuits = CircuitBreaker(
+            failure_threshold=max(1, failure_threshold),
+            recovery_timeout=recovery_timeout,
+            half_open_requests=1,
+            max_circuits=max_hosts
+        )
+        self._dead = BoundedLRUCache(max_entries=max_hosts, max_bytes=max_hosts)
+        self._lock = Lock()
+        self._stats = {"failures": 0, "opened": 0, "dead": 0}
+
+    def blocked(self, host: str) -> Optional[str]:
+        """Raison de ne pas contacter l'hote (None: requete permise)"""
+        if not host:
+            return None
+        if self._dead.get(host) is not None:
+            return DEAD_HOST
+        if not self._circuits.is_allowed(host):
+            return CIRCUIT_OPEN
+        return None
+
+    def record(self, host: str, error: Optional[str], via_proxy: bool = False):
+        """
+        Enregistre le resultat d'une tentative vers l'hote.
+
+        Via ScraperAPI, seuls les timeouts sont imputes a l'hote cible (une
+        erreur de connexion concerne alors le proxy).
+        """
+        if not host:
+            return
+        if error is None:
+            self._circuits.record_success(host)
+            return
+        if error not in HOST_FAILURES or (via_proxy and error != "timeout"):
+            return
+
+        before = self._circuits.get_state(host)
+        self._circuits.record_failure(host)
+        after = self._circuits.get_state(host)
+        with self._lock:
+            self._stats["failures"] += 1
+            if after == "open" and before != "open":
+                self._stats["opened"] += 1
+        # Domaine inexistant ou hote toujours muet apres la pause du circuit
+        if error == "dns" or before == "half-open":
+            self.mark_dead(host)
+
+    def mark_dead(self, host: str):
+        """Ignore l'hote pendant dead_ttl secondes"""
+        self._dead.set(host, True, size=1, expires_at=time.time() + self.dead_ttl)
+        with self._lock:
+            self._stats["dead"] += 1
+
+    def reset(self, host: Optional[str] = None):
+        """Oublie l'etat d'un hote (ou de tous)"""
+        self._circuits.reset(host)
+        if host:
+            self._dead.delete(host)
+        else:
+            self._dead.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Compteurs (echecs, circuits ouverts, hotes morts) et circuits suivis"""
+        with self._lock:
+            stats = dict(self._stats)
+        status = self._circuits.get_status()
+        stats["tracked"] = len(status)
+        stats["open"] = sum(1 for c in status.values() if c["state"] != "closed")
+        return stats
+
+
+class RetryBudget:
+    """
+    Relances permises pour une recherche (thread-safe).
+
+    Chaque requete du moteur est deposee (record_request); une relance
+    n'est accordee que si les relances deja faites restent sous
+    minimum + ratio * requetes.
+    """
+
+    def __init__(self, minimum: int = RETRY_BUDGET_MIN, ratio: float = RETRY_BUDGET_RATIO):
+        """
+        Args:
+            minimum: Relances toujours permises
+            ratio: Relances supplementaires accordees par requete
+        """
+        self.minimum = max(0, minimum)
+        self.ratio = max(0.0, ratio)
+        self._requests = 0
+        self._retries = 0
+        self._denied = 0
+        self._lock = Lock()
+
+    def record_request(self):
+        """Compte une requete (premiere tentative)"""
+        with self._lock:
+            self._requests += 1
+
+    def try_spend(self) -> bool:
+        """Prend une relance du budget (False: budget epuise)"""
+        with self._lock:
+            if self._retries < self.minimum + self.ratio * self._requests:
+                self._retries += 1
+                return True
+            self._denied += 1
+            return False
+
+    def get_stats(self) -> Dict[str, int]:
+        """Requetes, relances accordees et relances refusees"""
+        with self._lock:
+            return {"requests": self._requests, "retries": self._retries, "denied": self._denied}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BUDGET DE LA RECHERCHE EN COURS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Budget de la recherche executee par le thread (ou la tache asyncio) courant:
+# chaque recherche garde le sien. Les threads de travail d'une recherche le
+# recoivent avec contextvars.copy_context().
+_current_budget: ContextVar[Optional[RetryBudget]] = ContextVar("retry_budget", default=None)
+
+
+def get_current_retry_budget() -> Optional[RetryBudget]:
+    """Retourne le budget de relances du contexte courant (None hors recherche: illimite)"""
+    return _current_budget.get()
+
+
+def set_current_retry_budget(budget: RetryBudget):
+    """Active un budget de relances dans le contexte courant (jusqu'a clear_current_retry_budget)"""
+    _current_budget.set(budget)
+
+
+def clear_current_retry_budget(budget: Optional[RetryBudget] = None):
+    """
+    Desactive le budget de relances du contexte courant.
+
+    Avec un argument, seulement s'il est le budget actif; les recherches
+    executees par d'autres threads gardent le leur.
+    """
+    if budget is None or _current_budget.get() is budget:
+        _current_budget.set(None)
@@ -45,17 +45,21 @@ class CircuitBreaker:
         self,
         failure_threshold: int = 5,
         recovery_timeout: int = 30,
-        half_open_requests: int = 3
+        half_open_requests: int = 3,
+        max_circuits: int = 0
     ):
         """
         Args:
             failure_threshold: Nombre d'échecs avant ouverture du circuit
             recovery_timeout: Secondes avant de tenter une récupération
             half_open_requests: Requêtes réussies nécessaires pour fermer le circuit
+            max_circuits: Circuits conservés au plus (0: illimité), les plus
+                anciens circuits fermés sont oubliés en premier
         """
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.half_open_requests = half_open_requests
+        self.max_circuits = max_circuits
         self._circuits: Dict[str, CircuitState] = {}
         self._lock = Lock()
 
@@ -63,15 +67,28 @@ class CircuitBreaker:
         """Récupère ou crée un circuit pour un service"""
         with self._lock:
             if name not in self._circuits:
+                if self.max_circuits and len(self._circuits) >= self.max_circuits:
+                    self._evict()
                 self._circuits[name] = CircuitState()
             return self._circuits[name]
 
+    def _evict(self):
+        """Oublie le plus ancien circuit fermé (à défaut le plus ancien)"""
+        name = next((n for n, c in self._circuits.items() if c.state == "closed"),
+                    next(iter(self._circuits)))
+        del self._circuits[name]
+
+    def get_state(self, name: str) -> str:
+        """État du circuit d'un service ("closed" si inconnu)"""
+        with self._lock:
+            circuit = self._circuits.get(name)
+            return circuit.state if circuit else "closed"
+
     def is_allowed(self, name: str) -> bool:
         """Vérifie si une requête est autorisée pour ce service"""
-        circuit = self._get_circuit(name)
-
         with self._lock:
-            if circuit.state == "closed":
+            circuit = self._circuits.get(name)
+            if circuit is None or circuit.state == "closed":
                 return True
 
             if circuit.state == "open":
@@ -88,9 +105,10 @@ class CircuitBreaker:
 
     def record_success(self, name: str):
         """Enregistre un succès pour ce service"""
-        circuit = self._get_circuit(name)
-
         with self._lock:
+            circuit = self._circuits.get(name)
+            if circuit is None:
+                return  # Aucun échec connu: rien à réinitialiser
             if circuit.state == "half-open":
                 circuit.success_count += 1
                 if circuit.success_count >= self.half_open_requests:
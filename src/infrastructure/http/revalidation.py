@@ -0,0 +1,297 @@
+"""
+Revalidation HTTP des pages d'accueil et sitemaps (requetes conditionnelles).
+
+Les rescans des memes boutiques retelechargeaient la page d'accueil,
+/sitemap.xml et chaque sitemap produits. Pour chaque URL analysee, on garde
+les validateurs de la reponse (ETag, Last-Modified, Content-Length) et le
+resultat de l'analyse; le scan suivant envoie If-None-Match /
+If-Modified-Since et, sur 304 Not Modified, reutilise le resultat sans
+telecharger ni reanalyser le document.
+
+- Stockage: table http_validators (ecriture differee), cache L1 en memoire
+- Un resultat par (analyse, URL): une meme page peut servir plusieurs
+  analyses (detection CMS, analyse web...) avec chacune ses validateurs
+- Sans validateurs (premier passage, serveur sans ETag/Last-Modified):
+  requete normale, via le cache de documents de la recherche; la version
+  complete renvoyee a une requete conditionnelle y est aussi gardee
+
+Usage:
+    page = fetch_revalidated(url, "sitemap_count", lambda r: count(r.text))
+    if page.result is not None:
+        ...
+"""
+import copy
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from src.infrastructure.cache.document_cache import get_current_document_cache, normalize_url
+from src.infrastructure.cache.lru_cache import BoundedLRUCache
+from src.infrastructure.config import (
+    HTTP_REVALIDATION_ENABLED,
+    HTTP_REVALIDATION_MAX_AGE_DAYS,
+    HTTP_REVALIDATION_L1_MAX_ENTRIES,
+    HTTP_REVALIDATION_L1_MAX_BYTES,
+    HTTP_REVALIDATION_MISS_TTL,
+)
+from src.infrastructure.http.crawler import RETRY_STATUSES, CrawlResponse, get_crawler
+
+# Analyse d'une reponse 200: resultat serialisable en JSON (None: rien a stocker)
+Analyzer = Callable[[CrawlResponse], Any]
+
+# Entree L1 d'une cle sans validateurs en base (evite de relire la BDD)
+_MISSING = {"missing": True}
+
+
+@dataclass
+class Revalidated:
+    """Resultat d'une requete revalidee"""
+    result: Any  # Resultat de l'analyse (None si pas de reponse exploitable)
+    response: Optional[CrawlResponse]
+    not_modified: bool = False  # Resultat stocke reutilise apres un 304
+
+
+class RevalidationCache:
+    """
+    Validateurs HTTP et resultats d'analyse par (analyse, URL).
+
+    Thread-safe. Sans base (db=None), les validateurs ne vivent que dans le
+    cache L1 du process.
+    """
+
+    def __init__(
+        self,
+        db=None,
+        max_entries: int = HTTP_REVALIDATION_L1_MAX_ENTRIES,
+        max_bytes: int = HTTP_REVALIDATION_L1_MAX_BYTES,
+        max_age_days: float = HTTP_REVALIDATION_MAX_AGE_DAYS
+    ):
+        """
+        Args:
+            db: DatabaseManager (table http_validators), None: memoire seule
+            max_entries: Entrees max du cache L1
+            max_bytes: Taille max du cache L1 (octets)
+            max_age_days: Age max d'un resultat stocke (au-dela: requete normale)
+        """
+        self.db = db
+        self.max_age = max_age_days * 86400
+        self._l1 = BoundedLRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self._lock = threading.Lock()
+        self._stats = {"conditional": 0, "not_modified": 0, "stored": 0, "db_errors": 0}
+
+    @staticmethod
+    def key(kind: str, url: str) -> str:
+        """Cle de stockage d'une analyse d'URL"""
+        digest = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()[:40]
+        return f"{kind}:{digest}"
+
+    # ─── Validateurs ─────────────────────────────────────────────────────────
+
+    def get(self, kind: str, url: str) -> Optional[Dict]:
+        """Validateurs et resultat stockes (None si absents ou trop anciens)"""
+        key = self.key(kind, url)
+        entry = self._l1.get(key)
+        if entry is None and self.db is not None:
+            entry = self._load(key)
+        if not entry or entry is _MISSING:
+            return None
+        if time.time() - entry["changed_at"] > self.max_age:
+            return None
+        return entry
+
+    def _load(self, key: str) -> Dict:
+        """Lit une cle en base et la place dans le L1"""
+        from src.infrastructure.persistence.repositories.cache_repository import get_http_validator
+
+        try:
+            row = get_http_validator(self.db, key)
+        except Exception as e:
+            self._count("db_errors")
+            print(f"⚠️ Erreur lecture validateurs HTTP: {str(e)[:100]}")
+            return _MISSING
+
+        if row is None or row["result"] is None:
+            self._l1.set(key, _MISSING, size=64, expires_at=time.time() + HTTP_REVALIDATION_MISS_TTL)
+            return _MISSING
+
+        entry = {
+            "etag": row["etag"],
+            "last_modified": row["last_modified"],
+            "content_length": row["content_length"],
+            "result": row["result"],
+            "changed_at": row["changed_at"].timestamp() if row["changed_at"] else 0,
+        }
+        self._l1.set(key, entry, size=self._size(entry))
+        return entry
+
+    def store(self, kind: str, url: str, response: CrawlResponse, result: Any) -> bool:
+        """
+        Stocke le resultat d'une reponse 200 avec ses validateurs.
+
+        Returns:
+            False si la reponse n'a ni ETag ni Last-Modified (pas revalidable)
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return False
+
+        content_length = response.headers.get("Content-Length")
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_length": int(content_length) if str(content_length or "").isdigit() else None,
+            "result": copy.deepcopy(result),  # L'appelant peut modifier le sien
+            "changed_at": time.time(),
+        }
+        key = self.key(kind, url)
+        self._l1.set(key, entry, size=self._size(entry))
+        self._count("stored")
+        self._persist(cache_key=key, kind=kind, url=normalize_url(url)[:2000],
+                      etag=etag, last_modified=last_modified,
+                      content_length=entry["content_length"], result=result)
+        return True
+
+    def _persist(self, **record):
+        if self.db is None:
+            return
+        from src.infrastructure.persistence.write_behind import queue_http_validator
+
+        try:
+            queue_http_validator(self.db, **record)
+        except Exception as e:
+            self._count("db_errors")
+            print(f"⚠️ Erreur ecriture validateurs HTTP: {str(e)[:100]}")
+
+    @staticmethod
+    def _size(entry: Dict) -> int:
+        return len(json.dumps(entry["result"], separators=(",", ":"), default=str)) + 256
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    # ─── Requetes ────────────────────────────────────────────────────────────
+
+    def fetch(self, url: str, kind: str, analyze: Analyzer, **fetch_kwargs) -> Revalidated:
+        """
+        Requete conditionnelle si des validateurs sont connus, sinon requete normale.
+
+        Args:
+            url: URL du document
+            kind: Nom de l'analyse (cle de stockage avec l'URL)
+            analyze: Analyse d'une reponse 200 (resultat serialisable en JSON)
+            **fetch_kwargs: Options de CrawlerEngine.fetch (timeout, retries, max_bytes, sink, track...)
+
+        Returns:
+            Revalidated (result=None si pas de reponse exploitable)
+        """
+        crawler = get_crawler()
+        if not url.startswith(("http://", "https://")):
+            url = "https://" + url
+
+        # Document deja telecharge pendant la recherche: aucune requete
+        # (lecture en flux: le moteur rejoue lui-meme le document au consommateur)
+        documents = get_current_document_cache() if fetch_kwargs.get("sink") is None else None
+        if documents is not None:
+            max_bytes = fetch_kwargs.get("max_bytes")
+            max_bytes = crawler.max_body_bytes if max_bytes is None else max_bytes
+            document = documents.get(url, max_bytes)
+            if document is not None:
+                return self._analyze(kind, url, CrawlResponse.from_document(url, document).head(max_bytes), analyze)
+
+        entry = self.get(kind, url)
+        conditional = {}
+        if entry:
+            if entry["etag"]:
+                conditional["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                conditional["If-Modified-Since"] = entry["last_modified"]
+
+        if not conditional:
+            return self._analyze(kind, url, crawler.fetch(url, use_cache=True, **fetch_kwargs), analyze)
+
+        self._count("conditional")
+        response = crawler.fetch(url, extra_headers=conditional, **fetch_kwargs)
+        # Version complete: gardee pour les autres analyses de la recherche (comme use_cache)
+        if documents is not None and response.error is None \
+           and response.status_code not in RETRY_STATUSES | {304}:
+            documents.put(url, response.to_document())
+        if response.status_code == 304:
+            if self._same_length(entry, response):
+                self._count("not_modified")
+                self._persist(cache_key=self.key(kind, url))
+                return Revalidated(copy.deepcopy(entry["result"]), response, not_modified=True)
+            # 304 incoherent (taille differente): version complete
+            response = crawler.fetch(url, use_cache=True, **fetch_kwargs)
+        return self._analyze(kind, url, response, analyze)
+
+    def _analyze(self, kind: str, url: str, response: CrawlResponse, analyze: Analyzer) -> Revalidated:
+        if not response.ok or response.status_code == 304:
+            return Revalidated(None, response)
+        result = analyze(response)
+        if result is not None:
+            self.store(kind, url, response, result)
+        return Revalidated(result, response)
+
+    @staticmethod
+    def _same_length(entry: Dict, response: CrawlResponse) -> bool:
+        """Un 304 annoncant une autre taille que la version stockee est ignore"""
+        length = response.headers.get("Content-Length")
+        if not entry["content_length"] or not str(length or "").isdigit() or int(length) == 0:
+            return True
+        return int(length) == entry["content_length"]
+
+    # ─── Etat ────────────────────────────────────────────────────────────────
+
+    def get_stats(self) -> Dict:
+        """Statistiques (requetes conditionnelles, 304, resultats stockes, cache L1)"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["l1"] = self._l1.get_stats()
+        return stats
+
+    def clear(self):
+        """Vide le cache L1 (la base n'est pas modifiee)"""
+        self._l1.clear()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INSTANCE GLOBALE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_revalidation_cache: Optional[RevalidationCache] = None
+_revalidation_lock = threading.Lock()
+
+
+def get_revalidation_cache() -> RevalidationCache:
+    """Retourne le cache de revalidation du process (memoire seule tant que non configure)"""
+    global _revalidation_cache
+    if _revalidation_cache is None:
+        with _revalidation_lock:
+            if _revalidation_cache is None:
+                _revalidation_cache = RevalidationCache()
+    return _revalidation_cache
+
+
+def configure_revalidation_cache(db):
+    """Branche le cache de revalidation du process sur la base (http_validators)"""
+    get_revalidation_cache().db = db
+
+
+def fetch_revalidated(url: str, kind: str, analyze: Analyzer, **fetch_kwargs) -> Revalidated:
+    """
+    Requete revalidee via le cache du process (voir RevalidationCache.fetch).
+
+    Si HTTP_REVALIDATION_ENABLED est faux: requete normale et analyse.
+    """
+    if HTTP_REVALIDATION_ENABLED:
+        return get_revalidation_cache().fetch(url, kind, analyze, **fetch_kwargs)
+
+    response = get_crawler().fetch(url, use_cache=True, **fetch_kwargs)
+    if not response.ok:
+        return Revalidated(None, response)
+    return Revalidated(analyze(response), response)
@@ -2,7 +2,8 @@
 Module de monitoring et tracking des appels API.
 
 Fournit des outils pour tracer et analyser les appels API
-(Meta API, ScraperAPI, requetes web).
+(Meta API, ScraperAPI, requetes web), le canal de progression
+des recherches en arriere-plan et le tracing par spans.
 """
 
 from src.infrastructure.monitoring.api_tracker import (
@@ -13,6 +14,17 @@ from src.infrastructure.monitoring.api_tracker import (
     clear_current_tracker,
     track_api_call,
 )
+from src.infrastructure.monitoring.progress_channel import (
+    ProgressChannel,
+    get_progress_channel,
+    publish_progress,
+)
+from src.infrastructure.monitoring.tracing import (
+    Span,
+    Tracer,
+    proxy_label,
+    trace_span,
+)
 
 __all__ = [
     "APICall",
@@ -21,4 +33,11 @@ __all__ = [
     "set_current_tracker",
     "clear_current_tracker",
     "track_api_call",
+    "ProgressChannel",
+    "get_progress_channel",
+    "publish_progress",
+    "Span",
+    "Tracer",
+    "proxy_label",
+    "trace_span",
 ]
@@ -6,9 +6,11 @@ Centralise le monitoring de tous les appels Meta API, ScraperAPI et requetes web
 import time
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from threading import Lock
 
+from src.infrastructure.monitoring.tracing import proxy_label
+
 
 @dataclass
 class APICall:
@@ -38,14 +40,16 @@ class APITracker:
     # Cout par requete ScraperAPI (en $)
     SCRAPER_API_COST_PER_REQUEST = 0.0005  # ~$0.50 pour 1000 requetes
 
-    def __init__(self, search_log_id: int = None, db=None):
+    def __init__(self, search_log_id: int = None, db=None, tracer=None):
         """
         Args:
             search_log_id: ID du SearchLog associe (optionnel)
             db: DatabaseManager pour sauvegarder les appels (optionnel)
+            tracer: Tracer de la recherche; chaque appel y devient un span (optionnel)
         """
         self.search_log_id = search_log_id
         self.db = db
+        self.tracer = tracer
         self.calls: List[APICall] = []
         self._lock = Lock()
 
@@ -81,9 +85,22 @@ class APITracker:
         error_message: str = "",
         response_time_ms: float = 0,
         items_returned: int = 0,
-        response_size: int = 0
+        response_size: int = 0,
+        token: str = "",
+        proxy: str = ""
     ):
-        """Track un appel a l'API Meta"""
+        """
+        Track un appel a l'API Meta.
+        token (nom du token) et proxy (identifiants retires) ne servent qu'au span.
+        """
+        if self.tracer:
+            self.tracer.record(
+                "meta_api", "meta_api", response_time_ms,
+                parent_key=f"keyword:{keyword}" if keyword else None,
+                endpoint=endpoint.split("?", 1)[0], keyword=keyword, status=status_code,
+                bytes=response_size, items=items_returned, token=token,
+                proxy=proxy_label(proxy), error=error_type,
+            )
         with self._lock:
             self._meta_api_calls += 1
             if not success:
@@ -141,6 +158,11 @@ class APITracker:
         response_size: int = 0
     ):
         """Track un appel via ScraperAPI"""
+        if self.tracer:
+            self.tracer.record(
+                "scraper_api", "scraper_api", response_time_ms,
+                url=site_url or url, status=status_code, bytes=response_size, error=error_type,
+            )
         with self._lock:
             self._scraper_api_calls += 1
             if not success:
@@ -209,6 +231,13 @@ class APITracker:
         items_returned: int = 0
     ):
         """Track une requete web directe (sans proxy)"""
+        if self.tracer:
+            self.tracer.record(
+                "web_request", "web", response_time_ms,
+                parent_key=f"page:{page_id}" if page_id else None,
+                url=url, page_id=page_id, status=status_code, bytes=response_size,
+                items=items_returned, error=error_type,
+            )
         with self._lock:
             self._web_requests += 1
             if not success:
@@ -294,14 +323,16 @@ class APITracker:
         }
 
     def save_calls_to_db(self):
-        """Sauvegarde tous les appels en base de donnees"""
+        """Sauvegarde tous les appels en base de donnees (ecriture differee par lots)"""
         if not self.db or not self.search_log_id:
             return
 
         try:
             # Import local pour eviter les imports circulaires
-            from src.infrastructure.persistence.database import save_api_calls
-            save_api_calls(self.db, self.search_log_id, self.calls)
+            from src.infrastructure.persistence.database import queue_api_calls
+            with self._lock:
+                calls = [asdict(call) for call in self.calls]
+            queue_api_calls(self.db, self.search_log_id, calls)
         except Exception as e:
             print(f"Erreur sauvegarde API calls: {e}")
 
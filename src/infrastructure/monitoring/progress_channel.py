@@ -0,0 +1,283 @@
+"""
+Canal de progression en memoire des recherches en arriere-plan.
+
+Les mises a jour de progression (une par mot-cle, une par site analyse...)
+ne partent plus chacune en BDD:
+- l'etat courant de chaque recherche est fusionne en memoire (version incrementee)
+- les abonnes (endpoint SSE) sont notifies a chaque publication
+- un thread de fond ecrit la ligne SearchQueue au plus une fois par intervalle
+- les evenements importants (debut/fin de phase) forcent l'ecriture immediate
+
+L'etat final (statut termine/echoue) reste en memoire quelques minutes pour
+que les clients connectes recoivent le dernier evenement.
+"""
+import atexit
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.infrastructure.config import (
+    PROGRESS_CHANNEL_ENABLED,
+    PROGRESS_FLUSH_INTERVAL_MS,
+    PROGRESS_RETENTION_SECONDS,
+)
+
+# Ecrivain de la progression: writer(db, search_id, fields)
+Writer = Callable[[Any, int, Dict], Any]
+# Abonne: listener() appele (sans argument) a chaque changement d'etat
+Listener = Callable[[], Any]
+
+# Champs ecrits en BDD (arguments de update_search_queue_progress)
+PROGRESS_FIELDS = ("phase", "phase_name", "percent", "message", "phases_data")
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class ProgressChannel:
+    """
+    Etat de progression par recherche, ecrit en BDD par lots temporises.
+    Thread-safe; le thread d'ecriture demarre a la premiere publication.
+    """
+
+    def __init__(
+        self,
+        writer: Writer,
+        flush_interval_ms: int = PROGRESS_FLUSH_INTERVAL_MS,
+        retention_seconds: float = PROGRESS_RETENTION_SECONDS
+    ):
+        """
+        Args:
+            writer: writer(db, search_id, fields) - ecriture de la progression
+            flush_interval_ms: Delai min entre deux ecritures d'une recherche (ms)
+            retention_seconds: Conservation de l'etat final apres la fin
+        """
+        self._writer = writer
+        self.flush_interval = max(10, flush_interval_ms) / 1000
+        self.retention_seconds = retention_seconds
+
+        self._states: Dict[int, Dict] = {}
+        self._dirty: Dict[int, Tuple[Any, Dict]] = {}
+        self._finished: Dict[int, float] = {}
+        self._listeners: Dict[int, List[Listener]] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._published = 0
+        self._writes = 0
+        self._failed = 0
+
+    # ─── Publication ─────────────────────────────────────────────────────────
+
+    def publish(self, db, search_id: int, force: bool = False, **fields) -> int:
+        """
+        Publie une mise a jour (fusionnee avec l'etat courant).
+
+        Args:
+            db: DatabaseManager (ecriture BDD)
+            search_id: ID de la recherche dans SearchQueue
+            force: Ecrire immediatement en BDD (debut/fin de phase)
+            **fields: phase, phase_name, percent, message, phases_data, status
+
+        Returns:
+            Version de l'etat apres publication
+        """
+        with self._cond:
+            version = self._merge(search_id, fields)
+            persisted = {k: v for k, v in fields.items() if k in PROGRESS_FIELDS and v is not None}
+            if persisted:
+                pending = self._dirty.get(search_id, (db, {}))[1]
+                pending.update(persisted)
+                self._dirty[search_id] = (db, pending)
+            self._published += 1
+            listeners = list(self._listeners.get(search_id, ()))
+
+        self._notify(listeners)
+        if force:
+            self.flush(search_id)
+        else:
+            self._ensure_started()
+        return version
+
+    def finish(self, search_id: int, status: str, **fields) -> int:
+        """
+        Marque la fin d'une recherche: la progression en attente est ecrite,
+        l'etat final reste disponible pour les abonnes pendant la retention.
+        Le statut lui-meme est ecrit par l'appelant (update_search_queue_status).
+        """
+        self.flush(search_id)
+        with self._cond:
+            version = self._merge(search_id, dict(fields, status=status))
+            self._finished[search_id] = time.monotonic()
+            listeners = list(self._listeners.get(search_id, ()))
+            self._purge()
+        self._notify(listeners)
+        return version
+
+    def _merge(self, search_id: int, fields: Dict) -> int:
+        """Fusionne les champs dans l'etat (appele avec le lock)"""
+        state = self._states.setdefault(search_id, {"search_id": search_id, "version": 0})
+        for key, value in fields.items():
+            if value is not None:
+                state[key] = value
+        state["version"] += 1
+        state["updated_at"] = time.time()
+        return state["version"]
+
+    def _purge(self):
+        """Oublie les recherches terminees depuis plus que la retention (appele avec le lock)"""
+        limit = time.monotonic() - self.retention_seconds
+        for search_id in [sid for sid, at in self._finished.items() if at < limit]:
+            self._finished.pop(search_id, None)
+            self._states.pop(search_id, None)
+
+    @staticmethod
+    def _notify(listeners: List[Listener]):
+        for listener in listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"⚠️ Progression: erreur abonne: {e}")
+
+    # ─── Lecture / abonnement ────────────────────────────────────────────────
+
+    def get_state(self, search_id: int) -> Optional[Dict]:
+        """Copie de l'etat courant (None si la recherche n'est pas suivie ici)"""
+        with self._cond:
+            state = self._states.get(search_id)
+            return dict(state) if state is not None else None
+
+    def subscribe(self, search_id: int, listener: Listener) -> Callable[[], None]:
+        """
+        Abonne un listener aux changements d'une recherche.
+        Le listener est appele depuis le thread qui publie: il doit etre rapide
+        (ex: loop.call_soon_threadsafe(event.set)).
+
+        Returns:
+            Fonction de desabonnement
+        """
+        with self._cond:
+            self._listeners.setdefault(search_id, []).append(listener)
+
+        def unsubscribe():
+            with self._cond:
+                listeners = self._listeners.get(search_id)
+                if listeners and listener in listeners:
+                    listeners.remove(listener)
+                    if not listeners:
+                        del self._listeners[search_id]
+
+        return unsubscribe
+
+    # ─── Ecriture BDD ────────────────────────────────────────────────────────
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="progress_channel")
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self, search_id: Optional[int] = None) -> int:
+        """
+        Ecrit immediatement la progression en attente.
+
+        Args:
+            search_id: Recherche a ecrire (None = toutes)
+
+        Returns:
+            Nombre de recherches ecrites
+        """
+        written = 0
+        with self._flush_lock:
+            with self._cond:
+                if search_id is None:
+                    batch = list(self._dirty.items())
+                    self._dirty.clear()
+                elif search_id in self._dirty:
+                    batch = [(search_id, self._dirty.pop(search_id))]
+                else:
+                    batch = []
+
+            for sid, (db, fields) in batch:
+                try:
+                    self._writer(db, sid, fields)
+                    written += 1
+                except Exception as e:
+                    print(f"⚠️ Progression: echec ecriture recherche #{sid}: {e}")
+                    with self._cond:
+                        self._failed += 1
+
+        with self._cond:
+            self._writes += written
+        return written
+
+    def close(self, timeout: float = 5.0):
+        """Arrete le thread et ecrit la progression en attente"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        """Statistiques du canal (pour affichage/monitoring)"""
+        with self._cond:
+            return {
+                "searches": len(self._states),
+                "pending": len(self._dirty),
+                "subscribers": sum(len(listeners) for listeners in self._listeners.values()),
+                "published": self._published,
+                "writes": self._writes,
+                "failed": self._failed,
+            }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CANAL GLOBAL (recherches en arriere-plan du process)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_channel: Optional[ProgressChannel] = None
+_channel_lock = threading.Lock()
+
+
+def _write_progress(db, search_id: int, fields: Dict):
+    # Import local pour eviter les imports circulaires
+    from src.infrastructure.persistence.repositories.search_repository import (
+        update_search_queue_progress,
+    )
+    update_search_queue_progress(db, search_id, **fields)
+
+
+def get_progress_channel() -> ProgressChannel:
+    """
+    Retourne le canal global (cree au premier appel, vide a l'arret du process).
+    Canal desactive: chaque publication est ecrite immediatement (ancien comportement).
+    """
+    global _channel
+    if _channel is None:
+        with _channel_lock:
+            if _channel is None:
+                _channel = ProgressChannel(_write_progress)
+                atexit.register(_channel.close)
+    return _channel
+
+
+def publish_progress(db, search_id: int, force: bool = False, **fields) -> int:
+    """Publie la progression d'une recherche sur le canal global"""
+    return get_progress_channel().publish(
+        db, search_id, force=force or not PROGRESS_CHANNEL_ENABLED, **fields
+    )
@@ -0,0 +1,311 @@
+"""
+Tracing leger des recherches par spans imbriques.
+
+Une recherche produit un arbre de spans:
+    search -> phase -> mot-cle / page -> appel HTTP / ecriture BDD
+chacun avec ses attributs (token, proxy, octets, statut...).
+
+- Parent d'un span: le span ouvert du thread courant; a defaut (threads
+  du pipeline, pool d'analyse web) le span ouvert du thread proprietaire
+  (la phase en cours).
+- Un span ouvert avec une cle (ex: "keyword:bijoux") n'est pas empile: il
+  est designe par sa cle (parent_key) et peut etre ferme depuis un autre
+  thread ou une autre tache asyncio (mots-cles concurrents d'une boucle).
+- Nombre de spans borne: au-dela, les spans detailles sont abandonnes et
+  comptes (search et phases sont toujours conserves).
+
+Exports:
+- to_chrome_trace(): format "Trace Event" (chrome://tracing, Perfetto)
+- summary(): resume par categorie, spans les plus lents et piles
+  "folded" (self time en ms) pour flamegraph.pl / speedscope
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.infrastructure.config import (
+    TRACE_MAX_SPANS,
+    TRACE_SUMMARY_TOP,
+    TRACE_FOLDED_LIMIT,
+)
+
+# Categories toujours conservees (structure de l'arbre)
+_ALWAYS_KEPT = ("search", "phase")
+
+
+class Span:
+    """Intervalle de temps nomme, avec attributs et parent"""
+
+    __slots__ = ("span_id", "parent_id", "name", "category", "start_ns", "end_ns",
+                 "thread_id", "attrs", "key")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, category: str,
+                 start_ns: int, thread_id: int, attrs: Dict[str, Any], key: Optional[str] = None):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.start_ns = start_ns
+        self.end_ns: Optional[int] = None
+        self.thread_id = thread_id
+        self.attrs = attrs
+        self.key = key
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+
+class Tracer:
+    """
+    Collecte des spans d'une recherche. Thread-safe.
+    Le thread qui cree le tracer en est le proprietaire (parent par defaut).
+    """
+
+    def __init__(self, name: str = "search", max_spans: int = TRACE_MAX_SPANS, **attrs):
+        """
+        Args:
+            name: Nom du span racine
+            max_spans: Spans conserves au maximum (hors search/phases)
+            **attrs: Attributs du span racine (search_id, keywords...)
+        """
+        self.max_spans = max_spans
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+        self._stacks: Dict[int, List[Span]] = {}
+        self._keyed: Dict[str, Span] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._next_id = 1
+        self._dropped = 0
+        self._owner = threading.get_ident()
+        self._epoch_ns = time.perf_counter_ns()
+        self.started_at = time.time()
+        self.root = self.begin(name, "search", **attrs)
+
+    # ─── Ouverture / fermeture ───────────────────────────────────────────────
+
+    def _default_parent(self, thread_id: int) -> Optional[Span]:
+        """Parent implicite (appele avec le lock)"""
+        stack = self._stacks.get(thread_id) or self._stacks.get(self._owner)
+        return stack[-1] if stack else None
+
+    def _new_span(self, name: str, category: str, parent: Optional[Span],
+                  parent_key: Optional[str], start_ns: int, attrs: Dict, key: Optional[str]) -> Span:
+        """Cree et enregistre un span (appele avec le lock)"""
+        thread_id = threading.get_ident()
+        if parent is None and parent_key:
+            parent = self._keyed.get(parent_key)
+        if parent is None:
+            parent = self._default_parent(thread_id)
+
+        span = Span(self._next_id, parent.span_id if parent else None, name, category,
+                    start_ns, thread_id, attrs, key)
+        self._next_id += 1
+        if thread_id not in self._thread_names:
+            self._thread_names[thread_id] = threading.current_thread().name
+
+        if len(self._spans) < self.max_spans or category in _ALWAYS_KEPT:
+            self._spans.append(span)
+        else:
+            self._dropped += 1
+        return span
+
+    def begin(self, name: str, category: str = "", parent: Span = None,
+              key: str = None, parent_key: str = None, **attrs) -> Span:
+        """
+        Ouvre un span sur le thread courant (a fermer avec end()).
+
+        Args:
+            name: Nom du span (agrege tel quel dans le resume)
+            category: search, phase, keyword, page, meta_api, web, db...
+            parent: Parent explicite (sinon: span ouvert du thread / de la phase)
+            key: Cle permettant a d'autres spans de s'y rattacher (span non empile)
+            parent_key: Cle du parent (ignoree si aucun span ouvert sous cette cle)
+        """
+        with self._lock:
+            span = self._new_span(name, category, parent, parent_key,
+                                  time.perf_counter_ns(), attrs, key)
+            if key:
+                self._keyed[key] = span
+            else:
+                self._stacks.setdefault(span.thread_id, []).append(span)
+            return span
+
+    def end(self, span: Span, **attrs):
+        """Ferme un span (depuis n'importe quel thread)"""
+        with self._lock:
+            if span.end_ns is not None:
+                return
+            span.end_ns = time.perf_counter_ns()
+            span.attrs.update(attrs)
+            stack = self._stacks.get(span.thread_id)
+            if stack and span in stack:
+                stack.remove(span)
+                if not stack:
+                    del self._stacks[span.thread_id]
+            if span.key and self._keyed.get(span.key) is span:
+                del self._keyed[span.key]
+
+    def end_key(self, key: str, **attrs) -> bool:
+        """Ferme le span ouvert sous une cle (False si aucun)"""
+        with self._lock:
+            span = self._keyed.get(key)
+        if span is None:
+            return False
+        self.end(span, **attrs)
+        return True
+
+    @contextmanager
+    def span(self, name: str, category: str = "", **attrs) -> Iterator[Span]:
+        """Span autour d'un bloc; une exception est notee dans l'attribut error"""
+        span = self.begin(name, category, **attrs)
+        try:
+            yield span
+        except BaseException as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self.end(span)
+
+    def record(self, name: str, category: str = "", duration_ms: float = 0,
+               parent_key: str = None, **attrs) -> Span:
+        """
+        Enregistre un span deja termine (se terminant maintenant), par exemple
+        un appel HTTP dont la duree a ete mesuree par l'appelant.
+        """
+        end_ns = time.perf_counter_ns()
+        start_ns = max(self._epoch_ns, end_ns - int(duration_ms * 1e6))
+        with self._lock:
+            span = self._new_span(name, category, None, parent_key, start_ns, attrs, None)
+            span.end_ns = end_ns
+            return span
+
+    def finish(self, **attrs):
+        """Ferme tous les spans encore ouverts puis le span racine"""
+        with self._lock:
+            still_open = [s for stack in self._stacks.values() for s in stack if s is not self.root]
+            still_open.extend(self._keyed.values())
+        for span in still_open:
+            self.end(span, unfinished=True)
+        self.end(self.root, **attrs)
+
+    # ─── Exports ─────────────────────────────────────────────────────────────
+
+    def _snapshot(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def to_chrome_trace(self) -> Dict:
+        """Evenements au format Chrome Trace Event ("X" = span complet, microsecondes)"""
+        now = time.perf_counter_ns()
+        spans = self._snapshot()
+        with self._lock:
+            thread_names = dict(self._thread_names)
+
+        tids: Dict[int, int] = {}
+        events = []
+        for span in spans:
+            tid = tids.setdefault(span.thread_id, len(tids) + 1)
+            end = span.end_ns if span.end_ns is not None else now
+            events.append({
+                "name": span.name,
+                "cat": span.category or "default",
+                "ph": "X",
+                "ts": round((span.start_ns - self._epoch_ns) / 1000, 1),
+                "dur": round((end - span.start_ns) / 1000, 1),
+                "pid": 1,
+                "tid": tid,
+                "args": {**span.attrs, "span_id": span.span_id, "parent_id": span.parent_id},
+            })
+        for thread_id, tid in tids.items():
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                "args": {"name": thread_names.get(thread_id, str(thread_id))},
+            })
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"started_at": self.started_at, "dropped_spans": self._dropped},
+        }
+
+    def summary(self, top: int = TRACE_SUMMARY_TOP, folded_limit: int = TRACE_FOLDED_LIMIT) -> Dict:
+        """
+        Resume du trace:
+        - by_category: nombre, total et max (ms) par categorie
+        - phases: duree de chaque phase
+        - slowest: spans detailles les plus lents avec leurs attributs
+        - folded: piles "racine;phase;...;span self_ms" triees par self time
+        """
+        spans = self._snapshot()
+        by_id = {span.span_id: span for span in spans}
+
+        children_ms: Dict[int, float] = {}
+        for span in spans:
+            if span.parent_id in by_id:
+                children_ms[span.parent_id] = children_ms.get(span.parent_id, 0.0) + span.duration_ms
+
+        by_category: Dict[str, Dict] = {}
+        folded: Dict[str, float] = {}
+        for span in spans:
+            duration = span.duration_ms
+            stats = by_category.setdefault(span.category or "default",
+                                           {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += duration
+            stats["max_ms"] = max(stats["max_ms"], duration)
+
+            # Les enfants concurrents (threads) peuvent depasser le parent: self time >= 0
+            self_ms = max(0.0, duration - children_ms.get(span.span_id, 0.0))
+            path = [span.name]
+            parent = by_id.get(span.parent_id)
+            while parent is not None:
+                path.append(parent.name)
+                parent = by_id.get(parent.parent_id)
+            stack = ";".join(reversed(path))
+            folded[stack] = folded.get(stack, 0.0) + self_ms
+
+        for stats in by_category.values():
+            stats["total_ms"] = round(stats["total_ms"], 1)
+            stats["max_ms"] = round(stats["max_ms"], 1)
+
+        detailed = [s for s in spans if s.category not in _ALWAYS_KEPT]
+        detailed.sort(key=lambda s: s.duration_ms, reverse=True)
+
+        return {
+            "total_ms": round(self.root.duration_ms, 1),
+            "spans": len(spans),
+            "dropped_spans": self._dropped,
+            "by_category": by_category,
+            "phases": [
+                {"name": s.name, "ms": round(s.duration_ms, 1)}
+                for s in spans if s.category == "phase"
+            ],
+            "slowest": [
+                {"name": s.name, "category": s.category, "ms": round(s.duration_ms, 1), "attrs": s.attrs}
+                for s in detailed[:top]
+            ],
+            "folded": [
+                f"{stack} {round(ms, 1)}"
+                for stack, ms in sorted(folded.items(), key=lambda item: item[1], reverse=True)[:folded_limit]
+            ],
+        }
+
+
+@contextmanager
+def trace_span(tracer: Optional[Tracer], name: str, category: str = "", **attrs) -> Iterator[Optional[Span]]:
+    """Tracer.span() si un tracer est fourni, sinon bloc sans effet"""
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, category, **attrs) as span:
+        yield span
+
+
+def proxy_label(proxy: Optional[str]) -> str:
+    """Hote:port d'une URL de proxy, sans identifiants (attribut de span)"""
+    if not proxy:
+        return ""
+    return proxy.rsplit("@", 1)[-1].split("://", 1)[-1]
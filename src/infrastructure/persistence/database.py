@@ -66,7 +66,8 @@ from src.infrastructure.persistence.models import (
     PageNote, Favorite, Collection, CollectionPage, Blacklist, SavedFilter,
     ScheduledScan, SearchLog, PageSearchHistory, WinningAdSearchHistory,
     SearchQueue, APICallLog, UserSettings, ClassificationTaxonomy,
-    MetaToken, TokenUsageLog, AppSettings, APICache,
+    MetaToken, TokenUsageLog, AppSettings, APICache, CacheLease,
+    DomainFingerprint,
 )
 
 # Repository functions (re-exports pour compatibilite)
@@ -90,7 +91,9 @@ from src.infrastructure.persistence.repositories import (
     get_scheduled_scans, create_scheduled_scan, update_scheduled_scan,
     delete_scheduled_scan, mark_scan_executed,
     generate_cache_key, get_cached_response, set_cached_response,
-    get_cache_stats, clear_expired_cache, clear_all_cache,
+    get_cache_stats, clear_expired_cache, clear_all_cache, flush_cache_hits, get_l1_cache_stats,
+    acquire_cache_lease, release_cache_lease, is_cache_lease_active,
+    get_http_validator, bulk_save_http_validators,
     get_all_taxonomy, get_taxonomy_by_category, get_taxonomy_categories,
     add_taxonomy_entry, update_taxonomy_entry, delete_taxonomy_entry,
     init_default_taxonomy, build_taxonomy_prompt, get_unclassified_pages,
@@ -99,24 +102,32 @@ from src.infrastructure.persistence.repositories import (
     add_meta_token, get_all_meta_tokens, get_active_meta_tokens,
     get_active_meta_tokens_with_proxies, update_meta_token, delete_meta_token,
     record_token_usage, clear_rate_limit, reset_token_stats, log_token_usage,
+    bulk_record_token_usage, bulk_log_token_usage,
     get_token_usage_logs, get_token_stats_detailed, verify_meta_token, verify_all_tokens,
     save_pages_recherche, save_suivi_page, save_ads_recherche,
     get_all_pages, get_page_history, get_page_evolution_history, get_evolution_stats, get_all_countries, get_all_subcategories,
     add_country_to_page, get_pages_count, migration_add_country_to_all_pages,
     get_suivi_stats_filtered, get_cached_pages_info, get_dashboard_trends,
+    get_domain_fingerprints, bulk_save_domain_fingerprints,
     get_archive_stats, archive_old_data,
-    is_winning_ad, save_winning_ads, cleanup_duplicate_winning_ads,
+    is_winning_ad, match_winning_criteria, save_winning_ads, cleanup_duplicate_winning_ads,
     get_winning_ads, get_winning_ads_filtered, get_winning_ads_stats,
     get_winning_ads_by_page, get_winning_ads_count_by_page,
     create_search_log, update_search_log, complete_search_log, get_search_logs,
-    delete_search_log, save_api_calls, create_search_queue, get_search_queue,
+    delete_search_log, save_api_calls, bulk_save_api_calls, create_search_queue, get_search_queue,
     update_search_queue_status, update_search_queue_progress, cancel_search_queue,
     get_pending_searches, get_queue_stats, get_interrupted_searches, restart_search_queue, recover_interrupted_searches,
+    save_search_checkpoint, get_search_checkpoint, clear_search_checkpoint,
+    save_search_trace, get_search_trace,
     record_page_search_history, record_pages_search_history_batch,
     record_winning_ad_search_history, record_winning_ads_search_history_batch,
     get_search_history_stats, get_search_log_stats, update_search_log_phases, get_search_logs_stats,
     get_pages_for_search, get_winning_ads_for_search, get_ads_for_search,
 )
+from src.infrastructure.persistence.write_behind import (
+    queue_token_usage, queue_token_usage_log, queue_api_calls,
+    flush_write_behind, get_write_behind_stats,
+)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -303,6 +314,11 @@ def _run_migrations(db: DatabaseManager):
         ("scheduled_scans", "user_id", "ALTER TABLE scheduled_scans ADD COLUMN IF NOT EXISTS user_id UUID"),
         ("search_logs", "user_id", "ALTER TABLE search_logs ADD COLUMN IF NOT EXISTS user_id UUID"),
         ("search_queue", "user_id", "ALTER TABLE search_queue ADD COLUMN IF NOT EXISTS user_id UUID"),
+        ("search_queue", "checkpoint_data", "ALTER TABLE search_queue ADD COLUMN IF NOT EXISTS checkpoint_data TEXT"),
+        ("search_logs", "trace_summary", "ALTER TABLE search_logs ADD COLUMN IF NOT EXISTS trace_summary TEXT"),
+        ("search_logs", "trace_data", "ALTER TABLE search_logs ADD COLUMN IF NOT EXISTS trace_data TEXT"),
+        ("api_cache", "response_blob", "ALTER TABLE api_cache ADD COLUMN IF NOT EXISTS response_blob BYTEA"),
+        ("api_cache", "compression", "ALTER TABLE api_cache ADD COLUMN IF NOT EXISTS compression VARCHAR(10)"),
         ("liste_ads_recherche", "user_id", "ALTER TABLE liste_ads_recherche ADD COLUMN IF NOT EXISTS user_id UUID"),
         ("winning_ads", "user_id", "ALTER TABLE winning_ads ADD COLUMN IF NOT EXISTS user_id UUID"),
     ]
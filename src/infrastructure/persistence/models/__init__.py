@@ -3,12 +3,12 @@ Modeles SQLAlchemy - exports centralises.
 
 Organisation par domaine:
 - base: Base declarative
-- page_models: Pages et suivi
+- page_models: Pages, suivi et empreintes de domaines
 - ads_models: Publicites et winning ads
 - organization_models: Tags, collections, blacklist
 - search_models: Logs et historique recherche
 - settings_models: Parametres et tokens
-- cache_models: Cache API
+- cache_models: Cache API et validateurs HTTP
 """
 
 from src.infrastructure.persistence.models.base import Base
@@ -17,6 +17,7 @@ from src.infrastructure.persistence.models.page_models import (
     PageRecherche,
     SuiviPage,
     SuiviPageArchive,
+    DomainFingerprint,
 )
 
 from src.infrastructure.persistence.models.ads_models import (
@@ -56,6 +57,8 @@ from src.infrastructure.persistence.models.settings_models import (
 
 from src.infrastructure.persistence.models.cache_models import (
     APICache,
+    CacheLease,
+    HttpValidator,
 )
 
 from src.infrastructure.persistence.models.auth_models import (
@@ -71,6 +74,7 @@ __all__ = [
     "PageRecherche",
     "SuiviPage",
     "SuiviPageArchive",
+    "DomainFingerprint",
     # Ads
     "AdsRecherche",
     "WinningAds",
@@ -100,6 +104,8 @@ __all__ = [
     "AppSettings",
     # Cache
     "APICache",
+    "CacheLease",
+    "HttpValidator",
     # Auth
     "UserModel",
     "AuditLog",
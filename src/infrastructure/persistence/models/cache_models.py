@@ -1,8 +1,8 @@
 """
-Modeles SQLAlchemy pour le cache API.
+Modeles SQLAlchemy pour le cache API et la revalidation HTTP.
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, Text, Index
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index, LargeBinary
 
 from src.infrastructure.persistence.models.base import Base
 
@@ -14,7 +14,9 @@ class APICache(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     cache_key = Column(String(255), unique=True, nullable=False, index=True)
     cache_type = Column(String(50))
-    response_data = Column(Text)
+    response_data = Column(Text)  # Ancien format (JSON en clair), lu si response_blob est vide
+    response_blob = Column(LargeBinary, nullable=True)  # JSON compresse
+    compression = Column(String(10), nullable=True)  # "zstd" ou "gzip"
     created_at = Column(DateTime, default=datetime.utcnow)
     expires_at = Column(DateTime, nullable=False)
     hit_count = Column(Integer, default=0)
@@ -23,3 +25,40 @@ class APICache(Base):
         Index('idx_cache_expires', 'expires_at'),
         Index('idx_cache_type', 'cache_type'),
     )
+
+
+class CacheLease(Base):
+    """
+    Bail sur une cle de cache: le process qui le detient est seul a appeler
+    l'API pour cette cle, les autres attendent que le cache soit rempli.
+    """
+    __tablename__ = "api_cache_leases"
+
+    cache_key = Column(String(255), primary_key=True)
+    owner = Column(String(255), nullable=False)
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class HttpValidator(Base):
+    """
+    Validateurs HTTP d'une URL (ETag, Last-Modified, Content-Length) et
+    resultat de l'analyse de la derniere version telechargee: reutilise tel
+    quel quand le site repond 304 Not Modified a une requete conditionnelle.
+    """
+    __tablename__ = "http_validators"
+
+    cache_key = Column(String(255), primary_key=True)  # "{kind}:{hash de l'URL normalisee}"
+    kind = Column(String(50), nullable=False)  # Analyse stockee (sitemap_index, homepage...)
+    url = Column(Text, nullable=False)
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(64), nullable=True)
+    content_length = Column(Integer, nullable=True)
+    result_blob = Column(LargeBinary, nullable=True)  # Resultat JSON compresse
+    compression = Column(String(10), nullable=True)
+    changed_at = Column(DateTime, default=datetime.utcnow)  # Derniere reponse 200
+    checked_at = Column(DateTime, default=datetime.utcnow)  # Derniere revalidation
+
+    __table_args__ = (
+        Index('idx_http_validators_checked', 'checked_at'),
+    )
@@ -5,6 +5,7 @@ Multi-tenancy:
 --------------
 Toutes les tables ont une colonne user_id pour isoler les donnees par utilisateur.
 user_id = None signifie donnees systeme/partagees.
+Exception: domain_fingerprints (observations publiques d'un site, partagees).
 """
 from datetime import datetime
 from sqlalchemy import Column, String, Integer, DateTime, Text, Float, Index, Boolean
@@ -94,3 +95,41 @@ class SuiviPageArchive(Base):
     nombre_produits = Column(Integer, default=0)
     date_scan = Column(DateTime)
     archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DomainFingerprint(Base):
+    """
+    Table domain_fingerprints - Empreinte d'un site, partagee entre utilisateurs.
+
+    Uniquement ce qui est observe sur le site public (CMS, theme, paiements,
+    devise, produits, contenu et classification): rien de ce qu'un
+    utilisateur saisit ou modifie (nom de page, mots-cles, etat, notes,
+    thematique corrigee...) n'y est ecrit, ces donnees restent dans
+    liste_page_recherche (par user_id).
+    """
+    __tablename__ = "domain_fingerprints"
+
+    domain = Column(String(255), primary_key=True)  # Hote en minuscules, sans "www."
+    cms = Column(String(50))
+    cms_checked_at = Column(DateTime)
+    theme = Column(String(100))
+    payments = Column(Text)
+    currency = Column(String(10))
+    thematique = Column(String(100))  # Classification par mots-cles (analyse web)
+    type_produits = Column(Text)
+    product_count = Column(Integer)
+    product_count_country = Column(String(10))  # Pays du sitemap compte
+    site_title = Column(String(255))
+    site_description = Column(Text)
+    site_h1 = Column(String(200))
+    site_keywords = Column(String(300))
+    analyzed_at = Column(DateTime)
+    category = Column(String(100))  # Classification Gemini
+    subcategory = Column(String(100))
+    classification_confidence = Column(Float)
+    classified_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_fingerprint_updated', 'updated_at'),
+    )
@@ -70,6 +70,10 @@ class SearchLog(Base):
     page_ids = Column(Text)  # JSON array of page_ids
     winning_ad_ids = Column(Text)  # JSON array of ad_ids
 
+    # Tracing par spans (resume JSON + trace Chrome compresse zlib + base64)
+    trace_summary = Column(Text)
+    trace_data = Column(Text)
+
     __table_args__ = (
         Index('idx_search_log_user', 'user_id'),
         Index('idx_search_log_date', 'started_at'),
@@ -140,6 +144,7 @@ class SearchQueue(Base):
     progress_percent = Column(Integer, default=0)
     progress_message = Column(Text)
     phases_data = Column(Text)
+    checkpoint_data = Column(Text, nullable=True)  # Point de reprise (JSON compresse zlib + base64)
 
     search_log_id = Column(Integer, nullable=True)
     error_message = Column(Text, nullable=True)
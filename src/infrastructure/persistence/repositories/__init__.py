@@ -5,7 +5,7 @@ Ce module expose les fonctions de repositories par domaine:
 - database_manager: Gestionnaire de base de donnees
 - settings_repository: Parametres application/utilisateur
 - organization_repository: Tags, blacklist, favoris, collections
-- cache_repository: Cache API
+- cache_repository: Cache API et validateurs HTTP
 - taxonomy_repository: Classification des pages
 """
 
@@ -91,6 +91,13 @@ from src.infrastructure.persistence.repositories.cache_repository import (
     get_cache_stats,
     clear_expired_cache,
     clear_all_cache,
+    flush_cache_hits,
+    get_l1_cache_stats,
+    acquire_cache_lease,
+    release_cache_lease,
+    is_cache_lease_active,
+    get_http_validator,
+    bulk_save_http_validators,
 )
 
 from src.infrastructure.persistence.repositories.taxonomy_repository import (
@@ -117,9 +124,11 @@ from src.infrastructure.persistence.repositories.token_repository import (
     update_meta_token,
     delete_meta_token,
     record_token_usage,
+    bulk_record_token_usage,
     clear_rate_limit,
     reset_token_stats,
     log_token_usage,
+    bulk_log_token_usage,
     get_token_usage_logs,
     get_token_stats_detailed,
     verify_meta_token,
@@ -141,6 +150,8 @@ from src.infrastructure.persistence.repositories.page_repository import (
     migration_add_country_to_all_pages,
     get_suivi_stats_filtered,
     get_cached_pages_info,
+    get_domain_fingerprints,
+    bulk_save_domain_fingerprints,
     get_dashboard_trends,
     get_archive_stats,
     archive_old_data,
@@ -149,6 +160,7 @@ from src.infrastructure.persistence.repositories.page_repository import (
 
 from src.infrastructure.persistence.repositories.winning_ad_repository import (
     is_winning_ad,
+    match_winning_criteria,
     save_winning_ads,
     cleanup_duplicate_winning_ads,
     get_winning_ads,
@@ -166,6 +178,7 @@ from src.infrastructure.persistence.repositories.search_repository import (
     get_search_logs,
     delete_search_log,
     save_api_calls,
+    bulk_save_api_calls,
     create_search_queue,
     get_search_queue,
     update_search_queue_status,
@@ -176,6 +189,11 @@ from src.infrastructure.persistence.repositories.search_repository import (
     get_interrupted_searches,
     restart_search_queue,
     recover_interrupted_searches,
+    save_search_checkpoint,
+    get_search_checkpoint,
+    clear_search_checkpoint,
+    save_search_trace,
+    get_search_trace,
     record_page_search_history,
     record_pages_search_history_batch,
     record_winning_ad_search_history,
@@ -263,6 +281,13 @@ __all__ = [
     "get_cache_stats",
     "clear_expired_cache",
     "clear_all_cache",
+    "flush_cache_hits",
+    "get_l1_cache_stats",
+    "acquire_cache_lease",
+    "release_cache_lease",
+    "is_cache_lease_active",
+    "get_http_validator",
+    "bulk_save_http_validators",
     # Taxonomy
     "get_all_taxonomy",
     "get_taxonomy_by_category",
@@ -285,9 +310,11 @@ __all__ = [
     "update_meta_token",
     "delete_meta_token",
     "record_token_usage",
+    "bulk_record_token_usage",
     "clear_rate_limit",
     "reset_token_stats",
     "log_token_usage",
+    "bulk_log_token_usage",
     "get_token_usage_logs",
     "get_token_stats_detailed",
     "verify_meta_token",
@@ -307,12 +334,15 @@ __all__ = [
     "migration_add_country_to_all_pages",
     "get_suivi_stats_filtered",
     "get_cached_pages_info",
+    "get_domain_fingerprints",
+    "bulk_save_domain_fingerprints",
     "get_dashboard_trends",
     "get_archive_stats",
     "archive_old_data",
     "recalculate_all_page_states",
     # Winning Ads
     "is_winning_ad",
+    "match_winning_criteria",
     "save_winning_ads",
     "cleanup_duplicate_winning_ads",
     "get_winning_ads",
@@ -328,6 +358,7 @@ __all__ = [
     "get_search_logs",
     "delete_search_log",
     "save_api_calls",
+    "bulk_save_api_calls",
     "create_search_queue",
     "get_search_queue",
     "update_search_queue_status",
@@ -338,6 +369,11 @@ __all__ = [
     "get_interrupted_searches",
     "restart_search_queue",
     "recover_interrupted_searches",
+    "save_search_checkpoint",
+    "get_search_checkpoint",
+    "clear_search_checkpoint",
+    "save_search_trace",
+    "get_search_trace",
     "record_page_search_history",
     "record_pages_search_history_batch",
     "record_winning_ad_search_history",
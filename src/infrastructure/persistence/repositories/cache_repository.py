@@ -1,14 +1,109 @@
 """
-Repository pour le cache API.
+Repository pour le cache API et les validateurs HTTP (revalidation).
+
+Les reponses sont stockees compressees (zstd si disponible, sinon gzip)
+dans api_cache.response_blob. Un cache L1 en memoire (LRU borne en octets)
+evite l'aller-retour en base pour les cles chaudes, et les hit_count sont
+ecrits par lots au lieu d'une transaction par lecture.
 """
+import gzip
 import hashlib
 import json
+import time
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from src.infrastructure.cache.lru_cache import BoundedLRUCache
+from src.infrastructure.config import (
+    API_CACHE_L1_MAX_ENTRIES,
+    API_CACHE_L1_MAX_BYTES,
+    API_CACHE_HIT_FLUSH_INTERVAL,
+    API_CACHE_HIT_FLUSH_THRESHOLD,
+)
+from src.infrastructure.persistence.models import APICache, CacheLease, HttpValidator
+
+try:
+    import zstandard
+except ImportError:  # Dependance optionnelle: gzip sinon
+    zstandard = None
+
+
+# Cache L1: cle -> (payload compresse, compression)
+_l1_cache = BoundedLRUCache(max_entries=API_CACHE_L1_MAX_ENTRIES, max_bytes=API_CACHE_L1_MAX_BYTES)
+
+# hit_count en attente d'ecriture
+_pending_hits: Counter = Counter()
+_hits_lock = Lock()
+_last_hits_flush = time.time()
+
+
+def _compress_payload(data) -> Tuple[bytes, str]:
+    """Serialise et compresse une reponse"""
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(raw), "zstd"
+    return gzip.compress(raw, compresslevel=6), "gzip"
+
+
+def _decompress_payload(blob: bytes, compression: Optional[str]):
+    """Decompresse et deserialise une reponse"""
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("Payload zstd mais zstandard non installe")
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        raw = gzip.decompress(blob)
+    return json.loads(raw)
+
+
+def _record_hit(db, cache_key: str):
+    """Comptabilise un hit; ecriture groupee par intervalle ou par seuil"""
+    with _hits_lock:
+        _pending_hits[cache_key] += 1
+        due = (
+            sum(_pending_hits.values()) >= API_CACHE_HIT_FLUSH_THRESHOLD
+            or time.time() - _last_hits_flush >= API_CACHE_HIT_FLUSH_INTERVAL
+        )
+    if due:
+        flush_cache_hits(db)
+
+
+def flush_cache_hits(db) -> int:
+    """
+    Ecrit les hit_count en attente (une transaction pour tous les hits).
+
+    Returns:
+        Nombre de hits ecrits
+    """
+    global _last_hits_flush
+    with _hits_lock:
+        pending = dict(_pending_hits)
+        _pending_hits.clear()
+        _last_hits_flush = time.time()
+
+    if not pending:
+        return 0
 
-from src.infrastructure.persistence.models import APICache
+    try:
+        with db.get_session() as session:
+            for cache_key, hits in pending.items():
+                session.query(APICache).filter(
+                    APICache.cache_key == cache_key
+                ).update(
+                    {APICache.hit_count: func.coalesce(APICache.hit_count, 0) + hits},
+                    synchronize_session=False
+                )
+            session.commit()
+    except Exception as e:
+        print(f"⚠️ Erreur ecriture hit_count cache: {e}")
+        return 0
+
+    return sum(pending.values())
 
 
 def generate_cache_key(cache_type: str, **params) -> str:
@@ -32,6 +127,9 @@ def get_cached_response(db, cache_key: str) -> Optional[Dict]:
     """
     Recupere une reponse du cache si elle existe et n'est pas expiree.
 
+    Lecture seule: le cache L1 est consulte d'abord, puis la base.
+    Le hit_count est incremente en differe (flush_cache_hits).
+
     Args:
         db: DatabaseManager
         cache_key: Cle de cache
@@ -39,21 +137,42 @@ def get_cached_response(db, cache_key: str) -> Optional[Dict]:
     Returns:
         Donnees cachees ou None si cache miss
     """
+    l1_entry = _l1_cache.get(cache_key)
+    if l1_entry is not None:
+        blob, compression = l1_entry
+        _record_hit(db, cache_key)
+        return _decompress_payload(blob, compression)
+
     with db.get_session() as session:
-        cache_entry = session.query(APICache).filter(
+        cache_entry = session.query(
+            APICache.response_blob,
+            APICache.compression,
+            APICache.response_data,
+            APICache.expires_at
+        ).filter(
             APICache.cache_key == cache_key,
             APICache.expires_at > datetime.utcnow()
         ).first()
 
-        if cache_entry:
-            cache_entry.hit_count = (cache_entry.hit_count or 0) + 1
-            session.commit()
-            try:
-                return json.loads(cache_entry.response_data)
-            except Exception:
-                return None
+    if not cache_entry:
+        return None
 
-    return None
+    blob, compression, response_data, expires_at = cache_entry
+    try:
+        if blob is not None:
+            blob = bytes(blob)
+            data = _decompress_payload(blob, compression)
+        else:
+            # Ancien format: JSON en clair
+            data = json.loads(response_data)
+            blob, compression = _compress_payload(data)
+    except Exception:
+        return None
+
+    expires_ts = (expires_at - datetime.utcnow()).total_seconds() + time.time()
+    _l1_cache.set(cache_key, (blob, compression), size=len(blob), expires_at=expires_ts)
+    _record_hit(db, cache_key)
+    return data
 
 
 def set_cached_response(
@@ -64,7 +183,7 @@ def set_cached_response(
     ttl_hours: int = 6
 ) -> bool:
     """
-    Stocke une reponse dans le cache.
+    Stocke une reponse dans le cache (payload compresse).
 
     Args:
         db: DatabaseManager
@@ -77,6 +196,7 @@ def set_cached_response(
         True si succes
     """
     expires_at = datetime.utcnow() + timedelta(hours=ttl_hours)
+    blob, compression = _compress_payload(response_data)
 
     with db.get_session() as session:
         existing = session.query(APICache).filter(
@@ -84,25 +204,40 @@ def set_cached_response(
         ).first()
 
         if existing:
-            existing.response_data = json.dumps(response_data)
+            existing.response_blob = blob
+            existing.compression = compression
+            existing.response_data = None
             existing.expires_at = expires_at
             existing.created_at = datetime.utcnow()
         else:
             cache_entry = APICache(
                 cache_key=cache_key,
                 cache_type=cache_type,
-                response_data=json.dumps(response_data),
+                response_blob=blob,
+                compression=compression,
                 expires_at=expires_at
             )
             session.add(cache_entry)
 
         session.commit()
 
+    _l1_cache.set(cache_key, (blob, compression), size=len(blob),
+                  expires_at=time.time() + ttl_hours * 3600)
     return True
 
 
+def get_l1_cache_stats() -> Dict:
+    """Statistiques du cache L1 en memoire (process courant)."""
+    stats = _l1_cache.get_stats()
+    with _hits_lock:
+        stats["pending_hits"] = sum(_pending_hits.values())
+    stats["compression"] = "zstd" if zstandard is not None else "gzip"
+    return stats
+
+
 def get_cache_stats(db) -> Dict:
     """Recupere les statistiques du cache."""
+    flush_cache_hits(db)
     with db.get_session() as session:
         total_entries = session.query(func.count(APICache.id)).scalar() or 0
 
@@ -134,6 +269,7 @@ def get_cache_stats(db) -> Dict:
 
 def clear_expired_cache(db) -> int:
     """Supprime les entrees de cache expirees."""
+    flush_cache_hits(db)
     with db.get_session() as session:
         deleted = session.query(APICache).filter(
             APICache.expires_at < datetime.utcnow()
@@ -144,7 +280,177 @@ def clear_expired_cache(db) -> int:
 
 def clear_all_cache(db) -> int:
     """Supprime tout le cache."""
+    _l1_cache.clear()
+    with _hits_lock:
+        _pending_hits.clear()
     with db.get_session() as session:
         deleted = session.query(APICache).delete()
         session.commit()
     return deleted
+
+
+def acquire_cache_lease(db, cache_key: str, owner: str, ttl_seconds: int = 300) -> bool:
+    """
+    Tente d'obtenir le bail d'une cle de cache (coalescence inter-process).
+
+    Le bail est une ligne api_cache_leases: l'insertion echoue si un autre
+    process le detient deja. Un bail expire (process mort) est repris.
+
+    Args:
+        db: DatabaseManager
+        cache_key: Cle de cache
+        owner: Identifiant du demandeur (host:pid:thread)
+        ttl_seconds: Duree du bail
+
+    Returns:
+        True si le bail est obtenu (l'appelant doit faire l'appel API)
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    try:
+        with db.get_session() as session:
+            session.add(CacheLease(cache_key=cache_key, owner=owner, acquired_at=now, expires_at=expires_at))
+            session.commit()
+        return True
+    except IntegrityError:
+        pass
+
+    # Bail existant: le reprendre uniquement s'il est expire
+    with db.get_session() as session:
+        taken = session.query(CacheLease).filter(
+            CacheLease.cache_key == cache_key,
+            CacheLease.expires_at <= now
+        ).update(
+            {"owner": owner, "acquired_at": now, "expires_at": expires_at},
+            synchronize_session=False
+        )
+        session.commit()
+    return taken > 0
+
+
+def release_cache_lease(db, cache_key: str, owner: str) -> bool:
+    """Libere le bail d'une cle de cache (uniquement s'il appartient a owner)."""
+    with db.get_session() as session:
+        deleted = session.query(CacheLease).filter(
+            CacheLease.cache_key == cache_key,
+            CacheLease.owner == owner
+        ).delete(synchronize_session=False)
+        session.commit()
+    return deleted > 0
+
+
+def is_cache_lease_active(db, cache_key: str) -> bool:
+    """True si un bail non expire existe pour la cle."""
+    with db.get_session() as session:
+        count = session.query(func.count(CacheLease.cache_key)).filter(
+            CacheLease.cache_key == cache_key,
+            CacheLease.expires_at > datetime.utcnow()
+        ).scalar() or 0
+    return count > 0
+
+
+# ============================================================================
+# VALIDATEURS HTTP (requetes conditionnelles)
+# ============================================================================
+
+def get_http_validator(db, cache_key: str) -> Optional[Dict]:
+    """
+    Recupere les validateurs et le resultat d'analyse stockes pour une cle.
+
+    Returns:
+        Dict (kind, url, etag, last_modified, content_length, result,
+        changed_at, checked_at) ou None
+    """
+    with db.get_session() as session:
+        row = session.query(
+            HttpValidator.kind,
+            HttpValidator.url,
+            HttpValidator.etag,
+            HttpValidator.last_modified,
+            HttpValidator.content_length,
+            HttpValidator.result_blob,
+            HttpValidator.compression,
+            HttpValidator.changed_at,
+            HttpValidator.checked_at
+        ).filter(HttpValidator.cache_key == cache_key).first()
+
+    if not row:
+        return None
+
+    kind, url, etag, last_modified, content_length, blob, compression, changed_at, checked_at = row
+    try:
+        result = _decompress_payload(bytes(blob), compression) if blob is not None else None
+    except Exception:
+        return None
+    return {
+        "cache_key": cache_key,
+        "kind": kind,
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "content_length": content_length,
+        "result": result,
+        "changed_at": changed_at,
+        "checked_at": checked_at,
+    }
+
+
+def bulk_save_http_validators(db, records: List[Dict]) -> int:
+    """
+    Ecriture groupee des validateurs HTTP (write-behind).
+
+    Args:
+        records: Dicts avec cache_key et "at" (timestamp). Avec "result":
+                 nouvelle version (validateurs + resultat remplaces); sans:
+                 revalidation 304 (checked_at seul mis a jour)
+
+    Returns:
+        Nombre de cles ecrites
+    """
+    latest: Dict[str, Dict] = {}
+    for record in records:
+        previous = latest.get(record["cache_key"])
+        # Une nouvelle version n'est pas ecrasee par une revalidation du meme lot
+        if previous is not None and "result" in previous and "result" not in record:
+            previous["at"] = max(previous.get("at") or 0, record.get("at") or 0)
+            continue
+        latest[record["cache_key"]] = dict(record)
+
+    if not latest:
+        return 0
+
+    with db.get_session() as session:
+        existing = {
+            row.cache_key: row
+            for row in session.query(HttpValidator).filter(
+                HttpValidator.cache_key.in_(list(latest))
+            ).all()
+        }
+        for cache_key, record in latest.items():
+            at = datetime.utcfromtimestamp(record["at"]) if record.get("at") else datetime.utcnow()
+            row = existing.get(cache_key)
+            if "result" not in record:
+                if row is not None:
+                    row.checked_at = at
+                continue
+
+            blob, compression = _compress_payload(record["result"])
+            fields = {
+                "kind": record.get("kind", ""),
+                "url": record.get("url", ""),
+                "etag": (record.get("etag") or "")[:255] or None,
+                "last_modified": (record.get("last_modified") or "")[:64] or None,
+                "content_length": record.get("content_length"),
+                "result_blob": blob,
+                "compression": compression,
+                "changed_at": at,
+                "checked_at": at,
+            }
+            if row is None:
+                session.add(HttpValidator(cache_key=cache_key, **fields))
+            else:
+                for name, value in fields.items():
+                    setattr(row, name, value)
+        session.commit()
+    return len(latest)
@@ -156,6 +156,11 @@ def _run_migrations(db: DatabaseManager):
         ("liste_page_recherche", "site_keywords", "ALTER TABLE liste_page_recherche ADD COLUMN IF NOT EXISTS site_keywords VARCHAR(300)"),
         ("meta_tokens", "proxy_url", "ALTER TABLE meta_tokens ADD COLUMN IF NOT EXISTS proxy_url VARCHAR(255)"),
         ("search_queue", "updated_at", "ALTER TABLE search_queue ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW()"),
+        ("search_queue", "checkpoint_data", "ALTER TABLE search_queue ADD COLUMN IF NOT EXISTS checkpoint_data TEXT"),
+        ("search_logs", "trace_summary", "ALTER TABLE search_logs ADD COLUMN IF NOT EXISTS trace_summary TEXT"),
+        ("search_logs", "trace_data", "ALTER TABLE search_logs ADD COLUMN IF NOT EXISTS trace_data TEXT"),
+        ("api_cache", "response_blob", "ALTER TABLE api_cache ADD COLUMN IF NOT EXISTS response_blob BYTEA"),
+        ("api_cache", "compression", "ALTER TABLE api_cache ADD COLUMN IF NOT EXISTS compression VARCHAR(10)"),
     ]
 
     index_migrations = [
@@ -19,6 +19,7 @@ from src.infrastructure.persistence.models import (
     SuiviPage,
     AdsRecherche,
     WinningAds,
+    DomainFingerprint,
 )
 from src.infrastructure.persistence.repositories.utils import get_etat_from_ads_count
 
@@ -251,7 +252,7 @@ def save_ads_recherche(
     Args:
         db: DatabaseManager instance
         pages_final: Dict des pages finales (page_id -> page_data)
-        page_ads: Dict des ads par page (page_id -> list of ads)
+        page_ads: Mapping des ads par page (page_id -> sequence of ads, ex: AdStore)
         countries: Liste des pays (optionnel, pour compatibilité)
         min_ads_liste: Seuil minimum d'ads pour sauvegarder (optionnel)
         user_id: UUID de l'utilisateur (multi-tenancy). Si None, donnees partagees.
@@ -767,6 +768,103 @@ def get_cached_pages_info(
         return result
 
 
+# ============================================================================
+# EMPREINTES DE DOMAINES (partagees entre utilisateurs)
+# ============================================================================
+
+# Horodatage de fraicheur -> colonnes qu'il couvre
+FINGERPRINT_GROUPS = {
+    "cms_checked_at": ("cms",),
+    "analyzed_at": (
+        "theme", "payments", "currency", "thematique", "type_produits",
+        "product_count", "product_count_country",
+        "site_title", "site_description", "site_h1", "site_keywords",
+    ),
+    "classified_at": ("category", "subcategory", "classification_confidence"),
+}
+
+
+def get_domain_fingerprints(db, domains: List[str]) -> Dict[str, Dict]:
+    """
+    Recupere les empreintes de domaines (table partagee, pas de user_id).
+
+    Args:
+        db: Instance DatabaseManager
+        domains: Domaines normalises (hote en minuscules, sans "www.")
+
+    Returns:
+        Dict[domain] = {colonnes de DomainFingerprint}
+    """
+    domains = list({d for d in domains if d})
+    if not domains:
+        return {}
+
+    columns = [c.name for c in DomainFingerprint.__table__.columns]
+    result = {}
+    with db.get_session() as session:
+        for i in range(0, len(domains), 500):
+            rows = session.query(DomainFingerprint).filter(
+                DomainFingerprint.domain.in_(domains[i:i + 500])
+            ).all()
+            for row in rows:
+                result[row.domain] = {name: getattr(row, name) for name in columns}
+    return result
+
+
+def bulk_save_domain_fingerprints(db, records: List[Dict]) -> int:
+    """
+    Ecriture groupee des empreintes de domaines (write-behind).
+
+    Chaque enregistrement met a jour les colonnes qu'il contient; l'horodatage
+    de leur groupe (cms_checked_at, analyzed_at, classified_at) passe a "at".
+
+    Args:
+        records: Dicts avec "domain", "at" (timestamp) et des colonnes de FINGERPRINT_GROUPS
+
+    Returns:
+        Nombre de domaines ecrits
+    """
+    merged: Dict[str, Dict] = {}
+    for record in records:
+        domain = record.get("domain")
+        if not domain:
+            continue
+        at = datetime.utcfromtimestamp(record["at"]) if record.get("at") else datetime.utcnow()
+        target = merged.setdefault(domain, {})
+        for stamp, names in FINGERPRINT_GROUPS.items():
+            fields = {name: record[name] for name in names if name in record}
+            if fields:
+                target.update(fields)
+                target[stamp] = max(target.get(stamp, at), at)
+
+    if not merged:
+        return 0
+
+    columns = DomainFingerprint.__table__.columns
+    with db.get_session() as session:
+        existing = {
+            row.domain: row
+            for row in session.query(DomainFingerprint).filter(
+                DomainFingerprint.domain.in_(list(merged))
+            ).all()
+        }
+        now = datetime.utcnow()
+        for domain, fields in merged.items():
+            for name, value in fields.items():
+                length = getattr(columns[name].type, "length", None)
+                if length and isinstance(value, str):
+                    fields[name] = value[:length]
+            row = existing.get(domain)
+            if row is None:
+                session.add(DomainFingerprint(domain=domain[:255], updated_at=now, **fields))
+            else:
+                for name, value in fields.items():
+                    setattr(row, name, value)
+                row.updated_at = now
+        session.commit()
+    return len(merged)
+
+
 def get_dashboard_trends(db, days: int = 7, user_id: Optional[UUID] = None) -> Dict:
     """
     Calcule les tendances pour le dashboard.
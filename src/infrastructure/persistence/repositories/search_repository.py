@@ -8,6 +8,8 @@ Toutes les fonctions acceptent un parametre optionnel user_id (UUID).
 - Si user_id est None: les donnees sont considerees comme systeme/partagees
 """
 import json
+import zlib
+import base64
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from uuid import UUID
@@ -50,6 +52,11 @@ def create_search_log(
     user_id: Optional[UUID] = None
 ) -> int:
     """Cree un nouveau log de recherche."""
+    # Les appelants passent souvent des listes (colonnes Text)
+    if isinstance(keywords, (list, tuple)):
+        keywords = ", ".join(keywords)
+    if isinstance(selected_cms, (list, tuple)):
+        selected_cms = ", ".join(selected_cms)
     with db.get_session() as session:
         log = SearchLog(
             user_id=user_id,
@@ -75,6 +82,9 @@ def update_search_log(db, log_id: int, **kwargs) -> bool:
 
         for key, value in kwargs.items():
             if hasattr(log, key):
+                # Colonnes Text: phases_data, api_details, errors_list...
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value)
                 setattr(log, key, value)
 
         return True
@@ -202,21 +212,43 @@ def delete_search_log(db, log_id: int) -> bool:
 
 def save_api_calls(db, search_log_id: int, calls: List[Dict]) -> int:
     """Sauvegarde les appels API."""
-    count = 0
+    return bulk_save_api_calls(db, [dict(call, search_log_id=search_log_id) for call in calls])
+
+
+def bulk_save_api_calls(db, calls: List[Dict]) -> int:
+    """
+    Sauvegarde groupee d'appels API de plusieurs recherches (write-behind).
+
+    Args:
+        calls: Dicts aux champs de APICall (monitoring) + search_log_id;
+               called_at (datetime) ou "at" (timestamp) pour l'horodatage
+    """
+    rows = []
+    for call in calls:
+        called_at = call.get("called_at")
+        if not isinstance(called_at, datetime):
+            called_at = datetime.utcfromtimestamp(call["at"]) if call.get("at") else datetime.utcnow()
+        rows.append(APICallLog(
+            search_log_id=call.get("search_log_id"),
+            api_type=call.get("api_type", ""),
+            endpoint=(call.get("endpoint") or "")[:500],
+            method=call.get("method", "GET"),
+            keyword=(call.get("keyword") or "")[:200] or None,
+            page_id=call.get("page_id") or None,
+            site_url=(call.get("site_url") or "")[:500] or None,
+            status_code=call.get("status_code"),
+            success=call.get("success", True),
+            error_type=call.get("error_type") or None,
+            error_message=call.get("error_message") or None,
+            response_time_ms=call.get("response_time_ms"),
+            response_size=call.get("response_size"),
+            items_returned=call.get("items_returned", 0),
+            called_at=called_at,
+        ))
+
     with db.get_session() as session:
-        for call in calls:
-            api_call = APICallLog(
-                search_log_id=search_log_id,
-                api_type=call.get("api_type", ""),
-                endpoint=call.get("endpoint", ""),
-                success=call.get("success", True),
-                response_time_ms=call.get("response_time_ms"),
-                error_message=call.get("error_message"),
-                created_at=datetime.utcnow(),
-            )
-            session.add(api_call)
-            count += 1
-    return count
+        session.add_all(rows)
+    return len(rows)
 
 
 # ============================================================================
@@ -244,7 +276,7 @@ def create_search_queue(
             keywords=keywords,
             countries=countries,
             languages=languages,
-            min_ads=actual_min_ads,
+            ads_min=actual_min_ads,
             cms_filter=cms_filter,
             user_session=user_session,
             priority=priority,
@@ -265,13 +297,17 @@ def get_search_queue(db, search_id: int) -> Optional[Dict]:
 
         return {
             "id": search.id,
+            "user_id": search.user_id,
             "keywords": search.keywords,
             "countries": search.countries,
             "status": search.status,
             "progress_percent": search.progress_percent,
             "current_phase": search.current_phase,
-            "phase_name": search.phase_name,
-            "message": search.message,
+            "phase_name": search.current_phase_name,
+            "message": search.progress_message,
+            "phases_data": json.loads(search.phases_data) if search.phases_data else [],
+            "search_log_id": search.search_log_id,
+            "error": search.error_message,
             "created_at": search.created_at,
         }
 
@@ -311,11 +347,11 @@ def update_search_queue_progress(
         if phase is not None:
             search.current_phase = phase
         if phase_name is not None:
-            search.phase_name = phase_name
+            search.current_phase_name = phase_name
         if percent is not None:
             search.progress_percent = percent
         if message is not None:
-            search.message = message
+            search.progress_message = message
         if phases_data is not None:
             search.phases_data = json.dumps(phases_data)
         search.updated_at = datetime.utcnow()
@@ -401,6 +437,7 @@ def get_interrupted_searches(db) -> List:
 def restart_search_queue(db, search_id: int) -> bool:
     """
     Relance une recherche interrompue specifique.
+    Son checkpoint est conserve: elle reprend a la phase ou elle s'est arretee.
 
     Args:
         db: DatabaseManager
@@ -421,7 +458,7 @@ def restart_search_queue(db, search_id: int) -> bool:
 def recover_interrupted_searches(db) -> int:
     """
     Recupere les recherches interrompues (status='running' mais worker arrete).
-    Les remet en 'pending' pour retraitement.
+    Les remet en 'pending' pour retraitement (reprise depuis leur checkpoint).
 
     Returns:
         Nombre de recherches recuperees.
@@ -441,13 +478,127 @@ def recover_interrupted_searches(db) -> int:
         count = 0
         for search in interrupted:
             search.status = "pending"
-            search.message = "Recherche interrompue - relancee automatiquement"
+            if search.checkpoint_data:
+                search.progress_message = "Recherche interrompue - reprise automatique depuis le dernier checkpoint"
+            else:
+                search.progress_message = "Recherche interrompue - relancee automatiquement"
             search.updated_at = datetime.utcnow()
             count += 1
 
         return count
 
 
+def save_search_checkpoint(db, search_id: int, checkpoint: Dict) -> bool:
+    """
+    Enregistre le point de reprise d'une recherche.
+
+    Le checkpoint (ids d'annonces, compteurs et curseurs, sans le contenu
+    des annonces) est serialise en JSON puis compresse (zlib + base64):
+    les listes d'ids des grosses recherches restent legeres en base.
+
+    Args:
+        db: DatabaseManager
+        search_id: ID de la recherche dans SearchQueue
+        checkpoint: Etat serialisable en JSON
+
+    Returns:
+        True si le checkpoint a ete enregistre.
+    """
+    payload = json.dumps(checkpoint, default=str, separators=(",", ":")).encode("utf-8")
+    encoded = base64.b64encode(zlib.compress(payload, 6)).decode("ascii")
+
+    with db.get_session() as session:
+        search = session.query(SearchQueue).filter(SearchQueue.id == search_id).first()
+        if not search:
+            return False
+        search.checkpoint_data = encoded
+        search.updated_at = datetime.utcnow()
+        return True
+
+
+def get_search_checkpoint(db, search_id: int) -> Optional[Dict]:
+    """
+    Recupere le point de reprise d'une recherche.
+
+    Returns:
+        Etat du checkpoint, ou None si absent ou illisible.
+    """
+    with db.get_session() as session:
+        search = session.query(SearchQueue).filter(SearchQueue.id == search_id).first()
+        if not search or not search.checkpoint_data:
+            return None
+        encoded = search.checkpoint_data
+
+    try:
+        return json.loads(zlib.decompress(base64.b64decode(encoded)).decode("utf-8"))
+    except (ValueError, zlib.error):
+        return None
+
+
+def clear_search_checkpoint(db, search_id: int) -> bool:
+    """Supprime le point de reprise d'une recherche (recherche terminee)."""
+    with db.get_session() as session:
+        search = session.query(SearchQueue).filter(SearchQueue.id == search_id).first()
+        if not search:
+            return False
+        search.checkpoint_data = None
+        return True
+
+
+def save_search_trace(db, log_id: int, summary: Dict, chrome_trace: Dict) -> bool:
+    """
+    Attache le trace d'une recherche a son SearchLog.
+
+    Args:
+        db: DatabaseManager
+        log_id: ID du SearchLog
+        summary: Resume (Tracer.summary), stocke en JSON lisible
+        chrome_trace: Evenements Chrome (Tracer.to_chrome_trace), compresses zlib + base64
+
+    Returns:
+        True si le trace a ete enregistre.
+    """
+    payload = json.dumps(chrome_trace, default=str, separators=(",", ":")).encode("utf-8")
+    encoded = base64.b64encode(zlib.compress(payload, 6)).decode("ascii")
+
+    with db.get_session() as session:
+        log = session.query(SearchLog).filter(SearchLog.id == log_id).first()
+        if not log:
+            return False
+        log.trace_summary = json.dumps(summary, default=str)
+        log.trace_data = encoded
+        return True
+
+
+def get_search_trace(db, log_id: int, include_events: bool = False) -> Optional[Dict]:
+    """
+    Recupere le trace d'une recherche.
+
+    Args:
+        include_events: Ajouter les evenements Chrome (cle "chrome_trace")
+
+    Returns:
+        {"search_log_id", "user_id", "summary"[, "chrome_trace"]}, ou None si pas de trace.
+    """
+    with db.get_session() as session:
+        log = session.query(SearchLog).filter(SearchLog.id == log_id).first()
+        if not log or not log.trace_summary:
+            return None
+        result = {
+            "search_log_id": log.id,
+            "user_id": log.user_id,
+            "summary": json.loads(log.trace_summary),
+        }
+        encoded = log.trace_data
+
+    if include_events:
+        try:
+            result["chrome_trace"] = json.loads(zlib.decompress(base64.b64decode(encoded)).decode("utf-8"))
+        except (TypeError, ValueError, zlib.error):
+            result["chrome_trace"] = None
+    return result
+
+
 # ============================================================================
 # SEARCH HISTORY
 # ============================================================================
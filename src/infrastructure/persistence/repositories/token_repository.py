@@ -154,6 +154,39 @@ def record_token_usage(
                 meta_token.rate_limited_until = datetime.utcnow() + timedelta(seconds=rate_limit_seconds)
 
 
+def bulk_record_token_usage(db, usages: List[Dict]):
+    """
+    Enregistre un lot d'utilisations de tokens (write-behind).
+    Les compteurs sont agreges par token: une requete et une mise a jour par token.
+
+    Args:
+        usages: Dicts {token, success, error_message, is_rate_limit, rate_limit_seconds, at}
+    """
+    by_token: Dict[str, List[Dict]] = {}
+    for usage in usages:
+        by_token.setdefault(usage["token"], []).append(usage)
+
+    with db.get_session() as session:
+        tokens = session.query(MetaToken).filter(MetaToken.token.in_(list(by_token))).all()
+        for meta_token in tokens:
+            for usage in by_token.get(meta_token.token, []):
+                used_at = datetime.utcfromtimestamp(usage["at"]) if usage.get("at") else datetime.utcnow()
+                meta_token.total_calls = (meta_token.total_calls or 0) + 1
+                meta_token.last_used_at = max(meta_token.last_used_at or used_at, used_at)
+
+                if not usage.get("success", True):
+                    error_message = usage.get("error_message")
+                    meta_token.total_errors = (meta_token.total_errors or 0) + 1
+                    meta_token.last_error_at = used_at
+                    meta_token.last_error_message = error_message[:500] if error_message else None
+
+                    if usage.get("is_rate_limit"):
+                        meta_token.rate_limit_hits = (meta_token.rate_limit_hits or 0) + 1
+                        meta_token.rate_limited_until = used_at + timedelta(
+                            seconds=usage.get("rate_limit_seconds", 60)
+                        )
+
+
 def clear_rate_limit(db, token_id: int) -> bool:
     """Efface le rate limit d'un token."""
     with db.get_session() as session:
@@ -217,6 +250,33 @@ def log_token_usage(
         return log_entry.id
 
 
+def bulk_log_token_usage(db, entries: List[Dict]) -> int:
+    """
+    Enregistre un lot de logs d'utilisation de tokens (write-behind).
+
+    Args:
+        entries: Dicts avec les arguments de log_token_usage et l'horodatage "at"
+    """
+    with db.get_session() as session:
+        session.add_all([
+            TokenUsageLog(
+                token_id=entry["token_id"],
+                token_name=entry.get("token_name"),
+                action_type=entry.get("action_type"),
+                keyword=entry["keyword"][:255] if entry.get("keyword") else None,
+                countries=entry["countries"][:100] if entry.get("countries") else None,
+                page_id=entry.get("page_id"),
+                success=entry.get("success", True),
+                ads_count=entry.get("ads_count", 0),
+                error_message=entry.get("error_message"),
+                response_time_ms=entry.get("response_time_ms"),
+                created_at=datetime.utcfromtimestamp(entry["at"]) if entry.get("at") else datetime.utcnow()
+            )
+            for entry in entries
+        ])
+    return len(entries)
+
+
 def get_token_usage_logs(
     db,
     token_id: int = None,
@@ -132,15 +132,35 @@ def is_winning_ad(
         except ValueError:
             reach = 0
 
+    matched_criteria = match_winning_criteria(age_days, reach, criteria)
+    return (bool(matched_criteria), age_days, reach, matched_criteria)
+
+
+def match_winning_criteria(
+    age_days: int,
+    reach: int,
+    criteria: List[Tuple[int, int]] = None
+) -> str:
+    """
+    Critere winning matche par un couple (age, reach) deja extrait.
+
+    Utilise tel quel par la detection en colonnes (AdStore) pour ne pas
+    reconstruire chaque annonce.
+
+    Returns:
+        Description du critere (ex: "≤7d & >40k") ou chaine vide si non qualifiee
+    """
+    if criteria is None:
+        criteria = DEFAULT_WINNING_CRITERIA
+
     # Evaluation contre les criteres (ordre croissant d'age)
     # On matche le premier critere ou l'ad est eligible
     for max_age, min_reach in criteria:
         if age_days <= max_age and reach >= min_reach:
             # Format lisible: ≤4d & >15k (basé sur les seuils, pas les valeurs)
-            criteria_str = f"≤{max_age}d & >{min_reach // 1000}k"
-            return (True, age_days, reach, criteria_str)
+            return f"≤{max_age}d & >{min_reach // 1000}k"
 
-    return (False, age_days, reach, "")
+    return ""
 
 
 def save_winning_ads(
@@ -0,0 +1,305 @@
+"""
+Ecriture differee (write-behind) des logs d'appels API, de l'usage des tokens,
+des validateurs HTTP et des empreintes de domaines.
+
+Les appels Meta ne font plus d'aller-retour BDD: les enregistrements sont
+deposes dans une file memoire bornee, videe par un thread de fond qui les
+insere par lots (une session par lot et par type).
+
+- File pleine: l'enregistrement est abandonne et compte (jamais bloquant)
+- Lot en echec: abandonne et compte (pas de retry infini)
+- Arret du process / du worker: vidage complet de la file
+"""
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.infrastructure.config import (
+    WRITE_BEHIND_ENABLED,
+    WRITE_BEHIND_MAX_PENDING,
+    WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_FLUSH_INTERVAL,
+)
+
+# Ecrivain d'un type d'enregistrement: writer(db, records)
+Writer = Callable[[Any, List[Dict]], Any]
+
+KIND_TOKEN_USAGE = "token_usage"          # Compteurs MetaToken (record_token_usage)
+KIND_TOKEN_USAGE_LOG = "token_usage_log"  # Lignes TokenUsageLog (log_token_usage)
+KIND_API_CALL = "api_call"                # Lignes APICallLog (save_api_calls)
+KIND_HTTP_VALIDATOR = "http_validator"    # Validateurs HTTP (bulk_save_http_validators)
+KIND_DOMAIN_FINGERPRINT = "domain_fingerprint"  # Empreintes de domaines (bulk_save_domain_fingerprints)
+
+
+class WriteBehindBuffer:
+    """
+    File bornee d'enregistrements a ecrire en BDD par lots.
+    Thread-safe; le thread de vidage demarre au premier enregistrement.
+    """
+
+    def __init__(
+        self,
+        writers: Dict[str, Writer],
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL
+    ):
+        """
+        Args:
+            writers: {type: writer(db, records)} - insertion groupee d'un lot
+            max_pending: Enregistrements en attente max (au-dela: abandon)
+            batch_size: Taille max d'un lot (et seuil de reveil du thread)
+            flush_interval: Delai max (secondes) avant ecriture d'un enregistrement
+        """
+        self._writers = writers
+        self.max_pending = max(1, max_pending)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+
+        self._pending: Deque[Tuple[str, Any, Dict]] = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._queued = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+
+    def submit(self, kind: str, db, record: Dict) -> bool:
+        """
+        Depose un enregistrement (non bloquant).
+
+        Returns:
+            False si l'enregistrement a ete abandonne (file pleine ou buffer ferme)
+        """
+        with self._cond:
+            if self._closed or len(self._pending) >= self.max_pending:
+                self._dropped += 1
+                if self._dropped == 1 or self._dropped % 1000 == 0:
+                    print(f"⚠️ Write-behind sature: {self._dropped} enregistrement(s) abandonne(s)")
+                return False
+
+            self._pending.append((kind, db, record))
+            self._queued += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+        self._ensure_started()
+        return True
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="write_behind")
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and len(self._pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self) -> int:
+        """
+        Ecrit immediatement tous les enregistrements en attente.
+
+        Returns:
+            Nombre d'enregistrements ecrits
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    if not self._pending:
+                        return written
+                    count = min(self.batch_size, len(self._pending))
+                    batch = [self._pending.popleft() for _ in range(count)]
+                written += self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Tuple[str, Any, Dict]]) -> int:
+        """Ecrit un lot, groupe par (type, base)"""
+        groups: Dict[Tuple[str, int], Tuple[Any, List[Dict]]] = {}
+        for kind, db, record in batch:
+            groups.setdefault((kind, id(db)), (db, []))[1].append(record)
+
+        written = 0
+        for (kind, _), (db, records) in groups.items():
+            writer = self._writers.get(kind)
+            try:
+                if writer is None:
+                    raise KeyError(f"type inconnu: {kind}")
+                writer(db, records)
+                written += len(records)
+            except Exception as e:
+                print(f"⚠️ Write-behind: echec ecriture {len(records)} {kind}: {e}")
+                with self._cond:
+                    self._failed += len(records)
+
+        with self._cond:
+            self._written += written
+        return written
+
+    def close(self, timeout: float = 10.0):
+        """Arrete le thread et ecrit tout ce qui reste en attente"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        """Statistiques du buffer (pour affichage/monitoring)"""
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "max_pending": self.max_pending,
+                "queued": self._queued,
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+            }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BUFFER GLOBAL (logs tokens et appels API)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_buffer: Optional[WriteBehindBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def _default_writers() -> Dict[str, Writer]:
+    # Import local pour eviter les imports circulaires
+    from src.infrastructure.persistence.repositories.token_repository import (
+        bulk_record_token_usage, bulk_log_token_usage,
+    )
+    from src.infrastructure.persistence.repositories.search_repository import bulk_save_api_calls
+    from src.infrastructure.persistence.repositories.cache_repository import bulk_save_http_validators
+    from src.infrastructure.persistence.repositories.page_repository import bulk_save_domain_fingerprints
+
+    return {
+        KIND_TOKEN_USAGE: bulk_record_token_usage,
+        KIND_TOKEN_USAGE_LOG: bulk_log_token_usage,
+        KIND_API_CALL: bulk_save_api_calls,
+        KIND_HTTP_VALIDATOR: bulk_save_http_validators,
+        KIND_DOMAIN_FINGERPRINT: bulk_save_domain_fingerprints,
+    }
+
+
+def get_write_behind_buffer() -> WriteBehindBuffer:
+    """Retourne le buffer global (cree au premier appel, vide a l'arret du process)"""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = WriteBehindBuffer(_default_writers())
+                atexit.register(_buffer.close)
+    return _buffer
+
+
+def queue_token_usage(
+    db,
+    token: str,
+    success: bool = True,
+    error_message: str = None,
+    is_rate_limit: bool = False,
+    rate_limit_seconds: int = 60
+) -> bool:
+    """Equivalent differe de record_token_usage"""
+    record = {
+        "token": token,
+        "success": success,
+        "error_message": error_message,
+        "is_rate_limit": is_rate_limit,
+        "rate_limit_seconds": rate_limit_seconds,
+        "at": time.time(),
+    }
+    if not WRITE_BEHIND_ENABLED:
+        _default_writers()[KIND_TOKEN_USAGE](db, [record])
+        return True
+    return get_write_behind_buffer().submit(KIND_TOKEN_USAGE, db, record)
+
+
+def queue_token_usage_log(db, **fields) -> bool:
+    """
+    Equivalent differe de log_token_usage (memes arguments nommes:
+    token_id, token_name, action_type, keyword, countries, page_id,
+    success, ads_count, error_message, response_time_ms).
+    """
+    record = dict(fields, at=time.time())
+    if not WRITE_BEHIND_ENABLED:
+        _default_writers()[KIND_TOKEN_USAGE_LOG](db, [record])
+        return True
+    return get_write_behind_buffer().submit(KIND_TOKEN_USAGE_LOG, db, record)
+
+
+def queue_api_calls(db, search_log_id: int, calls: List[Dict]) -> int:
+    """
+    Equivalent differe de save_api_calls.
+
+    Returns:
+        Nombre d'appels acceptes dans la file
+    """
+    records = [dict(call, search_log_id=search_log_id, at=time.time()) for call in calls]
+    if not WRITE_BEHIND_ENABLED:
+        _default_writers()[KIND_API_CALL](db, records)
+        return len(records)
+
+    buffer = get_write_behind_buffer()
+    return sum(1 for record in records if buffer.submit(KIND_API_CALL, db, record))
+
+
+def queue_http_validator(db, **fields) -> bool:
+    """
+    Equivalent differe de bulk_save_http_validators pour une cle (cache_key,
+    kind, url, etag, last_modified, content_length, result; sans result:
+    revalidation 304).
+    """
+    record = dict(fields, at=time.time())
+    if not WRITE_BEHIND_ENABLED:
+        _default_writers()[KIND_HTTP_VALIDATOR](db, [record])
+        return True
+    return get_write_behind_buffer().submit(KIND_HTTP_VALIDATOR, db, record)
+
+
+def queue_domain_fingerprint(db, **fields) -> bool:
+    """
+    Equivalent differe de bulk_save_domain_fingerprints pour un domaine
+    (domain et colonnes observees: cms, theme, product_count, category...).
+    """
+    record = dict(fields, at=time.time())
+    if not WRITE_BEHIND_ENABLED:
+        _default_writers()[KIND_DOMAIN_FINGERPRINT](db, [record])
+        return True
+    return get_write_behind_buffer().submit(KIND_DOMAIN_FINGERPRINT, db, record)
+
+
+def flush_write_behind() -> int:
+    """Ecrit immediatement les enregistrements en attente (0 si aucun buffer)"""
+    if _buffer is None:
+        return 0
+    return _buffer.flush()
+
+
+def get_write_behind_stats() -> Dict:
+    """Statistiques du buffer global"""
+    if _buffer is None:
+        return {"pending": 0, "max_pending": WRITE_BEHIND_MAX_PENDING,
+                "queued": 0, "written": 0, "dropped": 0, "failed": 0}
+    return _buffer.get_stats()
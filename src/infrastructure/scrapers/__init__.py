@@ -2,13 +2,17 @@
 Module de scrapers et detecteurs web.
 
 Fournit des outils pour analyser les sites web:
-- Detection de CMS (Shopify, WooCommerce, etc.)
+- Detection de CMS (Shopify, WooCommerce, etc.) par signatures communes,
+  sur le debut des pages lu en flux
 - Analyse complete de sites web
+- Comptage des produits par sitemaps en flux (memoire bornee) ou par
+  /products.json (sondes paralleles)
+- Extraction des donnees HTML en un seul passage
 - Extraction d'informations
 
 V2 (MarketSpy):
 - Analyse optimisee avec 1 requete homepage
-- Streaming sitemap avec limites budgetaires
+- Sitemaps comptes en flux (moteur commun)
 - Classification Gemini batch (10 sites/appel)
 """
 
@@ -18,6 +22,34 @@ from src.infrastructure.scrapers.cms_detector import (
     get_shopify_details,
 )
 
+from src.infrastructure.scrapers.cms_signatures import (
+    CmsEvidence,
+    CmsSignatureStream,
+    SignatureMatcher,
+    scan_cms_signatures,
+    detect_cms_from_html,
+)
+
+from src.infrastructure.scrapers.head_scanner import HeadScanner
+
+from src.infrastructure.scrapers.sitemap_engine import (
+    SitemapEngine,
+    SitemapCount,
+    SitemapUrlCounter,
+    select_product_sitemaps,
+)
+
+from src.infrastructure.scrapers.products_json import (
+    ProductsJsonCounter,
+    ProductsJsonCount,
+)
+
+from src.infrastructure.scrapers.html_features import (
+    HtmlFeatures,
+    extract_html_features,
+    html_to_text,
+)
+
 from src.infrastructure.scrapers.web_analyzer import (
     ensure_url,
     get_web,
@@ -59,6 +91,26 @@ __all__ = [
     "detect_cms_from_url",
     "check_shopify_http",
     "get_shopify_details",
+    # Signatures CMS (un passage par document)
+    "CmsEvidence",
+    "CmsSignatureStream",
+    "SignatureMatcher",
+    "scan_cms_signatures",
+    "detect_cms_from_html",
+    # Debut des pages lu en flux (arret des que CMS / theme / devise connus)
+    "HeadScanner",
+    # Sitemaps (comptage en flux)
+    "SitemapEngine",
+    "SitemapCount",
+    "SitemapUrlCounter",
+    "select_product_sitemaps",
+    # /products.json (derniere page par sondes paralleles)
+    "ProductsJsonCounter",
+    "ProductsJsonCount",
+    # Donnees HTML (un passage par page)
+    "HtmlFeatures",
+    "extract_html_features",
+    "html_to_text",
     # Web Analyzer (legacy)
     "ensure_url",
     "get_web",
@@ -0,0 +1,453 @@
+"""
+Signatures CMS: table declarative et recherche multi-motifs en un passage.
+
+Les detecteurs (cms_detector, web_analyzer, MarketSpy) testaient chacun
+leurs motifs un par un (`motif in html`) sur jusqu'a 200 Ko de HTML. Les
+signatures de toutes les plateformes sont compilees une fois en un automate
+(Aho-Corasick via pyahocorasick si installe, sinon une regex en trie): un
+seul passage sur le document donne les preuves et scores de toutes les
+plateformes, puis une regle commune choisit le CMS.
+
+- SHOPIFY_SIGNATURES: preuves Shopify ponderees (HTML, headers, cookies)
+- CMS_PLATFORMS: autres plateformes par ordre de priorite (motifs forts /
+  moyens et confiance associee)
+- scan_cms_signatures(html, headers, cookies) -> CmsEvidence
+- CmsSignatureStream: meme recherche sur un document lu par morceaux
+
+Usage:
+    evidence = scan_cms_signatures(resp.text, resp.headers, resp.cookies)
+    result = evidence.decide()  # {"cms", "is_shopify", "confidence", "details"}
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - depend de l'environnement
+    ahocorasick = None
+
+# HTML analyse au plus (le debut du document suffit aux signatures)
+CMS_HTML_LIMIT = 200000
+
+# Score Shopify a partir duquel les preuves suffisent (confiance = score * 10)
+SHOPIFY_MIN_SCORE = 3
+
+# Score Shopify de confiance maximale: la suite du document ne change rien
+SHOPIFY_CERTAIN_SCORE = 10
+
+# Sources d'une signature
+HTML = "html"                  # Sous-chaine du HTML (en minuscules)
+HEADER = "header"              # Nom de header present
+HEADER_VALUE = "header_value"  # Sous-chaine de la valeur d'un header (Signature.field)
+HEADERS = "headers"            # Sous-chaine des headers (noms et valeurs)
+COOKIE = "cookie"              # Cookie recu (jar ou Set-Cookie)
+
+
+@dataclass(frozen=True)
+class Signature:
+    """Preuve d'une plateforme"""
+    platform: str
+    pattern: str  # En minuscules
+    weight: int = 1  # Shopify: points de score; autres: 2 = fort, 1 = moyen
+    source: str = HTML
+    field: str = ""  # Header examine (source HEADER_VALUE)
+
+    @property
+    def label(self) -> str:
+        """Libelle de la preuve (details du resultat)"""
+        if self.source == HTML:
+            return f"html:{self.pattern}"
+        if self.source == COOKIE:
+            return f"cookie:{self.pattern}"
+        return f"header:{self.field or self.pattern}"
+
+
+@dataclass(frozen=True)
+class Platform:
+    """Plateforme non Shopify: motifs HTML forts / moyens et confiance"""
+    name: str
+    confidence: int
+    strong: Tuple[str, ...]
+    medium: Tuple[str, ...] = ()
+    medium_confidence: int = 0
+    headers: Tuple[str, ...] = ()  # Motifs forts cherches dans les headers
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TABLE DES SIGNATURES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+SHOPIFY_SIGNATURES: List[Signature] = [
+    Signature("Shopify", pattern, weight) for pattern, weight in [
+        ("cdn.shopify.com", 3),
+        ("shopify.com", 1),
+        ("/cdn/shop/", 2),
+        ("shopify-analytics", 2),
+        ("shopify.theme", 2),
+        ("shopify.routes", 2),
+        ("shopify.paymentbutton", 2),
+        ("myshopify.com", 3),
+        ("/cart.js", 1),
+        ("shopify-section", 2),
+        ("data-shopify", 2),
+        ("shopify-features", 1),
+        ("shopify_pay", 1),
+        ("shop_pay", 1),
+        ("monorail-edge.shopifysvc.com", 3),
+        ("shopify.accesstoken", 2),
+        ("window.shopify", 2),
+        ("shopify.cdnhost", 2),
+    ]
+] + [
+    Signature("Shopify", name, 2, HEADER) for name in [
+        "x-shopify-stage",
+        "x-shopify-request-id",
+        "x-sorting-hat-podid",
+        "x-sorting-hat-shopid",
+        "x-shopid",
+    ]
+] + [
+    Signature("Shopify", "shopify", 2, HEADER_VALUE, field="x-powered-by"),
+    Signature("Shopify", "shopify", 2, HEADER_VALUE, field="server"),
+] + [
+    Signature("Shopify", name, 2, COOKIE)
+    for name in ["_shopify_s", "_shopify_y", "cart_sig", "secure_customer_sig"]
+]
+
+# Ordre de priorite: la premiere plateforme avec une preuve l'emporte
+CMS_PLATFORMS: List[Platform] = [
+    # WooCommerce (WordPress + plugin e-commerce)
+    Platform("WooCommerce", 90,
+             ("woocommerce", "wc-ajax", "wc-add-to-cart", "wc_cart", "wc-blocks"),
+             ("wp-content/plugins/woocommerce", "add_to_cart_button", "cart-contents"), 75),
+    # WordPress (sans WooCommerce)
+    Platform("WordPress", 80,
+             ("wp-content", "wp-includes", "wordpress", "wp-json", "/wp-admin",
+              'name="generator" content="wordpress', "powered by wordpress")),
+    Platform("PrestaShop", 90,
+             ("prestashop", "/modules/ps_", "prestashop-page", "id_product="),
+             ("ps_shoppingcart", "ps_customersignin", "blockcart", "/themes/classic/"), 75),
+    # Magento / Adobe Commerce
+    Platform("Magento", 90,
+             ("magento", "mage-", "x-magento", "/static/frontend/magento"),
+             ("varien", "mage/cookies", "checkout/cart", "catalogsearch/result"), 70,
+             headers=("x-magento",)),
+    Platform("Wix", 90, ("wixstatic.com", "wix.com", "parastorage.com", "_wix_browser_sess",
+                         "wix-code-sdk", "wixapps.net")),
+    Platform("Squarespace", 90, ("squarespace.com", "static1.squarespace", "squarespace-cdn",
+                                 "sqs-analytics", "data-squarespace-")),
+    Platform("BigCommerce", 85, ("bigcommerce", "cdn.bcapp", "bcappcdn", "bigcommerce.com",
+                                 "stencil-", "cornerstone-")),
+    Platform("Webflow", 90, ("webflow.com", "assets.website-files.com", "data-wf-site",
+                             "webflow-production", "w-commerce")),
+    Platform("Shopware", 85, ("shopware", "sw-cms-", "sw-blocks", "/frontend/", "shopware.com")),
+    Platform("OpenCart", 80, ("opencart", "route=product", "route=checkout", "index.php?route=")),
+    # Salesforce Commerce Cloud (Demandware)
+    Platform("Salesforce Commerce", 85, ("demandware", "dwanalytics", "dw/shop", "sfcc",
+                                         "salesforce commerce")),
+    Platform("WiziShop", 90, ("wizishop", "wizi-", "cdn.wizishop.com")),
+    Platform("Oxatis", 90, ("oxatis", "cdn.oxatis.com", "oxatis-cdn")),
+    Platform("Ecwid", 90, ("ecwid", "app.ecwid.com", "ecwid_product")),
+    Platform("Jimdo", 90, ("jimdo", "jimdocdn", "a.jimdo.com")),
+    # Drupal Commerce
+    Platform("Drupal", 80, ("drupal", "/sites/default/files", "drupal.org", "/core/misc/drupal")),
+    Platform("Odoo", 80, ("odoo", "/web/static/", "/website/static/", "odoo.com")),
+    Platform("Typo3", 80, ("typo3", "typo3conf", "typo3temp")),
+    Platform("Joomla", 80, ("joomla", "/components/com_", "/media/jui/", "option=com_")),
+    Platform("Weebly", 90, ("weebly", "weeblycloud", "editmysite.com")),
+    Platform("Volusion", 85, ("volusion", "vspfiles", "/v/vspfiles/")),
+    # 3dcart / Shift4Shop
+    Platform("Shift4Shop", 85, ("3dcart", "shift4shop", "3dcartstores")),
+    Platform("Snipcart", 90, ("snipcart", "cdn.snipcart.com", "snipcart-add-item")),
+    Platform("Gumroad", 90, ("gumroad", "gumroad.com", "gumroad-overlay")),
+    Platform("Kajabi", 90, ("kajabi", "kajabi-cdn", "app.kajabi.com")),
+    Platform("Teachable", 90, ("teachable", "teachablecdn", "app.teachable.com")),
+    Platform("Thinkific", 90, ("thinkific", "thinkific.com", "thinkific-cdn")),
+    Platform("Podia", 90, ("podia", "app.podia.com", "podia-cdn")),
+    Platform("Systeme.io", 90, ("systeme.io", "systemeio", "app.systeme.io")),
+    Platform("ClickFunnels", 90, ("clickfunnels", "cf-styles", "cf2.com")),
+    Platform("Kartra", 90, ("kartra", "app.kartra.com", "kartra-cdn")),
+    Platform("ThriveCart", 90, ("thrivecart", "thrivecart.com")),
+    Platform("SamCart", 90, ("samcart", "app.samcart.com")),
+    Platform("Tilda", 90, ("tilda.cc", "tildacdn", "tilda-")),
+    Platform("Duda", 90, ("duda.co", "dudaone", "cdn.duda.co")),
+    # GoDaddy Website Builder
+    Platform("GoDaddy", 85, ("godaddy", "img.godaddy.com", "godaddy-website-builder")),
+    # HubSpot CMS
+    Platform("HubSpot", 85, ("hubspot", "hs-scripts", "hscta", "hubspotusercontent")),
+    Platform("Shoptet", 90, ("shoptet", "shoptet.cz")),
+    # Lightspeed eCom
+    Platform("Lightspeed", 85, ("lightspeed", "shoplightspeed", "seoshop")),
+    Platform("Neto", 85, ("neto.com.au", "netosuite")),
+]
+
+CMS_SIGNATURES: List[Signature] = SHOPIFY_SIGNATURES + [
+    signature
+    for platform in CMS_PLATFORMS
+    for signature in (
+        [Signature(platform.name, p, 2) for p in platform.strong]
+        + [Signature(platform.name, p, 1) for p in platform.medium]
+        + [Signature(platform.name, p, 2, HEADERS) for p in platform.headers]
+    )
+]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MOTEUR MULTI-MOTIFS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _trie_regex(patterns: Iterable[str]) -> str:
+    """
+    Regex equivalente a l'alternative des motifs, factorisee en trie: a
+    chaque position, une seule branche par caractere est essayee et la
+    correspondance la plus longue est retenue.
+    """
+    trie: Dict = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: Dict) -> Optional[str]:
+        branches, leaves = [], []
+        for char in sorted(k for k in node if k):
+            tail = build(node[char])
+            if tail is None:
+                leaves.append(re.escape(char))
+            else:
+                branches.append(re.escape(char) + tail)
+        if leaves:
+            branches.append(leaves[0] if len(leaves) == 1 else "[" + "".join(leaves) + "]")
+        if not branches:
+            return None
+        regex = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{regex})?" if "" in node else regex
+
+    return build(trie) or "(?!)"
+
+
+class SignatureMatcher:
+    """
+    Recherche simultanee de sous-chaines en un passage sur le texte.
+
+    Automate Aho-Corasick (pyahocorasick) si disponible, sinon regex en
+    trie: la correspondance la plus longue a une position implique les
+    motifs qui en sont prefixes, la recherche reprend a la position suivante
+    (les motifs qui se chevauchent sont tous trouves).
+    """
+
+    def __init__(self, patterns: Iterable[str], use_automaton: Optional[bool] = None):
+        """
+        Args:
+            patterns: Sous-chaines a chercher
+            use_automaton: None: pyahocorasick si installe; False: regex
+        """
+        self.patterns = sorted({p for p in patterns if p})
+        if use_automaton is None:
+            use_automaton = ahocorasick is not None
+        self._automaton = None
+        if use_automaton:
+            self._automaton = ahocorasick.Automaton()
+            for pattern in self.patterns:
+                self._automaton.add_word(pattern, pattern)
+            self._automaton.make_automaton()
+        else:
+            self._regex = re.compile(_trie_regex(self.patterns))
+            self._prefixes = {
+                p: [q for q in self.patterns if p.startswith(q)] for p in self.patterns
+            }
+
+    @property
+    def backend(self) -> str:
+        return "aho-corasick" if self._automaton is not None else "regex"
+
+    def find(self, text: str) -> Set[str]:
+        """Motifs presents dans le texte"""
+        found: Set[str] = set()
+        if not text or not self.patterns:
+            return found
+        total = len(self.patterns)
+
+        if self._automaton is not None:
+            for _, pattern in self._automaton.iter(text):
+                found.add(pattern)
+                if len(found) == total:
+                    break
+            return found
+
+        search, pos = self._regex.search, 0
+        while True:
+            match = search(text, pos)
+            if match is None:
+                return found
+            found.update(self._prefixes[match.group()])
+            if len(found) == total:
+                return found
+            pos = match.start() + 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DETECTION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def unknown_cms_result() -> Dict[str, any]:
+    """Resultat par defaut (CMS non detecte)"""
+    return {"cms": "Unknown", "is_shopify": False, "confidence": 0, "details": ""}
+
+
+@dataclass
+class CmsEvidence:
+    """Preuves trouvees pour chaque plateforme (ordre de la table)"""
+    evidence: Dict[str, List[str]] = field(default_factory=dict)
+    scores: Dict[str, int] = field(default_factory=dict)
+    strongest: Dict[str, int] = field(default_factory=dict)  # Poids max par plateforme
+
+    def add(self, signature: Signature):
+        platform = signature.platform
+        self.evidence.setdefault(platform, []).append(signature.label)
+        self.scores[platform] = self.scores.get(platform, 0) + signature.weight
+        self.strongest[platform] = max(self.strongest.get(platform, 0), signature.weight)
+
+    def score(self, platform: str) -> int:
+        return self.scores.get(platform, 0)
+
+    @property
+    def certain(self) -> bool:
+        """True si d'autres preuves ne changeraient plus la decision (Shopify a 100%)"""
+        return self.score("Shopify") >= SHOPIFY_CERTAIN_SCORE
+
+    def decide(self, probe_shopify: Optional[Callable[[], bool]] = None) -> Dict[str, any]:
+        """
+        Choisit le CMS: Shopify d'abord (score), puis les autres plateformes
+        par ordre de priorite.
+
+        Args:
+            probe_shopify: Verification complementaire si aucune preuve
+                Shopify (endpoints /products.json...), None: pas de verification
+
+        Returns:
+            Dict avec 'cms', 'is_shopify', 'confidence', 'details'
+        """
+        result = unknown_cms_result()
+        shopify_score = self.score("Shopify")
+        if shopify_score >= SHOPIFY_MIN_SCORE:
+            result.update(cms="Shopify", is_shopify=True, confidence=min(100, shopify_score * 10),
+                          details=", ".join(self.evidence["Shopify"][:5]))
+            return result
+        if shopify_score >= 1 or (probe_shopify is not None and probe_shopify()):
+            result.update(cms="Shopify", is_shopify=True, confidence=80, details="API endpoint detected")
+            return result
+
+        for platform in CMS_PLATFORMS:
+            weight = self.strongest.get(platform.name)
+            if weight:
+                result["cms"] = platform.name
+                result["confidence"] = platform.confidence if weight >= 2 else platform.medium_confidence
+                return result
+        return result
+
+
+_HTML_MATCHER: Optional[SignatureMatcher] = None
+
+
+def _html_matcher() -> SignatureMatcher:
+    """Automate des signatures HTML (compile au premier appel)"""
+    global _HTML_MATCHER
+    if _HTML_MATCHER is None:
+        _HTML_MATCHER = SignatureMatcher(s.pattern for s in CMS_SIGNATURES if s.source == HTML)
+    return _HTML_MATCHER
+
+
+def scan_cms_signatures(
+    html: str,
+    headers: Optional[Dict[str, str]] = None,
+    cookies: Optional[Dict[str, str]] = None
+) -> CmsEvidence:
+    """
+    Cherche toutes les signatures CMS dans une reponse (un passage sur le HTML).
+
+    Args:
+        html: HTML de la page (les CMS_HTML_LIMIT premiers caracteres)
+        headers: Headers de la reponse
+        cookies: Cookies recus (noms)
+
+    Returns:
+        CmsEvidence (preuves et scores de toutes les plateformes)
+    """
+    found = _html_matcher().find((html or "")[:CMS_HTML_LIMIT].lower())
+    return _evidence(found, headers, cookies)
+
+
+def _evidence(
+    found: Set[str],
+    headers: Optional[Dict[str, str]] = None,
+    cookies: Optional[Dict[str, str]] = None
+) -> CmsEvidence:
+    """Preuves a partir des motifs HTML trouves, des headers et des cookies"""
+    headers_lower = {str(k).lower(): str(v).lower() for k, v in (headers or {}).items()}
+    headers_text = "\n".join(f"{k}:{v}" for k, v in headers_lower.items())
+    set_cookie = headers_lower.get("set-cookie", "")
+    cookies = cookies or {}
+
+    evidence = CmsEvidence()
+    for signature in CMS_SIGNATURES:
+        source, pattern = signature.source, signature.pattern
+        if source == HTML:
+            matched = pattern in found
+        elif source == HEADER:
+            matched = pattern in headers_lower
+        elif source == HEADER_VALUE:
+            matched = pattern in headers_lower.get(signature.field, "")
+        elif source == HEADERS:
+            matched = pattern in headers_text
+        else:
+            matched = pattern in cookies or pattern in set_cookie
+        if matched:
+            evidence.add(signature)
+    return evidence
+
+
+class CmsSignatureStream:
+    """
+    Signatures HTML cherchees au fil d'un document lu par morceaux.
+
+    Chaque morceau est cherche avec la fin du precedent (motif a cheval sur
+    deux morceaux); seuls les limit premiers caracteres sont examines, comme
+    scan_cms_signatures.
+    """
+
+    def __init__(self, limit: int = CMS_HTML_LIMIT):
+        self.limit = limit
+        self.found: Set[str] = set()
+        self.chars = 0
+        self._overlap = max((len(p) for p in _html_matcher().patterns), default=1) - 1
+        self._tail = ""
+
+    @property
+    def exhausted(self) -> bool:
+        return self.chars >= self.limit
+
+    def feed(self, text: str):
+        """Cherche les signatures dans le morceau suivant du document"""
+        text = text[:self.limit - self.chars]
+        if not text:
+            return
+        self.chars += len(text)
+        window = self._tail + text.lower()
+        self.found |= _html_matcher().find(window)
+        self._tail = window[-self._overlap:] if self._overlap else ""
+
+    def evidence(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        cookies: Optional[Dict[str, str]] = None
+    ) -> CmsEvidence:
+        """Preuves du document lu jusqu'ici (avec headers et cookies)"""
+        return _evidence(self.found, headers, cookies)
+
+
+def detect_cms_from_html(html: str, headers: Optional[Dict[str, str]] = None) -> str:
+    """Nom du CMS d'une page deja telechargee ("Unknown" si non detecte)"""
+    return scan_cms_signatures(html, headers).decide()["cms"]
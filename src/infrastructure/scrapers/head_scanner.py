@@ -0,0 +1,168 @@
+"""
+Lecture en flux du debut d'une page d'accueil (CMS, theme, devise).
+
+Les detecteurs telechargeaient la page entiere (certaines boutiques servent
+2 a 5 Mo de HTML/JSON inline) pour n'en examiner que le debut. HeadScanner
+est un consommateur du moteur de crawl (sink): le corps lui est passe par
+morceaux, sous un budget d'octets, et la lecture s'arrete des que les
+donnees demandees sont connues.
+
+- CMS: signatures cherchees au fil de la lecture (CmsSignatureStream);
+  connu des que les preuves Shopify sont certaines, sinon au budget
+- Theme: noms inline (Shopify.theme, data-theme-name...), en option; comme
+  sur la page entiere, le motif le plus prioritaire l'emporte (lecture
+  poursuivie tant que Shopify.theme n'est pas trouve)
+- Devise: Shopify.currency ou og:price:currency, en option
+
+Usage:
+    scanner = HeadScanner(theme=True, currency=True)
+    response = get_crawler().fetch(url, sink=scanner, max_bytes=scanner.budget)
+    cms = scanner.evidence(response.headers, response.cookies).decide()["cms"]
+"""
+import codecs
+from typing import List, Optional
+
+from src.infrastructure.config import (
+    COMPILED_INLINE_PATTERNS, COMPILED_THEME_CLEAN_PATTERN,
+    COMPILED_CURRENCY_SHOPIFY, COMPILED_CURRENCY_OG,
+)
+from src.infrastructure.scrapers.cms_signatures import (
+    CMS_HTML_LIMIT, CmsEvidence, CmsSignatureStream,
+)
+
+# Fin du morceau precedent gardee pour les motifs a cheval sur deux morceaux
+_WINDOW_OVERLAP = 4096
+
+# Sources de la devise, par priorite
+_CURRENCY_PATTERNS = [COMPILED_CURRENCY_SHOPIFY, COMPILED_CURRENCY_OG]
+
+
+def _charset(headers) -> str:
+    """Encodage annonce par Content-Type (utf-8 par defaut ou si inconnu)"""
+    content_type = next((v for k, v in headers.items() if k.lower() == "content-type"), "")
+    for param in str(content_type).split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            try:
+                return codecs.lookup(value.strip().strip("\"'")).name
+            except LookupError:
+                break
+    return "utf-8"
+
+
+def clean_theme_name(name: Optional[str]) -> Optional[str]:
+    """Nettoie le nom de theme (None si invalide)"""
+    if not name:
+        return None
+    n = name.strip().strip("/*-—–:=> \t\"'")
+    if len(n) < 2 or len(n) > 120:
+        return None
+    # Utiliser le pattern pre-compile
+    if COMPILED_THEME_CLEAN_PATTERN.search(n):
+        return None
+    return n
+
+
+class HeadScanner:
+    """
+    Consommateur en flux du debut d'une page (voir CrawlerEngine.fetch sink).
+
+    start() repart de zero (relance du moteur); feed() retourne True pour
+    arreter la lecture: donnees demandees connues ou budget atteint.
+    """
+
+    def __init__(self, budget: int = CMS_HTML_LIMIT, theme: bool = False, currency: bool = False):
+        """
+        Args:
+            budget: Octets lus au plus
+            theme: Attendre aussi le nom de theme inline
+            currency: Attendre aussi la devise
+        """
+        self.budget = budget
+        self.want_theme = theme
+        self.want_currency = currency
+        self._reset()
+
+    def _reset(self, headers=None):
+        self.headers = dict(headers or {})
+        self.bytes_read = 0
+        self.started = headers is not None
+        self._parts: List[str] = []
+        self._decoder = codecs.getincrementaldecoder(_charset(self.headers))(errors="replace")
+        self._signatures = CmsSignatureStream(self.budget)
+        self._tail = ""
+        self._theme: Optional[tuple] = None     # (priorite du motif, nom)
+        self._currency: Optional[tuple] = None  # (priorite de la source, code)
+
+    # ─── Protocole sink ──────────────────────────────────────────────────────
+
+    def start(self, headers):
+        self._reset(headers)
+
+    def feed(self, chunk: bytes) -> bool:
+        """Morceau suivant du corps (True: lecture terminee)"""
+        chunk = chunk[:max(0, self.budget - self.bytes_read)]
+        self.bytes_read += len(chunk)
+        text = self._decoder.decode(chunk)
+        if text:
+            self._parts.append(text)
+            self._signatures.feed(text)
+            window = self._tail + text
+            if self.want_theme:
+                self._find_theme(window)
+            if self.want_currency:
+                self._find_currency(window)
+            self._tail = window[-_WINDOW_OVERLAP:]
+        return self.resolved or self.bytes_read >= self.budget
+
+    # ─── Resultats ───────────────────────────────────────────────────────────
+
+    @property
+    def cms_resolved(self) -> bool:
+        return self._signatures.evidence(self.headers).certain
+
+    @property
+    def resolved(self) -> bool:
+        """True si toutes les donnees demandees sont connues"""
+        # Un motif de theme moins prioritaire peut etre supplante plus loin
+        if self.want_theme and (self._theme is None or self._theme[0] > 0):
+            return False
+        if self.want_currency and self._currency is None:
+            return False
+        return self.cms_resolved
+
+    @property
+    def text(self) -> str:
+        """Debut de la page lu jusqu'ici"""
+        return "".join(self._parts)
+
+    @property
+    def theme(self) -> Optional[str]:
+        return self._theme[1] if self._theme else None
+
+    @property
+    def currency(self) -> Optional[str]:
+        return self._currency[1] if self._currency else None
+
+    def evidence(self, headers=None, cookies=None) -> CmsEvidence:
+        """Preuves CMS du debut de la page (headers: ceux de start par defaut)"""
+        return self._signatures.evidence(self.headers if headers is None else headers, cookies)
+
+    # ─── Recherche ───────────────────────────────────────────────────────────
+
+    def _find_theme(self, window: str):
+        best = self._theme[0] if self._theme else len(COMPILED_INLINE_PATTERNS)
+        for priority, pattern in enumerate(COMPILED_INLINE_PATTERNS[:best]):
+            m = pattern.search(window)
+            name = clean_theme_name(m.group(1)) if m else None
+            if name:
+                self._theme = (priority, name)
+                return
+
+    def _find_currency(self, window: str):
+        best = self._currency[0] if self._currency else len(_CURRENCY_PATTERNS)
+        for priority, pattern in enumerate(_CURRENCY_PATTERNS[:best]):
+            m = pattern.search(window)
+            if m:
+                self._currency = (priority, m.group(1))
+                return
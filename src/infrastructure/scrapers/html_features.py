@@ -0,0 +1,315 @@
+"""
+Extraction des donnees d'une page HTML en un seul passage.
+
+L'analyse web construisait plusieurs arbres BeautifulSoup de la meme page
+d'accueil (paiements, texte de classification, titre/description/h1,
+assets du theme) puis le scraper Gemini en refaisait un. Ici la page est
+lue une fois par le parseur HTML de lxml en mode evenements (pas d'arbre):
+chaque evenement alimente toutes les donnees a la fois.
+
+- Texte visible (equivalent de get_text(" ", strip=True): sans script,
+  style, template ni commentaires)
+- <title>, meta description / keywords, premier <h1>
+- Texte de navigation (nav, header, footer, .site-nav, .menu)
+- Liens ressemblant a des produits (heuristique du scraper Gemini)
+- Indices de paiement (texte, HTML, alt/src des images)
+- Assets du theme (CSS/JS sous /assets/ ou /cdn/shop/t/) et devise
+
+Usage:
+    features = extract_html_features(html, base_url=url)
+    title, payments = features.title, features.payments
+"""
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from lxml import etree
+
+from src.infrastructure.config import (
+    DEFAULT_PAYMENTS, COMPILED_CURRENCY_SHOPIFY, COMPILED_CURRENCY_OG,
+)
+
+# Elements dont le contenu n'est pas du texte visible
+SKIPPED_TAGS = {"script", "style", "template"}
+
+# Conteneurs de navigation (balises et classes)
+NAV_TAGS = {"nav", "header", "footer"}
+NAV_CLASSES = {"site-nav", "menu"}
+
+# Texte visible pris en compte pour les paiements (avec le HTML brut)
+PAYMENT_TEXT_LIMIT = 400000
+
+# Liens produits gardes au plus
+MAX_PRODUCT_LINKS = 10
+
+# URLs de liens produits
+COMPILED_PRODUCT_HREF = re.compile(
+    r'/product[s]?/|/produit[s]?/|/p/|/shop/|/collection[s]?/|/item[s]?/|/article[s]?/|/catalog/', re.I
+)
+
+# Textes de liens avec un prix
+COMPILED_PRICE_TEXT = re.compile(r'[\d,\.]+\s*[€$£]|[€$£]\s*[\d,\.]+|EUR|USD')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+@dataclass
+class HtmlFeatures:
+    """Donnees extraites d'une page HTML"""
+    title: str = ""
+    description: str = ""
+    keywords: str = ""
+    h1: str = ""
+    text: str = ""  # Texte visible
+    nav_text: str = ""
+    product_links: List[str] = field(default_factory=list)
+    payments: List[str] = field(default_factory=list)
+    theme_assets: List[str] = field(default_factory=list)  # href/src bruts, dans l'ordre
+    currency: Optional[str] = None
+
+
+def extract_currency(html: str) -> Optional[str]:
+    """Devise du site (Shopify.currency, sinon og:price:currency)"""
+    m = COMPILED_CURRENCY_SHOPIFY.search(html)
+    if m:
+        return m.group(1)
+    m = COMPILED_CURRENCY_OG.search(html)
+    if m:
+        return m.group(1)
+    return None
+
+
+def is_product_link(href: str, text: str, domain: str) -> bool:
+    """Lien interne dont l'URL ou le texte (prix) ressemble a un produit"""
+    if not text or len(text) < 3 or len(text) > 100:
+        return False
+    if not (href.startswith('/') or href.startswith('#') or domain in href):
+        return False
+    return bool(COMPILED_PRODUCT_HREF.search(href) or COMPILED_PRICE_TEXT.search(text))
+
+
+def _is_theme_asset(src: str) -> bool:
+    return (src.endswith(".css") or src.endswith(".js")) and ("/assets/" in src or "/cdn/shop/t/" in src)
+
+
+class _FeatureCollector:
+    """
+    Cible du parseur lxml: recoit les evenements (start, end, data, comment)
+    dans l'ordre du document.
+
+    Les textes visibles sont ajoutes a une seule liste; le texte d'un
+    element est la tranche de cette liste entre son ouverture et sa
+    fermeture (un element suivi ne garde qu'un indice).
+    """
+
+    def __init__(self, domain: str, max_links: int):
+        self.domain = domain
+        self.max_links = max_links
+        self.features = HtmlFeatures()
+        self.strings: List[str] = []
+        self.images: List[str] = []     # alt + src des <img> (minuscules)
+        self.nav_parts: List[str] = []  # Texte des conteneurs de navigation
+        self._pending: List[str] = []  # Texte en cours (morceaux d'un meme noeud)
+        self._skip = 0                 # Profondeur dans script/style/template
+        self._title: Optional[List[str]] = None  # Textes du <title> ouvert
+        self._title_children = 0
+        self._h1: Optional[int] = None
+        self._h1_depth = 0
+        self._anchors: List[tuple] = []  # (rang, href, debut) des <a> ouverts
+        self._links: List[tuple] = []    # (rang, href, texte) des <a> fermes
+        self._nav_tag: Optional[str] = None
+        self._nav_depth = 0
+        self._nav_start = 0
+        self._seen_title = self._seen_h1 = False
+        self._seen_description = self._seen_keywords = False
+
+    # ─── Evenements du parseur ───────────────────────────────────────────────
+
+    def start(self, tag, attrib):
+        self._flush()
+        if not isinstance(tag, str):
+            return
+        tag = tag.lower()
+        if tag in SKIPPED_TAGS:
+            self._skip += 1
+            if tag == "script":
+                self._asset(attrib.get("src"))
+            return
+
+        if tag == "title" and not self._seen_title:
+            self._seen_title = True
+            self._title = []
+        elif self._title is not None:
+            self._title_children += 1
+        elif tag == "h1" and not self._seen_h1:
+            self._seen_h1 = True
+            self._h1 = len(self.strings)
+            self._h1_depth = 1
+        elif tag == "h1" and self._h1 is not None:
+            self._h1_depth += 1
+        elif tag == "meta":
+            self._meta(attrib)
+        elif tag == "a" and attrib.get("href") is not None:
+            rank = len(self._anchors) + len(self._links)
+            self._anchors.append((rank, attrib.get("href"), len(self.strings)))
+        elif tag == "img":
+            self.images.append(f"{attrib.get('alt') or ''} {attrib.get('src') or ''}".lower())
+        elif tag == "link":
+            self._asset(attrib.get("href"))
+
+        if self._nav_tag is not None:
+            if tag == self._nav_tag:
+                self._nav_depth += 1
+        elif tag in NAV_TAGS or NAV_CLASSES & set((attrib.get("class") or "").split()):
+            self._nav_tag, self._nav_depth, self._nav_start = tag, 1, len(self.strings)
+
+    def end(self, tag):
+        self._flush()
+        if not isinstance(tag, str):
+            return
+        tag = tag.lower()
+        if tag in SKIPPED_TAGS:
+            self._skip = max(0, self._skip - 1)
+            return
+
+        if tag == "title" and self._title is not None:
+            # Equivalent de title.string: un seul texte, sans element enfant
+            if len(self._title) == 1 and not self._title_children:
+                self.features.title = self._title[0].strip()
+            self._title = None
+        elif tag == "h1" and self._h1 is not None:
+            self._h1_depth -= 1
+            if not self._h1_depth:
+                self.features.h1 = "".join(self.strings[self._h1:])
+                self._h1 = None
+        elif tag == "a" and self._anchors:
+            rank, href, begin = self._anchors.pop()
+            self._links.append((rank, href, "".join(self.strings[begin:])))
+
+        if tag == self._nav_tag:
+            self._nav_depth -= 1
+            if self._nav_depth == 0:
+                self.nav_parts.append(" ".join(self.strings[self._nav_start:]))
+                self._nav_tag = None
+
+    def data(self, data):
+        if not self._skip:
+            self._pending.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def pi(self, target, data=None):
+        self._flush()
+
+    def doctype(self, *args):
+        pass
+
+    def close(self):
+        self._flush()
+        # Liens dans l'ordre d'ouverture (<a> imbriques dans du HTML invalide)
+        for _, href, text in sorted(self._links):
+            self._product_link(href, text)
+        self._links = []
+        return self.features
+
+    # ─── Collecte ────────────────────────────────────────────────────────────
+
+    def _flush(self):
+        """Un noeud texte complet (les morceaux d'entites sont regroupes)"""
+        if not self._pending:
+            return
+        raw = "".join(self._pending)
+        self._pending = []
+        if self._title is not None:
+            self._title.append(raw)
+        stripped = raw.strip()
+        if stripped:
+            self.strings.append(stripped)
+
+    def _meta(self, attrib):
+        name = attrib.get("name")
+        if name == "description" and not self._seen_description:
+            self._seen_description = True
+            self.features.description = (attrib.get("content") or "").strip()
+        elif name == "keywords" and not self._seen_keywords:
+            self._seen_keywords = True
+            self.features.keywords = (attrib.get("content") or "").strip()
+
+    def _asset(self, src: Optional[str]):
+        if src and _is_theme_asset(src):
+            self.features.theme_assets.append(src)
+
+    def _product_link(self, href: str, text: str):
+        links = self.features.product_links
+        if len(links) >= self.max_links or not is_product_link(href, text, self.domain):
+            return
+        clean_text = _WHITESPACE.sub(' ', text).strip()
+        if clean_text and clean_text not in links:
+            links.append(clean_text)
+
+
+def _find_payments(text: str, images: List[str], terms: List[str]) -> List[str]:
+    """Moyens de paiement cites dans le texte/HTML ou les images (alt, src)"""
+    text = text.lower()
+    found = set()
+    for term in terms:
+        term_lower = term.lower()
+        if term_lower in text or any(term_lower in image for image in images):
+            found.add(term)
+    return sorted(found)
+
+
+def _collect(html: str, base_url: str = "", max_links: int = MAX_PRODUCT_LINKS) -> _FeatureCollector:
+    """Lit la page une fois (parseur lxml en mode evenements)"""
+    collector = _FeatureCollector(urlparse(base_url).netloc, max_links)
+    # Octets: une declaration d'encodage dans une chaine est refusee par lxml
+    parser = etree.HTMLParser(target=collector, encoding="utf-8", remove_comments=False)
+    try:
+        parser.feed(html.encode("utf-8", errors="replace"))
+        parser.close()
+    except (etree.LxmlError, ValueError):
+        collector.close()
+    return collector
+
+
+def html_to_text(html: str) -> str:
+    """Texte visible d'une page (equivalent de get_text(" ", strip=True))"""
+    if not html or not html.strip():
+        return ""
+    return " ".join(_collect(html).strings)
+
+
+def extract_html_features(
+    html: str,
+    base_url: str = "",
+    payment_terms: Optional[List[str]] = None,
+    max_links: int = MAX_PRODUCT_LINKS
+) -> HtmlFeatures:
+    """
+    Lit une page HTML une fois et retourne toutes ses donnees.
+
+    Args:
+        html: Page HTML
+        base_url: URL de la page (liens internes)
+        payment_terms: Moyens de paiement cherches (defaut: DEFAULT_PAYMENTS)
+        max_links: Liens produits gardes au plus
+
+    Returns:
+        HtmlFeatures (champs vides si la page n'est pas lisible)
+    """
+    if not html or not html.strip():
+        return HtmlFeatures()
+
+    collector = _collect(html, base_url, max_links)
+    features = collector.features
+    features.text = " ".join(collector.strings)
+    features.nav_text = " ".join(collector.nav_parts)
+    features.currency = extract_currency(html)
+    features.payments = _find_payments(
+        " ".join([features.text[:PAYMENT_TEXT_LIMIT], html]),
+        collector.images,
+        DEFAULT_PAYMENTS if payment_terms is None else payment_terms,
+    )
+    return features
@@ -3,15 +3,14 @@ MarketSpy V2 - Module d'analyse optimise pour sites e-commerce.
 
 Architecture "Smart Stream" avec optimisations:
 - 1 requete HTTP unique par site pour homepage (CMS + Theme + Metadata)
-- Sitemap streaming avec limites budgetaires (50Ko/1MB)
-- Connection pooling et gzip
-- SSL configurable via PROXY_CA_BUNDLE
-- Retry avec exponential backoff
+- Sitemaps comptes en flux (memoire bornee, lecture parallele, arret a la limite)
+- Requetes via le moteur de crawl partage (pool global, politesse par site)
+- Retry avec backoff, curl_cffi en second essai si Cloudflare bloque
 
 Classes:
-    - HttpClient: Client HTTP optimise avec retry et SSL
+    - HttpClient: Client HTTP (moteur de crawl + repli curl_cffi)
     - ThemeDetector: Detection theme Shopify depuis HTML uniquement
-    - SitemapAnalyzer: Streaming sitemap avec limites
+    - SitemapAnalyzer: Comptage sitemap en flux (moteur commun)
     - MarketSpy: Orchestrateur principal
 
 Usage:
@@ -21,12 +20,11 @@ Usage:
 
 import os
 import re
-import time
 import random
 import logging
 import warnings
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Tuple, Any
+from typing import Optional, List, Dict, Tuple, Any, Callable
 from urllib.parse import urlparse, urljoin
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -38,14 +36,16 @@ except ImportError:
     curl_requests = None
     CURL_CFFI_AVAILABLE = False
 
-# Fallback sur requests standard
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
 # Desactiver les warnings SSL si pas de CA bundle
 import urllib3
 
+from src.infrastructure.config import CRAWLER_WORKERS, SITEMAP_MAX_BYTES
+from src.infrastructure.http.crawler import get_crawler
+from src.infrastructure.http.revalidation import Revalidated, fetch_revalidated
+from src.infrastructure.scrapers.cms_signatures import detect_cms_from_html
+from src.infrastructure.scrapers.products_json import ProductsJsonCounter, products_in
+from src.infrastructure.scrapers.sitemap_engine import SitemapEngine
+
 # Configuration logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -59,16 +59,14 @@ TIMEOUT_HOMEPAGE = 8
 TIMEOUT_SITEMAP = 10
 
 # Limites sitemap (en bytes)
-SITEMAP_STREAM_LIMIT_MULTI = 50 * 1024      # 50 Ko pour extraction titres
-SITEMAP_STREAM_LIMIT_SINGLE = 1 * 1024 * 1024  # 1 MB pour comptage
+SITEMAP_TITLES_BYTES = 50 * 1024      # 50 Ko du premier sitemap pour extraction titres
+SITEMAP_STREAM_LIMIT_SINGLE = 1 * 1024 * 1024  # 1 MB (get_stream)
 
-# Estimation produits par sitemap
-PRODUCTS_PER_SITEMAP_ESTIMATE = 50000
-
-# Retry configuration
-RETRY_STATUS_CODES = [429, 502, 503, 504]
+# Retry configuration (erreurs reseau et 429/502/503/504, dans le moteur de crawl)
 RETRY_MAX_ATTEMPTS = 3
-RETRY_BACKOFF_FACTOR = 1.0  # 1s, 2s, 4s
+
+# Statuts des pages de challenge Cloudflare (second essai avec curl_cffi)
+CLOUDFLARE_STATUS_CODES = {403, 503}
 
 # User-Agents pour rotation
 USER_AGENTS = [
@@ -106,41 +104,6 @@ THEME_CDN_PATTERN = re.compile(
     re.I
 )
 
-# Patterns pour detection CMS
-CMS_PATTERNS = {
-    "Shopify": [
-        re.compile(r'cdn\.shopify\.com', re.I),
-        re.compile(r'Shopify\.theme', re.I),
-        re.compile(r'/collections/', re.I),
-        re.compile(r'/products/', re.I),
-    ],
-    "WooCommerce": [
-        re.compile(r'woocommerce', re.I),
-        re.compile(r'wp-content', re.I),
-        re.compile(r'add-to-cart', re.I),
-    ],
-    "PrestaShop": [
-        re.compile(r'prestashop', re.I),
-        re.compile(r'ps_shoppingcart', re.I),
-    ],
-    "Magento": [
-        re.compile(r'magento', re.I),
-        re.compile(r'mage/', re.I),
-    ],
-    "Wix": [
-        re.compile(r'wixstatic\.com', re.I),
-        re.compile(r'wix\.com', re.I),
-    ],
-    "Squarespace": [
-        re.compile(r'squarespace\.com', re.I),
-        re.compile(r'static1\.squarespace', re.I),
-    ],
-    "BigCommerce": [
-        re.compile(r'bigcommerce', re.I),
-        re.compile(r'cdn\.bcapp', re.I),
-    ],
-}
-
 # Patterns pour extraction metadata
 CURRENCY_PATTERNS = [
     re.compile(r'Shopify\.currency\s*=\s*\{[^}]*"active"\s*:\s*"([A-Z]{3})"', re.I),
@@ -148,10 +111,6 @@ CURRENCY_PATTERNS = [
     re.compile(r'"priceCurrency"\s*:\s*"([A-Z]{3})"', re.I),
 ]
 
-# Patterns sitemap
-SITEMAP_LOC_PATTERN = re.compile(r'<loc>([^<]+)</loc>', re.I)
-SITEMAP_URL_PATTERN = re.compile(r'<url>', re.I)
-
 
 # ===========================================================================
 # DATA CLASSES
@@ -233,27 +192,22 @@ class AnalysisResult:
 
 class HttpClient:
     """
-    Client HTTP optimise avec:
-    - curl_cffi pour bypass Cloudflare (TLS fingerprint Chrome)
-    - Fallback sur requests standard si curl_cffi non disponible
-    - Connection pooling (Session)
-    - Gzip automatique
-    - SSL configurable via PROXY_CA_BUNDLE
-    - Retry avec exponential backoff sur 429/502/503/504
+    Client HTTP des analyses MarketSpy, adosse au moteur de crawl partage:
+    - Pool de connexions, concurrence globale et politesse par site du moteur
+    - Retry avec backoff sur erreurs reseau et 429/502/503/504
+    - Lecture bornee des reponses (streaming)
+    - curl_cffi (TLS fingerprint Chrome) en second essai sur les pages
+      bloquees par Cloudflare (403/503), s'il est installe
     """
 
     def __init__(self):
+        self.crawler = get_crawler()
         self.use_curl_cffi = CURL_CFFI_AVAILABLE
         self._setup_ssl()
-        if not self.use_curl_cffi:
-            self.session = self._create_fallback_session()
-            logger.warning("curl_cffi not available, using requests (may get blocked by Cloudflare)")
-        else:
-            self.session = curl_requests.Session()
-            logger.info("Using curl_cffi with Chrome impersonation for Cloudflare bypass")
+        self.session = curl_requests.Session() if self.use_curl_cffi else None
 
     def _setup_ssl(self):
-        """Configure SSL avec PROXY_CA_BUNDLE ou fallback verify=False."""
+        """Configure SSL (curl_cffi) avec PROXY_CA_BUNDLE ou fallback verify=False."""
         self.ca_bundle = os.getenv("PROXY_CA_BUNDLE", "")
 
         if self.ca_bundle and os.path.exists(self.ca_bundle):
@@ -266,40 +220,51 @@ class HttpClient:
             if self.ca_bundle:
                 logger.warning(f"SSL: CA bundle not found at {self.ca_bundle}, using verify=False")
 
-    def _create_fallback_session(self) -> requests.Session:
-        """Cree une session requests standard avec retry (fallback)."""
-        session = requests.Session()
-
-        # Configuration retry avec exponential backoff
-        retry_strategy = Retry(
-            total=RETRY_MAX_ATTEMPTS,
-            backoff_factor=RETRY_BACKOFF_FACTOR,
-            status_forcelist=RETRY_STATUS_CODES,
-            allowed_methods=["GET", "HEAD"],
-        )
-
-        adapter = HTTPAdapter(
-            max_retries=retry_strategy,
-            pool_connections=10,
-            pool_maxsize=20,
-        )
-
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-
-        return session
-
     def _get_headers(self) -> Dict[str, str]:
-        """Retourne les headers avec User-Agent aleatoire et gzip."""
+        """Retourne les headers avec User-Agent aleatoire."""
         return {
             "User-Agent": random.choice(USER_AGENTS),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1",
         }
 
+    def _fetch(self, url: str, timeout: int, max_bytes: Optional[int] = None) -> Optional[Any]:
+        """Requete via le moteur de crawl, puis curl_cffi si Cloudflare bloque."""
+        response = self.crawler.fetch(
+            url,
+            timeout=timeout,
+            headers=self._get_headers(),
+            use_proxy=False,
+            retries=RETRY_MAX_ATTEMPTS,
+            max_bytes=max_bytes
+        )
+        if response.ok:
+            return response
+
+        if response.status_code in CLOUDFLARE_STATUS_CODES and self.session is not None:
+            return self._fetch_fallback(url, timeout)
+
+        logger.debug(f"{response.error or response.status_code}: {url[:50]}... - {response.error_message[:50]}")
+        return None
+
+    def _fetch_fallback(self, url: str, timeout: int) -> Optional[Any]:
+        """Second essai curl_cffi (TLS fingerprint Chrome) d'une page bloquee par Cloudflare."""
+        try:
+            fallback = self.session.get(
+                url,
+                headers=self._get_headers(),
+                timeout=timeout,
+                verify=self.verify,
+                allow_redirects=True,
+                impersonate="chrome110",  # TLS fingerprint Chrome
+            )
+            fallback.raise_for_status()
+            return fallback
+        except Exception as e:
+            logger.debug(f"{type(e).__name__}: {url[:50]}... - {str(e)[:50]}")
+            return None
+
     def get(
         self,
         url: str,
@@ -307,44 +272,17 @@ class HttpClient:
         stream: bool = False
     ) -> Optional[Any]:
         """
-        Execute une requete GET avec bypass Cloudflare (curl_cffi).
+        Execute une requete GET.
 
         Args:
             url: URL a fetcher
             timeout: Timeout en secondes
-            stream: Si True, retourne la reponse en streaming
+            stream: Conserve pour compatibilite (le moteur lit toujours en streaming)
 
         Returns:
             Response ou None si erreur
         """
-        try:
-            if self.use_curl_cffi:
-                # curl_cffi avec impersonate Chrome pour bypass Cloudflare
-                response = self.session.get(
-                    url,
-                    headers=self._get_headers(),
-                    timeout=timeout,
-                    verify=self.verify,
-                    allow_redirects=True,
-                    impersonate="chrome110",  # TLS fingerprint Chrome
-                )
-            else:
-                # Fallback requests standard
-                response = self.session.get(
-                    url,
-                    headers=self._get_headers(),
-                    timeout=timeout,
-                    verify=self.verify,
-                    allow_redirects=True,
-                    stream=stream,
-                )
-            response.raise_for_status()
-            return response
-
-        except Exception as e:
-            error_type = type(e).__name__
-            logger.debug(f"{error_type}: {url[:50]}... - {str(e)[:50]}")
-            return None
+        return self._fetch(url, timeout)
 
     def get_stream(
         self,
@@ -363,56 +301,62 @@ class HttpClient:
         Returns:
             Tuple (content, bytes_downloaded)
         """
-        try:
-            if self.use_curl_cffi:
-                # curl_cffi avec impersonate Chrome
-                response = self.session.get(
-                    url,
-                    headers=self._get_headers(),
-                    timeout=timeout,
-                    verify=self.verify,
-                    allow_redirects=True,
-                    impersonate="chrome110",
-                )
-                response.raise_for_status()
-                # curl_cffi: pas de vrai streaming, mais on peut limiter
-                content = response.text[:max_bytes] if len(response.text) > max_bytes else response.text
-                bytes_downloaded = len(content.encode('utf-8'))
-                return content, bytes_downloaded
-            else:
-                # Fallback requests avec streaming
-                response = self.session.get(
-                    url,
-                    headers=self._get_headers(),
-                    timeout=timeout,
-                    verify=self.verify,
-                    allow_redirects=True,
-                    stream=True,
-                )
-                response.raise_for_status()
-
-                chunks = []
-                bytes_downloaded = 0
-
-                for chunk in response.iter_content(chunk_size=8192, decode_unicode=True):
-                    if chunk:
-                        chunks.append(chunk)
-                        bytes_downloaded += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        response = self._fetch(url, timeout, max_bytes=max_bytes)
+        if response is None:
+            return "", 0
+        content = response.text[:max_bytes]
+        return content, len(content.encode('utf-8'))
 
-                        if bytes_downloaded >= max_bytes:
-                            logger.debug(f"Stream limit reached: {bytes_downloaded} bytes")
-                            break
+    def get_revalidated(
+        self,
+        url: str,
+        kind: str,
+        analyze: Callable[[Any], Any],
+        timeout: int = TIMEOUT_SITEMAP,
+        max_bytes: Optional[int] = None,
+        sink=None
+    ) -> Revalidated:
+        """
+        Requete revalidee (ETag / Last-Modified): si le document n'a pas change
+        depuis la derniere analyse, le resultat stocke est reutilise (304).
 
-                content = ''.join(chunks) if chunks else ''
-                return content, bytes_downloaded
+        Args:
+            url: URL a fetcher
+            kind: Nom de l'analyse (cle de stockage avec l'URL)
+            analyze: Analyse de la reponse (utilise response.text)
+            timeout: Timeout en secondes
+            max_bytes: Limite en bytes (coupe si depassee)
+            sink: Consommateur du corps en flux (voir CrawlerEngine.fetch)
 
-        except Exception as e:
-            logger.debug(f"Stream Error: {url[:50]}... - {str(e)[:30]}")
-            return "", 0
+        Returns:
+            Revalidated (result None si erreur)
+        """
+        page = fetch_revalidated(
+            url,
+            kind,
+            analyze,
+            timeout=timeout,
+            headers=self._get_headers(),
+            use_proxy=False,
+            retries=RETRY_MAX_ATTEMPTS,
+            max_bytes=max_bytes,
+            sink=sink
+        )
+        response = page.response
+        if page.result is None and response is not None and self.session is not None \
+                and response.status_code in CLOUDFLARE_STATUS_CODES:
+            fallback = self._fetch_fallback(url, timeout)
+            if fallback is not None:
+                if sink is not None:
+                    sink.start(fallback.headers)
+                    sink.feed(fallback.content)
+                return Revalidated(analyze(fallback), None)
+        return page
 
     def close(self):
-        """Ferme la session."""
-        self.session.close()
+        """Ferme la session curl_cffi (le moteur de crawl est partage)."""
+        if self.session is not None:
+            self.session.close()
 
 
 # ===========================================================================
@@ -507,17 +451,22 @@ class ThemeDetector:
 
 class SitemapAnalyzer:
     """
-    Analyseur de sitemap avec streaming et limites budgetaires.
-
-    Strategies selon le nombre de sitemaps:
-    - Multiple sitemaps: Estimation N × 50000, stream 50Ko du premier pour titres
-    - Single sitemap: Stream jusqu'a 1MB, count reel
+    Analyseur de sitemap en flux (moteur commun, voir sitemap_engine).
 
-    Si coupe avant la fin: product_count = "> X"
+    - Sitemaps produits du pays (sinon "root"), lus en parallele
+    - <url> comptes pendant la lecture (.xml.gz compris), jamais materialises
+    - Arret a MAX_PRODUCTS_FROM_SITEMAP produits: product_count = "> X"
+    - Titres extraits des SITEMAP_TITLES_BYTES premiers octets du premier sitemap
     """
 
     def __init__(self, http_client: HttpClient):
         self.http = http_client
+        self.engine = SitemapEngine(
+            fetch=self._fetch,
+            timeout=TIMEOUT_SITEMAP,
+            head_bytes=SITEMAP_TITLES_BYTES,
+            summarize=lambda head: self._extract_product_titles(head, max_titles=10),
+        )
 
     def analyze(self, base_url: str, country_code: str = "FR") -> SitemapData:
         """
@@ -532,14 +481,11 @@ class SitemapAnalyzer:
         """
         origin = self._get_origin(base_url)
 
-        # Step 1: Recuperer le sitemap index
-        sitemap_index = self._fetch_sitemap_index(origin)
-        if not sitemap_index:
+        # Step 1: Sitemaps produits du pays (sitemap index revalide)
+        product_sitemaps = self.engine.product_sitemaps(origin, country_code)
+        if product_sitemaps is None:
             return SitemapData(url=base_url, error="Sitemap not found")
 
-        # Step 2: Trouver les sitemaps produits
-        product_sitemaps = self._find_product_sitemaps(sitemap_index, country_code)
-
         if not product_sitemaps:
             return SitemapData(
                 url=base_url,
@@ -547,11 +493,24 @@ class SitemapAnalyzer:
                 error="No product sitemaps found"
             )
 
-        # Step 3: Logique selon le nombre de sitemaps
-        if len(product_sitemaps) > 1:
-            return self._handle_multiple_sitemaps(origin, product_sitemaps)
+        # Step 2: Comptage en flux (revalide: 0 octet si inchange)
+        counted = self.engine.count(product_sitemaps)
+        if not counted.sitemaps:
+            return SitemapData(url=origin, error="Failed to fetch sitemap")
+
+        # Limite atteinte ou sitemap non lu: le count est partiel
+        if counted.complete:
+            product_count = str(counted.count)
         else:
-            return self._handle_single_sitemap(origin, product_sitemaps[0])
+            product_count = f"> {counted.count}"
+
+        return SitemapData(
+            url=origin,
+            product_count=product_count,
+            product_titles=counted.summary or [],
+            sitemap_count=len(product_sitemaps),
+            bytes_downloaded=counted.bytes_downloaded,
+        )
 
     def _get_origin(self, url: str) -> str:
         """Extrait l'origine (scheme://host) d'une URL."""
@@ -560,111 +519,12 @@ class SitemapAnalyzer:
         parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}"
 
-    def _fetch_sitemap_index(self, origin: str) -> Optional[str]:
-        """Recupere le contenu du sitemap index."""
-        for path in ["/sitemap.xml", "/sitemap_index.xml"]:
-            url = f"{origin}{path}"
-            response = self.http.get(url, timeout=TIMEOUT_SITEMAP)
-            if response and response.text:
-                return response.text
-        return None
-
-    def _find_product_sitemaps(
-        self,
-        sitemap_content: str,
-        country_code: str
-    ) -> List[str]:
-        """Trouve les URLs des sitemaps produits."""
-        locs = SITEMAP_LOC_PATTERN.findall(sitemap_content)
-
-        product_sitemaps = []
-        country_lower = country_code.lower()
-
-        for loc in locs:
-            loc_lower = loc.lower()
-
-            # Filtrer sur les sitemaps produits
-            if "sitemap_products" in loc_lower or "products-sitemap" in loc_lower:
-                # Priorite aux sitemaps du pays
-                if f"/{country_lower}/" in loc_lower:
-                    product_sitemaps.insert(0, loc)
-                elif not any(f"/{lang}/" in loc_lower for lang in ["en", "de", "es", "it", "pt"]):
-                    product_sitemaps.append(loc)
-
-        return product_sitemaps
-
-    def _handle_multiple_sitemaps(
-        self,
-        origin: str,
-        sitemaps: List[str]
-    ) -> SitemapData:
-        """
-        Gere le cas de multiples sitemaps produits.
-
-        - Estimation: N × 50000
-        - Stream 50Ko du premier pour extraire des titres
-        """
-        estimated_count = len(sitemaps) * PRODUCTS_PER_SITEMAP_ESTIMATE
-
-        # Stream le premier sitemap pour les titres
-        first_sitemap = sitemaps[0]
-        content, bytes_downloaded = self.http.get_stream(
-            first_sitemap,
-            timeout=TIMEOUT_SITEMAP,
-            max_bytes=SITEMAP_STREAM_LIMIT_MULTI
-        )
-
-        titles = self._extract_product_titles(content, max_titles=10)
-
-        return SitemapData(
-            url=origin,
-            product_count=f"~{estimated_count}",
-            product_titles=titles,
-            sitemap_count=len(sitemaps),
-            bytes_downloaded=bytes_downloaded,
-        )
-
-    def _handle_single_sitemap(
-        self,
-        origin: str,
-        sitemap_url: str
-    ) -> SitemapData:
-        """
-        Gere le cas d'un seul sitemap produit.
-
-        - Stream jusqu'a 1MB
-        - Count reel des <url>
-        - Si coupe: "> X"
-        """
-        content, bytes_downloaded = self.http.get_stream(
-            sitemap_url,
-            timeout=TIMEOUT_SITEMAP,
-            max_bytes=SITEMAP_STREAM_LIMIT_SINGLE
-        )
-
-        if not content:
-            return SitemapData(url=origin, error="Failed to fetch sitemap")
-
-        # Compter les <url>
-        count = len(SITEMAP_URL_PATTERN.findall(content))
-
-        # Si on a atteint la limite, le count est partiel
-        was_truncated = bytes_downloaded >= SITEMAP_STREAM_LIMIT_SINGLE
-
-        if was_truncated:
-            product_count = f"> {count}"
-        else:
-            product_count = str(count)
-
-        titles = self._extract_product_titles(content, max_titles=10)
-
-        return SitemapData(
-            url=origin,
-            product_count=product_count,
-            product_titles=titles,
-            sitemap_count=1,
-            bytes_downloaded=bytes_downloaded,
-        )
+    def _fetch(self, url: str, kind: str, analyze: Callable[[Any], Any], sink=None) -> Revalidated:
+        """Requete d'un sitemap pour le moteur (client MarketSpy: retries, curl_cffi)."""
+        if sink is None:
+            return self.http.get_revalidated(url, kind, analyze, timeout=TIMEOUT_SITEMAP)
+        return self.http.get_revalidated(url, kind, analyze, timeout=TIMEOUT_SITEMAP,
+                                         max_bytes=SITEMAP_MAX_BYTES, sink=sink)
 
     def _extract_product_titles(self, content: str, max_titles: int = 10) -> List[str]:
         """Extrait les titres de produits depuis le contenu XML."""
@@ -718,7 +578,7 @@ class MarketSpy:
         result = spy.analyze("https://example.com")
 
         # Ou en batch
-        results = spy.analyze_batch(urls, max_workers=8)
+        results = spy.analyze_batch(urls)
     """
 
     def __init__(self):
@@ -824,7 +684,7 @@ class MarketSpy:
 
         Plus fiable que les sitemaps car:
         - API officielle Shopify (retourne uniquement produits publies)
-        - Pagination automatique (250 produits/page)
+        - Derniere page (250 produits/page) trouvee par sondes paralleles
         - Pas de probleme de parsing XML
 
         Args:
@@ -839,66 +699,30 @@ class MarketSpy:
 
         logger.info(f"Shopify JSON API: Starting count for {origin}")
 
-        total_products = 0
-        page = 1
-        max_pages = 100  # Securite anti-boucle infinie
-
-        while page <= max_pages:
-            api_url = f"{origin}/products.json?limit=250&page={page}"
-
+        def fetch_page(api_url: str) -> Optional[int]:
+            response = self.http.get(api_url, timeout=TIMEOUT_SITEMAP)
+            if not response:
+                return None
             try:
-                response = self.http.get(api_url, timeout=TIMEOUT_SITEMAP)
+                data = response.json()
+            except Exception as json_err:
+                raise ValueError("JSON parse error") from json_err
+            # L'API publique /products.json retourne uniquement les produits publies
+            return products_in(data)
 
-                if not response:
-                    if page == 1:
-                        logger.warning(f"Shopify JSON API failed for {origin}: No response")
-                        return {"product_count": None, "error": "API not available"}
-                    break
+        counted = ProductsJsonCounter(fetch_page).count(origin)
+        if counted.count is None:
+            logger.warning(f"Shopify JSON API failed for {origin}: {counted.error}")
+            return {"product_count": None, "error": counted.error}
 
-                # Parser le JSON
-                try:
-                    data = response.json()
-                except Exception as json_err:
-                    logger.warning(f"Shopify JSON parse error for {origin}: {json_err}")
-                    if page == 1:
-                        return {"product_count": None, "error": "JSON parse error"}
-                    break
-
-                products = data.get("products", [])
-
-                if not products:
-                    break
-
-                # L'API publique /products.json retourne uniquement les produits publies
-                # Pas besoin de filtrer par status (champ admin non disponible)
-                total_products += len(products)
-
-                # Si moins de 250 produits, c'est la derniere page
-                if len(products) < 250:
-                    break
-
-                page += 1
-                time.sleep(0.3)  # Rate limiting
-
-            except requests.RequestException as e:
-                logger.warning(f"Shopify JSON API error for {origin}: {e}")
-                if page == 1:
-                    return {"product_count": None, "error": str(e)[:50]}
-                break
-            except Exception as e:
-                logger.warning(f"Shopify JSON parse error for {origin}: {e}")
-                if page == 1:
-                    return {"product_count": None, "error": str(e)[:50]}
-                break
-
-        logger.info(f"Shopify JSON API: {origin} = {total_products} produits")
-        return {"product_count": total_products, "error": None}
+        logger.info(f"Shopify JSON API: {origin} = {counted.count} produits ({counted.requests} requetes)")
+        return {"product_count": counted.count, "error": None}
 
     def analyze_batch(
         self,
         urls: List[str],
         country_code: str = "FR",
-        max_workers: int = 8,
+        max_workers: int = CRAWLER_WORKERS,
         homepage_only: bool = False
     ) -> List[AnalysisResult]:
         """
@@ -1025,21 +849,8 @@ class MarketSpy:
         )
 
     def _detect_cms(self, html: str, headers: Dict[str, str]) -> str:
-        """Detecte le CMS depuis le HTML et les headers."""
-        html_lower = html.lower()
-        headers_str = str(headers).lower()
-
-        # Verifier les headers Shopify
-        if "x-shopify" in headers_str:
-            return "Shopify"
-
-        # Verifier les patterns dans le HTML
-        for cms_name, patterns in CMS_PATTERNS.items():
-            for pattern in patterns:
-                if pattern.search(html_lower):
-                    return cms_name
-
-        return "Unknown"
+        """Detecte le CMS depuis le HTML et les headers (signatures communes)."""
+        return detect_cms_from_html(html, headers)
 
     def _extract_title(self, html: str) -> str:
         """Extrait le <title>."""
@@ -1168,7 +979,7 @@ def analyze_sitemap_v2(url: str, country_code: str = "FR") -> Dict[str, Any]:
 def analyze_batch_v2(
     sites: List[Dict[str, str]],
     country_code: str = "FR",
-    max_workers: int = 8,
+    max_workers: int = CRAWLER_WORKERS,
     homepage_only: bool = False
 ) -> Dict[str, Dict[str, Any]]:
     """
@@ -0,0 +1,166 @@
+"""
+Comptage des produits Shopify par l'API publique /products.json.
+
+Les pages de 250 produits etaient lues une par une (jusqu'a 100 pages,
+pause entre deux pages). Le nombre de produits ne depend que de la
+derniere page non vide: elle est cherchee en sondant plusieurs pages a la
+fois, d'abord en doublant l'indice de page (2, 4, 8...) puis par
+dichotomie entre la derniere page pleine et la premiere page incomplete.
+
+- Page 1 seule d'abord: la plupart des boutiques ont moins de 250 produits
+- Sondes d'un meme tour lancees en parallele (PRODUCTS_JSON_CONCURRENCY):
+  environ log(N) requetes simultanees au lieu de N requetes en serie
+- Requete reduite aux identifiants (fields=id, ignore par les boutiques
+  qui ne le gerent pas: le comptage reste exact)
+- Au-dela de PRODUCTS_JSON_MAX_PAGES pages pleines: count plafonne
+
+Usage:
+    counted = ProductsJsonCounter().count("https://shop.com")
+    if counted.count is not None:
+        ...
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from src.infrastructure.config import (
+    REQUEST_TIMEOUT, PRODUCTS_JSON_CONCURRENCY, PRODUCTS_JSON_MAX_PAGES,
+)
+from src.infrastructure.http.crawler import get_crawler
+
+# Produits par page (maximum de l'API)
+PAGE_SIZE = 250
+
+# Lecture d'une page: nombre de produits (None si erreur)
+PageFetch = Callable[[str], Optional[int]]
+
+
+def products_json_url(origin: str, page: int) -> str:
+    """URL d'une page de /products.json (identifiants seulement)"""
+    return f"{origin}/products.json?limit={PAGE_SIZE}&page={page}&fields=id"
+
+
+def products_in(data) -> int:
+    """Nombre de produits d'une reponse /products.json decodee"""
+    products = data.get("products") if isinstance(data, dict) else None
+    return len(products) if isinstance(products, list) else 0
+
+
+@dataclass
+class ProductsJsonCount:
+    """Resultat du comptage d'une boutique"""
+    count: Optional[int] = None  # None: API indisponible (page 1 en erreur)
+    complete: bool = False       # False: plafonne a max_pages ou page en erreur
+    requests: int = 0
+    error: Optional[str] = None
+
+
+class ProductsJsonCounter:
+    """
+    Recherche de la derniere page de /products.json par sondes paralleles.
+
+    Thread-safe (aucun etat entre deux appels). Les pages sont supposees
+    remplies dans l'ordre: pleines, puis une page incomplete, puis vides.
+    """
+
+    def __init__(
+        self,
+        fetch: Optional[PageFetch] = None,
+        max_pages: int = PRODUCTS_JSON_MAX_PAGES,
+        workers: int = PRODUCTS_JSON_CONCURRENCY,
+        timeout: float = REQUEST_TIMEOUT
+    ):
+        """
+        Args:
+            fetch: Lecture d'une page (defaut: moteur de crawl)
+            max_pages: Pages comptees au plus
+            workers: Pages sondees en parallele
+            timeout: Timeout d'une requete (fetch par defaut)
+        """
+        self.fetch = fetch or self._default_fetch
+        self.max_pages = max(1, max_pages)
+        self.workers = max(1, workers)
+        self.timeout = timeout
+
+    def _default_fetch(self, url: str) -> Optional[int]:
+        response = get_crawler().fetch(url, timeout=self.timeout)
+        if response.status_code != 200:
+            return None
+        return products_in(response.json())
+
+    def count(self, origin: str) -> ProductsJsonCount:
+        """Nombre de produits publies de la boutique"""
+        origin = origin.rstrip("/")
+        pages: Dict[int, Optional[int]] = {}
+        errors: Dict[int, str] = {}
+
+        self._probe(origin, [1], pages, errors)
+        first = pages[1]
+        if first is None:
+            return ProductsJsonCount(requests=1, error=errors.get(1, "API not available"))
+        if first < PAGE_SIZE:
+            return ProductsJsonCount(first, True, 1)
+
+        # Derniere page pleine et premiere page incomplete connues; une page
+        # incomplete non vide est la derniere
+        lo, hi = 1, None
+        while hi is None or (hi - lo > 1 and not pages[hi]):
+            if hi is None:
+                batch = self._doubling(lo)
+                if not batch:
+                    return ProductsJsonCount(self.max_pages * PAGE_SIZE, False, len(pages))
+            else:
+                batch = self._between(lo, hi)
+            self._probe(origin, batch, pages, errors)
+            lo, hi = self._bounds(pages)
+
+        last = pages[hi]
+        return ProductsJsonCount((hi - 1) * PAGE_SIZE + (last or 0), last is not None, len(pages))
+
+    # ─── Sondes ──────────────────────────────────────────────────────────────
+
+    def _probe(self, origin: str, batch: List[int], pages: Dict[int, Optional[int]], errors: Dict[int, str]):
+        """Lit les pages du tour en parallele"""
+        def read(page: int):
+            try:
+                return page, self.fetch(products_json_url(origin, page)), None
+            except Exception as e:
+                return page, None, str(e)[:50]
+
+        if len(batch) == 1 or self.workers == 1:
+            results = [read(page) for page in batch]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(batch)),
+                                    thread_name_prefix="products-json") as pool:
+                # Contexte de la recherche (budget de relances) dans chaque thread
+                futures = [pool.submit(copy_context().run, read, page) for page in batch]
+                results = [future.result() for future in futures]
+
+        for page, count, error in results:
+            pages[page] = count
+            if error:
+                errors[page] = error
+
+    def _doubling(self, lo: int) -> List[int]:
+        """Pages suivantes en doublant l'indice (plafonne a max_pages)"""
+        batch, page = [], lo
+        while len(batch) < self.workers and page < self.max_pages:
+            page = min(page * 2, self.max_pages)
+            batch.append(page)
+        return batch
+
+    def _between(self, lo: int, hi: int) -> List[int]:
+        """Pages reparties entre lo et hi exclus (une dichotomie a plusieurs sondes)"""
+        probes = min(self.workers, hi - lo - 1)
+        step = (hi - lo) / (probes + 1)
+        return sorted({min(hi - 1, lo + max(1, round(step * i))) for i in range(1, probes + 1)})
+
+    @staticmethod
+    def _bounds(pages: Dict[int, Optional[int]]):
+        """(derniere page pleine, premiere page incomplete ou en erreur) parmi les sondes"""
+        partial = [page for page, count in pages.items() if count is None or count < PAGE_SIZE]
+        hi = min(partial) if partial else None
+        full = [page for page, count in pages.items()
+                if count is not None and count >= PAGE_SIZE and (hi is None or page < hi)]
+        return max(full), hi
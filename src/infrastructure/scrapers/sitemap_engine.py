@@ -0,0 +1,344 @@
+"""
+Comptage des produits par sitemaps, en flux et a memoire bornee.
+
+Les sitemaps produits etaient telecharges en entier (response.text de
+plusieurs Mo par site) puis comptes un par un. Ici chaque sitemap est
+compte pendant sa lecture: les <url> sont comptes sur les morceaux recus
+(decompresses pour les .xml.gz), sans jamais materialiser le document.
+
+- Sitemaps produits d'un site telecharges en parallele (SITEMAP_SHARD_CONCURRENCY)
+- Budget partage: arret de toutes les lectures a MAX_PRODUCTS_FROM_SITEMAP
+- Revalidation (ETag / Last-Modified): un sitemap inchange n'est pas relu;
+  seuls les comptages complets sont stockes
+- Un seul moteur pour web_analyzer et MarketSpy (selection des sitemaps
+  du pays, comptage, extrait optionnel du debut du premier sitemap)
+
+Usage:
+    engine = SitemapEngine()
+    sitemaps = engine.product_sitemaps("https://shop.com", "FR")
+    if sitemaps:
+        total = engine.count(sitemaps).count
+"""
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+from urllib.parse import urlparse
+
+from src.infrastructure.config import (
+    REQUEST_TIMEOUT,
+    COMPILED_SITEMAP_LOC, COMPILED_SITEMAP_LANG_PREFIX,
+    MAX_SITEMAPS_TO_PARSE, MAX_PRODUCTS_FROM_SITEMAP,
+    SITEMAP_SHARD_CONCURRENCY, SITEMAP_MAX_BYTES,
+)
+from src.infrastructure.http.revalidation import Revalidated, fetch_revalidated
+
+# Balise comptee (un produit par <url>)
+URL_TAG = b"<url>"
+
+# Sitemaps index essayes dans l'ordre
+SITEMAP_INDEX_PATHS = ("/sitemap.xml", "/sitemap_index.xml")
+
+# Signature gzip (sitemap .xml.gz servi sans Content-Encoding)
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# Sortie max d'un appel de decompression (memoire bornee meme pour un gzip tres compresse)
+_INFLATE_STEP = 256 * 1024
+
+# Requete d'un sitemap: (url, kind, analyze, sink) -> Revalidated
+SitemapFetch = Callable[[str, str, Callable, Any], Revalidated]
+
+
+def is_product_sitemap(loc: str) -> bool:
+    """Sitemap produits (Shopify: sitemap_products_1.xml, autres: products-sitemap.xml)"""
+    loc_lower = loc.lower()
+    return "sitemap_products" in loc_lower or "products-sitemap" in loc_lower
+
+
+def product_sitemap_locs(response) -> Optional[List[str]]:
+    """Sitemaps produits listes par un sitemap index (None si vide)"""
+    if not response.text:
+        return None
+    return [loc for loc in COMPILED_SITEMAP_LOC.findall(response.text) if is_product_sitemap(loc)]
+
+
+def select_product_sitemaps(locs: List[str], country_code: str = "FR") -> List[str]:
+    """
+    Sitemaps produits a compter pour un pays.
+
+    1. Sitemaps avec code pays explicite (/{country}/) -> priorite haute
+    2. Sinon sitemaps "root" sans prefixe de langue -> version par defaut
+    3. Les sitemaps des autres langues sont ignores
+
+    Les deux groupes ne sont jamais additionnes (memes produits traduits).
+    """
+    country_lower = (country_code or "").lower()
+    country, root = [], []
+
+    for loc in dict.fromkeys(locs):
+        if not is_product_sitemap(loc):
+            continue
+        try:
+            path = urlparse(loc).path.lower()
+        except Exception:
+            path = loc.lower()
+
+        lang_match = COMPILED_SITEMAP_LANG_PREFIX.match(path)
+        if not lang_match:
+            root.append(loc)
+        elif lang_match.group(1) == country_lower:
+            country.append(loc)
+        # Prefixe d'une autre langue: ignore
+
+    return country or root
+
+
+class _UrlBudget:
+    """Produits comptes par tous les sitemaps d'un site (arret a la limite)"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def add(self, count: int) -> bool:
+        """Ajoute des produits comptes; True si la limite est atteinte"""
+        with self._lock:
+            self.total += count
+            return self.exhausted
+
+    @property
+    def exhausted(self) -> bool:
+        return bool(self.limit) and self.total >= self.limit
+
+
+class SitemapUrlCounter:
+    """
+    Compte les <url> d'un sitemap pendant sa lecture (sink de CrawlerEngine.fetch).
+
+    Le document n'est jamais garde: seuls les derniers octets d'un morceau
+    (balise a cheval sur deux morceaux) et, si demande, les head_bytes
+    premiers octets du XML sont conserves. Un corps gzip est detecte par sa
+    signature et decompresse par pas bornes.
+    """
+
+    def __init__(
+        self,
+        budget: Optional[_UrlBudget] = None,
+        head_bytes: int = 0,
+        max_bytes: int = SITEMAP_MAX_BYTES
+    ):
+        """
+        Args:
+            budget: Budget partage avec les autres sitemaps du site
+            head_bytes: Debut du XML conserve (extraits, ex: titres)
+            max_bytes: XML lu au plus (decompresse), au-dela: lecture arretee
+        """
+        self.budget = budget
+        self.head_bytes = head_bytes
+        self.max_bytes = max_bytes
+        self.started = False  # Une reponse 2xx a ete recue
+        self._reset()
+
+    def start(self, headers=None):
+        """Nouvelle reponse 2xx (relance comprise): repart de zero"""
+        if self.budget is not None and self.count:
+            self.budget.add(-self.count)
+        self.started = True
+        self._reset()
+
+    def _reset(self):
+        self.count = 0
+        self.bytes_read = 0  # Octets recus (compresses)
+        self.xml_bytes = 0   # Octets de XML comptes (decompresses)
+        self.stopped = False  # Lecture arretee (limite de produits ou de taille)
+        self._head = bytearray()
+        self._tail = b""
+        self._inflate = None
+        self._sniffed = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Compte un morceau recu; True pour arreter la lecture"""
+        if self.stopped or not chunk:
+            return self.stopped
+        self.bytes_read += len(chunk)
+
+        if not self._sniffed:
+            self._sniffed = True
+            if chunk[:2] == _GZIP_MAGIC:
+                self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self._inflate is None:
+            return self._count(chunk)
+        try:
+            data = self._inflate.decompress(chunk, _INFLATE_STEP)
+            while not self._count(data) and self._inflate.unconsumed_tail:
+                data = self._inflate.decompress(self._inflate.unconsumed_tail, _INFLATE_STEP)
+        except zlib.error:
+            self.stopped = True
+        return self.stopped
+
+    def _count(self, data: bytes) -> bool:
+        if not data:
+            return self.stopped
+        if self.head_bytes and len(self._head) < self.head_bytes:
+            self._head += data[:self.head_bytes - len(self._head)]
+
+        window = self._tail + data
+        found = window.count(URL_TAG)
+        self._tail = window[-(len(URL_TAG) - 1):]
+        self.count += found
+        self.xml_bytes += len(data)
+
+        # Limite atteinte par ce sitemap ou par un autre du meme site
+        if self.budget is not None and (self.budget.add(found) if found else self.budget.exhausted):
+            self.stopped = True
+        if self.max_bytes and self.xml_bytes >= self.max_bytes:
+            self.stopped = True
+        return self.stopped
+
+    @property
+    def head(self) -> str:
+        """Debut du XML lu (head_bytes au plus)"""
+        return bytes(self._head).decode("utf-8", errors="replace")
+
+
+@dataclass
+class SitemapCount:
+    """Produits comptes sur les sitemaps d'un site"""
+    count: int = 0
+    complete: bool = True  # False: limite atteinte, sitemap coupe, en erreur ou non lu
+    sitemaps: int = 0      # Sitemaps comptes (lus ou inchanges)
+    summary: Any = None    # Extrait du debut du premier sitemap (summarize)
+    bytes_downloaded: int = 0
+
+
+class SitemapEngine:
+    """
+    Comptage des produits d'un site par ses sitemaps, en flux.
+
+    Thread-safe (aucun etat entre deux appels). Les sitemaps d'un site sont
+    lus en parallele; le budget de produits est partage entre eux.
+    """
+
+    def __init__(
+        self,
+        fetch: Optional[SitemapFetch] = None,
+        limit: int = MAX_PRODUCTS_FROM_SITEMAP,
+        max_sitemaps: int = MAX_SITEMAPS_TO_PARSE,
+        workers: int = SITEMAP_SHARD_CONCURRENCY,
+        timeout: float = REQUEST_TIMEOUT,
+        head_bytes: int = 0,
+        summarize: Optional[Callable[[str], Any]] = None
+    ):
+        """
+        Args:
+            fetch: Requete revalidee d'un sitemap (defaut: fetch_revalidated via le moteur)
+            limit: Produits comptes au plus par site (0: pas de limite)
+            max_sitemaps: Sitemaps produits lus au plus par site
+            workers: Sitemaps lus en parallele
+            timeout: Timeout d'une requete (fetch par defaut)
+            head_bytes: Debut du premier sitemap passe a summarize
+            summarize: Extrait (serialisable en JSON) tire de ce debut, ex: titres
+        """
+        self.fetch = fetch or self._default_fetch
+        self.limit = limit
+        self.max_sitemaps = max_sitemaps
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.head_bytes = head_bytes if summarize else 0
+        self.summarize = summarize
+
+    def _default_fetch(self, url: str, kind: str, analyze: Callable, sink=None) -> Revalidated:
+        if sink is None:
+            return fetch_revalidated(url, kind, analyze, timeout=self.timeout)
+        return fetch_revalidated(url, kind, analyze, timeout=self.timeout, sink=sink,
+                                 max_bytes=SITEMAP_MAX_BYTES)
+
+    # ─── Selection ───────────────────────────────────────────────────────────
+
+    def sitemap_locs(self, origin: str) -> Optional[List[str]]:
+        """Sitemaps produits du sitemap index (None si pas de sitemap)"""
+        for path in SITEMAP_INDEX_PATHS:
+            page = self.fetch(f"{origin}{path}", "sitemap_products_index", product_sitemap_locs, None)
+            if page.result is not None:
+                return page.result
+        return None
+
+    def product_sitemaps(self, origin: str, country_code: str = "FR") -> Optional[List[str]]:
+        """Sitemaps produits a compter pour un pays (None si pas de sitemap index)"""
+        locs = self.sitemap_locs(origin.rstrip("/"))
+        if locs is None:
+            return None
+        return select_product_sitemaps(locs, country_code)
+
+    # ─── Comptage ────────────────────────────────────────────────────────────
+
+    def count(self, sitemaps: List[str]) -> SitemapCount:
+        """
+        Compte les <url> des sitemaps (MAX_SITEMAPS_TO_PARSE premiers).
+
+        Les lectures s'arretent des que la limite de produits est atteinte;
+        count peut alors la depasser de quelques produits (morceaux en cours).
+        """
+        sitemaps = list(dict.fromkeys(sitemaps))[:self.max_sitemaps]
+        if not sitemaps:
+            return SitemapCount(complete=False)
+
+        budget = _UrlBudget(self.limit)
+        jobs = [(url, budget, i == 0) for i, url in enumerate(sitemaps)]
+        if len(jobs) == 1 or self.workers == 1:
+            shards = [self._count_one(*job) for job in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs)),
+                                    thread_name_prefix="sitemap") as pool:
+                # Contexte de la recherche (cache de documents) dans chaque thread
+                futures = [pool.submit(copy_context().run, self._count_one, *job) for job in jobs]
+                shards = [future.result() for future in futures]
+
+        result = SitemapCount(complete=not budget.exhausted)
+        for shard in shards:
+            if shard is None:
+                result.complete = False
+                continue
+            count, complete, summary, bytes_read = shard
+            result.count += count
+            result.complete = result.complete and complete
+            result.sitemaps += 1
+            result.bytes_downloaded += bytes_read
+            if summary is not None:
+                result.summary = summary
+        return result
+
+    def _count_one(self, url: str, budget: _UrlBudget, first: bool):
+        """(count, complete, summary, octets lus) d'un sitemap, None si pas lu"""
+        if budget.exhausted:
+            return None
+        summarize = self.summarize if first else None
+        counter = SitemapUrlCounter(budget, self.head_bytes if summarize else 0)
+
+        def analyze(response):
+            # Comptage coupe (limite, taille): pas de resultat stocke
+            if not counter.started or counter.stopped or getattr(response, "truncated", False):
+                return None
+            if summarize is None:
+                return counter.count
+            return {"count": counter.count, "summary": summarize(counter.head)}
+
+        kind = "sitemap_url_summary" if summarize else "sitemap_url_count"
+        page = self.fetch(url, kind, analyze, counter)
+
+        if page.not_modified:
+            stored = page.result
+            count = stored["count"] if summarize else stored
+            budget.add(count)
+            return count, True, stored["summary"] if summarize else None, 0
+        if not counter.started:
+            return None
+
+        # Lecture interrompue (limite, taille, erreur en cours de lecture): compte partiel
+        complete = page.result is not None
+        summary = summarize(counter.head) if summarize else None
+        return counter.count, complete, summary, counter.bytes_read
@@ -2,23 +2,26 @@
 Module pour l'analyse complete des sites web.
 """
 import re
-import time
-import requests
 from urllib.parse import urlparse, urljoin
 from typing import Dict, List, Tuple, Optional
-from bs4 import BeautifulSoup
 
 from src.infrastructure.config import (
     REQUEST_TIMEOUT, HEADERS, DEFAULT_PAYMENTS, TAXONOMY, KEYWORD_OVERRIDES,
     THEME_ASSET_CANDIDATES, REQUEST_SNIPPET,
-    TIMEOUT_WEB, get_proxied_url, is_proxy_enabled,
+    TIMEOUT_WEB,
     # Patterns pre-compiles
     COMPILED_INLINE_PATTERNS, COMPILED_ASSET_PATTERNS, COMPILED_THEME_ID_PATTERN,
-    COMPILED_THEME_CLEAN_PATTERN, COMPILED_SITEMAP_LOC, COMPILED_SITEMAP_URL_TAG,
-    COMPILED_SITEMAP_LANG_PREFIX, COMPILED_CURRENCY_SHOPIFY, COMPILED_CURRENCY_OG,
-    MAX_SITEMAPS_TO_PARSE, MAX_PRODUCTS_FROM_SITEMAP
+    MAX_PRODUCTS_FROM_SITEMAP
 )
-from src.infrastructure.monitoring import get_current_tracker
+from src.infrastructure.http.crawler import CrawlResponse, get_crawler
+from src.infrastructure.http.revalidation import fetch_revalidated
+from src.infrastructure.scrapers.cms_signatures import detect_cms_from_html
+from src.infrastructure.scrapers.head_scanner import HeadScanner, clean_theme_name
+from src.infrastructure.scrapers.html_features import (
+    HtmlFeatures, extract_currency, extract_html_features, html_to_text,
+)
+from src.infrastructure.scrapers.products_json import ProductsJsonCounter
+from src.infrastructure.scrapers.sitemap_engine import SitemapEngine
 
 
 def ensure_url(url: str) -> str:
@@ -26,88 +29,32 @@ def ensure_url(url: str) -> str:
     return url if url.startswith("http") else "https://" + url
 
 
-def get_web(url: str, timeout: int = REQUEST_TIMEOUT, site_url: str = "", page_id: str = "") -> Optional[requests.Response]:
-    """Requete HTTP avec gestion d'erreurs, proxy optionnel et User-Agent aleatoire"""
-    tracker = get_current_tracker()
-    start_time = time.time()
-    use_proxy = is_proxy_enabled()
+def get_web(
+    url: str,
+    timeout: int = REQUEST_TIMEOUT,
+    site_url: str = "",
+    page_id: str = "",
+    scanner: Optional[HeadScanner] = None
+) -> Optional[CrawlResponse]:
+    """
+    Requete HTTP via le moteur de crawl (proxy optionnel, User-Agent aleatoire, cache de la recherche).
 
-    try:
-        proxied_url, headers = get_proxied_url(url)
-        response = requests.get(proxied_url, headers=headers, timeout=timeout, allow_redirects=True)
-        response_time = (time.time() - start_time) * 1000
-
-        if tracker:
-            api_type = "scraper_api" if use_proxy else "web_request"
-            if api_type == "scraper_api":
-                tracker.track_scraper_api_call(
-                    url=url[:200],
-                    site_url=site_url or url[:200],
-                    status_code=response.status_code,
-                    success=response.status_code == 200,
-                    response_time_ms=response_time,
-                    response_size=len(response.content) if response.content else 0
-                )
-            else:
-                tracker.track_web_request(
-                    url=url[:200],
-                    site_url=site_url or url[:200],
-                    page_id=page_id,
-                    status_code=response.status_code,
-                    success=response.status_code == 200,
-                    response_time_ms=response_time,
-                    response_size=len(response.content) if response.content else 0
-                )
-
-        return response
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        error_type = "timeout" if "timeout" in str(e).lower() else "error"
-
-        if tracker:
-            api_type = "scraper_api" if use_proxy else "web_request"
-            if api_type == "scraper_api":
-                tracker.track_scraper_api_call(
-                    url=url[:200],
-                    site_url=site_url or url[:200],
-                    success=False,
-                    error_type=error_type,
-                    error_message=str(e)[:200],
-                    response_time_ms=response_time
-                )
-            else:
-                tracker.track_web_request(
-                    url=url[:200],
-                    site_url=site_url or url[:200],
-                    page_id=page_id,
-                    success=False,
-                    error_type=error_type,
-                    error_message=str(e)[:200],
-                    response_time_ms=response_time
-                )
-        return None
+    Avec un scanner: seul le debut de la page est lu, en flux, jusqu'a ce
+    que le scanner ait ses donnees (corps non conserve, voir HeadScanner).
+    """
+    if scanner is None:
+        response = get_crawler().fetch(url, timeout=timeout, use_cache=True, track=True,
+                                       site_url=site_url, page_id=page_id)
+    else:
+        response = get_crawler().fetch(url, timeout=timeout, use_cache=True, track=True,
+                                       site_url=site_url, page_id=page_id,
+                                       max_bytes=scanner.budget, sink=scanner)
+    return response if response.status_code else None
 
 
 def detect_cms(html: str, headers: dict) -> str:
-    """Detecte le CMS utilise par le site"""
-    h = html.lower()
-    hdrs = "\n".join([f"{k}:{v}" for k, v in headers.items()]).lower()
-
-    if "cdn.shopify.com" in h or "x-shopify-" in hdrs or "/collections/" in h or "/products/" in h:
-        return "Shopify"
-    if "woocommerce" in h or "wp-content" in h or 'content="wordpress' in h:
-        return "WooCommerce / WordPress"
-    if "prestashop" in h or "ps_shoppingcart" in h:
-        return "PrestaShop"
-    if "magento" in h or "x-magento" in hdrs:
-        return "Magento"
-    if "wixstatic.com" in h:
-        return "Wix"
-    if "static1.squarespace.com" in h:
-        return "Squarespace"
-    if "bigcommerce" in h or "cdn.bcapp" in h:
-        return "BigCommerce"
-    return "Unknown"
+    """Detecte le CMS utilise par le site (signatures communes, voir cms_signatures)"""
+    return detect_cms_from_html(html, headers)
 
 
 def _origin(url: str) -> str:
@@ -117,64 +64,10 @@ def _origin(url: str) -> str:
 
 
 def _get_text(url: str, site_url: str = "") -> Optional[str]:
-    """Recupere le contenu texte d'une URL avec proxy optionnel"""
-    tracker = get_current_tracker()
-    start_time = time.time()
-    use_proxy = is_proxy_enabled()
-
-    try:
-        proxied_url, headers = get_proxied_url(url)
-        r = requests.get(proxied_url, headers=headers, timeout=REQUEST_TIMEOUT, allow_redirects=True)
-        response_time = (time.time() - start_time) * 1000
-
-        if tracker:
-            api_type = "scraper_api" if use_proxy else "web_request"
-            if api_type == "scraper_api":
-                tracker.track_scraper_api_call(
-                    url=url[:200],
-                    site_url=site_url or url[:200],
-                    status_code=r.status_code,
-                    success=r.status_code == 200,
-                    response_time_ms=response_time,
-                    response_size=len(r.content) if r.content else 0
-                )
-            else:
-                tracker.track_web_request(
-                    url=url[:200],
-                    site_url=site_url or url[:200],
-                    status_code=r.status_code,
-                    success=r.status_code == 200,
-                    response_time_ms=response_time,
-                    response_size=len(r.content) if r.content else 0
-                )
-
-        if r.status_code == 200 and r.text:
-            return r.text
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        error_type = "timeout" if "timeout" in str(e).lower() else "error"
-
-        if tracker:
-            api_type = "scraper_api" if use_proxy else "web_request"
-            if api_type == "scraper_api":
-                tracker.track_scraper_api_call(
-                    url=url[:200],
-                    site_url=site_url or url[:200],
-                    success=False,
-                    error_type=error_type,
-                    error_message=str(e)[:200],
-                    response_time_ms=response_time
-                )
-            else:
-                tracker.track_web_request(
-                    url=url[:200],
-                    site_url=site_url or url[:200],
-                    success=False,
-                    error_type=error_type,
-                    error_message=str(e)[:200],
-                    response_time_ms=response_time
-                )
-        return None
+    """Recupere le contenu texte d'une URL avec proxy optionnel (cache de la recherche)"""
+    r = get_crawler().fetch(url, timeout=REQUEST_TIMEOUT, use_cache=True, track=True, site_url=site_url)
+    if r.status_code == 200 and r.text:
+        return r.text
     return None
 
 
@@ -189,20 +82,7 @@ def _unique(seq: list) -> list:
     return out
 
 
-def _clean_theme(name: Optional[str]) -> Optional[str]:
-    """Nettoie le nom de theme"""
-    if not name:
-        return None
-    n = name.strip().strip("/*-—–:=> \t\"'")
-    if len(n) < 2 or len(n) > 120:
-        return None
-    # Utiliser le pattern pre-compile
-    if COMPILED_THEME_CLEAN_PATTERN.search(n):
-        return None
-    return n
-
-
-def _theme_shopify(html: str, base_url: str) -> Tuple[Optional[str], list]:
+def _theme_shopify(html: str, base_url: str, features: Optional[HtmlFeatures] = None) -> Tuple[Optional[str], list]:
     """Detecte le theme Shopify - Version optimisee avec patterns pre-compiles"""
     evidence = []
 
@@ -210,7 +90,7 @@ def _theme_shopify(html: str, base_url: str) -> Tuple[Optional[str], list]:
     for compiled_rgx in COMPILED_INLINE_PATTERNS:
         m = compiled_rgx.search(html)
         if m:
-            nm = _clean_theme(m.group(1))
+            nm = clean_theme_name(m.group(1))
             if nm:
                 return nm, evidence
 
@@ -219,13 +99,9 @@ def _theme_shopify(html: str, base_url: str) -> Tuple[Optional[str], list]:
     theme_id = m_id.group(1) if m_id else None
 
     origin = _origin(base_url)
-    soup = BeautifulSoup(html, "lxml")
-    asset_urls = []
-
-    for tag in soup.find_all(["link", "script"]):
-        src = tag.get("href") or tag.get("src")
-        if src and (src.endswith(".css") or src.endswith(".js")) and ("/assets/" in src or "/cdn/shop/t/" in src):
-            asset_urls.append(src if src.startswith("http") else urljoin(origin, src))
+    if features is None:
+        features = extract_html_features(html, base_url)
+    asset_urls = [src if src.startswith("http") else urljoin(origin, src) for src in features.theme_assets]
 
     for path in THEME_ASSET_CANDIDATES:
         asset_urls.append(urljoin(origin, path))
@@ -241,7 +117,7 @@ def _theme_shopify(html: str, base_url: str) -> Tuple[Optional[str], list]:
         for compiled_rgx in COMPILED_ASSET_PATTERNS:
             m = compiled_rgx.search(head)
             if m:
-                nm = _clean_theme(m.group(1))
+                nm = clean_theme_name(m.group(1))
                 if nm:
                     return nm, evidence
 
@@ -250,32 +126,20 @@ def _theme_shopify(html: str, base_url: str) -> Tuple[Optional[str], list]:
     return None, evidence
 
 
-def detect_theme(base_url: str, html: str, headers: dict, cms: str) -> Tuple[str, list]:
-    """Detecte le theme utilise"""
+def detect_theme(
+    base_url: str, html: str, headers: dict, cms: str, features: Optional[HtmlFeatures] = None
+) -> Tuple[str, list]:
+    """Detecte le theme utilise (features: page deja lue par extract_html_features)"""
     if cms == "Shopify":
-        name, ev = _theme_shopify(html, base_url)
+        name, ev = _theme_shopify(html, base_url, features)
     else:
         name = "NA"
     return (name or "NA"), []
 
 
-def detect_payments(html: str, soup: BeautifulSoup, terms: List[str]) -> List[str]:
-    """Detecte les moyens de paiement disponibles"""
-    text = " ".join([soup.get_text(" ", strip=True)[:400000], html]).lower()
-    found = set()
-
-    for t in terms:
-        if t.lower() in text:
-            found.add(t)
-
-    for img in soup.find_all("img"):
-        for attr in ("alt", "src"):
-            val = (img.get(attr) or "").lower()
-            for tt in terms:
-                if tt.lower() in val:
-                    found.add(tt)
-
-    return sorted(found)
+def detect_payments(html: str, terms: List[str]) -> List[str]:
+    """Detecte les moyens de paiement disponibles (texte, HTML, alt/src des images)"""
+    return extract_html_features(html, payment_terms=terms).payments
 
 
 def _kws(label: str) -> List[str]:
@@ -331,11 +195,11 @@ def try_get(url: str) -> Optional[str]:
     return None
 
 
-def collect_text_for_classification(base_url: str, html: str) -> str:
-    """Collecte le texte pour la classification"""
-    texts = []
-    soup = BeautifulSoup(html, "lxml")
-    texts.append(soup.get_text(" ", strip=True))
+def collect_text_for_classification(base_url: str, html: str, features: Optional[HtmlFeatures] = None) -> str:
+    """Collecte le texte pour la classification (features: page deja lue)"""
+    if features is None:
+        features = extract_html_features(html, base_url)
+    texts = [features.text]
 
     origin = f"{urlparse(base_url).scheme}://{urlparse(base_url).netloc}"
 
@@ -346,271 +210,128 @@ def collect_text_for_classification(base_url: str, html: str) -> str:
         for u in col_urls:
             t = try_get(u)
             if t:
-                texts.append(BeautifulSoup(t, "lxml").get_text(" ", strip=True))
+                texts.append(html_to_text(t))
 
     # Pages de collections
     for path in ["/collections", "/collections/all"]:
         t = try_get(urljoin(origin, path))
         if t:
-            texts.append(BeautifulSoup(t, "lxml").get_text(" ", strip=True))
+            texts.append(html_to_text(t))
 
     # Navigation
-    nav_text = []
-    for sel in ["nav", "header", "footer", ".site-nav", ".menu"]:
-        for el in soup.select(sel):
-            nav_text.append(el.get_text(" ", strip=True))
-    if nav_text:
-        texts.append(" ".join(nav_text))
+    if features.nav_text:
+        texts.append(features.nav_text)
 
     return (" \n ".join(texts))[:800000]
 
 
 def count_products_shopify_by_country(origin: str, country_code: str = "FR") -> int:
     """
-    Compte les produits Shopify via sitemaps - Version optimisee.
-    - Patterns regex pre-compiles
-    - Limite max de sitemaps a parser (MAX_SITEMAPS_TO_PARSE)
-    - Arret anticipe si MAX_PRODUCTS_FROM_SITEMAP atteint
-
-    Logique:
-    1. Sitemap avec code pays explicite (/{country}/) -> priorite haute
-    2. Sitemap "root" sans prefixe de langue -> version par defaut du site
-    3. Eviter les sitemaps des autres langues
+    Compte les produits Shopify via sitemaps (moteur en flux, voir sitemap_engine).
+    - Sitemaps du pays (/{country}/) en priorite, sinon sitemaps "root";
+      ceux des autres langues sont ignores
+    - Limite max de sitemaps a parser (MAX_SITEMAPS_TO_PARSE), lus en parallele
+    - <url> comptes pendant la lecture (.xml.gz compris), arret anticipe
+      des que MAX_PRODUCTS_FROM_SITEMAP est atteint
+
+    Sitemaps revalides (ETag / Last-Modified): un sitemap inchange depuis le
+    dernier scan n'est ni retelecharge ni recompte.
     """
-    def get_text_proxied(u):
-        """Recupere le texte d'une URL avec proxy si disponible"""
-        try:
-            proxied_url, headers = get_proxied_url(u)
-            r = requests.get(proxied_url, headers=headers, timeout=REQUEST_TIMEOUT)
-            return r.text if r and r.status_code == 200 else None
-        except Exception:
-            return None
-
     # Nettoyer origin
     if not origin.startswith("http"):
         origin = "https://" + origin
     origin = origin.rstrip("/")
 
-    country_lower = country_code.lower()
-    total = 0
-
-    # Codes langues connus a exclure (sauf si c'est notre pays)
-    other_languages = {"en", "es", "de", "it", "pt", "nl", "pl", "ru", "ja", "zh", "ko", "ar"}
-    other_languages.discard(country_lower)  # Ne pas exclure notre pays
-
-    # Recuperer le sitemap index
-    sm = get_text_proxied(f"{origin}/sitemap.xml")
-    if not sm:
+    engine = SitemapEngine()
+    product_sitemaps = engine.product_sitemaps(origin, country_code)
+    if not product_sitemaps:
+        # Pas de sitemap produits: essayer l'API
         return _count_products_via_api(origin)
 
-    # Utiliser pattern pre-compile
-    locs = COMPILED_SITEMAP_LOC.findall(sm)
-
-    # Separer les sitemaps produits
-    product_sitemaps_country = []  # Sitemaps avec notre code pays
-    product_sitemaps_root = []     # Sitemaps "root" (sans prefixe langue)
-
-    for loc in locs:
-        loc_lower = loc.lower()
-
-        # On ne s'interesse qu'aux sitemaps produits
-        if "sitemap_products" not in loc_lower:
-            continue
-
-        # Extraire le path apres le domaine
-        try:
-            parsed = urlparse(loc)
-            path = parsed.path.lower()
-        except Exception:
-            path = loc_lower
-
-        # Verifier si c'est un sitemap avec prefixe de langue (pattern pre-compile)
-        has_language_prefix = False
-        is_our_country = False
-
-        lang_match = COMPILED_SITEMAP_LANG_PREFIX.match(path)
-        if lang_match:
-            lang = lang_match.group(1)
-            has_language_prefix = True
-            if lang == country_lower:
-                is_our_country = True
-            elif lang in other_languages:
-                # C'est une autre langue, on ignore
-                continue
-
-        # Classifier le sitemap
-        if is_our_country:
-            # Sitemap avec notre code pays -> priorite maximale
-            product_sitemaps_country.append(loc)
-        elif not has_language_prefix:
-            # Sitemap "root" sans prefixe -> version par defaut
-            product_sitemaps_root.append(loc)
-
-    # Choisir les sitemaps a utiliser (priorite: pays > root)
-    if product_sitemaps_country:
-        product_sitemaps = product_sitemaps_country
-    elif product_sitemaps_root:
-        product_sitemaps = product_sitemaps_root
-    else:
-        # Fallback: essayer l'API
-        return _count_products_via_api(origin)
-
-    # Limiter le nombre de sitemaps a parser
-    product_sitemaps = product_sitemaps[:MAX_SITEMAPS_TO_PARSE]
-
-    # Compter les produits
-    seen_urls = set()
-
-    for smu in product_sitemaps:
-        if smu in seen_urls:
-            continue
-        seen_urls.add(smu)
-
-        txt = get_text_proxied(smu)
-        if not txt:
-            continue
-
-        # Compter les URLs (pattern pre-compile)
-        count = len(COMPILED_SITEMAP_URL_TAG.findall(txt))
-        total += count
-
-        # Arret anticipe si limite atteinte
-        if total >= MAX_PRODUCTS_FROM_SITEMAP:
-            print(f"Limite {MAX_PRODUCTS_FROM_SITEMAP} produits atteinte, arret anticipe")
-            break
+    counted = engine.count(product_sitemaps)
+    if counted.count >= MAX_PRODUCTS_FROM_SITEMAP:
+        print(f"Limite {MAX_PRODUCTS_FROM_SITEMAP} produits atteinte, arret anticipe")
 
     # Si toujours 0, essayer l'API
-    if total == 0:
-        total = _count_products_via_api(origin)
-
-    return total
+    if counted.count == 0:
+        return _count_products_via_api(origin)
+    return counted.count
 
 
 def _count_products_via_api(origin: str) -> int:
-    """Compte les produits via l'API Shopify /products.json avec proxy"""
+    """Compte les produits via l'API Shopify /products.json avec proxy (sondes paralleles)"""
     try:
-        # L'API retourne max 250 produits par page, on estime le total
-        url = f"{origin}/products.json?limit=250"
-        proxied_url, headers = get_proxied_url(url)
-        r = requests.get(proxied_url, headers=headers, timeout=REQUEST_TIMEOUT)
-
-        if r.status_code != 200:
-            return 0
-
-        data = r.json()
-        products = data.get("products", [])
-        count = len(products)
-
-        # Si on a 250 produits, il y en a probablement plus
-        if count == 250:
-            # Essayer de paginer pour avoir un meilleur compte
-            page = 2
-            while page <= 10:  # Max 10 pages = 2500 produits
-                url = f"{origin}/products.json?limit=250&page={page}"
-                proxied_url, headers = get_proxied_url(url)
-                r = requests.get(proxied_url, headers=headers, timeout=REQUEST_TIMEOUT)
-                if r.status_code != 200:
-                    break
-                data = r.json()
-                batch = data.get("products", [])
-                if not batch:
-                    break
-                count += len(batch)
-                if len(batch) < 250:
-                    break
-                page += 1
-
-        return count
-
+        return ProductsJsonCounter().count(origin).count or 0
     except Exception:
         return 0
 
 
 def extract_currency_from_html(html: str) -> Optional[str]:
     """Extrait la devise depuis le HTML Shopify - Version optimisee avec patterns pre-compiles"""
-    m = COMPILED_CURRENCY_SHOPIFY.search(html)
-    if m:
-        return m.group(1)
-    m = COMPILED_CURRENCY_OG.search(html)
-    if m:
-        return m.group(1)
-    return None
+    return extract_currency(html)
+
+
+def _analysis_error() -> Dict:
+    """Resultat d'analyse d'un site inaccessible"""
+    return {
+        "cms": "ERROR", "theme": "ERROR", "payments": "",
+        "thematique": "", "type_produits": "", "product_count": 0,
+        "currency_from_site": "",
+        "site_title": "", "site_description": "", "site_h1": "", "site_keywords": ""
+    }
+
+
+def _analyze_homepage(resp: CrawlResponse) -> Dict:
+    """Analyse de la page d'accueil (tout sauf le nombre de produits), page lue une fois"""
+    final_url = resp.url
+    html = resp.text
+    features = extract_html_features(html, final_url, payment_terms=DEFAULT_PAYMENTS)
+
+    cms = detect_cms(html, resp.headers)
+    theme, _ = detect_theme(final_url, html, resp.headers, cms, features)
+
+    big_text = collect_text_for_classification(final_url, html, features)
+    thematique, product_list = classify(big_text, TAXONOMY)
+
+    return {
+        "cms": cms,
+        "theme": theme,
+        "payments": ";".join(features.payments),
+        "thematique": thematique or "",
+        "type_produits": ";".join(product_list),
+        "product_count": 0,
+        "currency_from_site": features.currency or "",
+        # Donnees pour classification Gemini (economise un 2e scraping)
+        "site_title": features.title[:200],
+        "site_description": features.description[:400],
+        "site_h1": features.h1[:150],
+        "site_keywords": features.keywords[:200]
+    }
 
 
 def analyze_website_complete(url: str, country_code: str = "FR") -> Dict:
-    """Analyse complete d'un site web avec extraction des donnees pour classification Gemini"""
+    """
+    Analyse complete d'un site web avec extraction des donnees pour classification Gemini.
+
+    La page d'accueil est revalidee (ETag / Last-Modified): inchangee depuis
+    le dernier scan, son analyse est reutilisee; le nombre de produits est
+    toujours recalcule (sitemaps revalides separement).
+    """
     try:
         url = ensure_url(url)
-        resp = get_web(url, timeout=TIMEOUT_WEB)
-
-        if not resp or resp.status_code >= 400:
-            return {
-                "cms": "ERROR", "theme": "ERROR", "payments": "",
-                "thematique": "", "type_produits": "", "product_count": 0,
-                "currency_from_site": "",
-                "site_title": "", "site_description": "", "site_h1": "", "site_keywords": ""
-            }
-
-        final_url = resp.url
-        html = resp.text
-        soup = BeautifulSoup(html, "lxml")
-
-        cms = detect_cms(html, resp.headers)
-        theme, _ = detect_theme(final_url, html, resp.headers, cms)
-        payments = detect_payments(html, soup, DEFAULT_PAYMENTS)
-
-        big_text = collect_text_for_classification(final_url, html)
-        thematique, product_list = classify(big_text, TAXONOMY)
-
-        product_count = 0
-        if cms == "Shopify":
-            origin = f"{urlparse(final_url).scheme}://{urlparse(final_url).netloc}"
-            product_count = count_products_shopify_by_country(origin, country_code)
-
-        currency_from_site = extract_currency_from_html(html)
-
-        # Extraire les donnees pour classification Gemini (economise un 2e scraping)
-        site_title = ""
-        title_tag = soup.find('title')
-        if title_tag and title_tag.string:
-            site_title = title_tag.string.strip()[:200]
-
-        site_description = ""
-        desc_tag = soup.find('meta', attrs={'name': 'description'})
-        if desc_tag and desc_tag.get('content'):
-            site_description = desc_tag['content'].strip()[:400]
-
-        site_h1 = ""
-        h1_tag = soup.find('h1')
-        if h1_tag:
-            site_h1 = h1_tag.get_text(strip=True)[:150]
-
-        site_keywords = ""
-        kw_tag = soup.find('meta', attrs={'name': 'keywords'})
-        if kw_tag and kw_tag.get('content'):
-            site_keywords = kw_tag['content'].strip()[:200]
-
-        return {
-            "cms": cms,
-            "theme": theme,
-            "payments": ";".join(payments),
-            "thematique": thematique or "",
-            "type_produits": ";".join(product_list),
-            "product_count": product_count,
-            "currency_from_site": currency_from_site or "",
-            # Donnees pour classification Gemini
-            "site_title": site_title,
-            "site_description": site_description,
-            "site_h1": site_h1,
-            "site_keywords": site_keywords
-        }
+        page = fetch_revalidated(url, "homepage_analysis", _analyze_homepage, timeout=TIMEOUT_WEB, track=True)
+        if page.result is None:
+            return _analysis_error()
+
+        result = page.result
+        if result["cms"] == "Shopify":
+            final = urlparse(page.response.url)
+            result["product_count"] = count_products_shopify_by_country(
+                f"{final.scheme}://{final.netloc}", country_code
+            )
+        return result
     except Exception:
-        return {
-            "cms": "ERROR", "theme": "ERROR", "payments": "",
-            "thematique": "", "type_produits": "", "product_count": 0,
-            "currency_from_site": "",
-            "site_title": "", "site_description": "", "site_h1": "", "site_keywords": ""
-        }
+        return _analysis_error()
 
 
 # ============================================================================
@@ -621,7 +342,8 @@ def detect_cms_from_url(url: str) -> str:
     """
     Detecte le CMS d'un site web a partir de son URL.
 
-    Wrapper qui fetch l'URL et appelle detect_cms().
+    Wrapper qui lit le debut de la page en flux (HeadScanner): la lecture
+    s'arrete des que le CMS est certain, sinon au budget de signatures.
 
     Args:
         url: URL du site web
@@ -634,12 +356,13 @@ def detect_cms_from_url(url: str) -> str:
 
     try:
         url = ensure_url(url)
-        resp = get_web(url, timeout=TIMEOUT_WEB)
+        scanner = HeadScanner()
+        resp = get_web(url, timeout=TIMEOUT_WEB, scanner=scanner)
 
         if not resp or resp.status_code >= 400:
             return "Inconnu"
 
-        return detect_cms(resp.text, resp.headers)
+        return scanner.evidence(resp.headers).decide()["cms"]
     except Exception:
         return "Inconnu"
 
@@ -134,8 +134,10 @@ class BackgroundSearchWorker:
         # Import local pour eviter les imports circulaires
         from src.infrastructure.persistence.database import (
             DatabaseManager, SearchQueue,
-            update_search_queue_status, update_search_queue_progress
+            update_search_queue_status, update_search_queue_progress,
+            clear_search_checkpoint
         )
+        from src.infrastructure.monitoring.progress_channel import get_progress_channel
 
         db = DatabaseManager()
 
@@ -155,6 +157,7 @@ class BackgroundSearchWorker:
 
             # Marquer comme en cours
             update_search_queue_status(db, search_id, "running")
+            get_progress_channel().publish(db, search_id, status="running")
 
             # Importer et executer la recherche
             from src.application.use_cases.search_executor import execute_background_search
@@ -177,12 +180,18 @@ class BackgroundSearchWorker:
                 "completed",
                 search_log_id=result.get("search_log_id")
             )
+            get_progress_channel().finish(
+                search_id, "completed", percent=100, search_log_id=result.get("search_log_id")
+            )
+            # Le point de reprise n'est plus utile une fois la recherche terminee
+            clear_search_checkpoint(db, search_id)
 
             print(f"[BackgroundWorker] Recherche #{search_id} terminee avec succes")
 
         except Exception as e:
             print(f"[BackgroundWorker] Recherche #{search_id} echouee: {e}")
             update_search_queue_status(db, search_id, "failed", error=str(e)[:500])
+            get_progress_channel().finish(search_id, "failed", error=str(e)[:500])
             raise
 
     def _cleanup_completed_tasks(self):
@@ -270,6 +279,7 @@ class BackgroundSearchWorker:
             Dict avec le statut ou None
         """
         from src.infrastructure.persistence.database import DatabaseManager, SearchQueue
+        from src.infrastructure.monitoring.progress_channel import get_progress_channel
 
         db = DatabaseManager()
 
@@ -279,7 +289,7 @@ class BackgroundSearchWorker:
             if not search:
                 return None
 
-            return {
+            status = {
                 "id": search.id,
                 "status": search.status,
                 "phase": search.current_phase,
@@ -295,6 +305,16 @@ class BackgroundSearchWorker:
                 "error": search.error_message
             }
 
+        # Progression en memoire plus fraiche que la BDD (ecriture coalescee)
+        live = get_progress_channel().get_state(search_id)
+        if live:
+            for key, live_key in (("phase", "phase"), ("phase_name", "phase_name"),
+                                  ("progress", "percent"), ("message", "message"),
+                                  ("phases_data", "phases_data")):
+                if live.get(live_key) is not None:
+                    status[key] = live[live_key]
+        return status
+
     def get_active_searches(self, user_session: str = None) -> list:
         """
         Recupere les recherches actives.
@@ -357,6 +377,28 @@ class BackgroundSearchWorker:
         print("[BackgroundWorker] Arret en cours...")
         self._running = False
         self.executor.shutdown(wait=True)
+
+        # Ecrire les hit_count du cache API encore en attente
+        try:
+            from src.infrastructure.persistence.database import DatabaseManager, flush_cache_hits
+            flush_cache_hits(DatabaseManager())
+        except Exception as e:
+            print(f"[BackgroundWorker] Erreur flush cache: {e}")
+
+        # Ecrire la progression encore en attente (canal de progression)
+        try:
+            from src.infrastructure.monitoring.progress_channel import get_progress_channel
+            get_progress_channel().flush()
+        except Exception as e:
+            print(f"[BackgroundWorker] Erreur flush progression: {e}")
+
+        # Ecrire les logs tokens / appels API encore en file (write-behind)
+        try:
+            from src.infrastructure.persistence.database import flush_write_behind
+            flush_write_behind()
+        except Exception as e:
+            print(f"[BackgroundWorker] Erreur flush logs: {e}")
+
         print("[BackgroundWorker] Arrete")
 
 
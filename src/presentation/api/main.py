@@ -32,6 +32,7 @@ from src.presentation.api.collections.router import router as collections_router
 from src.presentation.api.notifications.router import router as notifications_router
 from src.presentation.api.jobs.router import router as jobs_router
 from src.presentation.api.audit.router import router as audit_router
+from src.presentation.api.searches.router import router as searches_router
 from src.infrastructure.logging import configure_logging, get_logger
 from src.infrastructure.logging.config import RequestLogger
 
@@ -90,6 +91,7 @@ def create_app() -> FastAPI:
     app.include_router(notifications_router, prefix=settings.api_prefix)
     app.include_router(jobs_router, prefix=settings.api_prefix)
     app.include_router(audit_router, prefix=settings.api_prefix)
+    app.include_router(searches_router, prefix=settings.api_prefix)
 
     return app
 
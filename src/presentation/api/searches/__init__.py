@@ -0,0 +1,5 @@
+"""Searches API module."""
+
+from src.presentation.api.searches.router import router
+
+__all__ = ["router"]
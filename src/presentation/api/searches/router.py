@@ -0,0 +1,243 @@
+"""
+Searches Router - Progression des recherches en arriere-plan.
+
+Responsabilite unique:
+----------------------
+Exposer la progression et le trace des recherches de la SearchQueue.
+Le flux SSE pousse chaque changement publie sur le canal de progression
+(recherche executee dans ce process); si la recherche tourne dans un autre
+process, le serveur relit la BDD a intervalle fixe a la place du client.
+
+Endpoints:
+----------
+- GET /searches/{id}/progress: Etat courant de la progression
+- GET /searches/{id}/progress/stream: Flux server-sent events (text/event-stream)
+- GET /searches/{id}/trace: Resume du trace (ou trace Chrome avec format=chrome)
+"""
+
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from src.presentation.api.searches.schemas import SearchProgressResponse, SearchTraceResponse
+from src.presentation.api.dependencies import get_current_user, get_db
+from src.domain.entities.user import User
+from src.infrastructure.config import PROGRESS_SSE_HEARTBEAT, PROGRESS_SSE_DB_POLL_INTERVAL
+from src.infrastructure.monitoring.progress_channel import (
+    TERMINAL_STATUSES,
+    get_progress_channel,
+)
+from src.infrastructure.persistence.database import (
+    DatabaseManager,
+    get_search_queue,
+    get_search_trace,
+)
+from src.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/searches", tags=["Searches"])
+
+
+def _get_owned_search(db: DatabaseManager, search_id: int, user: User) -> Dict:
+    """Charge la recherche et verifie qu'elle appartient a l'utilisateur."""
+    search = get_search_queue(db, search_id)
+    if not search:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recherche non trouvee",
+        )
+    owner = search.get("user_id")
+    if owner is not None and owner != user.id and not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acces non autorise",
+        )
+    return search
+
+
+def _progress_from_queue(search: Dict) -> Dict:
+    """Progression depuis la ligne SearchQueue (get_search_queue)."""
+    return {
+        "search_id": search["id"],
+        "status": search.get("status") or "pending",
+        "phase": search.get("current_phase"),
+        "phase_name": search.get("phase_name"),
+        "percent": search.get("progress_percent") or 0,
+        "message": search.get("message"),
+        "phases_data": search.get("phases_data") or [],
+        "search_log_id": search.get("search_log_id"),
+        "error": search.get("error"),
+    }
+
+
+def _progress_from_state(state: Dict, fallback: Dict) -> Dict:
+    """Progression depuis le canal en memoire (champs absents: valeur BDD)."""
+    progress = dict(fallback)
+    for key in ("status", "phase", "phase_name", "percent", "message",
+                "phases_data", "search_log_id", "error"):
+        if state.get(key) is not None:
+            progress[key] = state[key]
+    return progress
+
+
+def _sse(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    """Formate un evenement server-sent events."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _progress_events(
+    request: Request,
+    db: DatabaseManager,
+    search: Dict,
+) -> AsyncIterator[str]:
+    """
+    Genere les evenements SSE d'une recherche jusqu'a son statut final.
+
+    - event "progress": a chaque changement d'etat
+    - event "end": statut final (completed / failed / cancelled), puis fermeture
+    - commentaire keep-alive sans changement pendant PROGRESS_SSE_HEARTBEAT secondes
+    """
+    search_id = search["id"]
+    channel = get_progress_channel()
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+    unsubscribe = channel.subscribe(search_id, lambda: loop.call_soon_threadsafe(changed.set))
+
+    last_key = None
+    last_sent = time.monotonic()
+    db_progress = _progress_from_queue(search)
+    try:
+        while True:
+            state = channel.get_state(search_id)
+            if state is not None:
+                progress = _progress_from_state(state, db_progress)
+                key = ("live", state["version"])
+                wait = PROGRESS_SSE_HEARTBEAT
+            else:
+                # Recherche executee ailleurs (autre process) ou terminee et oubliee
+                fresh = await asyncio.to_thread(get_search_queue, db, search_id)
+                if fresh is None:
+                    yield _sse("end", dict(db_progress, status="deleted"))
+                    return
+                db_progress = progress = _progress_from_queue(fresh)
+                key = ("db", json.dumps(progress, default=str, sort_keys=True))
+                wait = PROGRESS_SSE_DB_POLL_INTERVAL
+
+            if key != last_key:
+                last_key = key
+                last_sent = time.monotonic()
+                event_id = state["version"] if state is not None else None
+                yield _sse("progress", progress, event_id)
+
+            if progress["status"] in TERMINAL_STATUSES:
+                yield _sse("end", progress)
+                return
+
+            if await request.is_disconnected():
+                return
+
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                if time.monotonic() - last_sent >= PROGRESS_SSE_HEARTBEAT:
+                    last_sent = time.monotonic()
+                    yield ": keep-alive\n\n"
+            changed.clear()
+    finally:
+        unsubscribe()
+
+
+@router.get(
+    "/{search_id}/progress",
+    response_model=SearchProgressResponse,
+    summary="Progression d'une recherche",
+    description="Retourne l'etat courant de la progression d'une recherche en arriere-plan.",
+)
+def get_search_progress(
+    search_id: int,
+    user: User = Depends(get_current_user),
+    db: DatabaseManager = Depends(get_db),
+):
+    """
+    Retourne la progression courante (memoire si la recherche tourne ici, sinon BDD).
+    """
+    search = _get_owned_search(db, search_id, user)
+    progress = _progress_from_queue(search)
+    state = get_progress_channel().get_state(search_id)
+    if state is not None:
+        progress = _progress_from_state(state, progress)
+    return SearchProgressResponse(**progress)
+
+
+@router.get(
+    "/{search_id}/progress/stream",
+    summary="Flux de progression (SSE)",
+    description="Pousse la progression d'une recherche en server-sent events jusqu'a sa fin.",
+    response_class=StreamingResponse,
+)
+async def stream_search_progress(
+    search_id: int,
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: DatabaseManager = Depends(get_db),
+):
+    """
+    Ouvre un flux text/event-stream: un evenement "progress" par changement,
+    un evenement "end" au statut final.
+    """
+    search = await asyncio.to_thread(_get_owned_search, db, search_id, user)
+    logger.info("progress_stream_opened", search_id=search_id, user_id=str(user.id))
+
+    return StreamingResponse(
+        _progress_events(request, db, search),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get(
+    "/{search_id}/trace",
+    response_model=SearchTraceResponse,
+    summary="Trace d'une recherche",
+    description=(
+        "Retourne le resume du trace (duree par categorie et par phase, spans les "
+        "plus lents, piles folded pour flamegraph). format=chrome renvoie le fichier "
+        "Trace Event a ouvrir dans chrome://tracing ou Perfetto."
+    ),
+)
+def get_search_trace_endpoint(
+    search_id: int,
+    format: str = Query("summary", pattern="^(summary|chrome)$", description="summary ou chrome"),
+    user: User = Depends(get_current_user),
+    db: DatabaseManager = Depends(get_db),
+):
+    """
+    Retourne le trace enregistre en fin de recherche sur le SearchLog.
+    """
+    search = _get_owned_search(db, search_id, user)
+    log_id = search.get("search_log_id")
+    trace = get_search_trace(db, log_id, include_events=format == "chrome") if log_id else None
+    if not trace or (format == "chrome" and not trace.get("chrome_trace")):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trace non disponible",
+        )
+
+    if format == "chrome":
+        return JSONResponse(
+            trace["chrome_trace"],
+            headers={"Content-Disposition": f'attachment; filename="search-{search_id}-trace.json"'},
+        )
+    return SearchTraceResponse(search_id=search_id, search_log_id=log_id, **trace["summary"])
@@ -0,0 +1,39 @@
+"""
+Searches Schemas - Modeles Pydantic pour les endpoints de recherches.
+
+Responsabilite unique:
+----------------------
+Definir les schemas de reponse de la progression et du trace des recherches
+en arriere-plan.
+"""
+
+from pydantic import BaseModel
+from typing import Optional, Any
+
+
+class SearchProgressResponse(BaseModel):
+    """Progression d'une recherche en arriere-plan (aussi envoyee en SSE)."""
+
+    search_id: int
+    status: str
+    phase: Optional[int] = None
+    phase_name: Optional[str] = None
+    percent: int = 0
+    message: Optional[str] = None
+    phases_data: list[dict[str, Any]] = []
+    search_log_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class SearchTraceResponse(BaseModel):
+    """Resume du trace d'une recherche (spans par categorie, piles flamegraph)."""
+
+    search_id: int
+    search_log_id: int
+    total_ms: float = 0
+    spans: int = 0
+    dropped_spans: int = 0
+    by_category: dict[str, dict[str, float]] = {}
+    phases: list[dict[str, Any]] = []
+    slowest: list[dict[str, Any]] = []
+    folded: list[str] = []
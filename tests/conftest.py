@@ -3,7 +3,9 @@ Configuration et fixtures pytest.
 """
 
 import sys
+import threading
 from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 import pytest
@@ -198,6 +200,103 @@ def meta_api_ad_response() -> dict:
     }
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# FIXTURES - HTTP LOCAL (moteur de crawl et scrapers)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # Connexion coupee par le client (lecture arretee, timeout)
+
+
+class LocalHTTPServer:
+    """Serveur HTTP local (thread): chaque GET est passe a handle(handler)"""
+
+    def __init__(self, handle):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = _QuietHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    @property
+    def origin(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def url(self, path: str, host: str = "127.0.0.1") -> str:
+        return f"http://{host}:{self.port}{path}"
+
+    @staticmethod
+    def send(handler, status: int, body: bytes = b"", headers: dict = None):
+        """Reponse complete (Content-Length); client deconnecte ignore"""
+        try:
+            handler.send_response(status)
+            for name, value in (headers or {}).items():
+                handler.send_header(name, value)
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Lecture arretee par le client
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def http_server():
+    """Demarre des serveurs locaux: http_server(handle) -> LocalHTTPServer (arretes en fin de test)"""
+    servers = []
+
+    def start(handle) -> LocalHTTPServer:
+        server = LocalHTTPServer(handle)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def crawler_engine(monkeypatch):
+    """
+    Cree des CrawlerEngine de test: crawler_engine(*modules, **options).
+
+    Sans proxy ni delai par hote (sauf options); get_crawler des modules
+    consommateurs donnes renvoie le moteur cree. Moteurs fermes en fin de test.
+    """
+    from src.infrastructure.http import crawler as crawler_module
+
+    monkeypatch.setattr(crawler_module, "is_proxy_enabled", lambda: False)
+    engines = []
+
+    def create(*consumers, **options):
+        options.setdefault("per_host_delay", 0)
+        engine = crawler_module.CrawlerEngine(**options)
+        for module in consumers:
+            monkeypatch.setattr(module, "get_crawler", lambda: engine)
+        engines.append(engine)
+        return engine
+
+    yield create
+    for engine in engines:
+        engine.close()
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # MARKERS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -0,0 +1,110 @@
+"""
+Tests unitaires pour le stockage compact des annonces (AdStore).
+"""
+
+from datetime import datetime
+
+from src.application.use_cases.ad_store import AdStore, naive_epoch
+from src.infrastructure.persistence.repositories.winning_ad_repository import (
+    is_winning_ad,
+    match_winning_criteria,
+)
+
+
+def _ad(ad_id, page_id="p1", **fields):
+    ad = {
+        "id": ad_id,
+        "page_id": page_id,
+        "page_name": "Shop",
+        "ad_creation_time": "2024-01-01T00:00:00+0000",
+        "eu_total_reach": 50_000,
+        "ad_creative_bodies": ["Texte é"],
+        "ad_creative_link_captions": ["shop.com"],
+    }
+    ad.update(fields)
+    return ad
+
+
+class TestAdStore:
+    """Tests pour AdStore."""
+
+    def test_round_trip_preserves_ads(self):
+        """Les annonces reconstruites sont identiques aux annonces ajoutees."""
+        store = AdStore()
+        ads = [
+            _ad("1", _keyword="bijoux"),
+            _ad("2", eu_total_reach="1200"),
+            _ad("3", eu_total_reach=None),
+        ]
+        missing_reach = _ad("4")
+        del missing_reach["eu_total_reach"]
+        ads.append(missing_reach)
+        for ad in ads:
+            store.add("p1", ad)
+
+        assert list(store["p1"]) == ads
+        assert store["p1"][1] == ads[1]
+        assert [store.reach(row) for row in store.rows("p1")] == [50_000, 1200, 0, 0]
+
+    def test_mapping_interface(self):
+        """Le store se comporte comme un dict page_id -> annonces."""
+        store = AdStore()
+        store.add("p1", _ad("1"))
+        store.add("p2", _ad("2", page_id="p2"))
+
+        assert set(store) == {"p1", "p2"}
+        assert len(store["p2"]) == 1
+        assert store.get("p3", []) == []
+        assert {pid: [ad["id"] for ad in ads] for pid, ads in store.items()} == {
+            "p1": ["1"], "p2": ["2"]
+        }
+
+    def test_replace_and_retain_compact(self):
+        """Remplacement d'une page puis retain(): seules les lignes utiles restent."""
+        store = AdStore()
+        for i in range(3):
+            store.add("p1", _ad(str(i)))
+        store.add("p2", _ad("x", page_id="p2"))
+        view = store["p1"]
+        before = store.nbytes()
+
+        store["p1"] = [_ad("9", eu_total_reach=10)]
+        store.retain(["p1"])
+
+        assert "p2" not in store
+        assert [ad["id"] for ad in view] == ["9"]
+        assert store.ad_count == 1
+        assert store.nbytes() < before
+
+    def test_first_keyword(self):
+        """Le premier mot-cle connu de la page est retrouve."""
+        store = AdStore()
+        store.add("p1", _ad("1"))
+        store.add("p1", _ad("2", _keyword="montres"))
+
+        assert store.first_keyword("p1") == "montres"
+        assert store.first_keyword("p2") is None
+
+    def test_columns_match_is_winning_ad(self):
+        """La detection en colonnes donne le meme resultat que is_winning_ad."""
+        store = AdStore()
+        ads = [
+            _ad("1", ad_creation_time="2024-01-05T10:00:00+0000", eu_total_reach=45_000),
+            _ad("2", ad_creation_time="2024-01-01T00:00:00Z", eu_total_reach=10_000),
+            _ad("3", ad_creation_time="", eu_total_reach=900_000),
+            _ad("4", ad_creation_time="invalid"),
+        ]
+        for ad in ads:
+            store.add("p1", ad)
+        scan_date = datetime(2024, 1, 12, 9, 0)
+        scan_epoch = naive_epoch(scan_date)
+
+        for ad, row in zip(ads, store.rows("p1")):
+            expected = is_winning_ad(ad, scan_date)
+            created = store.created_epoch(row)
+            if created is None:
+                assert expected[0] is False
+                continue
+            age_days = max(0, (scan_epoch - created) // 86400)
+            matched = match_winning_criteria(age_days, store.reach(row))
+            assert (bool(matched), age_days, store.reach(row), matched) == expected
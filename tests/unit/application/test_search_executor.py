@@ -0,0 +1,249 @@
+"""
+Tests unitaires pour le regroupement des annonces par page (phases 2 et 5).
+"""
+
+import time
+
+from src.infrastructure.monitoring import progress_channel
+from src.infrastructure.monitoring.progress_channel import ProgressChannel
+from src.application.use_cases.search_executor import (
+    BackgroundProgressTracker,
+    PageAdsGrouper,
+    PagePipeline,
+    SearchCheckpoint,
+    merge_counted_ads,
+)
+
+
+class TestPageAdsGrouper:
+    """Tests pour PageAdsGrouper."""
+
+    def test_groups_streamed_pages_and_deduplicates(self):
+        """Les pages de resultats successives sont dedupliquees et regroupees."""
+        grouper = PageAdsGrouper(blacklist_ids=set())
+
+        grouper.add_ads([
+            {"id": "1", "page_id": "p1", "page_name": "Shop"},
+            {"id": "2", "page_id": "p1", "page_name": "Shop FR"},
+        ], keyword="bijoux")
+        grouper.add_ads([
+            {"id": "2", "page_id": "p1", "page_name": "Shop FR"},
+            {"id": "3", "page_id": "p1", "page_name": "Shop"},
+            {"id": "4", "page_id": "p2", "page_name": "Other"},
+        ], keyword="montres")
+
+        pages = grouper.finalize()
+
+        assert grouper.total_ads == 5
+        assert len(grouper.seen_ad_ids) == 4
+        assert pages["p1"]["ads_found_search"] == 3
+        assert pages["p1"]["page_name"] == "Shop"
+        assert pages["p1"]["_keywords"] == {"bijoux", "montres"}
+        assert [ad["id"] for ad in grouper.page_ads["p1"]] == ["1", "2", "3"]
+
+    def test_skips_blacklisted_pages(self):
+        """Les annonces des pages blacklistees sont ignorees et comptees."""
+        grouper = PageAdsGrouper(blacklist_ids={"p1"})
+
+        grouper.add_ads([
+            {"id": "1", "page_id": "p1"},
+            {"id": "2", "page_id": "p2"},
+            {"id": "3"},
+        ])
+        pages = grouper.finalize()
+
+        assert list(pages) == ["p2"]
+        assert grouper.blacklisted_ads_count == 1
+        assert grouper.blacklisted_pages_found == {"p1"}
+
+    def test_state_roundtrip_resumes_grouping(self):
+        """Un grouper restaure depuis son etat continue a dedupliquer."""
+        grouper = PageAdsGrouper(blacklist_ids=set())
+        grouper.add_ads([{"id": "1", "page_id": "p1", "page_name": "Shop"}], keyword="bijoux")
+
+        restored = PageAdsGrouper.from_state(grouper.to_state(), blacklist_ids=set())
+        restored.add_ads([
+            {"id": "1", "page_id": "p1", "page_name": "Shop"},
+            {"id": "2", "page_id": "p1", "page_name": "Shop"},
+        ], keyword="bijoux")
+        pages = restored.finalize()
+
+        assert pages["p1"]["ads_found_search"] == 2
+        assert pages["p1"]["_keywords"] == {"bijoux"}
+        assert [ad["id"] for ad in restored.page_ads["p1"]] == ["2"]
+
+    def test_state_keeps_ids_and_website_not_ads(self):
+        """Le checkpoint ne contient que les identifiants, comptes et sites des pages."""
+        grouper = PageAdsGrouper(blacklist_ids=set())
+        grouper.add_ads([
+            {"id": "1", "page_id": "p1", "ad_creative_bodies": ["x" * 1000]},
+            {"id": "2", "page_id": "p1", "ad_creative_link_url": "https://shop.fr"},
+            {"id": "3", "page_id": "p1", "ad_creative_link_url": "https://autre.fr"},
+        ])
+
+        state = grouper.to_state()
+
+        assert set(state) == {"pages", "name_counter", "total_ads",
+                              "blacklisted_ads_count", "blacklisted_pages_found"}
+        assert sorted(state["pages"]["p1"]["_ad_ids"]) == ["1", "2", "3"]
+        assert state["pages"]["p1"]["website"] == "https://shop.fr"
+        assert "x" * 1000 not in str(state)
+
+    def test_take_qualified_reports_each_page_once(self):
+        """Une page est signalee des qu'elle atteint le seuil, une seule fois."""
+        grouper = PageAdsGrouper(blacklist_ids=set())
+
+        grouper.add_ads([{"id": "1", "page_id": "p1"}, {"id": "2", "page_id": "p2"}])
+        assert grouper.take_qualified(2) == []
+
+        grouper.add_ads([{"id": "3", "page_id": "p1"}])
+        assert grouper.take_qualified(2) == ["p1"]
+
+        grouper.add_ads([{"id": "4", "page_id": "p1"}])
+        assert grouper.take_qualified(2) == []
+
+
+class TestPagePipeline:
+    """Tests pour PagePipeline."""
+
+    def _pipeline(self, **overrides):
+        stages = {
+            "resolve_sites": lambda pids: {pid: f"https://{pid}.com" for pid in pids if pid != "nosite"},
+            "detect_cms": lambda pid, url: {"cms": "Shopify" if pid.startswith("s") else "Wix"},
+            "accept_for_web": lambda pid, cms: cms["cms"] == "Shopify",
+            "analyze_web": lambda pid, url: {"product_count": 10, "url": url},
+        }
+        stages.update(overrides)
+        return PagePipeline(queue_size=2, cms_workers=2, web_workers=2, **stages)
+
+    def test_pages_flow_through_stages(self):
+        """CMS detecte pour chaque site; analyse web seulement si le CMS est accepte."""
+        pipeline = self._pipeline()
+        pipeline.submit(["s1", "w1", "nosite"])
+        pipeline.submit(["s2"])
+        pipeline.close()
+
+        cms = pipeline.wait_cms()
+        web = pipeline.wait_web()
+
+        assert set(cms) == {"s1", "w1", "s2"}
+        assert web == {
+            "s1": {"product_count": 10, "url": "https://s1.com"},
+            "s2": {"product_count": 10, "url": "https://s2.com"},
+        }
+
+    def test_stage_errors_use_fallback_results(self):
+        """Une erreur de detection ou d'analyse donne le resultat par defaut."""
+        def fail(pid, url):
+            raise RuntimeError("timeout")
+
+        pipeline = self._pipeline(
+            detect_cms=lambda pid, url: fail(pid, url) if pid == "s1" else {"cms": "Shopify"},
+            analyze_web=fail,
+        )
+        pipeline.submit(["s1", "s2"])
+        pipeline.close()
+
+        assert pipeline.wait_cms()["s1"] == {"cms": "Unknown", "is_shopify": False}
+        assert pipeline.wait_web() == {"s2": {"product_count": 0, "error": "timeout"}}
+
+    def test_cancel_releases_waiters(self):
+        """cancel() debloque les attentes sans fermer le pipeline."""
+        pipeline = self._pipeline(analyze_web=lambda pid, url: time.sleep(0.05) or {})
+        pipeline.submit(["s1"])
+
+        pipeline.cancel()
+
+        assert isinstance(pipeline.wait_cms(), dict)
+        assert isinstance(pipeline.wait_web(), dict)
+
+
+class TestSearchCheckpoint:
+    """Tests pour SearchCheckpoint."""
+
+    def test_update_persists_merged_state(self, monkeypatch):
+        """update() fusionne l'etat et l'enregistre via le repository."""
+        saved = []
+        monkeypatch.setattr(
+            "src.infrastructure.persistence.database.save_search_checkpoint",
+            lambda db, search_id, data: saved.append((search_id, dict(data))),
+        )
+        checkpoint = SearchCheckpoint(db=None, search_id=7, enabled=True)
+
+        checkpoint.update(search_log_id=42)
+        checkpoint.update(phase=2)
+
+        assert checkpoint.phase == 2
+        assert saved[-1] == (7, {"search_log_id": 42, "phase": 2})
+
+    def test_discard_drops_finished_phase_data(self, monkeypatch):
+        """discard() retire les donnees d'une phase terminee du prochain enregistrement."""
+        saved = []
+        monkeypatch.setattr(
+            "src.infrastructure.persistence.database.save_search_checkpoint",
+            lambda db, search_id, data: saved.append(dict(data)),
+        )
+        checkpoint = SearchCheckpoint(db=None, search_id=7, enabled=True)
+        checkpoint.update(cursors={"bijoux": "abc"}, keywords_done=["montres"])
+
+        checkpoint.discard("cursors", "keywords_done")
+        checkpoint.update(phase=2)
+
+        assert saved[-1] == {"phase": 2}
+
+    def test_is_due_respects_interval(self):
+        """is_due() attend l'intervalle minimum entre deux enregistrements."""
+        checkpoint = SearchCheckpoint(db=None, search_id=1, enabled=False, interval=3600)
+
+        assert checkpoint.is_due() is False
+        assert SearchCheckpoint(db=None, search_id=1, enabled=False, interval=0).is_due() is True
+
+
+class TestMergeCountedAds:
+    """Tests pour merge_counted_ads (comptage leger de la phase 5)."""
+
+    def test_reuses_known_creatives(self):
+        """Les creatives connues sont reutilisees, le reach du comptage prime."""
+        counted = [{"id": "1", "page_id": "p1", "eu_total_reach": 900}]
+        known = [{"id": "1", "page_id": "p1", "eu_total_reach": 100, "ad_creative_bodies": ["Promo"]}]
+
+        merged, complete = merge_counted_ads(counted, known)
+
+        assert complete is True
+        assert merged == [{"id": "1", "page_id": "p1", "eu_total_reach": 900, "ad_creative_bodies": ["Promo"]}]
+
+    def test_flags_unknown_ads(self):
+        """Une annonce absente de la phase 1 rend la page incomplete."""
+        counted = [{"id": "1", "page_id": "p1"}, {"id": "2", "page_id": "p1"}]
+        known = [{"id": "1", "page_id": "p1", "ad_snapshot_url": "https://x"}]
+
+        merged, complete = merge_counted_ads(counted, known)
+
+        assert complete is False
+        assert [ad["id"] for ad in merged] == ["1", "2"]
+        assert "ad_snapshot_url" not in merged[1]
+
+
+class TestBackgroundProgressTracker:
+    """Tests pour la publication de progression du tracker."""
+
+    def test_steps_coalesced_phases_written_immediately(self, monkeypatch):
+        """Les etapes restent en memoire; debut et fin de phase sont ecrits."""
+        writes = []
+        channel = ProgressChannel(lambda db, sid, fields: writes.append(dict(fields)),
+                                  flush_interval_ms=60_000)
+        monkeypatch.setattr(progress_channel, "_channel", channel)
+        tracker = BackgroundProgressTracker(db=None, search_id=1)
+
+        tracker.start_phase(1, "Recherche par mots-cles")
+        for i in range(1, 11):
+            tracker.update_step("Mots-cles", i, 10)
+
+        assert len(writes) == 1
+        assert channel.get_state(1)["message"] == "Mots-cles: 10/10"
+
+        tracker.complete_phase("42 annonces")
+
+        assert len(writes) == 2
+        assert writes[1]["phases_data"][0]["result"] == "42 annonces"
+        channel.close()
@@ -0,0 +1,100 @@
+"""
+Tests unitaires pour le cache API (payload compresse, L1, hits groupes).
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.infrastructure.cache.lru_cache import BoundedLRUCache
+from src.infrastructure.persistence.repositories import cache_repository
+
+
+@pytest.fixture(autouse=True)
+def reset_cache_state():
+    """Isole l'etat global du module entre les tests."""
+    cache_repository._l1_cache.clear()
+    cache_repository._pending_hits.clear()
+    yield
+    cache_repository._l1_cache.clear()
+    cache_repository._pending_hits.clear()
+
+
+def _db(row=None):
+    """DatabaseManager factice: la requete de lecture retourne `row`."""
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = row
+
+    @contextmanager
+    def get_session():
+        yield session
+
+    db = MagicMock()
+    db.get_session = get_session
+    db.session = session
+    return db
+
+
+class TestBoundedLRUCache:
+    """Tests pour BoundedLRUCache."""
+
+    def test_evicts_least_recently_used_over_byte_budget(self):
+        """Le budget en octets evince les entrees les moins recentes."""
+        cache = BoundedLRUCache(max_entries=10, max_bytes=100)
+        cache.set("a", 1, size=40)
+        cache.set("b", 2, size=40)
+        cache.get("a")
+        cache.set("c", 3, size=40)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_oversized_and_expired_entries(self):
+        """Une entree trop grosse n'est pas stockee; une entree expiree est ignoree."""
+        cache = BoundedLRUCache(max_entries=10, max_bytes=100)
+        cache.set("big", 1, size=500)
+        cache.set("old", 2, size=10, expires_at=1)
+
+        assert cache.get("big") is None
+        assert cache.get("old") is None
+        assert cache.get_stats()["bytes"] == 0
+
+
+class TestCompressedApiCache:
+    """Tests pour get/set_cached_response."""
+
+    def test_set_stores_compressed_blob_and_fills_l1(self):
+        """set_cached_response stocke un blob compresse et alimente le L1."""
+        db = _db()
+        payload = [{"id": str(i), "ad_creative_bodies": ["Promo -50%"]} for i in range(200)]
+
+        cache_repository.set_cached_response(db, "search_ads:k", "search_ads", payload)
+
+        entry = db.session.add.call_args[0][0]
+        assert entry.response_data is None
+        assert len(entry.response_blob) < len(str(payload)) / 5
+        # Lecture servie par le L1, sans requete
+        db.session.query.reset_mock()
+        assert cache_repository.get_cached_response(db, "search_ads:k") == payload
+        db.session.query.assert_not_called()
+
+    def test_reads_legacy_text_rows_without_write(self):
+        """Les anciennes lignes (JSON en clair) restent lisibles, sans commit."""
+        row = (None, None, '[{"id": "1"}]', datetime.utcnow() + timedelta(hours=1))
+        db = _db(row)
+
+        assert cache_repository.get_cached_response(db, "search_ads:old") == [{"id": "1"}]
+        db.session.commit.assert_not_called()
+        assert cache_repository._pending_hits["search_ads:old"] == 1
+
+    def test_hits_flushed_in_one_batch(self):
+        """flush_cache_hits ecrit tous les hits en attente en une transaction."""
+        db = _db()
+        cache_repository._pending_hits.update({"a": 3, "b": 1})
+
+        assert cache_repository.flush_cache_hits(db) == 4
+        assert db.session.commit.call_count == 1
+        assert not cache_repository._pending_hits
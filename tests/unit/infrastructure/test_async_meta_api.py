@@ -0,0 +1,268 @@
+"""
+Tests unitaires pour AsyncMetaAdsClient.
+
+Utilise un serveur aiohttp local qui simule l'API Meta Ads Archive.
+"""
+
+import json
+
+import pytest
+from aiohttp import web
+
+from src.infrastructure.external_services import async_meta_api
+from src.infrastructure.external_services.async_meta_api import AsyncMetaAdsClient
+
+
+def _build_app(pages_by_keyword, calls):
+    """Construit une fausse API Ads Archive paginee."""
+
+    async def handler(request):
+        calls.append(dict(request.query))
+        keyword = request.query.get("search_terms") or request.query.get("kw")
+        page = int(request.query.get("page", "0"))
+        pages = pages_by_keyword.get(keyword, [[]])
+        payload = {"data": pages[page]}
+        if page + 1 < len(pages):
+            next_url = f"{request.url.with_query({'kw': keyword, 'page': page + 1})}"
+            payload["paging"] = {"next": next_url}
+        return web.json_response(payload)
+
+    app = web.Application()
+    app.router.add_get("/ads_archive", handler)
+    return app
+
+
+@pytest.fixture
+def aiohttp_server_factory(monkeypatch):
+    """Demarre la fausse API et redirige ADS_ARCHIVE vers elle."""
+
+    async def factory(pages_by_keyword, calls):
+        runner = web.AppRunner(_build_app(pages_by_keyword, calls))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        monkeypatch.setattr(async_meta_api, "ADS_ARCHIVE", f"http://127.0.0.1:{port}/ads_archive")
+        monkeypatch.setattr(async_meta_api, "META_DELAY_BETWEEN_PAGES", 0)
+        return runner
+
+    return factory
+
+
+class TestAsyncMetaAdsClient:
+    """Tests pour AsyncMetaAdsClient."""
+
+    async def test_search_ads_follows_pagination(self, aiohttp_server_factory):
+        """search_ads() agrege toutes les pages de resultats."""
+        calls = []
+        runner = await aiohttp_server_factory(
+            {"bijoux": [[{"id": "1"}, {"id": "2"}], [{"id": "3"}]]}, calls
+        )
+        try:
+            async with AsyncMetaAdsClient([{"token": "tok-a"}]) as client:
+                ads = await client.search_ads("bijoux", ["FR"], ["fr"])
+        finally:
+            await runner.cleanup()
+
+        assert [ad["id"] for ad in ads] == ["1", "2", "3"]
+        assert len(calls) == 2
+        assert calls[0]["access_token"] == "tok-a"
+
+    async def test_one_session_per_token_proxy_pair(self):
+        """Une session poolee est creee par couple token/proxy et reutilisee."""
+        client = AsyncMetaAdsClient([
+            {"token": "tok-a", "proxy": "http://p1:8080"},
+            {"token": "tok-b", "proxy": "http://p2:8080"},
+        ])
+        try:
+            tokens = client._token_data
+            first = client._get_session(tokens[0])
+
+            assert client._get_session(tokens[0]) is first
+            assert client._get_session(tokens[1]) is not first
+            assert len(client._sessions) == 2
+        finally:
+            await client.close()
+
+        assert client._sessions == {}
+
+    async def test_search_keywords_deduplicates_and_tags_keyword(self, aiohttp_server_factory):
+        """search_keywords() deduplique les ads et renseigne _keyword."""
+        calls = []
+        runner = await aiohttp_server_factory(
+            {
+                "bijoux": [[{"id": "1"}, {"id": "2"}]],
+                "montres": [[{"id": "2"}, {"id": "3"}]],
+            },
+            calls,
+        )
+        progress = []
+        try:
+            async with AsyncMetaAdsClient([{"token": "tok-a"}, {"token": "tok-b"}]) as client:
+                all_ads, by_keyword = await client.search_keywords(
+                    ["bijoux", "montres"], ["FR"], [],
+                    progress_callback=lambda kw, cur, tot: progress.append((cur, tot)),
+                )
+        finally:
+            await runner.cleanup()
+
+        assert sorted(ad["id"] for ad in all_ads) == ["1", "2", "3"]
+        assert by_keyword == {"bijoux": 2, "montres": 2}
+        assert all(ad.get("_keyword") for ad in all_ads)
+        assert progress[-1] == (2, 2)
+        assert {c["access_token"] for c in calls} == {"tok-a", "tok-b"}
+
+    async def test_search_keywords_without_tokens(self):
+        """search_keywords() sans token retourne des resultats vides."""
+        async with AsyncMetaAdsClient([]) as client:
+            assert await client.search_keywords(["bijoux"], ["FR"], []) == ([], {})
+
+    async def test_iter_search_ads_yields_each_page(self, aiohttp_server_factory):
+        """iter_search_ads() renvoie chaque page des sa reception."""
+        calls = []
+        runner = await aiohttp_server_factory(
+            {"bijoux": [[{"id": "1"}, {"id": "2"}], [{"id": "3"}]]}, calls
+        )
+        try:
+            async with AsyncMetaAdsClient([{"token": "tok-a"}]) as client:
+                batches = [
+                    [ad["id"] for ad in batch]
+                    async for batch in client.iter_search_ads("bijoux", ["FR"], [])
+                ]
+        finally:
+            await runner.cleanup()
+
+        assert batches == [["1", "2"], ["3"]]
+
+    async def test_iter_keywords_stops_paginating_when_abandoned(self, aiohttp_server_factory):
+        """Interrompre iter_keywords() annule la pagination restante."""
+        calls = []
+        runner = await aiohttp_server_factory(
+            {"bijoux": [[{"id": str(i)}] for i in range(20)]}, calls
+        )
+        try:
+            async with AsyncMetaAdsClient([{"token": "tok-a"}]) as client:
+                stream = client.iter_keywords(["bijoux"], ["FR"], [], max_buffered_pages=1)
+                first = await stream.__anext__()
+                await stream.aclose()
+        finally:
+            await runner.cleanup()
+
+        assert first.keyword == "bijoux"
+        assert first.ads == [{"id": "0"}]
+        assert len(calls) < 20
+
+    async def test_iter_keywords_signals_end_of_each_keyword(self, aiohttp_server_factory):
+        """Chaque mot-cle termine produit une page done=True."""
+        calls = []
+        runner = await aiohttp_server_factory(
+            {"bijoux": [[{"id": "1"}]], "montres": [[{"id": "2"}], [{"id": "3"}]]}, calls
+        )
+        try:
+            async with AsyncMetaAdsClient([{"token": "tok-a"}]) as client:
+                pages = [p async for p in client.iter_keywords(["bijoux", "montres"], ["FR"], [])]
+        finally:
+            await runner.cleanup()
+
+        assert sorted(p.keyword for p in pages if p.done) == ["bijoux", "montres"]
+        assert sorted(ad["id"] for p in pages for ad in p.ads) == ["1", "2", "3"]
+
+    async def test_reduced_limit_retry_with_no_ads_succeeds(self, monkeypatch):
+        """Une relance a limite reduite qui aboutit (0 ads) n'est pas un echec."""
+        responses = [RuntimeError('Please reduce the amount of data {"code":1}'), {"data": []}]
+        logged = []
+
+        async def fake_get_api(token_data, url, params, keyword=None):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        async def fake_log_usage(token_data, keyword, countries, success, ads_count, error_msg, start_time):
+            logged.append((success, error_msg))
+
+        monkeypatch.setattr(async_meta_api.asyncio, "sleep", _no_sleep)
+        async with AsyncMetaAdsClient([{"token": "tok-a"}]) as client:
+            monkeypatch.setattr(client, "_get_api", fake_get_api)
+            monkeypatch.setattr(client, "_log_usage", fake_log_usage)
+            batches = [batch async for batch in client.iter_search_ads("bijoux", ["FR"], [])]
+
+        assert batches == [[]]
+        assert logged == [(True, None)]
+
+
+async def _no_sleep(delay):
+    pass
+
+
+def _build_pages_app(calls, failing_tokens=()):
+    """Fausse API: 2 ads par page demandee, erreur pour certains tokens."""
+
+    async def handler(request):
+        token = request.query.get("access_token")
+        page_ids = json.loads(request.query["search_page_ids"])
+        calls.append((token, page_ids, request.query.get("fields")))
+        if token in failing_tokens:
+            return web.json_response({"error": {"code": 190, "message": "Invalid token"}})
+        ads = [{"id": f"{pid}-{i}", "page_id": pid} for pid in page_ids for i in range(2)]
+        return web.json_response({"data": ads})
+
+    app = web.Application()
+    app.router.add_get("/ads_archive", handler)
+    return app
+
+
+@pytest.fixture
+def pages_server_factory(monkeypatch):
+    """Demarre la fausse API de comptage par page."""
+
+    async def factory(calls, failing_tokens=()):
+        runner = web.AppRunner(_build_pages_app(calls, failing_tokens))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        monkeypatch.setattr(async_meta_api, "ADS_ARCHIVE", f"http://127.0.0.1:{port}/ads_archive")
+        return runner
+
+    return factory
+
+
+class TestFetchPagesBatches:
+    """Tests pour la repartition des batches de pages sur les tokens."""
+
+    async def test_batches_spread_across_tokens(self, pages_server_factory):
+        """Les batches de 10 pages sont repartis sur tous les tokens."""
+        calls = []
+        runner = await pages_server_factory(calls)
+        page_ids = [str(i) for i in range(45)]
+        progress = []
+        try:
+            async with AsyncMetaAdsClient([{"token": "tok-a"}, {"token": "tok-b"}]) as client:
+                results = await client.fetch_pages_batches(
+                    page_ids, ["FR"], [], fields="id,page_id",
+                    progress_callback=lambda done, total: progress.append((done, total)),
+                )
+        finally:
+            await runner.cleanup()
+
+        assert len(calls) == 5
+        assert all(len(ids) <= 10 for _, ids, _ in calls)
+        assert {token for token, _, _ in calls} == {"tok-a", "tok-b"}
+        assert {fields for _, _, fields in calls} == {"id,page_id"}
+        assert set(results) == set(page_ids)
+        assert all(count == 2 for _, count in results.values())
+        assert progress[-1] == (5, 5)
+
+    async def test_failed_batch_retried_on_next_token(self, pages_server_factory):
+        """Un batch en echec est retente sur le token suivant."""
+        calls = []
+        runner = await pages_server_factory(calls, failing_tokens={"tok-a"})
+        try:
+            async with AsyncMetaAdsClient([{"token": "tok-a"}, {"token": "tok-b"}]) as client:
+                results = await client.fetch_pages_batches([str(i) for i in range(20)], ["FR"], [])
+        finally:
+            await runner.cleanup()
+
+        assert all(count == 2 for _, count in results.values())
+        assert len(results) == 20
@@ -0,0 +1,123 @@
+"""
+Tests unitaires pour l'enregistrement / rejeu HTTP du benchmark hors ligne.
+"""
+
+import asyncio
+import json
+
+import aiohttp
+import requests
+
+from src.infrastructure.benchmark.archive import ReplayArchive, request_key
+from src.infrastructure.benchmark.http_replay import ReplayServer, record_http, replay_http
+from src.infrastructure.benchmark.runner import compare_reports, percentile
+
+ADS_URL = "https://graph.facebook.com/v21.0/ads_archive"
+
+
+def _archive():
+    archive = ReplayArchive(meta={"keywords": ["bijoux"]})
+    archive.add("GET", f"{ADS_URL}?search_terms=bijoux&access_token=SECRET", 200,
+                {"Content-Type": "application/json", "Set-Cookie": "x"},
+                json.dumps({"data": [{"id": "1"}]}).encode(), elapsed_ms=120)
+    archive.add("GET", "https://shop.com/sitemap.xml", 200, {"Content-Type": "application/xml"},
+                b"<urlset/>", final_url="https://www.shop.com/sitemap.xml")
+    return archive
+
+
+class TestReplayArchive:
+    """Tests pour ReplayArchive."""
+
+    def test_request_key_ignores_secrets_and_param_order(self):
+        """La cle ne depend ni du token ni de l'ordre des parametres."""
+        assert request_key("get", f"{ADS_URL}?b=2&access_token=T1&a=1") == \
+            request_key("GET", f"{ADS_URL}?a=1&b=2&access_token=T2")
+
+    def test_request_key_unwraps_scraper_api(self):
+        """Une URL ScraperAPI a la meme cle que son URL cible."""
+        proxied = "http://api.scraperapi.com?api_key=K&url=https%3A%2F%2Fshop.com%2F&render=false"
+        assert request_key("GET", proxied) == request_key("GET", "https://shop.com/")
+
+    def test_save_load_round_trip_without_secrets(self, tmp_path):
+        """L'archive relue rejoue les memes reponses, sans token ni en-tetes inutiles."""
+        path = str(tmp_path / "archive.jsonl.gz")
+        _archive().save(path)
+
+        archive = ReplayArchive.load(path)
+        entry = archive.lookup("GET", f"{ADS_URL}?search_terms=bijoux&access_token=OTHER")
+
+        assert archive.meta == {"keywords": ["bijoux"]}
+        assert "SECRET" not in entry["url"]
+        assert entry["headers"] == {"content-type": "application/json"}
+        assert json.loads(ReplayArchive.body(entry)) == {"data": [{"id": "1"}]}
+
+    def test_repeated_calls_replayed_in_order(self):
+        """Un appel enregistre plusieurs fois est rejoue dans l'ordre, puis la derniere reponse."""
+        archive = ReplayArchive()
+        archive.add("GET", "https://shop.com/", 429, {}, b"")
+        archive.add("GET", "https://shop.com/", 200, {}, b"ok")
+
+        statuses = [archive.lookup("GET", "https://shop.com/")["status"] for _ in range(3)]
+        assert statuses == [429, 200, 200]
+
+
+class TestReplayHttp:
+    """Tests pour ReplayServer et replay_http."""
+
+    def test_requests_replayed_through_local_server(self):
+        """requests recoit la reponse enregistree et l'URL finale d'origine."""
+        with ReplayServer(_archive(), latency_ms=5) as server, replay_http(server):
+            meta = requests.get(ADS_URL, params={"search_terms": "bijoux", "access_token": "T"},
+                                proxies={"https": "http://proxy.invalid:1"})
+            sitemap = requests.get("https://shop.com/sitemap.xml")
+            missing = requests.get("https://unknown.example/")
+
+        assert meta.json() == {"data": [{"id": "1"}]}
+        assert sitemap.url == "https://www.shop.com/sitemap.xml"
+        assert missing.status_code == 404
+        assert server.served == 2
+        assert server.misses == ["GET https://unknown.example/"]
+        assert min(server.latencies["meta_api"]) >= 5
+
+    def test_aiohttp_replayed_through_local_server(self):
+        """Les sessions aiohttp (client Meta async) sont aussi rejouees."""
+        async def fetch():
+            async with aiohttp.ClientSession() as session:
+                async with session.get(ADS_URL, params={"search_terms": "bijoux"},
+                                       proxy="http://proxy.invalid:1") as response:
+                    return response.status, await response.json()
+
+        with ReplayServer(_archive()) as server, replay_http(server):
+            status, data = asyncio.run(fetch())
+
+        assert (status, data) == (200, {"data": [{"id": "1"}]})
+
+    def test_record_then_replay(self):
+        """Les reponses recues pendant record_http sont rejouables."""
+        recorded = ReplayArchive()
+        with ReplayServer(_archive()) as source:
+            url = f"{source.url}/https/shop.com/sitemap.xml"
+            with record_http(recorded):
+                requests.get(url)
+
+        assert len(recorded) == 1
+        with ReplayServer(recorded) as server, replay_http(server):
+            assert requests.get(url).text == "<urlset/>"
+
+
+class TestReports:
+    """Tests pour les metriques et la comparaison de rapports."""
+
+    def test_percentile(self):
+        """Percentile par interpolation lineaire."""
+        assert percentile(list(range(1, 101)), 95) == 95.05
+        assert percentile([], 95) == 0.0
+
+    def test_compare_reports_flags_regressions(self):
+        """Les metriques degradees au-dela de la tolerance sont signalees."""
+        baseline = {"median": {"wall_seconds": 10.0, "web_p95_ms": 100, "peak_rss_mb": 300}}
+        current = {"median": {"wall_seconds": 12.0, "web_p95_ms": 105, "peak_rss_mb": 300, "misses": 0}}
+
+        regressions = compare_reports(current, baseline, tolerance=0.15)
+
+        assert regressions == ["wall_seconds: 10.0 -> 12.0 (+20%)"]
@@ -0,0 +1,114 @@
+"""
+Tests unitaires pour les signatures CMS (recherche multi-motifs en un passage).
+"""
+
+import pytest
+
+from src.infrastructure.scrapers import cms_signatures
+from src.infrastructure.scrapers.cms_signatures import (
+    CMS_HTML_LIMIT,
+    SignatureMatcher,
+    detect_cms_from_html,
+    scan_cms_signatures,
+)
+from src.infrastructure.scrapers.market_spy import MarketSpy
+from src.infrastructure.scrapers.web_analyzer import detect_cms
+
+BACKENDS = [pytest.param(False, id="regex")]
+if cms_signatures.ahocorasick is not None:
+    BACKENDS.append(pytest.param(True, id="aho-corasick"))
+
+
+class TestSignatureMatcher:
+    """Tests pour SignatureMatcher (les deux moteurs)."""
+
+    @pytest.mark.parametrize("use_automaton", BACKENDS)
+    def test_overlapping_and_prefix_patterns_all_found(self, use_automaton):
+        """Motifs imbriques ou prefixes l'un de l'autre: tous trouves, comme `in`."""
+        patterns = ["shopify.com", "cdn.shopify.com", "myshopify.com", "jimdo", "jimdocdn", "absent"]
+        text = "<script src='//cdn.shopify.com/a.js'></script> x.myshopify.com jimdocdn"
+
+        found = SignatureMatcher(patterns, use_automaton=use_automaton).find(text)
+
+        assert found == {p for p in patterns if p in text}
+
+    @pytest.mark.parametrize("use_automaton", BACKENDS)
+    def test_special_characters_escaped(self, use_automaton):
+        matcher = SignatureMatcher(["index.php?route=", "a.b"], use_automaton=use_automaton)
+
+        assert matcher.find("/index.php?route=product") == {"index.php?route="}
+        assert matcher.find("axb") == set()
+
+    def test_empty_inputs(self):
+        assert SignatureMatcher([]).find("anything") == set()
+        assert SignatureMatcher(["x"]).find("") == set()
+
+
+class TestScanCmsSignatures:
+    """Tests pour scan_cms_signatures / CmsEvidence.decide."""
+
+    def test_shopify_scored_from_html_headers_and_cookies(self):
+        """Les preuves de toutes les sources s'additionnent, dans l'ordre de la table."""
+        evidence = scan_cms_signatures(
+            '<link href="//cdn.shopify.com/s/x.css">',
+            {"X-Shopify-Stage": "production", "Set-Cookie": "_shopify_y=abc"},
+        )
+
+        result = evidence.decide()
+
+        assert evidence.score("Shopify") == 3 + 1 + 2 + 2
+        assert result["cms"] == "Shopify" and result["confidence"] == 80
+        assert result["details"] == (
+            "html:cdn.shopify.com, html:shopify.com, header:x-shopify-stage, cookie:_shopify_y"
+        )
+
+    def test_weak_shopify_evidence_skips_probe(self):
+        """Un score Shopify faible suffit; la verification reseau n'est faite que sans preuve."""
+        probes = []
+        result = scan_cms_signatures("<a href='/cart.js'>").decide(lambda: probes.append(1) or False)
+
+        assert result["cms"] == "Shopify" and result["confidence"] == 80
+        assert probes == []
+
+    def test_probe_used_without_shopify_evidence(self):
+        result = scan_cms_signatures("<html>wp-content</html>").decide(lambda: True)
+
+        assert result["cms"] == "Shopify"
+
+    def test_evidence_for_all_platforms_priority_decides(self):
+        """Le scan donne les preuves de toutes les plateformes; la priorite de la table tranche."""
+        evidence = scan_cms_signatures("<html>wixstatic.com wp-includes</html>")
+
+        assert {"Wix", "WordPress"} <= set(evidence.evidence)
+        assert evidence.decide()["cms"] == "WordPress"
+
+    def test_medium_pattern_confidence(self):
+        result = scan_cms_signatures("<div class='ps_shoppingcart'>").decide()
+
+        assert (result["cms"], result["confidence"]) == ("PrestaShop", 75)
+
+    def test_header_only_signature(self):
+        """x-magento cherche aussi dans les headers."""
+        assert detect_cms_from_html("<html></html>", {"X-Magento-Cache-Debug": "HIT"}) == "Magento"
+
+    def test_html_scanned_up_to_limit(self):
+        html = "x" * CMS_HTML_LIMIT + "cdn.shopify.com"
+
+        assert detect_cms_from_html(html) == "Unknown"
+
+
+class TestDetectorsShareSignatures:
+    """web_analyzer.detect_cms et MarketSpy._detect_cms utilisent la meme table."""
+
+    @pytest.mark.parametrize("html, headers, expected", [
+        ("<script src='//cdn.shopify.com/x.js'>", {}, "Shopify"),
+        ("<body class='woocommerce'>", {}, "WooCommerce"),
+        ("<img src='https://static.wixstatic.com/a.png'>", {}, "Wix"),
+        ("<html></html>", {"X-Shopify-Stage": "production"}, "Shopify"),
+        ("<a href='/products/robe'>Robe</a>", {}, "Unknown"),
+    ])
+    def test_same_result(self, html, headers, expected):
+        spy = MarketSpy.__new__(MarketSpy)
+
+        assert detect_cms(html, headers) == expected
+        assert spy._detect_cms(html, headers) == expected
@@ -0,0 +1,231 @@
+"""
+Tests unitaires pour le moteur de crawl partage (CrawlerEngine).
+
+Utilise un serveur HTTP local (thread) qui simule les sites crawles.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.infrastructure.cache.document_cache import (
+    DocumentCache, clear_current_document_cache, set_current_document_cache,
+)
+from src.infrastructure.http import crawler as crawler_module
+
+
+class _Site:
+    """Serveur local: /page, /redirect, /slow, /big, /flaky"""
+
+    def __init__(self, http_server):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.started = []
+        self.flaky_calls = 0
+        self.server = http_server(self.handle)
+        self.url = self.server.url
+
+    def handle(self, handler):
+        send = self.server.send
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.started.append(time.monotonic())
+        try:
+            if handler.path == "/redirect":
+                send(handler, 302, b"", {"Location": "/page"})
+            elif handler.path.startswith("/slow"):
+                time.sleep(0.1)
+                send(handler, 200, b"ok")
+            elif handler.path == "/big":
+                send(handler, 200, b"x" * 300_000)
+            elif handler.path == "/flaky":
+                with self.lock:
+                    self.flaky_calls += 1
+                    status = 503 if self.flaky_calls == 1 else 200
+                send(handler, status, b"flaky")
+            else:
+                send(handler, 200, "<title>Boutique é</title>".encode("utf-8"), {
+                    "Content-Type": "text/html; charset=utf-8",
+                    "X-Shopify-Stage": "production",
+                    "Set-Cookie": "_shopify_y=abc; Path=/",
+                })
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def site(http_server):
+    return _Site(http_server)
+
+
+@pytest.fixture
+def engine(crawler_engine):
+    return crawler_engine(max_concurrency=8, per_host_concurrency=2)
+
+
+class TestCrawlerEngine:
+    """Tests pour CrawlerEngine."""
+
+    def test_fetch_follows_redirects_and_exposes_response(self, site, engine):
+        """fetch() suit les redirections et expose statut, texte, headers et cookies."""
+        response = engine.fetch(site.url("/redirect"))
+
+        assert response.ok
+        assert response.status_code == 200
+        assert response.url == site.url("/page")
+        assert response.requested_url == site.url("/redirect")
+        assert response.text == "<title>Boutique é</title>"
+        assert response.headers["x-shopify-stage"] == "production"
+        assert response.cookies == {"_shopify_y": "abc"}
+
+    def test_body_truncated_at_max_bytes(self, site, engine):
+        """Le corps est coupe a max_bytes."""
+        response = engine.fetch(site.url("/big"), max_bytes=100_000)
+
+        assert response.truncated
+        assert len(response.content) == 100_000
+
+    def test_network_error_returned_not_raised(self, engine):
+        """Une erreur reseau donne status_code 0 et error, sans exception."""
+        response = engine.fetch("http://127.0.0.1:9/", timeout=2)
+
+        assert response.status_code == 0
+        assert response.error == "connection"
+        assert not response.ok
+
+    def test_retries_on_retryable_status(self, site, engine):
+        """retries relance une reponse 503."""
+        response = engine.fetch(site.url("/flaky"), retries=1)
+
+        assert response.status_code == 200
+        assert site.flaky_calls == 2
+
+    def test_per_host_concurrency_limit(self, site, engine):
+        """Pas plus de per_host_concurrency requetes simultanees vers un hote."""
+        responses = engine.fetch_many([site.url(f"/slow?{i}") for i in range(6)])
+
+        assert [r.status_code for r in responses] == [200] * 6
+        assert site.max_active == 2
+
+    def test_global_concurrency_limit_across_hosts(self, site, crawler_engine):
+        """max_concurrency borne les requetes, tous hotes confondus."""
+        engine = crawler_engine(max_concurrency=1, per_host_concurrency=4)
+        urls = [site.url(f"/slow?{i}", host) for i in range(2) for host in ("127.0.0.1", "localhost")]
+        engine.fetch_many(urls)
+
+        assert site.max_active == 1
+
+    def test_per_host_delay_spaces_requests(self, site, crawler_engine):
+        """per_host_delay espace les departs vers un meme hote."""
+        engine = crawler_engine(per_host_concurrency=4, per_host_delay=0.1)
+        engine.fetch_many([site.url(f"/page?{i}") for i in range(3)])
+
+        gaps = [b - a for a, b in zip(site.started, site.started[1:])]
+        assert min(gaps) >= 0.08
+
+    def test_direct_fallback_when_proxy_unreachable(self, site, engine, monkeypatch):
+        """Si ScraperAPI ne repond pas, direct_fallback refait la requete en direct."""
+        monkeypatch.setattr(crawler_module, "is_proxy_enabled", lambda: True)
+        monkeypatch.setattr(crawler_module, "get_proxied_url",
+                            lambda url, extra=None: ("http://127.0.0.1:9/", {}))
+
+        without = engine.fetch(site.url("/page"), timeout=2)
+        with_fallback = engine.fetch(site.url("/page"), timeout=2, direct_fallback=True)
+
+        assert without.error == "connection" and without.via_proxy
+        assert with_fallback.status_code == 200 and not with_fallback.via_proxy
+
+    def test_afetch_from_another_event_loop(self, site, engine):
+        """afetch() est utilisable depuis une autre boucle asyncio."""
+        async def run():
+            return await asyncio.gather(*(engine.afetch(site.url(f"/page?{i}")) for i in range(3)))
+
+        responses = asyncio.run(run())
+
+        assert [r.status_code for r in responses] == [200] * 3
+        assert engine.get_stats()["requests"] == 3
+
+
+class TestCrawlerDocumentCache:
+    """Tests pour use_cache (cache de documents de la recherche)."""
+
+    @pytest.fixture
+    def documents(self):
+        cache = DocumentCache(max_document_bytes=200_000)
+        set_current_document_cache(cache)
+        yield cache
+        clear_current_document_cache(cache)
+        cache.close()
+
+    def test_document_fetched_once_per_search(self, site, engine, documents):
+        """Une page deja recuperee est servie par le cache, sans nouvelle requete."""
+        first = engine.fetch(site.url("/page"), max_bytes=1_000, use_cache=True)
+        second = engine.fetch(site.url("/page/").rstrip("/"), use_cache=True)
+
+        assert len(site.started) == 1
+        assert not first.from_cache and second.from_cache
+        assert second.text == first.text
+        assert second.headers["x-shopify-stage"] == "production"
+        assert second.cookies == {"_shopify_y": "abc"}
+
+    def test_concurrent_requests_coalesced(self, site, engine, documents):
+        """Des requetes simultanees vers la meme URL partagent une seule requete."""
+        responses = engine.fetch_many([site.url("/slow")] * 4, use_cache=True)
+
+        assert [r.status_code for r in responses] == [200] * 4
+        assert len(site.started) == 1
+
+    def test_truncated_document_not_served_to_longer_read(self, site, engine, documents):
+        """Un document tronque ne sert pas une lecture plus longue que son corps."""
+        small = engine.fetch(site.url("/big"), max_bytes=1_000, use_cache=True)
+        full = engine.fetch(site.url("/big"), max_bytes=0, use_cache=True)
+
+        assert small.truncated and len(small.content) == 1_000
+        assert len(full.content) == 300_000
+        assert len(site.started) == 2
+
+    def test_retryable_status_not_cached(self, site, engine, documents):
+        """Une reponse 503 (temporaire) n'est pas mise en cache."""
+        engine.fetch(site.url("/flaky"), use_cache=True)
+        response = engine.fetch(site.url("/flaky"), use_cache=True)
+
+        assert response.status_code == 200
+        assert site.flaky_calls == 2
+
+    def test_concurrent_searches_use_their_own_cache(self, site, engine):
+        """Deux recherches simultanees (threads) remplissent chacune leur cache."""
+        caches = [DocumentCache(), DocumentCache()]
+        ready = threading.Barrier(len(caches))
+
+        def search(cache: DocumentCache):
+            set_current_document_cache(cache)
+            try:
+                ready.wait(timeout=5)
+                engine.fetch(site.url("/page"), use_cache=True)
+            finally:
+                clear_current_document_cache(cache)
+
+        threads = [threading.Thread(target=search, args=(cache,)) for cache in caches]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        try:
+            assert all(cache.get(site.url("/page")) is not None for cache in caches)
+            assert len(site.started) == 2
+        finally:
+            for cache in caches:
+                cache.close()
+
+    def test_without_active_cache_every_fetch_hits_network(self, site, engine):
+        """Hors recherche (aucun cache actif), use_cache est sans effet."""
+        engine.fetch(site.url("/page"), use_cache=True)
+        engine.fetch(site.url("/page"), use_cache=True)
+
+        assert len(site.started) == 2
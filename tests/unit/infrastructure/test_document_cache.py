@@ -0,0 +1,166 @@
+"""
+Tests unitaires pour le cache des documents d'une recherche (fetch-once).
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+import pytest
+
+from src.infrastructure.cache.document_cache import (
+    CachedDocument,
+    DocumentCache,
+    clear_current_document_cache,
+    get_current_document_cache,
+    normalize_url,
+    set_current_document_cache,
+)
+
+
+def _document(size: int = 100, truncated: bool = False) -> CachedDocument:
+    return CachedDocument(
+        url="https://shop.com/", status_code=200,
+        headers={"Content-Type": "text/html"}, content=b"x" * size,
+        cookies={"_shopify_y": "abc"}, truncated=truncated
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DocumentCache(max_memory_bytes=10_000, max_disk_bytes=1_000_000,
+                          max_document_bytes=5_000, spill_dir=str(tmp_path))
+    yield cache
+    cache.close()
+
+
+class TestNormalizeUrl:
+    """Tests pour normalize_url."""
+
+    @pytest.mark.parametrize("url", [
+        "shop.com",
+        "https://shop.com",
+        "HTTPS://Shop.COM/",
+        "https://shop.com:443/",
+        "https://shop.com/#top",
+    ])
+    def test_equivalent_urls_share_key(self, url):
+        """Schema/hote en minuscules, port par defaut, fragment et chemin vide normalises."""
+        assert normalize_url(url) == "https://shop.com/"
+
+    def test_path_query_and_port_kept(self):
+        """Le chemin, la query et un port explicite font partie de la cle."""
+        assert normalize_url("http://Shop.com:8080/Fr?a=1") == "http://shop.com:8080/Fr?a=1"
+        assert normalize_url("http://shop.com") != normalize_url("https://shop.com")
+
+
+class TestDocumentCache:
+    """Tests pour DocumentCache."""
+
+    def test_put_then_get_by_normalized_url(self, cache):
+        """Un document stocke est servi pour toute URL equivalente."""
+        cache.put("https://shop.com", _document())
+
+        document = cache.get("SHOP.com/")
+
+        assert document.status_code == 200
+        assert document.cookies == {"_shopify_y": "abc"}
+        assert cache.get("https://other.com") is None
+        assert cache.get_stats()["hits"] == 1
+
+    def test_body_truncated_to_document_limit(self, cache):
+        """Le corps est coupe a max_document_bytes; le document ne sert que les lectures couvertes."""
+        cache.put("https://shop.com", _document(size=8_000))
+
+        assert cache.get("https://shop.com", max_bytes=2_000) is not None
+        assert cache.get("https://shop.com", max_bytes=5_000) is not None
+        assert cache.get("https://shop.com", max_bytes=6_000) is None
+        assert cache.get("https://shop.com") is None
+
+    def test_complete_document_serves_any_read(self, cache):
+        """Un document non tronque sert aussi les lectures completes."""
+        cache.put("https://shop.com", _document(size=1_000))
+
+        assert cache.get("https://shop.com") is not None
+        assert cache.get("https://shop.com", max_bytes=50_000) is not None
+
+    def test_spill_to_disk_over_memory_budget(self, cache, tmp_path):
+        """Au-dela du budget memoire, les plus anciens documents passent sur disque."""
+        for i in range(4):
+            cache.put(f"https://shop{i}.com", _document(size=4_000))
+
+        stats = cache.get_stats()
+        assert stats["memory_bytes"] <= 10_000
+        assert stats["spilled"] == 2
+
+        document = cache.get("https://shop0.com")
+        assert document.content == b"x" * 4_000
+        assert cache.get_stats()["disk_hits"] == 1
+
+        cache.close()
+        assert os.listdir(tmp_path) == []
+
+    def test_disk_budget_drops_oldest(self, tmp_path):
+        """Au-dela du budget disque, les fichiers les plus anciens sont oublies."""
+        cache = DocumentCache(max_memory_bytes=1_000, max_disk_bytes=1_500,
+                              max_document_bytes=5_000, spill_dir=str(tmp_path))
+        try:
+            for i in range(4):
+                cache.put(f"https://shop{i}.com", CachedDocument(
+                    url=f"https://shop{i}.com/", status_code=200, content=os.urandom(900)
+                ))
+
+            assert cache.get("https://shop0.com") is None
+            assert cache.get("https://shop2.com") is not None
+            assert cache.get_stats()["disk_bytes"] <= 1_500
+        finally:
+            cache.close()
+
+    def test_closed_cache_stores_nothing(self, cache):
+        """Apres close(), le cache ne stocke plus rien."""
+        cache.close()
+        cache.put("https://shop.com", _document())
+
+        assert cache.get("https://shop.com") is None
+
+
+class TestCurrentDocumentCache:
+    """Tests pour l'activation du cache d'une recherche."""
+
+    def test_concurrent_searches_keep_their_cache(self):
+        """Chaque recherche (thread) voit son cache, meme activees en meme temps."""
+        caches = [DocumentCache(), DocumentCache()]
+        ready = threading.Barrier(len(caches))
+        seen = {}
+
+        def search(index: int):
+            set_current_document_cache(caches[index])
+            ready.wait(timeout=5)  # Les deux caches sont actifs
+            seen[index] = get_current_document_cache()
+            ready.wait(timeout=5)
+            clear_current_document_cache(caches[index])
+            seen[f"{index}_cleared"] = get_current_document_cache()
+
+        threads = [threading.Thread(target=search, args=(i,)) for i in range(len(caches))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert seen[0] is caches[0] and seen[1] is caches[1]
+        assert seen["0_cleared"] is None and seen["1_cleared"] is None
+        assert get_current_document_cache() is None
+
+    def test_worker_threads_get_search_cache_via_context(self):
+        """Les threads de travail lances avec copy_context() voient le cache de la recherche."""
+        cache = DocumentCache()
+        set_current_document_cache(cache)
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                inherited = pool.submit(copy_context().run, get_current_document_cache).result()
+                plain = pool.submit(get_current_document_cache).result()
+        finally:
+            clear_current_document_cache(cache)
+
+        assert inherited is cache and plain is None
@@ -0,0 +1,147 @@
+"""
+Tests unitaires pour les empreintes de domaines partagees entre utilisateurs.
+
+Base sqlite en memoire (table domain_fingerprints seule), ecriture directe
+(write-behind desactive).
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.infrastructure.cache.fingerprint_store import DomainFingerprintStore, fingerprint_domain
+from src.infrastructure.persistence import write_behind as write_behind_module
+from src.infrastructure.persistence.models import DomainFingerprint
+from src.infrastructure.persistence.repositories.page_repository import (
+    bulk_save_domain_fingerprints, get_domain_fingerprints,
+)
+
+ANALYSIS = {
+    "cms": "Shopify", "theme": "Dawn", "payments": "Visa, PayPal",
+    "thematique": "Mode", "type_produits": "robes", "product_count": 120,
+    "currency_from_site": "EUR", "site_title": "Boutique", "site_description": "Robes",
+    "site_h1": "Nouveautes", "site_keywords": "robe",
+}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(write_behind_module, "WRITE_BEHIND_ENABLED", False)
+    engine = create_engine("sqlite://")
+    DomainFingerprint.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    class _Db:
+        @contextmanager
+        def get_session(self):
+            session = Session()
+            try:
+                yield session
+            finally:
+                session.close()
+
+    return _Db()
+
+
+class TestFingerprintDomain:
+    """Tests pour fingerprint_domain."""
+
+    @pytest.mark.parametrize("url", [
+        "shop.com",
+        "https://www.Shop.com/products/robe?utm_source=fb",
+        "HTTP://WWW.SHOP.COM#top",
+    ])
+    def test_urls_of_same_site_share_domain(self, url):
+        """Schema, www., chemin et query n'entrent pas dans la cle."""
+        assert fingerprint_domain(url) == "shop.com"
+
+    def test_empty_url(self):
+        assert fingerprint_domain("") == ""
+
+
+class TestDomainFingerprintStore:
+    """Tests pour DomainFingerprintStore."""
+
+    def test_observations_shared_across_searches(self, db):
+        """Une analyse faite par une recherche sert la recherche suivante (autre utilisateur)."""
+        first = DomainFingerprintStore(db)
+        first.record_analysis("https://www.shop.com/", ANALYSIS, "FR")
+        first.record_classification("https://shop.com", {"category": "Mode", "subcategory": "Robes", "confidence": 0.9})
+
+        second = DomainFingerprintStore(db)
+        result = second.get_web_result("shop.com/collections/robes", "FR")
+
+        assert second.get_cms("shop.com") == "Shopify"
+        assert result["product_count"] == 120 and result["currency_from_site"] == "EUR"
+        assert result["gemini_category"] == "Mode" and result["_skip_classification"]
+        assert second.get_stats()["analysis_hits"] == 1
+
+    def test_analysis_for_other_country_not_reused(self, db):
+        """Le nombre de produits depend du pays du sitemap."""
+        DomainFingerprintStore(db).record_analysis("shop.com", ANALYSIS, "FR")
+
+        assert DomainFingerprintStore(db).get_web_result("shop.com", "DE") is None
+
+    def test_expired_groups_ignored(self, db):
+        """Chaque groupe a sa fraicheur: un CMS ancien reste valide plus longtemps que l'analyse."""
+        old = (datetime.utcnow() - timedelta(days=3)).timestamp()
+        bulk_save_domain_fingerprints(db, [{"domain": "shop.com", "cms": "Shopify", "at": old},
+                                           {"domain": "shop.com", "product_count": 5,
+                                            "product_count_country": "FR", "at": old}])
+        store = DomainFingerprintStore(db, cms_ttl_days=30, analysis_ttl_days=1)
+
+        assert store.get_cms("shop.com") == "Shopify"
+        assert store.get_web_result("shop.com", "FR") is None
+
+    def test_classification_needs_refresh_separately(self, db):
+        """Analyse recente sans classification: le contenu est servi, la classification reste a faire."""
+        DomainFingerprintStore(db).record_analysis("shop.com", ANALYSIS, "FR")
+
+        result = DomainFingerprintStore(db).get_web_result("shop.com", "FR")
+
+        assert result["site_title"] == "Boutique"
+        assert "gemini_category" not in result and not result.get("_skip_classification")
+
+    def test_failed_detections_not_shared(self, db):
+        """CMS inconnu et analyse en erreur ne sont pas enregistres."""
+        store = DomainFingerprintStore(db)
+        store.record_cms("shop.com", "Unknown")
+        store.record_analysis("shop.com", {"cms": "ERROR", "product_count": 0}, "FR")
+
+        assert get_domain_fingerprints(db, ["shop.com"]) == {}
+
+    def test_only_site_observations_stored(self, db):
+        """La table ne contient aucun champ propre a un utilisateur."""
+        columns = {c.name for c in DomainFingerprint.__table__.columns}
+
+        assert not columns & {"user_id", "page_id", "page_name", "keywords", "etat", "nombre_ads_active"}
+
+    def test_disabled_store_never_reads_nor_writes(self, db):
+        store = DomainFingerprintStore(db, enabled=False)
+        store.record_cms("shop.com", "Shopify")
+
+        assert store.get_cms("shop.com") is None
+        assert get_domain_fingerprints(db, ["shop.com"]) == {}
+
+
+class TestDomainFingerprintRepository:
+    """Tests pour bulk_save_domain_fingerprints."""
+
+    def test_partial_records_merge_columns(self, db):
+        """Un enregistrement ne met a jour que ses colonnes et l'horodatage de leur groupe."""
+        bulk_save_domain_fingerprints(db, [{"domain": "shop.com", "cms": "Shopify", "at": 1_000_000}])
+        bulk_save_domain_fingerprints(db, [{"domain": "shop.com", "category": "Mode", "at": 2_000_000}])
+
+        row = get_domain_fingerprints(db, ["shop.com"])["shop.com"]
+
+        assert row["cms"] == "Shopify" and row["category"] == "Mode"
+        assert row["cms_checked_at"] < row["classified_at"]
+        assert row["analyzed_at"] is None
+
+    def test_long_values_truncated_to_column(self, db):
+        bulk_save_domain_fingerprints(db, [{"domain": "shop.com", "theme": "x" * 500}])
+
+        assert len(get_domain_fingerprints(db, ["shop.com"])["shop.com"]["theme"]) == 100
@@ -0,0 +1,161 @@
+"""
+Tests unitaires pour la lecture en flux du debut des pages (HeadScanner).
+
+Utilise un serveur HTTP local qui sert des pages de plusieurs Mo dont les
+signatures sont au debut.
+"""
+
+import pytest
+
+from src.infrastructure.http import revalidation as revalidation_module
+from src.infrastructure.scrapers import cms_detector, web_analyzer
+from src.infrastructure.scrapers.cms_signatures import (
+    CMS_HTML_LIMIT, CmsSignatureStream, scan_cms_signatures,
+)
+from src.infrastructure.scrapers.head_scanner import HeadScanner
+
+PADDING = b"<div>" + b"x" * 3 * 1024 * 1024 + b"</div>"
+
+SHOPIFY_HEAD = (
+    b'<html><head><link href="//cdn.shopify.com/s/files/theme.css">'
+    b'<script src="/cdn/shop/t/3/assets/global.js"></script>'
+    b'<script>window.Shopify = {}; Shopify.theme = {name: "Dawn", id: 3};'
+    b' Shopify.currency = {"active":"EUR","rate":"1.0"};</script></head>'
+    b'<body class="shopify-section" data-shopify="1">'
+)
+
+
+def _page(head: bytes) -> bytes:
+    return head + PADDING + b"</body></html>"
+
+
+class _Site:
+    """Serveur local: routes {path: (headers, body)}"""
+
+    def __init__(self, http_server):
+        self.routes = {}
+        self.server = http_server(self.handle)
+        self.url = self.server.url
+
+    def handle(self, handler):
+        headers, body = self.routes.get(handler.path, ({}, None))
+        if body is None:
+            self.server.send(handler, 404)
+        else:
+            self.server.send(handler, 200, body, headers)
+
+
+@pytest.fixture
+def site(http_server):
+    return _Site(http_server)
+
+
+@pytest.fixture(autouse=True)
+def engine(crawler_engine):
+    return crawler_engine(revalidation_module, cms_detector, web_analyzer)
+
+
+class TestCmsSignatureStream:
+    """Tests pour CmsSignatureStream."""
+
+    def test_chunks_find_same_signatures_as_one_pass(self):
+        html = SHOPIFY_HEAD.decode() + "<p>wp-content</p>"
+        stream = CmsSignatureStream()
+
+        for i in range(0, len(html), 7):
+            stream.feed(html[i:i + 7])
+
+        assert stream.evidence().evidence == scan_cms_signatures(html).evidence
+
+    def test_limit_applies_across_chunks(self):
+        stream = CmsSignatureStream(limit=10)
+        stream.feed("x" * 8)
+        stream.feed("wp-content")
+
+        assert stream.exhausted and not stream.found
+
+
+class TestHeadScanner:
+    """Tests pour HeadScanner (sans reseau)."""
+
+    def test_stops_when_cms_theme_and_currency_known(self):
+        scanner = HeadScanner(theme=True, currency=True)
+        scanner.start({})
+
+        assert scanner.feed(SHOPIFY_HEAD)
+        assert (scanner.theme, scanner.currency) == ("Dawn", "EUR")
+        assert scanner.evidence().decide()["cms"] == "Shopify"
+
+    def test_waits_for_missing_currency(self):
+        scanner = HeadScanner(currency=True)
+        scanner.start({})
+
+        assert not scanner.feed(SHOPIFY_HEAD.replace(b"Shopify.currency", b"Shopify.other"))
+        assert scanner.feed(b'<meta property="og:price:currency" content="USD">')
+        assert scanner.currency == "USD"
+
+    def test_theme_resolved_by_priority(self):
+        """Deux themes dans le head: meme choix que sur la page entiere (Shopify.theme)."""
+        head = SHOPIFY_HEAD.replace(b"Shopify.theme = {name: \"Dawn\", id: 3};", b"")
+        scanner = HeadScanner(theme=True)
+        scanner.start({})
+
+        assert not scanner.feed(b'<body data-theme="Ancien">' + head)
+        assert scanner.theme == "Ancien"
+        assert scanner.feed(b'<script>Shopify.theme = {name: "Dawn", id: 3};</script>')
+        assert scanner.theme == "Dawn"
+        assert web_analyzer._theme_shopify(scanner.text, "https://shop.com")[0] == "Dawn"
+
+    def test_uncertain_cms_read_up_to_budget(self):
+        """Preuves non Shopify: une signature Shopify plus loin changerait le resultat."""
+        scanner = HeadScanner(budget=1000)
+        scanner.start({})
+
+        assert not scanner.feed(b"<html>wp-content" + b" " * 500)
+        assert scanner.feed(b"x" * 600)
+        assert scanner.bytes_read == 1000
+
+    def test_split_utf8_and_declared_charset(self):
+        scanner = HeadScanner()
+        scanner.start({"Content-Type": "text/html; charset=iso-8859-1"})
+        scanner.feed("<p>été</p>".encode("latin-1"))
+
+        assert scanner.text == "<p>été</p>"
+
+        encoded = "<p>été</p>".encode()
+        scanner.start({})
+        scanner.feed(encoded[:4])
+        scanner.feed(encoded[4:])
+        assert scanner.text == "<p>été</p>"
+
+    def test_restart_resets_state(self):
+        scanner = HeadScanner(theme=True)
+        scanner.start({})
+        scanner.feed(SHOPIFY_HEAD)
+        scanner.start({})
+
+        assert scanner.theme is None and scanner.text == "" and scanner.bytes_read == 0
+
+
+class TestStreamedDetection:
+    """Les detecteurs n'examinent que le debut des pages."""
+
+    def test_shopify_page_read_stops_early(self, site, engine):
+        site.routes["/"] = ({"X-Shopify-Stage": "production"}, _page(SHOPIFY_HEAD))
+
+        result = cms_detector.detect_cms_from_url(site.url("/"))
+
+        assert result["cms"] == "Shopify" and result["confidence"] == 100
+        assert engine.get_stats()["bytes"] < 256 * 1024
+
+    def test_other_cms_read_up_to_signature_limit(self, site, engine):
+        site.routes["/"] = ({}, _page(b"<html><head><link href='/wp-content/x.css'></head><body>"))
+
+        assert web_analyzer.detect_cms_from_url(site.url("/")) == "WordPress"
+        assert engine.get_stats()["bytes"] <= CMS_HTML_LIMIT
+
+    def test_signature_beyond_budget_ignored(self, site):
+        """Comme l'ancienne lecture tronquee: seul le debut compte."""
+        site.routes["/"] = ({}, b"<html>" + PADDING + b"wp-content</html>")
+
+        assert web_analyzer.detect_cms_from_url(site.url("/")) == "Unknown"
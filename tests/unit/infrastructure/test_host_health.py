@@ -0,0 +1,263 @@
+"""
+Tests unitaires pour la sante des hotes et le budget de relances du moteur de crawl.
+
+Utilise un port ferme (connexion refusee) et un serveur HTTP local dont
+certaines routes ne repondent pas avant le timeout.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from src.infrastructure.http.crawler import _error_kind
+from src.infrastructure.http.host_health import (
+    CIRCUIT_OPEN, DEAD_HOST, HostHealth, RetryBudget,
+    clear_current_retry_budget, get_current_retry_budget, set_current_retry_budget,
+)
+from src.infrastructure.http.resilient_client import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    """Circuits bornes et non crees pour les services sans echec."""
+
+    def test_success_and_checks_do_not_track(self):
+        breaker = CircuitBreaker()
+
+        assert breaker.is_allowed("a")
+        breaker.record_success("a")
+
+        assert breaker.get_status() == {} and breaker.get_state("a") == "closed"
+
+    def test_max_circuits_evicts_closed_first(self):
+        breaker = CircuitBreaker(failure_threshold=1, max_circuits=2)
+        breaker.record_failure("open")
+        breaker.failure_threshold = 5
+        breaker.record_failure("closed")
+
+        breaker.record_failure("new")
+
+        assert set(breaker.get_status()) == {"open", "new"}
+
+
+class TestHostHealth:
+    """Tests pour HostHealth."""
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        health = HostHealth(failure_threshold=3)
+
+        for _ in range(2):
+            health.record("mort.fr", "timeout")
+        assert health.blocked("mort.fr") is None
+
+        health.record("mort.fr", "connection")
+        assert health.blocked("mort.fr") == CIRCUIT_OPEN
+        assert health.blocked("autre.fr") is None
+        assert health.get_stats()["opened"] == 1
+
+    def test_http_response_resets_failures(self):
+        health = HostHealth(failure_threshold=2)
+
+        health.record("lent.fr", "timeout")
+        health.record("lent.fr", None)
+        health.record("lent.fr", "timeout")
+
+        assert health.blocked("lent.fr") is None
+
+    @pytest.mark.parametrize("error,via_proxy", [("ssl", False), ("redirects", False), ("connection", True)])
+    def test_errors_not_imputed_to_host(self, error, via_proxy):
+        health = HostHealth(failure_threshold=1)
+
+        health.record("site.fr", error, via_proxy)
+
+        assert health.blocked("site.fr") is None
+
+    def test_proxied_timeout_counts(self):
+        health = HostHealth(failure_threshold=1)
+
+        health.record("site.fr", "timeout", via_proxy=True)
+
+        assert health.blocked("site.fr") == CIRCUIT_OPEN
+
+    def test_unknown_domain_dead_at_once(self):
+        health = HostHealth(failure_threshold=3)
+
+        health.record("inexistant.fr", "dns")
+
+        assert health.blocked("inexistant.fr") == DEAD_HOST
+
+    def test_failed_probe_marks_host_dead(self):
+        health = HostHealth(failure_threshold=1, recovery_timeout=0)
+        health.record("muet.fr", "timeout")
+        time.sleep(0.01)
+
+        assert health.blocked("muet.fr") is None  # Requete de test (semi-ouvert)
+        health.record("muet.fr", "timeout")
+
+        assert health.blocked("muet.fr") == DEAD_HOST
+
+    def test_dead_host_expires(self):
+        health = HostHealth(dead_ttl=0.05)
+        health.mark_dead("mort.fr")
+
+        time.sleep(0.1)
+
+        assert health.blocked("mort.fr") is None
+
+    def test_memory_bounded(self):
+        health = HostHealth(failure_threshold=5, max_hosts=10)
+
+        for i in range(100):
+            health.record(f"site{i}.fr", "timeout")
+            health.record(f"mort{i}.fr", "dns")
+
+        assert health.get_stats()["tracked"] <= 10
+
+
+class TestRetryBudget:
+    """Tests pour RetryBudget."""
+
+    def test_minimum_plus_ratio_of_requests(self):
+        budget = RetryBudget(minimum=2, ratio=0.5)
+
+        assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+        for _ in range(4):
+            budget.record_request()
+
+        assert budget.try_spend() and budget.try_spend() and not budget.try_spend()
+        assert budget.get_stats() == {"requests": 4, "retries": 4, "denied": 2}
+
+    def test_current_budget_scoping(self):
+        budget = RetryBudget()
+        set_current_retry_budget(budget)
+        try:
+            clear_current_retry_budget(RetryBudget())  # Budget d'une autre recherche
+            assert get_current_retry_budget() is budget
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                assert pool.submit(get_current_retry_budget).result() is None
+        finally:
+            clear_current_retry_budget(budget)
+
+        assert get_current_retry_budget() is None
+
+    def test_dns_error_kind(self):
+        key = SimpleNamespace(host="inexistant.fr", port=443, ssl=True)
+        unknown = socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        temporary = socket.gaierror(socket.EAI_AGAIN, "Temporary failure in name resolution")
+
+        assert _error_kind(aiohttp.ClientConnectorError(key, unknown)) == "dns"
+        assert _error_kind(aiohttp.ClientConnectorError(key, temporary)) == "connection"
+        assert _error_kind(asyncio.TimeoutError()) == "timeout"
+
+
+class _Site:
+    """Serveur local: /slow ne repond pas avant le timeout, /busy repond 503"""
+
+    def __init__(self, http_server):
+        self.hits = 0
+        self._lock = threading.Lock()
+        self.server = http_server(self.handle)
+        self.url = self.server.url
+
+    def handle(self, handler):
+        with self._lock:
+            self.hits += 1
+        if handler.path.startswith("/slow"):
+            time.sleep(1)
+        self.server.send(handler, 503 if handler.path == "/busy" else 200, b"ok")
+
+
+@pytest.fixture
+def site(http_server):
+    return _Site(http_server)
+
+
+@pytest.fixture
+def closed_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@pytest.fixture
+def engine(crawler_engine):
+    return crawler_engine(health=HostHealth(failure_threshold=2))
+
+
+class TestCrawlerIntegration:
+    """Le moteur ne relance plus les hotes injoignables."""
+
+    def test_open_circuit_skips_network(self, engine, closed_port):
+        url = f"http://127.0.0.1:{closed_port}/"
+        for _ in range(2):
+            assert engine.fetch(url).error == "connection"
+
+        response = engine.fetch(url)
+
+        assert response.error == CIRCUIT_OPEN and response.status_code == 0
+        assert engine.get_stats()["requests"] == 2 and engine.get_stats()["blocked"] == 1
+
+    def test_retries_stop_when_circuit_opens(self, engine, closed_port):
+        response = engine.fetch(f"http://127.0.0.1:{closed_port}/", retries=5)
+
+        assert response.error == "connection"
+        assert engine.get_stats()["requests"] == 2
+
+    def test_queued_requests_to_silent_host_released(self, engine, site):
+        """Requetes en attente d'un slot vers un hote muet: ignorees des que le circuit s'ouvre."""
+        start = time.time()
+
+        responses = engine.fetch_many([site.url(f"/slow{i}") for i in range(8)], timeout=0.3)
+
+        errors = [r.error for r in responses]
+        assert time.time() - start < 1.5  # Au lieu de 4 vagues de timeouts
+        # Le slot libere par le premier timeout peut partir avant l'ouverture
+        assert errors.count("timeout") <= 3
+        assert errors.count(CIRCUIT_OPEN) == 8 - errors.count("timeout")
+
+    def test_retry_budget_of_current_search(self, engine, site):
+        budget = RetryBudget(minimum=1, ratio=0)
+        set_current_retry_budget(budget)
+        try:
+            engine.fetch(site.url("/busy"), retries=3)
+        finally:
+            clear_current_retry_budget(budget)
+
+        assert site.hits == 2
+        assert budget.get_stats() == {"requests": 1, "retries": 1, "denied": 1}
+        assert engine.get_stats()["retries_denied"] == 1
+
+    def test_concurrent_searches_spend_their_own_budget(self, engine, site):
+        """Deux recherches simultanees (threads): chacune consomme son budget."""
+        budgets = [RetryBudget(minimum=1, ratio=0), RetryBudget(minimum=0, ratio=0)]
+        ready = threading.Barrier(len(budgets))
+
+        def search(budget: RetryBudget):
+            set_current_retry_budget(budget)
+            try:
+                ready.wait(timeout=5)
+                engine.fetch(site.url("/busy"), retries=3)
+            finally:
+                clear_current_retry_budget(budget)
+
+        threads = [threading.Thread(target=search, args=(budget,)) for budget in budgets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert budgets[0].get_stats() == {"requests": 1, "retries": 1, "denied": 1}
+        assert budgets[1].get_stats() == {"requests": 1, "retries": 0, "denied": 1}
+        assert site.hits == 3
+
+    def test_no_budget_outside_search(self, engine, site):
+        response = engine.fetch(site.url("/busy"), retries=2)
+
+        assert response.status_code == 503 and site.hits == 3
@@ -0,0 +1,152 @@
+"""
+Tests unitaires pour l'extraction HTML en un seul passage (html_features).
+
+Les resultats sont compares a ceux de BeautifulSoup (ancienne extraction).
+"""
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.infrastructure.external_services.gemini_classifier import (
+    extract_product_links,
+    extract_site_content_sync,
+)
+from src.infrastructure.scrapers import web_analyzer
+from src.infrastructure.scrapers.html_features import (
+    extract_html_features,
+    html_to_text,
+    is_product_link,
+)
+
+PAGE = """<!DOCTYPE html>
+<html><head>
+  <title> Boutique Mode </title>
+  <meta name="description" content=" Robes et accessoires ">
+  <meta name="keywords" content="robe, mode">
+  <meta name="description" content="seconde description">
+  <link rel="stylesheet" href="//cdn.shopify.com/s/files/1/t/4/assets/theme.css">
+  <script src="/cdn/shop/t/12/assets/global.js"></script>
+  <script>var Shopify = {}; Shopify.currency = {"active":"EUR","rate":"1.0"};</script>
+  <style>.menu { color: red }</style>
+</head><body>
+  <header class="top"><nav><a href="/collections/robes">Robes</a></nav>Livraison offerte</header>
+  <!-- commentaire -->
+  <h1>Nouvelle <span>collection</span></h1>
+  <ul class="menu main"><li><a href="/pages/contact">Contact</a></li></ul>
+  <a href="/products/robe-ete">Robe   d'ete</a>
+  <a href="https://ailleurs.com/products/x">Externe produit</a>
+  <a href="/pages/info">Prix 19,90 €</a>
+  <a href="/products/robe-ete">Robe d'ete</a>
+  <template><p>cache</p></template>
+  <noscript>Activez JavaScript</noscript>
+  <p>Paiement securise par Visa et PayPal &amp; plus</p>
+  <img src="/icons/apple-pay.svg" alt="">
+  <footer>Mentions <b>legales</b></footer>
+</body></html>"""
+
+
+class TestExtractHtmlFeatures:
+    """Tests pour extract_html_features."""
+
+    def test_text_matches_beautifulsoup(self):
+        soup = BeautifulSoup(PAGE, "lxml")
+
+        features = extract_html_features(PAGE, "https://boutique.fr/")
+
+        assert features.text == soup.get_text(" ", strip=True)
+        assert "commentaire" not in features.text and "cache" not in features.text
+
+    def test_head_fields(self):
+        features = extract_html_features(PAGE, "https://boutique.fr/")
+
+        assert features.title == "Boutique Mode"
+        assert features.description == "Robes et accessoires"
+        assert features.keywords == "robe, mode"
+        assert features.h1 == "Nouvellecollection"  # get_text(strip=True)
+
+    def test_nav_text_from_tags_and_classes(self):
+        features = extract_html_features(PAGE, "https://boutique.fr/")
+
+        assert features.nav_text == "Robes Livraison offerte Contact Mentions legales"
+
+    def test_product_links_internal_and_deduplicated(self):
+        features = extract_html_features(PAGE, "https://boutique.fr/")
+
+        assert features.product_links == ["Robes", "Robe d'ete", "Prix 19,90 €"]
+
+    def test_payments_theme_assets_and_currency(self):
+        features = extract_html_features(PAGE, "https://boutique.fr/", payment_terms=["Visa", "PayPal", "Apple Pay", "apple-pay", "Klarna"])
+
+        assert features.payments == ["PayPal", "Visa", "apple-pay"]
+        assert features.theme_assets == [
+            "//cdn.shopify.com/s/files/1/t/4/assets/theme.css",
+            "/cdn/shop/t/12/assets/global.js",
+        ]
+        assert features.currency == "EUR"
+
+    @pytest.mark.parametrize("html", [
+        "<html><head><title></title></head></html>",
+        "<html><title>a<b>b</b></title></html>",
+        "<title>Premier</title><title>Second</title>",
+        "<body><h1>a<h1>b</h1>c</h1><h1>d</h1></body>",
+    ])
+    def test_title_and_h1_like_beautifulsoup(self, html):
+        soup = BeautifulSoup(html, "lxml")
+        title = soup.find("title")
+        h1 = soup.find("h1")
+
+        features = extract_html_features(html)
+
+        assert features.title == (title.string.strip() if title and title.string else "")
+        assert features.h1 == (h1.get_text(strip=True) if h1 else "")
+
+    @pytest.mark.parametrize("html", ["", "   ", "\x00\x00", "<<<>>>"])
+    def test_unreadable_pages(self, html):
+        features = extract_html_features(html)
+
+        assert features.product_links == [] and features.title == ""
+
+
+class TestHtmlToText:
+    """Tests pour html_to_text."""
+
+    def test_encoding_declaration_in_string(self):
+        html = '<?xml version="1.0" encoding="iso-8859-1"?><html><body><p>Ete</p> <p>a   b</p></body></html>'
+
+        assert html_to_text(html) == BeautifulSoup(html, "lxml").get_text(" ", strip=True)
+
+    def test_is_product_link(self):
+        assert is_product_link("/products/a", "Robe", "shop.fr")
+        assert not is_product_link("https://autre.fr/products/a", "Robe", "shop.fr")
+        assert not is_product_link("/products/a", "ab", "shop.fr")
+
+
+class TestConsumers:
+    """Les appelants utilisent le meme passage."""
+
+    def test_detect_payments(self):
+        assert web_analyzer.detect_payments(PAGE, ["Visa", "Klarna"]) == ["Visa"]
+
+    def test_gemini_site_content(self):
+        content = extract_site_content_sync(PAGE, "p1", "https://boutique.fr/", "Boutique")
+
+        assert (content.title, content.h1) == ("Boutique Mode", "Nouvellecollection")
+        assert content.product_links == ["Robes", "Robe d'ete", "Prix 19,90 €"]
+        assert extract_product_links(PAGE, "https://boutique.fr/", max_links=1) == ["Robes"]
+
+    def test_homepage_analysis_reads_page_once(self, monkeypatch):
+        class Response:
+            url = "https://boutique.fr/"
+            text = PAGE
+            headers = {}
+
+        calls = []
+        original = web_analyzer.extract_html_features
+        monkeypatch.setattr(web_analyzer, "extract_html_features", lambda *a, **k: calls.append(1) or original(*a, **k))
+        monkeypatch.setattr(web_analyzer, "try_get", lambda url: None)
+
+        result = web_analyzer._analyze_homepage(Response())
+
+        assert len(calls) == 1
+        assert result["site_title"] == "Boutique Mode" and result["currency_from_site"] == "EUR"
+        assert result["theme"]
@@ -0,0 +1,209 @@
+"""
+Tests unitaires pour la revalidation HTTP (requetes conditionnelles, 304).
+
+Utilise un serveur HTTP local qui gere If-None-Match / If-Modified-Since.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.infrastructure.cache.document_cache import (
+    CachedDocument, DocumentCache, clear_current_document_cache, set_current_document_cache,
+)
+from src.infrastructure.http import revalidation as revalidation_module
+from src.infrastructure.http.revalidation import RevalidationCache
+from src.infrastructure.persistence.models import HttpValidator
+from src.infrastructure.persistence.repositories.cache_repository import (
+    bulk_save_http_validators, get_http_validator,
+)
+
+SITEMAP = b"<urlset><url><loc>https://shop.com/products/a</loc></url><url><loc>b</loc></url></urlset>"
+
+
+class _Site:
+    """Serveur local: /sitemap.xml (ETag), /dated.xml (Last-Modified), /plain.xml (sans validateur)"""
+
+    def __init__(self, http_server):
+        self.version = 1
+        self.requests = []
+        self.not_modified = 0
+        self.server = http_server(self.handle)
+        self.url = self.server.url
+
+    def handle(self, handler):
+        self.requests.append((handler.path, dict(handler.headers)))
+        etag = f'"v{self.version}"'
+        last_modified = f"Mon, 0{self.version} Jun 2026 10:00:00 GMT"
+        headers = {}
+        if handler.path == "/sitemap.xml":
+            headers["ETag"] = etag
+            fresh = handler.headers.get("If-None-Match") == etag
+        elif handler.path == "/dated.xml":
+            headers["Last-Modified"] = last_modified
+            fresh = handler.headers.get("If-Modified-Since") == last_modified
+        else:
+            fresh = False
+
+        if fresh:
+            self.not_modified += 1
+            self.server.send(handler, 304, headers=headers)
+        else:
+            self.server.send(handler, 200, SITEMAP * self.version, headers)
+
+
+class _Counter:
+    """Analyse factice: compte les <url> et les appels"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, response):
+        self.calls += 1
+        return response.text.count("<url>")
+
+
+@pytest.fixture
+def site(http_server):
+    return _Site(http_server)
+
+
+@pytest.fixture(autouse=True)
+def engine(crawler_engine):
+    return crawler_engine(revalidation_module)
+
+
+class TestRevalidationCache:
+    """Tests pour RevalidationCache."""
+
+    def test_not_modified_reuses_stored_result(self, site):
+        """Avec un ETag connu, la requete est conditionnelle et le 304 reutilise le resultat."""
+        cache, analyze = RevalidationCache(), _Counter()
+
+        first = cache.fetch(site.url("/sitemap.xml"), "count", analyze)
+        second = cache.fetch(site.url("/sitemap.xml"), "count", analyze)
+
+        assert (first.result, second.result) == (2, 2)
+        assert second.not_modified and second.response.status_code == 304
+        assert analyze.calls == 1
+        assert site.requests[1][1].get("If-None-Match") == '"v1"'
+        assert cache.get_stats()["not_modified"] == 1
+
+    def test_changed_document_is_reanalyzed(self, site):
+        """Un document modifie (nouvel ETag) est retelecharge et reanalyse."""
+        cache, analyze = RevalidationCache(), _Counter()
+        cache.fetch(site.url("/sitemap.xml"), "count", analyze)
+
+        site.version = 2
+        changed = cache.fetch(site.url("/sitemap.xml"), "count", analyze)
+        again = cache.fetch(site.url("/sitemap.xml"), "count", analyze)
+
+        assert changed.result == 4 and not changed.not_modified
+        assert again.not_modified and again.result == 4
+        assert analyze.calls == 2
+
+    def test_last_modified_validator(self, site):
+        """Last-Modified seul suffit (If-Modified-Since)."""
+        cache = RevalidationCache()
+        cache.fetch(site.url("/dated.xml"), "count", _Counter())
+        second = cache.fetch(site.url("/dated.xml"), "count", _Counter())
+
+        assert second.not_modified
+        assert site.requests[1][1].get("If-Modified-Since") == "Mon, 01 Jun 2026 10:00:00 GMT"
+
+    def test_response_without_validators_not_stored(self, site):
+        """Sans ETag ni Last-Modified, chaque appel telecharge le document."""
+        cache, analyze = RevalidationCache(), _Counter()
+        cache.fetch(site.url("/plain.xml"), "count", analyze)
+        cache.fetch(site.url("/plain.xml"), "count", analyze)
+
+        assert analyze.calls == 2
+        assert all("If-None-Match" not in headers for _, headers in site.requests)
+
+    def test_results_stored_per_analysis(self, site):
+        """Chaque analyse d'une meme URL a son propre resultat stocke."""
+        cache = RevalidationCache()
+        cache.fetch(site.url("/sitemap.xml"), "count", _Counter())
+
+        other = cache.fetch(site.url("/sitemap.xml"), "length", lambda r: len(r.content))
+
+        assert other.result == len(SITEMAP) and not other.not_modified
+
+    def test_document_cache_of_search_avoids_request(self, site):
+        """Un document deja telecharge pendant la recherche est analyse sans requete."""
+        documents = DocumentCache()
+        documents.put(site.url("/sitemap.xml"), CachedDocument(
+            url=site.url("/sitemap.xml"), status_code=200, headers={"ETag": '"v1"'}, content=SITEMAP
+        ))
+        set_current_document_cache(documents)
+        try:
+            page = RevalidationCache().fetch(site.url("/sitemap.xml"), "count", _Counter())
+        finally:
+            clear_current_document_cache(documents)
+            documents.close()
+
+        assert page.result == 2 and page.response.from_cache
+        assert site.requests == []
+
+
+    def test_conditional_full_response_kept_for_search(self, site):
+        """Version complete d'une requete conditionnelle: servie aux autres analyses de la recherche."""
+        cache = RevalidationCache()
+        cache.fetch(site.url("/sitemap.xml"), "count", _Counter())
+        site.version = 2
+        documents = DocumentCache()
+        set_current_document_cache(documents)
+        try:
+            changed = cache.fetch(site.url("/sitemap.xml"), "count", _Counter())
+            other = cache.fetch(site.url("/sitemap.xml"), "length", lambda r: len(r.content))
+        finally:
+            clear_current_document_cache(documents)
+            documents.close()
+
+        assert changed.result == 4 and not changed.not_modified
+        assert other.result == len(SITEMAP) * 2 and other.response.from_cache
+        assert len(site.requests) == 2
+
+class TestHttpValidatorRepository:
+    """Tests pour le stockage des validateurs (table http_validators)."""
+
+    @pytest.fixture
+    def db(self):
+        engine = create_engine("sqlite://")
+        HttpValidator.__table__.create(engine)
+        Session = sessionmaker(bind=engine)
+
+        class _Db:
+            @contextmanager
+            def get_session(self):
+                session = Session()
+                try:
+                    yield session
+                finally:
+                    session.close()
+
+        return _Db()
+
+    def test_save_then_load_and_touch(self, db):
+        """Une nouvelle version remplace validateurs et resultat; un 304 ne change que checked_at."""
+        bulk_save_http_validators(db, [
+            {"cache_key": "count:k", "kind": "count", "url": "https://shop.com/sitemap.xml",
+             "etag": '"v1"', "content_length": 10, "result": {"count": 2}, "at": 1_000_000},
+        ])
+        bulk_save_http_validators(db, [{"cache_key": "count:k", "at": 2_000_000}])
+
+        row = get_http_validator(db, "count:k")
+
+        assert row["etag"] == '"v1"' and row["result"] == {"count": 2}
+        assert row["changed_at"].timestamp() < row["checked_at"].timestamp()
+
+    def test_touch_in_same_batch_keeps_new_version(self, db):
+        """Dans un meme lot, une revalidation n'ecrase pas la nouvelle version."""
+        bulk_save_http_validators(db, [
+            {"cache_key": "count:k", "kind": "count", "url": "u", "etag": '"v2"', "result": 4, "at": 1},
+            {"cache_key": "count:k", "at": 2},
+        ])
+
+        assert get_http_validator(db, "count:k")["result"] == 4
@@ -0,0 +1,137 @@
+"""
+Tests unitaires pour le rate limiter adaptatif Meta.
+
+Teste le parsing des headers d'usage, l'AIMD et l'integration TokenRotator.
+"""
+
+import json
+
+from src.infrastructure.external_services.meta_api import TokenRotator
+from src.infrastructure.external_services.meta_rate_limiter import (
+    AdaptiveRateLimiter,
+    parse_meta_usage_headers,
+)
+
+
+def _buc_header(call_count=10, cputime=5, total_time=5, regain_minutes=0):
+    return json.dumps({
+        "123456": [{
+            "type": "ads_archive",
+            "call_count": call_count,
+            "total_cputime": cputime,
+            "total_time": total_time,
+            "estimated_time_to_regain_access": regain_minutes,
+        }]
+    })
+
+
+class TestParseMetaUsageHeaders:
+    """Tests pour parse_meta_usage_headers."""
+
+    def test_returns_max_usage_across_headers(self):
+        """L'usage retenu est le max de tous les compteurs."""
+        headers = {
+            "x-business-use-case-usage": _buc_header(call_count=12, cputime=40),
+            "x-app-usage": json.dumps({"call_count": 55, "total_cputime": 3, "total_time": 8}),
+        }
+
+        usage, regain = parse_meta_usage_headers(headers)
+
+        assert usage == 55
+        assert regain == 0
+
+    def test_regain_access_in_seconds(self):
+        """estimated_time_to_regain_access (minutes) est converti en secondes."""
+        headers = {"X-Business-Use-Case-Usage": _buc_header(call_count=100, regain_minutes=2)}
+
+        usage, regain = parse_meta_usage_headers(headers)
+
+        assert usage == 100
+        assert regain == 120
+
+    def test_missing_or_invalid_headers(self):
+        """Headers absents ou invalides: pas d'usage."""
+        assert parse_meta_usage_headers({}) == (None, 0.0)
+        assert parse_meta_usage_headers({"x-app-usage": "not json"}) == (None, 0.0)
+
+
+class TestAdaptiveRateLimiter:
+    """Tests pour AdaptiveRateLimiter."""
+
+    def test_additive_increase_below_target(self):
+        """Sous la cible, le debit augmente de increase_step."""
+        limiter = AdaptiveRateLimiter(rate=1.0, increase_step=0.5, target_usage=75)
+
+        limiter.update_from_headers({"x-app-usage": json.dumps({"call_count": 20})})
+
+        assert limiter.rate == 1.5
+        assert limiter.last_usage == 20
+
+    def test_multiplicative_decrease_above_target(self):
+        """Au-dessus de la cible, le debit est multiplie par decrease_factor."""
+        limiter = AdaptiveRateLimiter(rate=4.0, decrease_factor=0.5, target_usage=75)
+
+        limiter.update_from_headers({"x-app-usage": json.dumps({"call_count": 90})})
+
+        assert limiter.rate == 2.0
+
+    def test_rate_is_bounded(self):
+        """Le debit reste dans [min_rate, max_rate]."""
+        limiter = AdaptiveRateLimiter(rate=1.0, min_rate=0.5, max_rate=1.2, increase_step=1.0)
+
+        limiter.update_from_headers({})
+        assert limiter.rate == 1.2
+
+        for _ in range(10):
+            limiter.on_rate_limited()
+        assert limiter.rate == 0.5
+
+    def test_burst_then_paced(self):
+        """Le bucket autorise une rafale puis impose un delai."""
+        limiter = AdaptiveRateLimiter(rate=2.0, burst=2)
+
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == 0
+        assert 0.4 < limiter.reserve() <= 0.5
+
+    def test_regain_access_blocks_token(self):
+        """Un temps de retour d'acces bloque le token."""
+        limiter = AdaptiveRateLimiter(rate=5.0, burst=5)
+
+        limiter.update_from_headers({"x-business-use-case-usage": _buc_header(100, regain_minutes=1)})
+
+        assert limiter.reserve() > 59
+
+
+class TestTokenRotatorRateLimiters:
+    """Integration du rate limiter dans TokenRotator."""
+
+    def test_one_limiter_per_token(self):
+        """Chaque token a son propre limiter."""
+        rotator = TokenRotator(tokens=["token-aaaaaaaa", "token-bbbbbbbb"])
+
+        first = rotator.get_rate_limiter("token-aaaaaaaa")
+        second = rotator.get_rate_limiter("token-bbbbbbbb")
+
+        assert first is not None and second is not None
+        assert first is not second
+        assert rotator.get_rate_limiter() is first
+
+    def test_mark_rate_limited_slows_token(self):
+        """mark_rate_limited() ralentit le limiter du token courant."""
+        rotator = TokenRotator(tokens=["token-aaaaaaaa", "token-bbbbbbbb"])
+        limiter = rotator.get_rate_limiter()
+        initial_rate = limiter.rate
+
+        rotator.mark_rate_limited(cooldown_seconds=30)
+
+        assert limiter.rate < initial_rate
+        assert limiter.get_stats()["blocked_for"] > 0
+
+    def test_available_tokens_exclude_cooldown(self):
+        """get_available_token_data() ignore les tokens en cooldown."""
+        rotator = TokenRotator(tokens=["token-aaaaaaaa", "token-bbbbbbbb"])
+
+        rotator.mark_rate_limited(cooldown_seconds=30)
+
+        assert [t["token"] for t in rotator.get_available_token_data()] == ["token-bbbbbbbb"]
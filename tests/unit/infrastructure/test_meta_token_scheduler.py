@@ -0,0 +1,127 @@
+"""
+Tests unitaires pour l'ordonnanceur de tokens Meta.
+
+Teste le temps de completion attendu, la retrogradation des proxies lents
+et l'integration TokenRotator.
+"""
+
+import time
+
+from src.infrastructure.external_services.meta_api import TokenRotator
+from src.infrastructure.external_services.meta_rate_limiter import AdaptiveRateLimiter
+from src.infrastructure.external_services.meta_token_scheduler import TokenScheduler
+
+
+def _feed(scheduler, token, latency, count=5, success=True):
+    for _ in range(count):
+        scheduler.record(token, latency, success)
+
+
+class TestTokenScheduler:
+    """Tests pour TokenScheduler."""
+
+    def test_unknown_tokens_keep_input_order(self):
+        """Sans historique, le classement conserve l'ordre (round-robin)."""
+        scheduler = TokenScheduler(default_latency=1.0)
+
+        assert scheduler.rank(["b", "a", "c"]) == ["b", "a", "c"]
+
+    def test_faster_token_ranked_first(self):
+        """Le token le plus rapide passe devant."""
+        scheduler = TokenScheduler(min_samples=3)
+        _feed(scheduler, "slow", 2.0)
+        _feed(scheduler, "fast", 0.5)
+
+        assert scheduler.rank(["slow", "fast"]) == ["fast", "slow"]
+
+    def test_errors_and_in_flight_increase_expected_completion(self):
+        """Taux d'erreur et recherches en cours allongent le temps attendu."""
+        scheduler = TokenScheduler()
+        _feed(scheduler, "a", 1.0, count=4)
+        base = scheduler.expected_completion("a")
+
+        scheduler.record("a", 1.0, success=False)
+        with_errors = scheduler.expected_completion("a")
+        scheduler.begin("a")
+        with_queue = scheduler.expected_completion("a")
+        scheduler.end("a")
+
+        assert with_errors > base
+        assert with_queue > with_errors
+
+    def test_quota_usage_and_cooldown(self):
+        """Quota consomme et cooldown de rate limit penalisent le token."""
+        scheduler = TokenScheduler(default_latency=1.0)
+        limiter = AdaptiveRateLimiter(rate=1.0, burst=5)
+        free = scheduler.expected_completion("a", limiter)
+
+        limiter._last_usage = 80
+        assert scheduler.expected_completion("a", limiter) > free
+
+        now = time.time()
+        assert scheduler.expected_completion("a", cooldown_until=now + 30, now=now) >= 30
+
+    def test_slow_proxy_is_demoted(self):
+        """Un proxy nettement plus lent que les autres est classe en dernier."""
+        scheduler = TokenScheduler(min_samples=3, demote_factor=3.0)
+        _feed(scheduler, "fast", 0.2)
+        _feed(scheduler, "slow", 2.0)
+
+        assert scheduler.is_demoted("slow")
+        assert not scheduler.is_demoted("fast")
+        assert scheduler.rank(["slow", "fast"]) == ["fast", "slow"]
+
+    def test_demotion_expires(self):
+        """La retrogradation est levee sans appel recent du token."""
+        scheduler = TokenScheduler(min_samples=3, demote_factor=3.0, demote_seconds=60)
+        _feed(scheduler, "fast", 0.2)
+        _feed(scheduler, "slow", 2.0)
+        scheduler._windows["slow"].last_call = time.time() - 120
+
+        assert not scheduler.is_demoted("slow")
+
+
+class TestTokenRotatorScheduling:
+    """Tests pour l'ordonnancement dans TokenRotator."""
+
+    def _rotator(self):
+        return TokenRotator(tokens_with_proxies=[
+            {"token": "token_aaaaaaaa", "proxy": "http://p1", "name": "A"},
+            {"token": "token_bbbbbbbb", "proxy": "http://p2", "name": "B"},
+            {"token": "token_cccccccc", "proxy": "http://p3", "name": "C"},
+        ])
+
+    def test_rotation_picks_best_expected_completion(self):
+        """rotate_to_next choisit le token le plus rapide (hors token courant)."""
+        rotator = self._rotator()
+        for _ in range(5):
+            rotator.record_latency("token_bbbbbbbb", 3000)
+            rotator.record_latency("token_cccccccc", 200)
+
+        assert rotator.rotate_to_next()
+        assert rotator.get_current_token() == "token_cccccccc"
+
+    def test_rotation_skips_rate_limited(self):
+        """Un token en cooldown n'est jamais choisi."""
+        rotator = self._rotator()
+        for _ in range(5):
+            rotator.record_latency("token_bbbbbbbb", 200)
+            rotator.record_latency("token_cccccccc", 3000)
+        rotator._rate_limited["token_bbbbbbbb"] = time.time() + 60
+
+        assert rotator.rotate_to_next()
+        assert rotator.get_current_token() == "token_cccccccc"
+
+    def test_rank_token_data_and_stats(self):
+        """rank_token_data classe les tokens; get_token_info expose les stats."""
+        rotator = self._rotator()
+        for _ in range(5):
+            rotator.record_latency("token_aaaaaaaa", 2500, success=False)
+            rotator.record_latency("token_bbbbbbbb", 300)
+
+        ranked = rotator.rank_token_data()
+        info = rotator.get_token_info()
+
+        assert ranked[0]["token"] == "token_bbbbbbbb"
+        assert ranked[-1]["token"] == "token_aaaaaaaa"
+        assert info["scheduler"][rotator._mask_token("token_aaaaaaaa")]["error_rate"] == 1.0
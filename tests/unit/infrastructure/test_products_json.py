@@ -0,0 +1,141 @@
+"""
+Tests unitaires pour le comptage Shopify par /products.json (ProductsJsonCounter).
+"""
+
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.infrastructure.scrapers import market_spy, products_json, web_analyzer
+from src.infrastructure.scrapers.market_spy import MarketSpy
+from src.infrastructure.scrapers.products_json import PAGE_SIZE, ProductsJsonCounter
+
+
+class _Catalog:
+    """Pages /products.json d'une boutique de total produits (fetch factice)"""
+
+    def __init__(self, total: int, failing=(), delay: float = 0):
+        self.total = total
+        self.failing = set(failing)
+        self.delay = delay
+        self.pages = []
+        self.active = self.max_active = 0
+        self._lock = threading.Lock()
+
+    def products(self, page: int) -> int:
+        return max(0, min(PAGE_SIZE, self.total - (page - 1) * PAGE_SIZE))
+
+    def __call__(self, url: str):
+        page = int(parse_qs(urlparse(url).query)["page"][0])
+        with self._lock:
+            self.pages.append(page)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if page in self.failing:
+            return None
+        return self.products(page)
+
+
+class TestProductsJsonCounter:
+    """Tests pour ProductsJsonCounter."""
+
+    @pytest.mark.parametrize("total", [0, 1, 249, 250, 251, 500, 2499, 2500, 12345, 24750, 24999])
+    def test_exact_count(self, total):
+        counted = ProductsJsonCounter(_Catalog(total)).count("https://shop.com")
+
+        assert counted.count == total and counted.complete
+
+    def test_small_store_single_request(self):
+        catalog = _Catalog(42)
+
+        counted = ProductsJsonCounter(catalog).count("https://shop.com")
+
+        assert catalog.pages == [1] and counted.requests == 1
+
+    def test_large_store_logarithmic_requests(self):
+        """~50 pages: bien moins de requetes que de pages, sondes simultanees."""
+        catalog = _Catalog(12345, delay=0.02)
+
+        counted = ProductsJsonCounter(catalog, workers=4).count("https://shop.com")
+
+        assert counted.count == 12345
+        assert counted.requests <= 20 < 50
+        assert catalog.max_active > 1
+        assert len(set(catalog.pages)) == len(catalog.pages)
+
+    def test_capped_at_max_pages(self):
+        counted = ProductsJsonCounter(_Catalog(10_000), max_pages=10).count("https://shop.com")
+
+        assert counted.count == 2500 and not counted.complete
+
+    def test_first_page_error(self):
+        counted = ProductsJsonCounter(_Catalog(1000, failing={1})).count("https://shop.com")
+
+        assert counted.count is None and counted.error == "API not available"
+
+    def test_exception_message_reported(self):
+        def fetch(url):
+            raise ValueError("JSON parse error")
+
+        assert ProductsJsonCounter(fetch).count("https://shop.com").error == "JSON parse error"
+
+    def test_later_page_error_counts_pages_before(self):
+        """Comme l'ancienne boucle: une page en erreur termine le comptage."""
+        counted = ProductsJsonCounter(_Catalog(5000, failing={2})).count("https://shop.com")
+
+        assert counted.count == 250 and not counted.complete
+
+    def test_field_minimised_url(self):
+        catalog = _Catalog(10)
+        urls = []
+
+        ProductsJsonCounter(lambda url: urls.append(url) or catalog(url)).count("https://shop.com/")
+
+        assert urls == ["https://shop.com/products.json?limit=250&page=1&fields=id"]
+
+
+class _Shop:
+    """Serveur local: /products.json pagine"""
+
+    def __init__(self, http_server, total: int):
+        self.total = total
+        self.server = http_server(self.handle)
+        self.origin = self.server.origin
+
+    def handle(self, handler):
+        query = parse_qs(urlparse(handler.path).query)
+        page = int(query.get("page", ["1"])[0])
+        count = max(0, min(PAGE_SIZE, self.total - (page - 1) * PAGE_SIZE))
+        body = json.dumps({"products": [{"id": i} for i in range(count)]}).encode()
+        self.server.send(handler, 200, body, {"Content-Type": "application/json"})
+
+
+@pytest.fixture
+def shop(http_server):
+    return _Shop(http_server, total=3210)
+
+
+@pytest.fixture
+def engine(crawler_engine):
+    return crawler_engine(products_json, market_spy)
+
+
+class TestConsumers:
+    """web_analyzer et MarketSpy utilisent le meme compteur."""
+
+    def test_web_analyzer_api_count(self, shop, engine):
+        assert web_analyzer._count_products_via_api(shop.origin) == 3210
+
+    def test_market_spy_products_json(self, shop, engine):
+        spy = MarketSpy()
+
+        result = spy.count_shopify_products_json(shop.origin)
+        spy.close()
+
+        assert result == {"product_count": 3210, "error": None}
@@ -0,0 +1,113 @@
+"""
+Tests unitaires pour le canal de progression des recherches en arriere-plan.
+"""
+
+import time
+
+from src.infrastructure.monitoring.progress_channel import ProgressChannel
+
+
+class _Recorder:
+    """Writer factice: memorise chaque ecriture."""
+
+    def __init__(self):
+        self.writes = []
+
+    def __call__(self, db, search_id, fields):
+        self.writes.append((search_id, dict(fields)))
+
+
+class TestProgressChannel:
+    """Tests pour ProgressChannel."""
+
+    def test_steps_are_coalesced_into_one_write(self):
+        """Les etapes successives sont fusionnees en une seule ecriture."""
+        writer = _Recorder()
+        channel = ProgressChannel(writer, flush_interval_ms=60_000)
+        for i in range(50):
+            channel.publish(None, 1, phase=1, percent=i, message=f"Mot-cle {i}/50")
+
+        assert writer.writes == []
+        assert channel.get_state(1)["percent"] == 49
+
+        assert channel.flush() == 1
+        assert writer.writes == [(1, {"phase": 1, "percent": 49, "message": "Mot-cle 49/50"})]
+        channel.close()
+
+    def test_force_writes_immediately(self):
+        """force=True (debut/fin de phase) ecrit sans attendre l'intervalle."""
+        writer = _Recorder()
+        channel = ProgressChannel(writer, flush_interval_ms=60_000)
+        channel.publish(None, 1, percent=5, message="etape")
+        channel.publish(None, 1, force=True, phase=2, phase_name="Regroupement")
+
+        assert writer.writes == [
+            (1, {"percent": 5, "message": "etape", "phase": 2, "phase_name": "Regroupement"})
+        ]
+        channel.close()
+
+    def test_background_thread_flushes(self):
+        """Le thread de fond ecrit la progression apres l'intervalle."""
+        writer = _Recorder()
+        channel = ProgressChannel(writer, flush_interval_ms=50)
+        channel.publish(None, 7, percent=10)
+
+        deadline = time.time() + 2
+        while not writer.writes and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert writer.writes == [(7, {"percent": 10})]
+        channel.close()
+
+    def test_subscribers_notified_and_versions_increase(self):
+        """Chaque publication notifie les abonnes et incremente la version."""
+        channel = ProgressChannel(_Recorder(), flush_interval_ms=60_000)
+        calls = []
+        unsubscribe = channel.subscribe(3, lambda: calls.append(1))
+
+        first = channel.publish(None, 3, percent=1)
+        second = channel.publish(None, 3, percent=2)
+        unsubscribe()
+        channel.publish(None, 3, percent=3)
+
+        assert (first, second) == (1, 2)
+        assert len(calls) == 2
+        assert channel.get_stats()["subscribers"] == 0
+        channel.close()
+
+    def test_finish_flushes_and_keeps_final_state(self):
+        """finish() ecrit la progression en attente et expose le statut final."""
+        writer = _Recorder()
+        channel = ProgressChannel(writer, flush_interval_ms=60_000)
+        channel.publish(None, 4, percent=90)
+
+        channel.finish(4, "completed", percent=100)
+
+        assert writer.writes == [(4, {"percent": 90})]
+        state = channel.get_state(4)
+        assert state["status"] == "completed"
+        assert state["percent"] == 100
+        channel.close()
+
+    def test_finished_searches_are_purged_after_retention(self):
+        """L'etat final est oublie apres la retention."""
+        channel = ProgressChannel(_Recorder(), retention_seconds=0)
+        channel.finish(5, "failed")
+        time.sleep(0.01)
+        channel.finish(6, "completed")
+
+        assert channel.get_state(5) is None
+        channel.close()
+
+    def test_failed_write_is_counted(self):
+        """Une ecriture en echec est comptee, sans lever."""
+        def failing(db, search_id, fields):
+            raise RuntimeError("db down")
+
+        channel = ProgressChannel(failing, flush_interval_ms=60_000)
+        channel.publish(None, 1, percent=1)
+
+        assert channel.flush() == 0
+        assert channel.get_stats()["failed"] == 1
+        channel.close()
+
@@ -0,0 +1,52 @@
+"""
+Tests unitaires pour la persistance des checkpoints de recherche.
+"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src.infrastructure.persistence.repositories.search_repository import (
+    clear_search_checkpoint,
+    get_search_checkpoint,
+    save_search_checkpoint,
+)
+
+
+def _db_with(search):
+    """DatabaseManager factice dont la session retourne `search`."""
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = search
+
+    @contextmanager
+    def get_session():
+        yield session
+
+    db = MagicMock()
+    db.get_session = get_session
+    return db
+
+
+class TestSearchCheckpointRepository:
+    """Tests pour save/get/clear_search_checkpoint."""
+
+    def test_roundtrip_is_compressed(self):
+        """Le checkpoint est relu a l'identique et stocke compresse."""
+        search = SimpleNamespace(checkpoint_data=None, updated_at=None)
+        db = _db_with(search)
+        state = {"phase": 2, "cursors": {"bijoux": "QVFIUm"}, "ads": [{"id": "1"}] * 500}
+
+        assert save_search_checkpoint(db, 1, state) is True
+
+        assert len(search.checkpoint_data) < 500
+        assert get_search_checkpoint(db, 1) == state
+
+    def test_missing_or_cleared_checkpoint(self):
+        """Sans checkpoint (ou apres clear), get retourne None."""
+        search = SimpleNamespace(checkpoint_data="corrompu", updated_at=None)
+        db = _db_with(search)
+
+        assert get_search_checkpoint(db, 1) is None
+        assert clear_search_checkpoint(db, 1) is True
+        assert search.checkpoint_data is None
+        assert get_search_checkpoint(_db_with(None), 1) is None
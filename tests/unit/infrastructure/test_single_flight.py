@@ -0,0 +1,205 @@
+"""
+Tests unitaires pour la coalescence des recherches Meta identiques.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.infrastructure.cache.single_flight import SingleFlight
+from src.infrastructure.external_services import meta_api
+
+
+class TestSingleFlight:
+    """Tests pour SingleFlight."""
+
+    def test_concurrent_callers_share_one_execution(self):
+        """Les appels concurrents d'une meme cle n'executent fn qu'une fois."""
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def fn():
+            calls.append(1)
+            started.set()
+            release.wait(2)
+            return ["ad"]
+
+        results = []
+
+        def caller():
+            results.append(flight.do("search_ads:abc", fn))
+
+        leader = threading.Thread(target=caller)
+        leader.start()
+        started.wait(2)
+        followers = [threading.Thread(target=caller) for _ in range(3)]
+        for t in followers:
+            t.start()
+        while flight.get_stats()["coalesced"] < 3:
+            time.sleep(0.01)
+        release.set()
+        for t in [leader, *followers]:
+            t.join(2)
+
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False, True, True, True]
+        assert all(result == ["ad"] for result, _ in results)
+        assert flight.in_flight("search_ads:abc") is False
+
+    def test_error_propagated_and_key_released(self):
+        """L'exception du leader est levee et la cle liberee."""
+        flight = SingleFlight()
+
+        with pytest.raises(RuntimeError):
+            flight.do("k", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+
+        assert flight.do("k", lambda: 1) == (1, False)
+
+
+class TestCachedSearchAdsCoalescing:
+    """Coalescence inter-process par bail en BDD dans cached_search_ads."""
+
+    def _patch_db(self, monkeypatch, lease_holder=None, cache_after_wait=None):
+        from src.infrastructure.persistence import database
+
+        state = {"cache": None, "polls": 0, "released": []}
+
+        def get_cached_response(db, key):
+            if state["cache"] is None and cache_after_wait is not None and state["polls"]:
+                state["cache"] = cache_after_wait
+            state["polls"] += 1
+            return state["cache"]
+
+        monkeypatch.setattr(database, "get_cached_response", get_cached_response)
+        monkeypatch.setattr(database, "set_cached_response",
+                            lambda db, key, kind, data, ttl_hours=6: state.update(cache=data))
+        monkeypatch.setattr(database, "acquire_cache_lease",
+                            lambda db, key, owner, ttl_seconds=300: lease_holder is None)
+        monkeypatch.setattr(database, "release_cache_lease",
+                            lambda db, key, owner: state["released"].append(key))
+        monkeypatch.setattr(database, "is_cache_lease_active", lambda db, key: True)
+        monkeypatch.setattr("src.infrastructure.config.META_COALESCE_POLL_INTERVAL", 0)
+        return state
+
+    def test_leader_calls_api_and_releases_lease(self, monkeypatch):
+        """Le detenteur du bail appelle l'API, remplit le cache et libere le bail."""
+        state = self._patch_db(monkeypatch)
+        client = type("Client", (), {"search_ads": lambda self, *a: [{"id": "1"}]})()
+
+        ads, from_cache = meta_api.cached_search_ads(client, "Bijoux", ["FR"], ["fr"], db=object())
+
+        assert ads == [{"id": "1"}]
+        assert from_cache is False
+        assert state["cache"] == [{"id": "1"}]
+        assert len(state["released"]) == 1
+
+    def test_follower_waits_for_other_process(self, monkeypatch):
+        """Sans le bail, on attend le resultat du leader sans appeler l'API."""
+        self._patch_db(monkeypatch, lease_holder="other", cache_after_wait=[{"id": "2"}])
+
+        def search_ads(self, *args):
+            raise AssertionError("l'API ne doit pas etre appelee")
+
+        client = type("Client", (), {"search_ads": search_ads})()
+
+        ads, from_cache = meta_api.cached_search_ads(client, "bijoux", ["FR"], ["fr"], db=object())
+
+        assert ads == [{"id": "2"}]
+        assert from_cache is True
+
+    def test_empty_result_not_cached(self, monkeypatch):
+        """Un resultat vide (aucune annonce ou erreur API) n'est pas mis en cache."""
+        state = self._patch_db(monkeypatch)
+        results = [[], [{"id": "1"}]]
+        client = type("Client", (), {"search_ads": lambda self, *a: results.pop(0)})()
+
+        first = meta_api.cached_search_ads(client, "bijoux", ["FR"], ["fr"], db=object())
+        second = meta_api.cached_search_ads(client, "bijoux", ["FR"], ["fr"], db=object())
+
+        assert first == ([], False)
+        assert second == ([{"id": "1"}], False)
+        assert len(state["released"]) == 2
+
+    def test_lease_error_falls_back_to_direct_call(self, monkeypatch):
+        """BDD indisponible pour le bail: appel direct de l'API."""
+        from src.infrastructure.persistence import database
+
+        self._patch_db(monkeypatch)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("db down")
+
+        monkeypatch.setattr(database, "acquire_cache_lease", fail)
+        client = type("Client", (), {"search_ads": lambda self, *a: [{"id": "1"}]})()
+
+        ads, from_cache = meta_api.cached_search_ads(client, "bijoux", ["FR"], ["fr"], db=object())
+
+        assert ads == [{"id": "1"}] and from_cache is False
+
+    def test_release_error_keeps_result(self, monkeypatch):
+        """Une erreur a la liberation du bail ne perd pas le resultat de l'appel API."""
+        from src.infrastructure.persistence import database
+
+        self._patch_db(monkeypatch)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("db down")
+
+        monkeypatch.setattr(database, "release_cache_lease", fail)
+        client = type("Client", (), {"search_ads": lambda self, *a: [{"id": "1"}]})()
+
+        ads, from_cache = meta_api.cached_search_ads(client, "bijoux", ["FR"], ["fr"], db=object())
+
+        assert ads == [{"id": "1"}] and from_cache is False
+
+    def test_cache_write_error_not_retried_by_followers(self, monkeypatch):
+        """Une erreur d'ecriture du cache ne relance pas la recherche."""
+        self._patch_db(monkeypatch)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("db down")
+
+        monkeypatch.setattr("src.infrastructure.persistence.database.set_cached_response", fail)
+        calls = []
+        client = type("Client", (), {"search_ads": lambda self, *a: calls.append(1) or [{"id": "1"}]})()
+
+        ads, from_cache = meta_api.cached_search_ads(client, "bijoux", ["FR"], ["fr"], db=object())
+
+        assert ads == [{"id": "1"}] and from_cache is False
+        assert calls == [1]
+
+    def test_leader_error_shared_without_direct_calls(self, monkeypatch):
+        """L'erreur du leader est partagee: aucun follower n'appelle Meta."""
+        self._patch_db(monkeypatch)
+        calls = []
+        started = threading.Event()
+
+        def search_ads(self, *args):
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError("Meta indisponible")
+
+        client = type("Client", (), {"search_ads": search_ads})()
+        errors = []
+
+        def caller():
+            try:
+                meta_api.cached_search_ads(client, "bijoux", ["FR"], ["fr"], db=object())
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        leader = threading.Thread(target=caller)
+        leader.start()
+        started.wait(2)
+        followers = [threading.Thread(target=caller) for _ in range(3)]
+        for t in followers:
+            t.start()
+        for t in [leader, *followers]:
+            t.join(5)
+
+        assert calls == [1]
+        assert errors == ["Meta indisponible"] * 4
@@ -0,0 +1,232 @@
+"""
+Tests unitaires pour le comptage des sitemaps en flux (SitemapEngine).
+
+Utilise un serveur HTTP local qui sert un sitemap index et des sitemaps
+produits (XML ou .xml.gz, avec ou sans ETag).
+"""
+
+import gzip
+
+import pytest
+
+from src.infrastructure.http import revalidation as revalidation_module
+from src.infrastructure.scrapers import web_analyzer
+from src.infrastructure.scrapers.market_spy import HttpClient, SitemapAnalyzer
+from src.infrastructure.scrapers.sitemap_engine import (
+    SitemapEngine, SitemapUrlCounter, select_product_sitemaps,
+)
+
+
+def _sitemap(count: int, start: int = 0) -> bytes:
+    urls = "".join(
+        f"<url><loc>https://shop.com/products/robe-{i}</loc>"
+        f"<image:image><image:title>Robe {i}</image:title></image:image></url>"
+        for i in range(start, start + count)
+    )
+    return f'<?xml version="1.0"?><urlset>{urls}</urlset>'.encode()
+
+
+def _index(*paths: str) -> bytes:
+    locs = "".join(f"<sitemap><loc>{{origin}}{path}</loc></sitemap>" for path in paths)
+    return f"<sitemapindex>{locs}</sitemapindex>".encode()
+
+
+class _Site:
+    """Serveur local: routes {path: body}, ETag sur les chemins de etags"""
+
+    def __init__(self, http_server):
+        self.routes = {}
+        self.etags = set()
+        self.requests = []
+        self.server = http_server(self.handle)
+        self.origin = self.server.origin
+
+    def route(self, path: str, body: bytes, etag: bool = False):
+        self.routes[path] = body.replace(b"{origin}", self.origin.encode())
+        if etag:
+            self.etags.add(path)
+
+    def handle(self, handler):
+        self.requests.append(handler.path)
+        body = self.routes.get(handler.path)
+        if body is None:
+            self.server.send(handler, 404)
+            return
+
+        etag = f'"{len(body)}"'
+        headers = {"ETag": etag} if handler.path in self.etags else {}
+        if headers and handler.headers.get("If-None-Match") == etag:
+            self.server.send(handler, 304, headers=headers)
+        else:
+            self.server.send(handler, 200, body, headers)
+
+
+@pytest.fixture
+def site(http_server):
+    return _Site(http_server)
+
+
+@pytest.fixture(autouse=True)
+def engine(crawler_engine):
+    return crawler_engine(revalidation_module)
+
+
+class TestSitemapUrlCounter:
+    """Tests pour SitemapUrlCounter."""
+
+    def test_tags_split_across_chunks_counted_once(self):
+        body = _sitemap(50)
+        counter = SitemapUrlCounter(head_bytes=64)
+        counter.start()
+
+        for i in range(0, len(body), 3):
+            counter.feed(body[i:i + 3])
+
+        assert counter.count == 50
+        assert counter.head == body[:64].decode()
+
+    def test_gzip_body_decompressed_while_counting(self):
+        body = gzip.compress(_sitemap(500))
+        counter = SitemapUrlCounter()
+        counter.start()
+
+        for i in range(0, len(body), 1000):
+            counter.feed(body[i:i + 1000])
+
+        assert counter.count == 500
+        assert counter.bytes_read == len(body) and counter.xml_bytes == len(_sitemap(500))
+
+    def test_xml_size_limit_stops_reading(self):
+        counter = SitemapUrlCounter(max_bytes=1000)
+        counter.start()
+
+        assert counter.feed(_sitemap(100))
+        assert counter.stopped
+
+    def test_restart_resets_count(self):
+        """Relance du moteur: le comptage repart de zero."""
+        counter = SitemapUrlCounter()
+        counter.start()
+        counter.feed(_sitemap(10))
+        counter.start()
+        counter.feed(_sitemap(3))
+
+        assert counter.count == 3
+
+
+class TestSelectProductSitemaps:
+    """Tests pour select_product_sitemaps."""
+
+    LOCS = [
+        "https://shop.com/sitemap_products_1.xml?from=1&to=99",
+        "https://shop.com/en/sitemap_products_1.xml",
+        "https://shop.com/fr/sitemap_products_1.xml",
+        "https://shop.com/sitemap_pages_1.xml",
+    ]
+
+    def test_country_sitemaps_first(self):
+        assert select_product_sitemaps(self.LOCS, "FR") == ["https://shop.com/fr/sitemap_products_1.xml"]
+
+    def test_root_sitemaps_when_no_country(self):
+        """Sans sitemap du pays: version par defaut, jamais les autres langues."""
+        assert select_product_sitemaps(self.LOCS, "DE") == ["https://shop.com/sitemap_products_1.xml?from=1&to=99"]
+
+    def test_products_sitemap_naming(self):
+        assert select_product_sitemaps(["https://shop.com/products-sitemap.xml"]) == [
+            "https://shop.com/products-sitemap.xml"
+        ]
+
+
+class TestStreamedFetch:
+    """Le corps passe au consommateur n'est pas conserve."""
+
+    def test_sink_receives_body_not_materialized(self, site, engine):
+        site.route("/sitemap_products_1.xml", _sitemap(2000))
+        counter = SitemapUrlCounter()
+
+        response = engine.fetch(f"{site.origin}/sitemap_products_1.xml", sink=counter, max_bytes=0)
+
+        assert response.ok and response.content == b""
+        assert counter.count == 2000
+
+    def test_sink_stop_ends_download(self, site, engine):
+        body = _sitemap(20000)
+        site.route("/sitemap_products_1.xml", body)
+        counter = SitemapUrlCounter(max_bytes=100_000)
+
+        response = engine.fetch(f"{site.origin}/sitemap_products_1.xml", sink=counter, max_bytes=0)
+
+        assert response.truncated
+        assert counter.bytes_read < len(body) // 4
+
+
+class TestSitemapEngine:
+    """Tests pour SitemapEngine."""
+
+    def test_shards_counted_in_parallel_gzip_included(self, site):
+        site.route("/sitemap.xml", _index("/sitemap_products_1.xml", "/sitemap_products_2.xml.gz"))
+        site.route("/sitemap_products_1.xml", _sitemap(300))
+        site.route("/sitemap_products_2.xml.gz", gzip.compress(_sitemap(200, start=300)))
+        sitemap_engine = SitemapEngine(limit=0)
+
+        sitemaps = sitemap_engine.product_sitemaps(site.origin, "FR")
+        counted = sitemap_engine.count(sitemaps)
+
+        assert len(sitemaps) == 2
+        assert counted.count == 500 and counted.complete and counted.sitemaps == 2
+
+    def test_limit_stops_all_shards_early(self, site):
+        paths = [f"/sitemap_products_{i}.xml" for i in range(4)]
+        for path in paths:
+            site.route(path, _sitemap(20000))
+
+        counted = SitemapEngine(limit=1000).count([site.origin + path for path in paths])
+
+        assert 1000 <= counted.count < 20000
+        assert not counted.complete
+        assert counted.bytes_downloaded < len(_sitemap(20000))
+
+    def test_unchanged_sitemap_not_downloaded_again(self, site):
+        """Sitemap revalide (ETag): le comptage stocke est reutilise sur 304."""
+        site.route("/sitemap_products_1.xml", _sitemap(120), etag=True)
+        url = f"{site.origin}/sitemap_products_1.xml"
+
+        first = SitemapEngine().count([url])
+        second = SitemapEngine().count([url])
+
+        assert (first.count, second.count) == (120, 120)
+        assert first.bytes_downloaded > 0 and second.bytes_downloaded == 0
+
+    def test_partial_count_not_stored(self, site):
+        """Un comptage coupe par la limite n'est pas reutilise comme total."""
+        site.route("/sitemap_products_1.xml", _sitemap(5000), etag=True)
+        url = f"{site.origin}/sitemap_products_1.xml"
+
+        SitemapEngine(limit=100).count([url])
+        full = SitemapEngine(limit=0).count([url])
+
+        assert full.count == 5000 and full.bytes_downloaded > 0
+
+    def test_count_products_shopify_by_country(self, site, monkeypatch):
+        site.route("/sitemap.xml", _index("/fr/sitemap_products_1.xml", "/sitemap_products_1.xml"))
+        site.route("/fr/sitemap_products_1.xml", _sitemap(42))
+        monkeypatch.setattr(web_analyzer, "_count_products_via_api", lambda origin: -1)
+
+        assert web_analyzer.count_products_shopify_by_country(site.origin, "FR") == 42
+        assert web_analyzer.count_products_shopify_by_country(site.origin + "/missing", "FR") == -1
+
+
+class TestMarketSpySitemapAnalyzer:
+    """SitemapAnalyzer utilise le meme moteur (count reel, titres du premier sitemap)."""
+
+    def test_count_and_titles(self, site):
+        site.route("/sitemap.xml", _index("/sitemap_products_1.xml", "/sitemap_products_2.xml"))
+        site.route("/sitemap_products_1.xml", _sitemap(30))
+        site.route("/sitemap_products_2.xml", _sitemap(20, start=30))
+        client = HttpClient()
+
+        data = SitemapAnalyzer(client).analyze(site.origin)
+        client.close()
+
+        assert data.product_count == "50" and data.sitemap_count == 2
+        assert data.product_titles[:2] == ["Robe 0", "Robe 1"]
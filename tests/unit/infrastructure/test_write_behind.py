@@ -0,0 +1,122 @@
+"""
+Tests unitaires pour l'ecriture differee (write-behind) des logs.
+"""
+
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src.infrastructure.persistence.repositories.token_repository import bulk_record_token_usage
+from src.infrastructure.persistence.write_behind import WriteBehindBuffer
+
+
+class _Recorder:
+    """Writer factice: memorise chaque lot recu."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, db, records):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.batches.append((db, list(records)))
+
+
+class TestWriteBehindBuffer:
+    """Tests pour WriteBehindBuffer."""
+
+    def test_flush_writes_in_batches_grouped_by_kind(self):
+        """Les enregistrements sont ecrits par lots, groupes par type."""
+        logs, usage = _Recorder(), _Recorder()
+        buffer = WriteBehindBuffer({"log": logs, "usage": usage}, batch_size=3, flush_interval=60)
+        db = object()
+        for i in range(4):
+            buffer.submit("log", db, {"i": i})
+        buffer.submit("usage", db, {"token": "t"})
+
+        written = buffer.flush()
+
+        assert written == 5
+        assert [len(records) for _, records in logs.batches] == [3, 1]
+        assert usage.batches == [(db, [{"token": "t"}])]
+        buffer.close()
+
+    def test_drops_and_counts_when_full(self):
+        """File pleine: l'enregistrement est abandonne et compte."""
+        buffer = WriteBehindBuffer({"log": _Recorder()}, max_pending=2, batch_size=10, flush_interval=60)
+
+        accepted = [buffer.submit("log", None, {"i": i}) for i in range(3)]
+
+        assert accepted == [True, True, False]
+        assert buffer.get_stats()["dropped"] == 1
+        buffer.close()
+
+    def test_background_thread_flushes(self):
+        """Le thread de fond ecrit sans appel explicite."""
+        logs = _Recorder()
+        buffer = WriteBehindBuffer({"log": logs}, batch_size=100, flush_interval=0.05)
+        buffer.submit("log", None, {"i": 1})
+
+        deadline = time.time() + 2
+        while not logs.batches and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert logs.batches == [(None, [{"i": 1}])]
+        buffer.close()
+
+    def test_close_flushes_and_rejects_new_records(self):
+        """close() vide la file; les enregistrements suivants sont refuses."""
+        logs = _Recorder()
+        buffer = WriteBehindBuffer({"log": logs}, batch_size=100, flush_interval=60)
+        buffer.submit("log", None, {"i": 1})
+
+        buffer.close()
+
+        assert logs.batches == [(None, [{"i": 1}])]
+        assert buffer.submit("log", None, {"i": 2}) is False
+
+    def test_failed_batch_is_counted(self):
+        """Un lot en echec est abandonne et compte, sans lever."""
+        buffer = WriteBehindBuffer({"log": _Recorder(fail=True)}, flush_interval=60)
+        buffer.submit("log", None, {"i": 1})
+
+        assert buffer.flush() == 0
+        assert buffer.get_stats()["failed"] == 1
+        buffer.close()
+
+
+class TestBulkRecordTokenUsage:
+    """Tests pour bulk_record_token_usage."""
+
+    def test_aggregates_usages_per_token(self):
+        """Les compteurs du token sont mis a jour pour chaque utilisation du lot."""
+        meta_token = SimpleNamespace(
+            token="tok", total_calls=1, total_errors=0, rate_limit_hits=0,
+            last_used_at=None, last_error_at=None, last_error_message=None,
+            rate_limited_until=None,
+        )
+        session = MagicMock()
+        session.query.return_value.filter.return_value.all.return_value = [meta_token]
+
+        @contextmanager
+        def get_session():
+            yield session
+
+        db = MagicMock()
+        db.get_session = get_session
+        now = time.time()
+
+        bulk_record_token_usage(db, [
+            {"token": "tok", "success": True, "at": now},
+            {"token": "tok", "success": False, "error_message": "limit",
+             "is_rate_limit": True, "rate_limit_seconds": 60, "at": now},
+        ])
+
+        assert meta_token.total_calls == 3
+        assert meta_token.total_errors == 1
+        assert meta_token.rate_limit_hits == 1
+        assert meta_token.last_error_message == "limit"
+        assert meta_token.rate_limited_until > datetime.utcfromtimestamp(now)
@@ -0,0 +1,53 @@
+"""
+Tests unitaires pour le flux SSE de progression des recherches.
+"""
+
+import asyncio
+import importlib
+
+from src.infrastructure.monitoring import progress_channel
+from src.infrastructure.monitoring.progress_channel import ProgressChannel
+
+searches_router = importlib.import_module("src.presentation.api.searches.router")
+
+
+class _Recorder:
+    """Writer factice: ignore les ecritures."""
+
+    def __call__(self, db, search_id, fields):
+        pass
+
+
+class TestProgressStream:
+    """Tests pour le flux SSE de progression."""
+
+    def test_stream_pushes_updates_until_final_status(self, monkeypatch):
+        """Le flux pousse les changements publies puis un evenement end."""
+        channel = ProgressChannel(_Recorder(), flush_interval_ms=60_000)
+        monkeypatch.setattr(progress_channel, "_channel", channel)
+        monkeypatch.setattr(searches_router, "PROGRESS_SSE_HEARTBEAT", 5)
+
+        class _Request:
+            async def is_disconnected(self):
+                return False
+
+        search = {"id": 9, "status": "running", "progress_percent": 0}
+        channel.publish(None, 9, phase=1, percent=10)
+
+        async def consume():
+            events = []
+            stream = searches_router._progress_events(_Request(), None, search)
+            async for event in stream:
+                events.append(event)
+                if len(events) == 1:
+                    loop = asyncio.get_running_loop()
+                    loop.call_later(0.05, channel.finish, 9, "completed")
+            return events
+
+        events = asyncio.run(consume())
+
+        assert events[0].startswith("event: progress\nid: 1\n")
+        assert '"percent": 10' in events[0]
+        assert events[-1].startswith("event: end\n")
+        assert '"status": "completed"' in events[-1]
+        channel.close()